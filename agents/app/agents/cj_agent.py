@@ -1,6 +1,6 @@
 """CJ Agent - AI Customer Support Lead for merchant conversations."""
 
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple
 from crewai import Agent
 from app.agents.extended_agent import ExtendedAgent
 from app.models import ConversationState
@@ -69,12 +69,36 @@ class CJAgent:
         else:
             logger.info(f"[CJ_AGENT] Initialized without merchant memory")
 
+        # Merchant memory, loaded once and then kept current through add_facts()
+        self._facts: Optional[List[str]] = None
+
         # Load prompts and tools
         self._load_components()
 
         # Create the CrewAI agent
         self.agent = self._create_agent(**kwargs)
 
+    @property
+    def cache_key(self) -> Tuple[str, str, Optional[str], str, Optional[str]]:
+        """What the agent's prompt, workflow and tools were built for."""
+        return (self.merchant_name, self.scenario_name, self.workflow_name, self.cj_version, self.user_id)
+
+    def refresh(self, conversation_state: Optional[ConversationState], oauth_metadata: Optional[Dict[str, Any]] = None) -> ExtendedAgent:
+        """Reuse the agent for the next turn.
+
+        Prompt, workflow, tools and merchant facts are kept; only the parts built from
+        the conversation window (history, grounding, onboarding phase) are redone.
+        """
+        self.conversation_state = conversation_state
+        self.oauth_metadata = oauth_metadata
+        self.agent.backstory = self._build_backstory()
+        return self.agent
+
+    def add_facts(self, facts: List[str]) -> None:
+        """Add newly extracted facts to the memory shown from the next turn on."""
+        if self._facts is not None:
+            self._facts = (self._facts + list(facts))[-20:]
+
     def _load_components(self):
         """Load prompts, workflows, and tools."""
         from app.prompts.loader import PromptLoader
@@ -334,8 +358,16 @@ class CJAgent:
         logger.info(f"[CJ_AGENT] [GROUNDING] === GROUNDING CHECK COMPLETE (processed) ===")
         return content
 
-    def _create_agent(self, **kwargs) -> ExtendedAgent:
-        """Create the CrewAI agent instance."""
+    def _get_facts(self) -> List[str]:
+        """Up to 20 most recent merchant facts, read from the database on first use."""
+        if self._facts is None:
+            from shared.user_identity import get_user_facts
+            all_facts = get_user_facts(self.user_id)
+            self._facts = [f['fact'] for f in all_facts[-20:]]
+        return self._facts
+
+    def _build_backstory(self) -> str:
+        """Format the prompt for the current conversation window."""
         # Build context
         context = self._build_context()
         
@@ -353,16 +385,11 @@ class CJAgent:
 
         # Add universe info if available
         if self.data_agent is not None:
-            universe_info = self._get_universe_info()
-            backstory += universe_info
+            backstory += self._universe_info
 
         # Add merchant memory facts if available
         if self.user_id:
-            # Get facts from user_identity
-            from shared.user_identity import get_user_facts
-            all_facts = get_user_facts(self.user_id)
-            # Get up to 20 most recent facts
-            facts = [f['fact'] for f in all_facts[-20:]]
+            facts = self._get_facts()
             if facts:
                 logger.info(f"[CJ_AGENT] [MEMORY] Injecting {len(facts)} facts into context for {self.merchant_name}")
                 memory_context = "\n\nThings I know about this merchant from previous conversations:\n"
@@ -375,6 +402,13 @@ class CJAgent:
         else:
             logger.info(f"[CJ_AGENT] [MEMORY] No merchant memory available for context")
 
+        return backstory
+
+    def _create_agent(self, **kwargs) -> ExtendedAgent:
+        """Create the CrewAI agent instance."""
+        self._universe_info = self._get_universe_info()
+        backstory = self._build_backstory()
+
         # Log agent creation
         logger.info("[CJ_AGENT] Creating CJ agent:")
         logger.info(f"[CJ_AGENT] - Merchant: {self.merchant_name}")
@@ -498,3 +532,77 @@ def create_cj_agent(
         **kwargs,
     )
     return cj.agent
+
+
+def get_grounding_directives(workflow_name: Optional[str] = None, cj_version: str = None) -> List[Any]:
+    """Grounding directives a CJ agent for this workflow resolves while building its prompt.
+
+    Reads the same (cached) prompt and workflow as CJAgent, so knowledge queries can be
+    prefetched before the agent is built.
+    """
+    from app.prompts.loader import PromptLoader
+    from app.services.grounding_manager import GroundingManager
+    from app.workflows.loader import WorkflowLoader
+
+    sources = [PromptLoader().load_cj_prompt(cj_version or settings.default_cj_version).get("prompt", "")]
+    if workflow_name:
+        sources.append(WorkflowLoader().get_workflow(workflow_name).get("workflow", ""))
+
+    return [d for source in sources for d in GroundingManager.extract_grounding_directives(source)]
+
+
+class CJAgentCache:
+    """Reuses one session's CJ agent across turns.
+
+    Building a CJAgent reads the prompt and workflow YAML, constructs every tool and
+    queries the merchant's facts. None of that changes between turns of a session,
+    so the agent is kept while its (merchant, scenario, workflow, cj_version, user_id)
+    key stays the same and only refreshed for the new conversation window. A changed
+    key (e.g. a workflow transition) builds a new agent.
+    """
+
+    def __init__(self):
+        self._cj: Optional[CJAgent] = None
+        self.stats = {"hits": 0, "misses": 0}
+
+    def get_agent(
+        self,
+        merchant_name: str,
+        scenario_name: str,
+        cj_version: str = None,
+        workflow_name: Optional[str] = None,
+        conversation_state: Optional[ConversationState] = None,
+        data_agent: Optional[UniverseDataAgent] = None,
+        user_id: Optional[str] = None,
+        oauth_metadata: Optional[Dict[str, Any]] = None,
+        verbose: bool = True,
+    ) -> Agent:
+        """The session's agent, refreshed for this turn, or a new one when the key changed."""
+        key = (merchant_name, scenario_name, workflow_name, cj_version or settings.default_cj_version, user_id)
+        cj = self._cj
+        if cj is not None and cj.cache_key == key and cj.data_agent is data_agent:
+            self.stats["hits"] += 1
+            logger.info(f"[CJ_AGENT] Reusing agent for {merchant_name} (workflow={workflow_name})")
+            return cj.refresh(conversation_state, oauth_metadata)
+
+        self.stats["misses"] += 1
+        self._cj = CJAgent(
+            merchant_name=merchant_name,
+            scenario_name=scenario_name,
+            cj_version=cj_version,
+            workflow_name=workflow_name,
+            conversation_state=conversation_state,
+            data_agent=data_agent,
+            user_id=user_id,
+            oauth_metadata=oauth_metadata,
+            verbose=verbose,
+        )
+        return self._cj.agent
+
+    def add_facts(self, facts: List[str]) -> None:
+        """Show facts FactExtractor just stored from the next turn on."""
+        if self._cj is not None:
+            self._cj.add_facts(facts)
+
+    def clear(self) -> None:
+        self._cj = None
@@ -3,7 +3,7 @@
 import logging
 import json
 from typing import List, Any, Optional
-from datetime import datetime, date, timedelta
+from datetime import datetime, date, timedelta, timezone
 from crewai.tools.base_tool import tool
 from app.utils.supabase_util import get_db_session
 from app.lib.freshdesk_analytics_lib import FreshdeskAnalytics
@@ -77,9 +77,11 @@ Data Source: Live database query"""
         """TEXT SEARCH ONLY - Search tickets by keywords, customer names, or tags. 
         
         CANNOT search by date. For date-based queries, use get_daily_snapshot or other time-based tools.
+        Results are ranked, best match first.
 
         Args:
-            query: Text search term (searches in subject, description, customer name, email, and tags)
+            query: Text search term (searches in subject, description, customer name, email, tags,
+                  and conversation messages)
                   Examples: 'shipping delays', 'refund requests', 'Mary Beskin', 'singlesswag'
         """
         logger.info(f"[TOOL CALL] search_tickets_in_db(query='{query}') - Searching for tickets in database")
@@ -917,13 +919,15 @@ Ticket #{survey['ticket_id']} - {survey['rating_label']} ({survey['rating']})
 
     @tool
     @log_tool_execution
-    def get_sla_exceptions(first_response_min: Optional[int] = None, resolution_min: Optional[int] = None, include_pending: bool = True) -> str:
+    def get_sla_exceptions(first_response_min: Optional[int] = None, resolution_min: Optional[int] = None, include_pending: bool = True, limit: int = 5, since: Optional[str] = None) -> str:
         """Monitor SLA compliance and identify tickets breaching service level agreements.
         
         Args:
             first_response_min: First response SLA in minutes (default: 60 min / 1 hour)
             resolution_min: Resolution SLA in minutes (default: 1440 min / 24 hours)
             include_pending: Include open/pending tickets in resolution checks (default: True)
+            limit: Number of worst breaches to list per type (default: 5, max 50)
+            since: Only check tickets created on or after this date (YYYY-MM-DD, optional)
             
         Returns comprehensive SLA breach analysis with patterns and insights.
         """
@@ -933,6 +937,14 @@ Ticket #{survey['ticket_id']} - {survey['rating_label']} ({survey['rating']})
             first_response_min = args_dict.get('first_response_min')
             resolution_min = args_dict.get('resolution_min')
             include_pending = args_dict.get('include_pending', True)
+            limit = args_dict.get('limit', 5)
+            since = args_dict.get('since')
+        
+        limit = max(1, min(int(limit or 5), 50))
+        try:
+            since_dt = datetime.fromisoformat(since).replace(tzinfo=timezone.utc) if since else None
+        except ValueError:
+            return f"Invalid since date '{since}'. Use YYYY-MM-DD format."
         
         # Build SLA config
         sla_config = {
@@ -943,7 +955,7 @@ Ticket #{survey['ticket_id']} - {survey['rating_label']} ({survey['rating']})
         if resolution_min is not None:
             sla_config["resolution_min"] = resolution_min
         
-        logger.info(f"[TOOL CALL] get_sla_exceptions(config={sla_config})")
+        logger.info(f"[TOOL CALL] get_sla_exceptions(config={sla_config}, limit={limit}, since={since})")
         
         try:
             # Get merchant_id
@@ -954,7 +966,9 @@ Ticket #{survey['ticket_id']} - {survey['rating_label']} ({survey['rating']})
                 analysis = FreshdeskAnalytics.get_sla_exceptions(
                     session,
                     merchant_id,
-                    sla_config if sla_config != {"include_pending": include_pending} else None
+                    sla_config if sla_config != {"include_pending": include_pending} else None,
+                    limit=limit,
+                    since=since_dt
                 )
             
             # Format output
@@ -975,7 +989,7 @@ Ticket #{survey['ticket_id']} - {survey['rating_label']} ({survey['rating']})
             # First Response Breaches
             if analysis['breaches']['first_response']:
                 output += "\n❌ **First Response SLA Breaches (worst first):**\n"
-                for i, breach in enumerate(analysis['breaches']['first_response'][:5], 1):
+                for i, breach in enumerate(analysis['breaches']['first_response'], 1):
                     if breach.get('no_response'):
                         output += f"""
 {i}. #{breach['ticket_id']} - NO RESPONSE YET
@@ -992,13 +1006,14 @@ Ticket #{survey['ticket_id']} - {survey['rating_label']} ({survey['rating']})
    Priority: {breach['priority']} | Escalated: {'Yes' if breach.get('fr_escalated') else 'No'}
 """
                 
-                if len(analysis['breaches']['first_response']) > 5:
-                    output += f"\n... and {len(analysis['breaches']['first_response']) - 5} more response breaches\n"
+                remaining = analysis['summary']['response_breaches'] - len(analysis['breaches']['first_response'])
+                if remaining > 0:
+                    output += f"\n... and {remaining} more response breaches\n"
             
             # Resolution Breaches
             if analysis['breaches']['resolution']:
                 output += "\n⏰ **Resolution SLA Breaches (worst first):**\n"
-                for i, breach in enumerate(analysis['breaches']['resolution'][:5], 1):
+                for i, breach in enumerate(analysis['breaches']['resolution'], 1):
                     status_str = "STILL OPEN" if breach.get('still_open') else "Resolved"
                     output += f"""
 {i}. #{breach['ticket_id']} - {breach['resolution_time_min']} min ({breach['resolution_time_min'] / 1440:.1f} days)
@@ -1008,8 +1023,9 @@ Ticket #{survey['ticket_id']} - {survey['rating_label']} ({survey['rating']})
    Escalated: {'Yes' if breach.get('is_escalated') else 'No'}
 """
                 
-                if len(analysis['breaches']['resolution']) > 5:
-                    output += f"\n... and {len(analysis['breaches']['resolution']) - 5} more resolution breaches\n"
+                remaining = analysis['summary']['resolution_breaches'] - len(analysis['breaches']['resolution'])
+                if remaining > 0:
+                    output += f"\n... and {remaining} more resolution breaches\n"
             
             # Patterns
             output += "\n📊 **Breach Patterns:**\n"
@@ -1041,7 +1057,7 @@ Ticket #{survey['ticket_id']} - {survey['rating_label']} ({survey['rating']})
                 urgent_count = analysis['patterns']['by_priority']['response'][4]['count']
                 insights.append(f"🔴 {urgent_count} urgent priority tickets breached response SLA")
             
-            open_resolution_breaches = sum(1 for b in analysis['breaches']['resolution'] if b.get('still_open'))
+            open_resolution_breaches = analysis['summary']['still_open_count']
             if open_resolution_breaches > 0:
                 insights.append(f"⏳ {open_resolution_breaches} tickets are still open and breaching resolution SLA")
             
@@ -1183,14 +1199,17 @@ Ticket #{survey['ticket_id']} - {survey['rating_label']} ({survey['rating']})
         
         Args:
             limit: Number of tickets to retrieve (default: 20, max: 100)
-            cursor: Pagination cursor from previous call (ticket_id to continue after)
+            cursor: Pagination cursor from previous call (the exact next_cursor string it returned)
             status_filter: Optional list of statuses to include 
                           ['open', 'pending', 'waiting', 'resolved', 'closed'] (default: all statuses)
         
         Returns raw ticket data including:
-        - Ticket metadata, conversations, ratings, escalation status
+        - Ticket metadata, conversation excerpts, ratings, escalation status
         - Pagination info (has_more, next_cursor if applicable)
         
+        Conversations show the first messages with long bodies cut short. Use get_ticket_details
+        for the full conversation of a specific ticket.
+        
         NOTE: This tool returns RAW DATA ONLY. You must analyze the tickets yourself and paginate over the right search area to identify:
         - Payment or billing issues affecting multiple customers
         - Service outages or system errors
@@ -1200,8 +1219,8 @@ Ticket #{survey['ticket_id']} - {survey['rating_label']} ({survey['rating']})
         Usage examples:
             # Paginate through all tickets
             page1 = get_recent_tickets_for_review(limit=20)
-            # If has_more=True and next_cursor="345927"
-            page2 = get_recent_tickets_for_review(limit=20, cursor="345927")
+            # If has_more=True and next_cursor="eyJjIjogIjIwMjUtMDYtMDVUMTM6NDc6NTYrMDA6MDAiLCAidCI6ICIzODU2NjAifQ"
+            page2 = get_recent_tickets_for_review(limit=20, cursor="eyJjIjogIjIwMjUtMDYtMDVUMTM6NDc6NTYrMDA6MDAiLCAidCI6ICIzODU2NjAifQ")
         """
         # Handle CrewAI dict args
         if isinstance(limit, dict):
@@ -1276,7 +1295,7 @@ Tags: {', '.join(ticket['tags']) if ticket['tags'] else 'None'}
 Escalated: {'YES' if ticket.get('is_escalated') else 'No'}
 Rating: {f"{ticket['rating_score']} - {ticket['rating_feedback']}" if ticket['has_rating'] else 'No rating'}
 
-CONVERSATION:
+CONVERSATION{' (excerpt, use get_ticket_details for the full text)' if ticket.get('conversation_truncated') else ''}:
 {ticket['conversation'] or 'No conversation available'}
 
 """
@@ -1374,7 +1393,9 @@ CONVERSATION:
                     status_codes = None
                 
                 # Query tickets
-                query = session.query(FreshdeskUnifiedTicketView).filter(
+                query = session.query(FreshdeskUnifiedTicketView).options(
+                    FreshdeskUnifiedTicketView.load_profile("subject", "status", "tags", "requester_email", "created_at")
+                ).filter(
                     FreshdeskUnifiedTicketView.merchant_id == 1,
                     FreshdeskUnifiedTicketView.created_at >= start,
                     FreshdeskUnifiedTicketView.created_at < end + timedelta(days=1)
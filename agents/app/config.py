@@ -96,6 +96,31 @@ class Settings(BaseSettings):
     rate_limit_delay: float = Field(0.1, env="RATE_LIMIT_DELAY")
     cache_warm_concurrency: int = Field(3, env="CACHE_WARM_CONCURRENCY")
     slow_response_threshold: float = Field(5.0, env="SLOW_RESPONSE_THRESHOLD")
+    persistence_max_workers: int = Field(4, env="PERSISTENCE_MAX_WORKERS")  # Threads for blocking DB calls from async code
+    persistence_max_pending: int = Field(200, env="PERSISTENCE_MAX_PENDING")  # Reject background DB work beyond this backlog
+    agent_max_workers: int = Field(8, env="AGENT_MAX_WORKERS")  # CJ agent turns running at once
+    agent_max_pending: int = Field(64, env="AGENT_MAX_PENDING")  # Reject new turns beyond this backlog
+    agent_session_max_pending: int = Field(3, env="AGENT_SESSION_MAX_PENDING")  # Turns one conversation may have queued
+    freshdesk_fetch_concurrency: int = Field(4, env="FRESHDESK_FETCH_CONCURRENCY")  # Tickets whose conversations download at once
+    freshdesk_fetch_queue_size: int = Field(100, env="FRESHDESK_FETCH_QUEUE_SIZE")  # Fetched tickets waiting for the DB writer
+    sync_max_workers: int = Field(4, env="SYNC_MAX_WORKERS")  # Processes for the multi-merchant sync scheduler
+    sync_freshdesk_concurrency: int = Field(2, env="SYNC_FRESHDESK_CONCURRENCY")  # Freshdesk merchant syncs at once
+    sync_shopify_concurrency: int = Field(2, env="SYNC_SHOPIFY_CONCURRENCY")  # Shopify merchant syncs at once
+    shopify_bulk_batch_size: int = Field(500, env="SHOPIFY_BULK_BATCH_SIZE")  # Customers per upsert in bulk syncs
+    shopify_bulk_poll_interval: float = Field(2.0, env="SHOPIFY_BULK_POLL_INTERVAL")  # Seconds between bulk operation polls
+    shopify_customer_cache_size: int = Field(10_000, env="SHOPIFY_CUSTOMER_CACHE_SIZE")  # Customer ids remembered per ETL
+    http_pool_max_connections: int = Field(10, env="HTTP_POOL_MAX_CONNECTIONS")  # Keep-alive connections and requests in flight per provider host
+    http_pool_http2: bool = Field(False, env="HTTP_POOL_HTTP2")  # Negotiate HTTP/2 in async provider clients (needs h2)
+    http_max_retries: int = Field(3, env="HTTP_MAX_RETRIES")  # Retries for 429/5xx responses and connection errors
+    http_backoff_base: float = Field(0.5, env="HTTP_BACKOFF_BASE")  # First retry waits up to this long, doubling per retry
+    http_backoff_max: float = Field(30.0, env="HTTP_BACKOFF_MAX")  # Longest jittered backoff between retries
+    grounding_cache_ttl: float = Field(1800.0, env="GROUNDING_CACHE_TTL")  # Seconds a knowledge service result is reused
+    grounding_cache_max_entries: int = Field(512, env="GROUNDING_CACHE_MAX_ENTRIES")  # Knowledge service results kept (LRU)
+    grounding_query_timeout: float = Field(10.0, env="GROUNDING_QUERY_TIMEOUT")  # Seconds a turn waits for each knowledge service query
+    grounding_prefetch: bool = Field(True, env="GROUNDING_PREFETCH")  # Start knowledge queries when the merchant message arrives
+    yaml_cache_check_interval: float = Field(1.0, env="YAML_CACHE_CHECK_INTERVAL")  # Seconds between mtime checks of a cached prompt/workflow/universe file
+    yaml_cache_preload: bool = Field(True, env="YAML_CACHE_PRELOAD")  # Parse prompts, universes and catalog at startup
+    yaml_cache_watch: bool = Field(False, env="YAML_CACHE_WATCH")  # Invalidate on file events instead of mtime checks (needs watchdog)
 
     # API Configuration
     api_host: str = Field("0.0.0.0", env="API_HOST")
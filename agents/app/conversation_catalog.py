@@ -6,9 +6,9 @@ Provides descriptions and characteristics for discovery.
 from dataclasses import dataclass
 from typing import Dict, List
 from enum import Enum
-import yaml
 import os
 from app.scenarios.loader import ScenarioLoader
+from app.utils.yaml_cache import load_yaml
 
 
 class StressLevel(str, Enum):
@@ -52,20 +52,16 @@ class WorkflowMetadata:
 class ConversationCatalog:
     """Registry of all available conversation options with rich metadata."""
 
-    _catalog_data = None
+    _catalog_path = os.path.join(
+        os.path.dirname(os.path.dirname(__file__)),
+        "config",
+        "conversation_catalog.yaml",
+    )
 
     @classmethod
     def _load_catalog(cls) -> dict:
-        """Load catalog data from YAML file."""
-        if cls._catalog_data is None:
-            catalog_path = os.path.join(
-                os.path.dirname(os.path.dirname(__file__)),
-                "config",
-                "conversation_catalog.yaml",
-            )
-            with open(catalog_path, "r") as f:
-                cls._catalog_data = yaml.safe_load(f)
-        return cls._catalog_data
+        """Load catalog data from YAML file (read-only, via the shared YAML cache)."""
+        return load_yaml(cls._catalog_path)
 
     @staticmethod
     def get_scenarios() -> Dict[str, ScenarioMetadata]:
@@ -16,6 +16,8 @@ from .etl_tables import (
     FreshdeskTicket,
     FreshdeskConversation,
     FreshdeskRating,
+    FreshdeskDailyRollup,
+    FreshdeskTicketSearch,
     # Aliases for backwards compatibility
     Customer,
     SupportTicket,
@@ -39,6 +41,8 @@ __all__ = [
     'FreshdeskTicket',
     'FreshdeskConversation',
     'FreshdeskRating',
+    'FreshdeskDailyRollup',
+    'FreshdeskTicketSearch',
     # View models
     'FreshdeskUnifiedTicketView',
     # Aliases
@@ -77,6 +77,12 @@ class SyncMetadata(Base, TimestampMixin):
         String(20), nullable=True
     )  # 'success', 'failed', 'in_progress'
     error_message = Column(Text, nullable=True)
+    watermark_at = Column(
+        DateTime(timezone=True), nullable=True
+    )  # Newest source timestamp covered by the last completed run (migration 016)
+    checkpoint = Column(
+        JSONB, nullable=True
+    )  # Unfinished run: {"since", "page", "watermark", "started_at", "saved_at"}
 
     # Relationships
     merchant = relationship("Merchant")
@@ -6,13 +6,14 @@ from sqlalchemy import (
     Column,
     Integer,
     String,
+    Date,
     DateTime,
     Boolean,
     ForeignKey,
     UniqueConstraint,
     Index,
 )
-from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
@@ -55,6 +56,7 @@ class ShopifyCustomer(Base, ETLTimestampMixin):
     )
     shopify_customer_id = Column(String(255), primary_key=True, nullable=False)
     data = Column(JSONB, nullable=False, default={})  # Flexible data storage
+    content_hash = Column(String(64))  # SHA-256 of data without _raw_data as canonical JSON, set by the ETL (migration 017)
 
     # Relationships
     merchant = relationship("Merchant")
@@ -88,6 +90,17 @@ class FreshdeskTicket(Base, ETLTimestampMixin):
     )
     freshdesk_ticket_id = Column(String(255), primary_key=True, nullable=False)
     data = Column(JSONB, nullable=False, default={})  # Core ticket data only
+    content_hash = Column(String(64))  # SHA-256 of data as canonical JSON, set by the ETL (migration 017)
+    
+    # Typed copies of hot fields in data, written by FreshdeskETL at upsert time (migration 014)
+    created_at = Column(DateTime(timezone=True))  # data.created_at
+    updated_at = Column(DateTime(timezone=True))  # data.updated_at
+    status = Column(Integer)  # data.status
+    priority = Column(Integer)  # data.priority
+    first_responded_at = Column(DateTime(timezone=True))  # data.stats.first_responded_at
+    resolved_at = Column(DateTime(timezone=True))  # data.stats.resolved_at
+    closed_at = Column(DateTime(timezone=True))  # data.stats.closed_at
+    requester_email = Column(String)  # data.requester.email
     
     """
     Example data content (realistic example from production):
@@ -194,6 +207,11 @@ class FreshdeskTicket(Base, ETLTimestampMixin):
         Index("idx_etl_freshdesk_tickets_freshdesk_ticket_id", "freshdesk_ticket_id"),
         Index("idx_etl_freshdesk_tickets_data_gin", "data", postgresql_using="gin"),
         Index("idx_etl_freshdesk_tickets_etl_created_at", "etl_created_at"),
+        # Date ranges and, scanned backwards, the keyset order of ticket review pages
+        Index("idx_etl_freshdesk_tickets_merchant_created", "merchant_id", "created_at", "freshdesk_ticket_id"),
+        Index("idx_etl_freshdesk_tickets_merchant_status", "merchant_id", "status"),
+        Index("idx_etl_freshdesk_tickets_merchant_closed", "merchant_id", "closed_at"),
+        Index("idx_etl_freshdesk_tickets_merchant_email", "merchant_id", "requester_email"),
     )
 
     def __repr__(self):
@@ -212,6 +230,12 @@ class FreshdeskConversation(Base, ETLTimestampMixin):
         nullable=False
     )
     data = Column(JSONB, nullable=False, default={})  # Array of conversation entries
+    content_hash = Column(String(64))  # SHA-256 of data as canonical JSON, set by the ETL (migration 017)
+    
+    # Summary of data, written by FreshdeskETL with each conversation upsert (migration 015)
+    conversation_count = Column(Integer, nullable=False, default=0)  # Number of entries in data
+    last_conversation_at = Column(DateTime(timezone=True))  # Latest entry created_at
+    has_agent_response = Column(Boolean, nullable=False, default=False)  # Any entry with incoming=false
     
     """
     Example data content (array of conversation entries):
@@ -273,6 +297,11 @@ class FreshdeskRating(Base, ETLTimestampMixin):
         nullable=False
     )
     data = Column(JSONB, nullable=False, default={})  # Rating data
+    content_hash = Column(String(64))  # SHA-256 of data as canonical JSON, set by the ETL (migration 017)
+    
+    # Typed copies of hot fields in data, written by FreshdeskETL at upsert time (migration 014)
+    rating_score = Column(Integer)  # data.ratings.default_question
+    created_at = Column(DateTime)  # data.created_at as UTC wall-clock time
     
     """
     Example data content:
@@ -308,6 +337,7 @@ class FreshdeskRating(Base, ETLTimestampMixin):
     # Constraints and indexes
     __table_args__ = (
         Index("idx_freshdesk_ratings_ticket_id", "freshdesk_ticket_id"),
+        Index("idx_etl_freshdesk_ratings_created_at", "created_at"),
         Index(
             "idx_freshdesk_ratings_rating", 
             data["ratings"]["default_question"].astext,
@@ -319,6 +349,92 @@ class FreshdeskRating(Base, ETLTimestampMixin):
         return f"<FreshdeskRating(freshdesk_ticket_id='{self.freshdesk_ticket_id}')>"
 
 
+class FreshdeskDailyRollup(Base):
+    """Per-merchant daily Freshdesk aggregates maintained by the ETL.
+    
+    Rows are recomputed by the refresh_freshdesk_daily_rollups() database function
+    for the days each sync batch touches (see FreshdeskRollups). Days are UTC.
+    """
+
+    __tablename__ = "freshdesk_daily_rollups"
+
+    merchant_id = Column(
+        Integer,
+        ForeignKey("merchants.id", ondelete="CASCADE"),
+        primary_key=True,
+        nullable=False,
+    )
+    day = Column(Date, primary_key=True, nullable=False)  # UTC calendar day
+    new_tickets = Column(Integer, nullable=False, default=0)  # Tickets created on this day
+    closed_tickets = Column(Integer, nullable=False, default=0)  # Tickets closed on this day
+    untagged_tickets = Column(Integer, nullable=False, default=0)  # Tickets created on this day without tags
+    tag_counts = Column(JSONB, nullable=False, default={})  # {"tag": count} for tickets created on this day
+    type_counts = Column(JSONB, nullable=False, default={})  # {"type": count}, null type stored as "unspecified"
+    rating_histogram = Column(JSONB, nullable=False, default={})  # {"103": count} for ratings received on this day
+    first_response_sketch = Column(JSONB, nullable=False, default={})  # {"buckets": {"3": n}, "count": n, "sum_min": x}
+    resolution_sketch = Column(JSONB, nullable=False, default={})  # Same shape as first_response_sketch
+    refreshed_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    # Relationships
+    merchant = relationship("Merchant")
+
+    def __repr__(self):
+        return f"<FreshdeskDailyRollup(merchant_id={self.merchant_id}, day={self.day}, new_tickets={self.new_tickets})>"
+
+
+class FreshdeskTicketSearch(Base):
+    """Per-ticket search index over ticket fields and conversation text.
+    
+    Rows are rebuilt by the refresh_freshdesk_ticket_search() database function for the
+    tickets each sync batch touches (see FreshdeskSearch). The display columns are copied
+    from the ticket so search results need no join.
+    """
+
+    __tablename__ = "freshdesk_ticket_search"
+
+    merchant_id = Column(
+        Integer,
+        ForeignKey("merchants.id", ondelete="CASCADE"),
+        primary_key=True,
+        nullable=False,
+    )
+    freshdesk_ticket_id = Column(String(255), primary_key=True, nullable=False)
+    subject = Column(String)  # Trigram indexed for partial matches
+    status = Column(Integer)
+    created_at = Column(DateTime(timezone=True))  # When the ticket was created in Freshdesk
+    requester_name = Column(String)  # Trigram indexed for partial matches
+    requester_email = Column(String)  # Trigram indexed for partial matches
+    tags = Column(JSONB, nullable=False, default=[])  # Tag array for exact tag matches
+    search_vector = Column(TSVECTOR, nullable=False)  # A=subject, B=requester/tags, C=description, D=conversations
+    refreshed_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    # Relationships
+    merchant = relationship("Merchant")
+
+    # Constraints and indexes
+    __table_args__ = (
+        Index("idx_freshdesk_ticket_search_vector", "search_vector", postgresql_using="gin"),
+        Index(
+            "idx_freshdesk_ticket_search_subject_trgm", "subject",
+            postgresql_using="gin", postgresql_ops={"subject": "gin_trgm_ops"}
+        ),
+        Index(
+            "idx_freshdesk_ticket_search_email_trgm", "requester_email",
+            postgresql_using="gin", postgresql_ops={"requester_email": "gin_trgm_ops"}
+        ),
+        Index(
+            "idx_freshdesk_ticket_search_name_trgm", "requester_name",
+            postgresql_using="gin", postgresql_ops={"requester_name": "gin_trgm_ops"}
+        ),
+        Index(
+            "idx_freshdesk_ticket_search_tags", "tags",
+            postgresql_using="gin", postgresql_ops={"tags": "jsonb_path_ops"}
+        ),
+    )
+
+    def __repr__(self):
+        return f"<FreshdeskTicketSearch(freshdesk_ticket_id='{self.freshdesk_ticket_id}', merchant_id={self.merchant_id})>"
+
 
 # For backwards compatibility, create aliases
 Customer = ShopifyCustomer
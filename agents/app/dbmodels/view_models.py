@@ -15,17 +15,30 @@ from sqlalchemy import (
     ForeignKey,
 )
 from sqlalchemy.dialects.postgresql import JSONB
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import deferred, load_only, relationship
 
 from .base import Base
 
 
+# Deferred group for the large JSONB columns on the unified ticket view. They are only
+# fetched when a query asks for them (load_profile or undefer_group).
+HEAVY_COLUMNS_GROUP = "heavy_jsonb"
+
+
 class FreshdeskUnifiedTicketView(Base):
     """Read-only view combining ticket, conversation, and rating data.
     
     This view provides a single source of truth for all ticket-related queries,
     eliminating the need for complex joins and JSONB extractions in application code.
     
+    custom_fields and conversation_history are deferred: plain queries skip them, and
+    callers that need them name them in a load_profile() (see freshdesk_analytics_lib).
+    
+    The conversation summary columns are stored by the ETL, and conversations and ratings
+    are joined by primary key, so a query that selects none of their columns never reads
+    those tables. v_freshdesk_unified_tickets_lean is the same view without
+    conversation_history, for SQL consumers that select every column.
+    
     Example usage:
         # Get all open tickets with ratings
         tickets = session.query(FreshdeskUnifiedTicketView).filter(
@@ -89,7 +102,7 @@ class FreshdeskUnifiedTicketView(Base):
     
     # Tags & Custom Fields
     tags = Column(JSONB)  # Array of string tags applied to ticket (e.g., ["#PROCESS_CANCELLATION_PAYWHIRL"])
-    custom_fields = Column(JSONB)  # Merchant-specific custom fields as key-value pairs. Common fields in our dataset:
+    custom_fields = deferred(Column(JSONB), group=HEAVY_COLUMNS_GROUP)  # Merchant-specific custom fields as key-value pairs. Common fields in our dataset:
                                    # - cf_store_id: Shopify store ID associated with the ticket
                                    # - cf_store_id953865: Alternative store ID field (likely merchant-specific variant)
                                    # - cf_subscription_id: Subscription/recurring order ID if ticket relates to subscription
@@ -105,7 +118,7 @@ class FreshdeskUnifiedTicketView(Base):
                                    # - cf_sf_mp_breakout: Salesforce marketplace breakout tracking
                                    # - cf_t2checkedforgithub: Boolean flag if T2 support checked for related GitHub issues
     
-    # Conversation Summary
+    # Conversation Summary (stored on etl_freshdesk_conversations by the ETL)
     conversation_count = Column(Integer)  # Total number of conversation entries (messages) on this ticket
     last_conversation_at = Column(DateTime(timezone=True))  # Timestamp of the most recent conversation entry
     has_agent_response = Column(Boolean)  # Whether any agent has responded to this ticket (true if any non-incoming conversation exists)
@@ -117,11 +130,26 @@ class FreshdeskUnifiedTicketView(Base):
     rating_created_at = Column(DateTime(timezone=True))  # When the customer submitted their satisfaction rating
     
     # Conversation History
-    conversation_history = Column(JSONB)  # Full conversation history as JSONB array from etl_freshdesk_conversations.data
+    conversation_history = deferred(Column(JSONB), group=HEAVY_COLUMNS_GROUP)  # Full conversation history as JSONB array from etl_freshdesk_conversations.data
     
     # Relationships
     merchant = relationship("Merchant")
     
+    @classmethod
+    def load_profile(cls, *names: str):
+        """Query option that loads only the named columns (plus the primary key).
+        
+        Accessing any other column on the loaded rows raises instead of silently
+        issuing one extra SELECT per row, so a profile must list every column its
+        caller reads. Heavy JSONB is only fetched when named explicitly.
+        
+        Example:
+            session.query(FreshdeskUnifiedTicketView).options(
+                FreshdeskUnifiedTicketView.load_profile("subject", "status")
+            )
+        """
+        return load_only(*(getattr(cls, name) for name in dict.fromkeys(names)), raiseload=True)
+    
     @property
     def conversation(self):
         """Get formatted conversation history as markdown using the embedded conversation_history field.
@@ -0,0 +1,130 @@
+"""Change-detecting bulk upserts shared by the ETL libraries.
+
+Every ETL row carries content_hash, a SHA-256 of its data document serialized as
+canonical JSON (sorted keys, no whitespace), optionally leaving out keys that differ by
+source without the record having changed. Before writing a page, one query fetches
+the stored hashes for the page's keys; rows whose hash is unchanged are dropped on the
+client and never sent, and the rest go out in a single INSERT ... ON CONFLICT DO UPDATE
+that compares hashes instead of JSONB documents.
+
+upsert_rows_isolating_failures() wraps that statement in a savepoint and, when it
+fails, splits the page in halves until the rows Postgres rejects are isolated, so
+one bad row costs only itself.
+"""
+
+import hashlib
+import json
+from typing import Any, Dict, List, Sequence, Tuple
+
+from sqlalchemy import select, tuple_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+
+def content_hash(document: Any, unhashed_keys: Sequence[str] = ()) -> str:
+    """SHA-256 hex digest of a JSON document in canonical form, leaving out unhashed_keys."""
+    if unhashed_keys:
+        document = {key: value for key, value in document.items() if key not in unhashed_keys}
+    canonical = json.dumps(document, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def filter_changed_rows(session: Session, model, rows: List[Dict[str, Any]],
+                        index_elements: List[str]) -> List[Dict[str, Any]]:
+    """Rows that are new or whose content_hash differs from the stored one.
+
+    Looks up the stored hashes for all rows in one query.
+    """
+    if not rows:
+        return []
+    if len(index_elements) == 1:
+        key_column = getattr(model, index_elements[0])
+        keys = [row[index_elements[0]] for row in rows]
+        stored = session.execute(
+            select(key_column, model.content_hash).where(key_column.in_(keys))
+        ).all()
+        stored_hashes = {key: stored_hash for key, stored_hash in stored}
+        return [row for row in rows if stored_hashes.get(row[index_elements[0]]) != row['content_hash']]
+
+    key_columns = [getattr(model, name) for name in index_elements]
+    keys = [tuple(row[name] for name in index_elements) for row in rows]
+    stored = session.execute(
+        select(*key_columns, model.content_hash).where(tuple_(*key_columns).in_(keys))
+    ).all()
+    stored_hashes = {tuple(values[:-1]): values[-1] for values in stored}
+    return [
+        row for row in rows
+        if stored_hashes.get(tuple(row[name] for name in index_elements)) != row['content_hash']
+    ]
+
+
+def upsert_changed_rows(session: Session, model, rows: List[Dict[str, Any]], index_elements: List[str],
+                        force: bool = False, unhashed_keys: Sequence[str] = ()) -> List[Any]:
+    """Upsert the new and changed rows of a page with one multi-row INSERT ... ON CONFLICT DO UPDATE.
+
+    Adds content_hash to every row (from its data, without the unhashed_keys). Unless
+    force is set, rows whose hash matches the stored one are skipped without being sent.
+    Rows must be unique on index_elements, as Postgres rejects touching a row twice in
+    one statement.
+
+    Returns:
+        Keys (the last index element) of rows that were inserted or changed, in row order
+    """
+    for row in rows:
+        row['content_hash'] = content_hash(row['data'], unhashed_keys)
+    if not force:
+        rows = filter_changed_rows(session, model, rows, index_elements)
+    if not rows:
+        return []
+
+    stmt = insert(model).values(rows)
+    update_columns = {
+        name: stmt.excluded[name] for name in rows[0] if name not in index_elements
+    }
+    stmt = stmt.on_conflict_do_update(
+        index_elements=index_elements,
+        set_=update_columns,
+        # Only update if content differs (rows stored before hashing have no hash yet)
+        where=None if force else model.content_hash.is_distinct_from(stmt.excluded.content_hash)
+    )
+    key_name = index_elements[-1]
+    changed = set(session.execute(stmt.returning(getattr(model, key_name))).scalars())
+    return [row[key_name] for row in rows if row[key_name] in changed]
+
+
+def upsert_rows_isolating_failures(session: Session, model, rows: List[Dict[str, Any]],
+                                   index_elements: List[str], force: bool = False,
+                                   unhashed_keys: Sequence[str] = ()
+                                   ) -> Tuple[List[Any], List[Tuple[Any, Exception]]]:
+    """upsert_changed_rows() in a savepoint, binary-splitting the page when it fails.
+
+    Each attempt runs in its own SAVEPOINT, so a rejected statement rolls back only
+    that attempt and the session stays usable. A page whose statement fails is split
+    in halves and retried until the failing rows stand alone; the rest are written.
+    The caller commits.
+
+    Returns:
+        (keys of inserted or changed rows, [(key, error) for each row that was not written])
+    """
+    failed: List[Tuple[Any, Exception]] = []
+    changed = _upsert_or_split(session, model, rows, index_elements, force, unhashed_keys, failed)
+    return changed, failed
+
+
+def _upsert_or_split(session: Session, model, rows: List[Dict[str, Any]], index_elements: List[str],
+                     force: bool, unhashed_keys: Sequence[str], failed: List[Tuple[Any, Exception]]) -> List[Any]:
+    if not rows:
+        return []
+    savepoint = session.begin_nested()
+    try:
+        changed = upsert_changed_rows(session, model, rows, index_elements, force, unhashed_keys)
+    except Exception as e:
+        savepoint.rollback()
+        if len(rows) == 1:
+            failed.append((rows[0][index_elements[-1]], e))
+            return []
+        middle = len(rows) // 2
+        return (_upsert_or_split(session, model, rows[:middle], index_elements, force, unhashed_keys, failed)
+                + _upsert_or_split(session, model, rows[middle:], index_elements, force, unhashed_keys, failed))
+    savepoint.commit()
+    return changed
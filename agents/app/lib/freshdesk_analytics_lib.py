@@ -4,16 +4,231 @@ This library provides comprehensive analytics functions for support team metrics
 designed to power the support_daily workflow with actionable insights.
 """
 
+import base64
+import binascii
+import heapq
+import json
+from collections import Counter
 from datetime import datetime, date, timedelta, timezone
 from typing import Dict, Any, Optional, List
-from sqlalchemy import func, and_, or_, case, distinct
+import numpy as np
+from sqlalchemy import func, and_, or_, case, distinct, select, column, tuple_
+from sqlalchemy.dialects.postgresql import JSONB, aggregate_order_by
 from sqlalchemy.orm import Session
 
 from app.dbmodels.view_models import FreshdeskUnifiedTicketView
+from app.lib.freshdesk_rollup_lib import FreshdeskRollups
+from app.lib.freshdesk_search_lib import FreshdeskSearch
+from app.lib.ticket_frame import TicketFrame, tag_counts
 from app.utils.supabase_util import get_db_session
 from app.config import logger
 
 
+# Scalar columns extracted by the frame-based analytics methods
+RESPONSE_TIME_COLUMNS = [
+    "freshdesk_ticket_id", "created_at", "first_responded_at", "resolved_at",
+    "has_rating", "rating_score",
+]
+ROOT_CAUSE_COLUMNS = ["freshdesk_ticket_id", "subject", "type", "tags", "created_at"]
+
+# Column profiles for ORM queries on the unified view (FreshdeskUnifiedTicketView.load_profile).
+# Only methods that return conversation text include CONVERSATION_COLUMNS, which carries the
+# heavy conversation_history JSONB plus the fields FreshdeskUnifiedTicketView.conversation reads.
+CONVERSATION_COLUMNS = ["conversation_history", "subject", "has_rating", "rating_score", "rating_feedback"]
+RECENT_TICKET_PROFILE = [
+    "subject", "status", "priority", "created_at", "updated_at", "requester_name",
+    "requester_email", "conversation_count", "has_agent_response",
+] + CONVERSATION_COLUMNS
+CSAT_PROFILE = ["requester_email", "rating_score", "rating_created_at"]
+TICKET_DETAIL_PROFILE = [
+    "subject", "description", "status", "priority", "created_at", "updated_at",
+    "requester_name", "requester_email", "conversation_count", "has_agent_response",
+    "has_rating", "rating_score", "rating_feedback", "rating_created_at",
+] + CONVERSATION_COLUMNS
+CUSTOMER_HISTORY_PROFILE = ["subject", "status", "priority", "created_at"]
+RATED_TICKET_PROFILE = ["subject", "rating_score", "rating_created_at", "requester_name", "requester_email"]
+BAD_CSAT_PROFILE = [
+    "subject", "requester_name", "requester_email", "rating_score", "rating_feedback",
+    "rating_created_at",
+] + CONVERSATION_COLUMNS
+# Review pages build a conversation excerpt in SQL, so they skip conversation_history
+TICKET_REVIEW_PAGE_PROFILE = [
+    "subject", "status", "priority", "type", "created_at", "updated_at", "requester_name",
+    "requester_email", "tags", "has_rating", "rating_score", "rating_feedback",
+    "first_responded_at", "resolved_at", "is_escalated", "conversation_count",
+]
+TICKET_REVIEW_PROFILE = TICKET_REVIEW_PAGE_PROFILE + CONVERSATION_COLUMNS
+CSAT_DETAIL_PROFILE = [
+    "rating_score", "rating_feedback", "rating_created_at", "responder_id", "requester_email",
+    "tags", "created_at", "first_responded_at", "resolved_at", "conversation_count",
+]
+OPEN_TICKET_PROFILE = ["subject", "status", "priority", "tags", "requester_email", "created_at", "updated_at"]
+
+
+# Ticket review pages carry a conversation excerpt built in SQL instead of the full history:
+# the first REVIEW_CONVERSATION_MESSAGES messages, each body cut at REVIEW_MESSAGE_CHARS.
+REVIEW_CONVERSATION_MESSAGES = 10
+REVIEW_MESSAGE_CHARS = 1000
+
+
+# Rows fetched per round trip when streaming SLA breaches, and breaches returned per type
+SLA_STREAM_BATCH_SIZE = 1000
+DEFAULT_SLA_BREACH_LIMIT = 50
+
+
+def encode_review_cursor(created_at: Optional[datetime], ticket_id: str) -> str:
+    """Opaque keyset cursor for get_recent_tickets_for_review."""
+    payload = json.dumps({"c": created_at.isoformat() if created_at else None, "t": ticket_id})
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_review_cursor(cursor: str) -> tuple:
+    """(created_at, ticket_id) from a cursor made by encode_review_cursor.
+    
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        created_at = datetime.fromisoformat(payload["c"]) if payload["c"] else None
+        return created_at, str(payload["t"])
+    except (binascii.Error, UnicodeDecodeError, ValueError, KeyError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
+
+
+def _conversation_excerpt(max_messages: int, max_chars: int):
+    """Scalar subquery with the first messages of a ticket, bodies truncated, as a JSONB array."""
+    message = func.jsonb_array_elements(
+        FreshdeskUnifiedTicketView.conversation_history
+    ).table_valued(column("value", JSONB), with_ordinality="ordinal").alias("message")
+    body = func.coalesce(message.c.value["body_text"].astext, message.c.value["body"].astext, "")
+    entry = func.jsonb_build_object(
+        "incoming", message.c.value.op("->")("incoming"),
+        "from_email", message.c.value["from_email"].astext,
+        "created_at", message.c.value["created_at"].astext,
+        "body_text", func.left(body, max_chars),
+        "truncated", func.length(body) > max_chars,
+    )
+    return select(
+        func.jsonb_agg(aggregate_order_by(entry, message.c.ordinal))
+    ).where(
+        message.c.ordinal <= max_messages
+    ).scalar_subquery().label("conversation_excerpt")
+
+
+def _sla_base_columns() -> List[Any]:
+    """Columns shared by both SLA breach queries."""
+    view = FreshdeskUnifiedTicketView
+    return [
+        view.freshdesk_ticket_id,
+        view.subject,
+        view.status,
+        view.priority,
+        view.tags,
+        func.extract("epoch", view.created_at).label("created_at"),
+    ]
+
+
+class _BreachAggregate:
+    """Running SLA breach totals plus a bounded heap of the worst breaches.
+    
+    Breach minutes are rounded before aggregating so averages match the per-breach
+    figures shown to users.
+    """
+    
+    def __init__(self, limit: int):
+        self.limit = max(limit, 0)
+        self.heap: List[tuple] = []
+        self.count = 0
+        self.total_breach_min = 0.0
+        self.flag_count = 0
+        self.by_priority: Dict[Optional[int], List[float]] = {}
+        self.tag_counts: Counter = Counter()
+    
+    def add(self, row) -> None:
+        breach_by_min = round(float(row.breach_by_min), 1)
+        self.count += 1
+        self.total_breach_min += breach_by_min
+        if row.flag:
+            self.flag_count += 1
+        
+        pattern = self.by_priority.setdefault(row.priority, [0, 0.0])
+        pattern[0] += 1
+        pattern[1] += breach_by_min
+        self.tag_counts.update(row.tags or [])
+        
+        # Min-heap keyed on breach size; the sequence number keeps ties in arrival order
+        entry = (breach_by_min, -self.count, row)
+        if len(self.heap) < self.limit:
+            heapq.heappush(self.heap, entry)
+        elif self.heap and entry[:2] > self.heap[0][:2]:
+            heapq.heapreplace(self.heap, entry)
+    
+    def worst(self) -> List[Any]:
+        """Retained rows, largest breach first."""
+        return [row for _, _, row in sorted(self.heap, key=lambda entry: entry[:2], reverse=True)]
+    
+    def average(self) -> float:
+        return round(self.total_breach_min / self.count, 1) if self.count else 0
+    
+    def priority_patterns(self) -> Dict[Optional[int], Dict[str, Any]]:
+        return {
+            priority: {"count": count, "avg_breach_min": round(total / count, 1)}
+            for priority, (count, total) in self.by_priority.items()
+        }
+
+
+def _as_float(value) -> float:
+    """Convert a nullable EXTRACT(epoch) result (a Decimal) to float, NULL to NaN."""
+    return np.nan if value is None else float(value)
+
+
+def _response_breach(row) -> Dict[str, Any]:
+    """Shape a first response breach row for get_sla_exceptions."""
+    breach = {
+        "ticket_id": row.freshdesk_ticket_id,
+        "subject": row.subject,
+        "created_at": _epoch_isoformat(_as_float(row.created_at)),
+        "first_responded_at": _epoch_isoformat(_as_float(row.first_responded_at)),
+        "response_time_min": None if row.flag else round(float(row.elapsed_min), 1),
+        "breach_by_min": round(float(row.breach_by_min), 1),
+        "status": row.status,
+        "priority": row.priority,
+        "tags": row.tags or [],
+        "fr_escalated": bool(row.escalated)  # Check if marked as escalated
+    }
+    if row.flag:
+        # No response yet - overdue
+        breach["no_response"] = True
+    return breach
+
+
+def _resolution_breach(row) -> Dict[str, Any]:
+    """Shape a resolution breach row for get_sla_exceptions."""
+    return {
+        "ticket_id": row.freshdesk_ticket_id,
+        "subject": row.subject,
+        "created_at": _epoch_isoformat(_as_float(row.created_at)),
+        "resolved_at": _epoch_isoformat(_as_float(row.resolved_at)),
+        "resolution_time_min": round(float(row.elapsed_min), 1),
+        "breach_by_min": round(float(row.breach_by_min), 1),
+        "status": row.status,
+        "priority": row.priority,
+        "assigned_agent": row.responder_id,
+        "tags": row.tags or [],
+        "is_escalated": bool(row.escalated),
+        "still_open": bool(row.flag)
+    }
+
+
+def _epoch_isoformat(epoch: float) -> Optional[str]:
+    """Format a frame epoch timestamp as a UTC ISO string (None when NULL)."""
+    if np.isnan(epoch):
+        return None
+    return datetime.fromtimestamp(float(epoch), tz=timezone.utc).isoformat()
+
+
 class FreshdeskAnalytics:
     """Analytics engine for Freshdesk support metrics."""
     
@@ -43,121 +258,94 @@ class FreshdeskAnalytics:
         start_dt = datetime.combine(target_date, datetime.min.time()).replace(tzinfo=timezone.utc)
         end_dt = datetime.combine(target_date, datetime.max.time()).replace(tzinfo=timezone.utc)
         
-        # Base query filtered by merchant
-        base_query = session.query(FreshdeskUnifiedTicketView).filter(
-            FreshdeskUnifiedTicketView.merchant_id == merchant_id
-        )
-        
-        # New tickets created on target date
-        new_tickets = base_query.filter(
-            FreshdeskUnifiedTicketView.created_at.between(start_dt, end_dt)
-        ).count()
-            
-        # Tickets closed on target date
-        closed_tickets = base_query.filter(
-            FreshdeskUnifiedTicketView.closed_at.between(start_dt, end_dt)
-        ).count()
-        
-        # Open tickets at end of day (created before end of day and not closed by end of day)
-        open_eod = base_query.filter(
-            FreshdeskUnifiedTicketView.created_at <= end_dt,
-            or_(
-                FreshdeskUnifiedTicketView.closed_at.is_(None),
-                FreshdeskUnifiedTicketView.closed_at > end_dt
-            ),
-            FreshdeskUnifiedTicketView.status.in_([2, 3, 6, 7])  # Open, Pending, Waiting statuses
-        ).count()
-        
-        # Get tickets created on target date for response/resolution metrics
-        target_date_tickets = base_query.filter(
-            FreshdeskUnifiedTicketView.created_at.between(start_dt, end_dt)
-        ).all()
-        
-        # Calculate response times
-        first_response_times = []
-        resolution_times = []
-        quick_close_count = 0
-        
-        for ticket in target_date_tickets:
-            # First response time
-            if ticket.first_responded_at and ticket.created_at:
-                response_time = (ticket.first_responded_at - ticket.created_at).total_seconds() / 60
-                first_response_times.append(response_time)
-            
-            # Resolution time
-            if ticket.resolved_at and ticket.created_at:
-                resolution_time = (ticket.resolved_at - ticket.created_at).total_seconds() / 60
-                resolution_times.append(resolution_time)
-                
-                # Quick close (< 10 minutes)
-                if resolution_time < 10:
-                    quick_close_count += 1
-        
-        # Calculate medians
-        def calculate_median(values: List[float]) -> Optional[float]:
-            if not values:
-                return None
-            sorted_values = sorted(values)
-            n = len(sorted_values)
-            if n % 2 == 0:
-                return (sorted_values[n//2 - 1] + sorted_values[n//2]) / 2
-            return sorted_values[n//2]
-        
-        median_first_response_min = calculate_median(first_response_times)
-        median_resolution_min = calculate_median(resolution_times)
-        
-        # CSAT metrics - ratings received on target date
-        csat_ratings = base_query.filter(
-            FreshdeskUnifiedTicketView.rating_created_at.between(start_dt, end_dt),
-            FreshdeskUnifiedTicketView.has_rating == True
-        ).all()
+        # All metrics are aggregated in a single round trip - no ORM rows are hydrated
+        row = session.execute(
+            FreshdeskAnalytics._daily_snapshot_query(merchant_id, start_dt, end_dt)
+        ).one()
         
-        new_csat_count = len(csat_ratings)
+        new_csat_count = row.new_csat_count or 0
         
         # CSAT calculation: percentage of perfect scores (103 = Extremely Happy)
-        # Bad ratings: anything below 102 (Very Happy)
-        perfect_scores = 0
-        bad_csat_count = 0
-        
-        for ticket in csat_ratings:
-            if ticket.rating_score == 103:  # Extremely Happy
-                perfect_scores += 1
-            if ticket.rating_score < 102:  # Below Very Happy
-                bad_csat_count += 1
-        
-        # Calculate CSAT percentage
-        csat_percentage = (perfect_scores / new_csat_count * 100) if new_csat_count > 0 else 0.0
-        
-        # SLA breaches - tickets created on target date that breached SLA
-        sla_breaches = 0
-        for ticket in target_date_tickets:
-            # Check first response SLA breach
-            if ticket.fr_escalated:
-                sla_breaches += 1
-            # Check resolution SLA breach (only if not already counted for first response)
-            elif ticket.is_escalated:
-                sla_breaches += 1
+        csat_percentage = (row.perfect_scores / new_csat_count * 100) if new_csat_count > 0 else 0.0
+        
+        median_first_response_min = row.median_first_response_min
+        median_resolution_min = row.median_resolution_min
         
         return {
                 "date": target_date.isoformat(),
-                "new_tickets": new_tickets,
-                "closed_tickets": closed_tickets,
-                "open_eod": open_eod,
-                "median_first_response_min": round(median_first_response_min, 1) if median_first_response_min is not None else None,
-                "median_resolution_min": round(median_resolution_min, 1) if median_resolution_min is not None else None,
-                "quick_close_count": quick_close_count,
+                "new_tickets": row.new_tickets or 0,
+                "closed_tickets": row.closed_tickets or 0,
+                "open_eod": row.open_eod or 0,
+                "median_first_response_min": round(float(median_first_response_min), 1) if median_first_response_min is not None else None,
+                "median_resolution_min": round(float(median_resolution_min), 1) if median_resolution_min is not None else None,
+                "quick_close_count": row.quick_close_count or 0,
                 "new_csat_count": new_csat_count,
                 "csat_percentage": round(csat_percentage, 1),
-                "bad_csat_count": bad_csat_count,
-                "sla_breaches": sla_breaches
+                "bad_csat_count": row.bad_csat_count or 0,
+                "sla_breaches": row.sla_breaches or 0
             }
+    
+    @staticmethod
+    def _daily_snapshot_query(merchant_id: int, start_dt: datetime, end_dt: datetime):
+        """Build the single aggregate statement behind get_daily_snapshot.
+        
+        Every metric is a FILTERed aggregate over the merchant's tickets, so Postgres
+        computes counts, medians (percentile_cont) and SLA totals in one pass without
+        ever selecting conversation_history.
+        """
+        view = FreshdeskUnifiedTicketView
+        
+        created_today = view.created_at.between(start_dt, end_dt)
+        rated_today = and_(
+            view.rating_created_at.between(start_dt, end_dt),
+            view.has_rating == True
+        )
+        first_response_min = func.extract('epoch', view.first_responded_at - view.created_at) / 60
+        resolution_min = func.extract('epoch', view.resolved_at - view.created_at) / 60
+        
+        return select(
+            # New tickets created on target date
+            func.count().filter(created_today).label("new_tickets"),
+            # Tickets closed on target date
+            func.count().filter(view.closed_at.between(start_dt, end_dt)).label("closed_tickets"),
+            # Open tickets at end of day (created before end of day and not closed by end of day)
+            func.count().filter(
+                view.created_at <= end_dt,
+                or_(view.closed_at.is_(None), view.closed_at > end_dt),
+                view.status.in_([2, 3, 6, 7])  # Open, Pending, Waiting statuses
+            ).label("open_eod"),
+            # Medians for tickets created on target date (NULL durations are ignored)
+            func.percentile_cont(0.5).within_group(first_response_min).filter(
+                created_today
+            ).label("median_first_response_min"),
+            func.percentile_cont(0.5).within_group(resolution_min).filter(
+                created_today
+            ).label("median_resolution_min"),
+            # Quick close (< 10 minutes)
+            func.count().filter(created_today, resolution_min < 10).label("quick_close_count"),
+            # CSAT - ratings received on target date
+            func.count().filter(rated_today).label("new_csat_count"),
+            func.count().filter(rated_today, view.rating_score == 103).label("perfect_scores"),  # Extremely Happy
+            func.count().filter(rated_today, view.rating_score < 102).label("bad_csat_count"),  # Below Very Happy
+            # SLA breaches - first response or resolution escalation, counted once per ticket
+            func.count().filter(
+                created_today,
+                or_(view.fr_escalated == True, view.is_escalated == True)
+            ).label("sla_breaches"),
+        ).where(
+            view.merchant_id == merchant_id,
+            # Every metric above concerns tickets that existed by the end of the day
+            view.created_at <= end_dt
+        )
 
 
     @staticmethod
     def get_recent_ticket(session: Session, merchant_id: int) -> Optional[Dict[str, Any]]:
         """Get the most recent open ticket with conversation history."""
         # Query the unified view for the most recent open ticket
-        ticket = session.query(FreshdeskUnifiedTicketView).filter(
+        ticket = session.query(FreshdeskUnifiedTicketView).options(
+            FreshdeskUnifiedTicketView.load_profile(*RECENT_TICKET_PROFILE)
+        ).filter(
             FreshdeskUnifiedTicketView.merchant_id == merchant_id,
             FreshdeskUnifiedTicketView.status.in_([2, 3, 6, 7])  # Open, Pending, Waiting statuses
         ).order_by(
@@ -220,37 +408,20 @@ class FreshdeskAnalytics:
     
     @staticmethod
     def search_tickets(session: Session, query: str, merchant_id: int, limit: int = 10) -> List[Dict[str, Any]]:
-        """Search tickets by keyword."""
-        # Search in subject, description, customer name, email, and tags
-        tickets = session.query(FreshdeskUnifiedTicketView).filter(
-            FreshdeskUnifiedTicketView.merchant_id == merchant_id,
-            or_(
-                FreshdeskUnifiedTicketView.subject.ilike(f"%{query}%"),
-                FreshdeskUnifiedTicketView.description.ilike(f"%{query}%"),
-                FreshdeskUnifiedTicketView.requester_email.ilike(f"%{query}%"),
-                FreshdeskUnifiedTicketView.requester_name.ilike(f"%{query}%"),
-                FreshdeskUnifiedTicketView.tags.op('@>')(f'["{query}"]')
-            )
-        ).limit(limit).all()
+        """Search tickets by keyword, best match first.
         
-        results = []
-        for ticket in tickets:
-            results.append({
-                "ticket_id": ticket.freshdesk_ticket_id,
-                "subject": ticket.subject,
-                "status": ticket.status,
-                "created_at": ticket.created_at.isoformat() if ticket.created_at else None,
-                "requester_email": ticket.requester_email,
-                "customer_name": ticket.requester_name
-            })
-            
-        return results
+        Matches subject, description, customer name, email, tags and conversation text
+        through the freshdesk_ticket_search index (see FreshdeskSearch).
+        """
+        return FreshdeskSearch.search(session, merchant_id, query, limit=limit)
     
     @staticmethod
     def calculate_csat(session: Session, merchant_id: int, days: Optional[int] = None) -> Dict[str, Any]:
         """Calculate CSAT score with proper deduplication."""
         # Build base query
-        query = session.query(FreshdeskUnifiedTicketView).filter(
+        query = session.query(FreshdeskUnifiedTicketView).options(
+            FreshdeskUnifiedTicketView.load_profile(*CSAT_PROFILE)
+        ).filter(
             FreshdeskUnifiedTicketView.merchant_id == merchant_id,
             FreshdeskUnifiedTicketView.has_rating == True
         )
@@ -296,7 +467,9 @@ class FreshdeskAnalytics:
     def get_ticket_by_id(session: Session, ticket_id: str, merchant_id: int) -> Optional[Dict[str, Any]]:
         """Get detailed ticket information from the unified view."""
         # Get ticket from unified view
-        ticket = session.query(FreshdeskUnifiedTicketView).filter(
+        ticket = session.query(FreshdeskUnifiedTicketView).options(
+            FreshdeskUnifiedTicketView.load_profile(*TICKET_DETAIL_PROFILE)
+        ).filter(
             FreshdeskUnifiedTicketView.merchant_id == merchant_id,
             FreshdeskUnifiedTicketView.freshdesk_ticket_id == str(ticket_id)
         ).first()
@@ -326,7 +499,9 @@ class FreshdeskAnalytics:
     @staticmethod
     def get_tickets_by_email(session: Session, email: str, merchant_id: int, limit: int = 20) -> List[Dict[str, Any]]:
         """Get all tickets for a specific customer email."""
-        tickets = session.query(FreshdeskUnifiedTicketView).filter(
+        tickets = session.query(FreshdeskUnifiedTicketView).options(
+            FreshdeskUnifiedTicketView.load_profile(*CUSTOMER_HISTORY_PROFILE)
+        ).filter(
             FreshdeskUnifiedTicketView.merchant_id == merchant_id,
             FreshdeskUnifiedTicketView.requester_email == email
         ).order_by(
@@ -349,7 +524,9 @@ class FreshdeskAnalytics:
     def get_tickets_by_rating(session: Session, rating_type: str, merchant_id: int, days: Optional[int] = None) -> List[Dict[str, Any]]:
         """Get tickets with specific rating type."""
         # Build base query
-        query = session.query(FreshdeskUnifiedTicketView).filter(
+        query = session.query(FreshdeskUnifiedTicketView).options(
+            FreshdeskUnifiedTicketView.load_profile(*RATED_TICKET_PROFILE)
+        ).filter(
             FreshdeskUnifiedTicketView.merchant_id == merchant_id,
             FreshdeskUnifiedTicketView.has_rating == True
         )
@@ -389,7 +566,9 @@ class FreshdeskAnalytics:
         cutoff_date = datetime.utcnow() - timedelta(days=days)
         
         # Get bad rated tickets from unified view
-        bad_tickets = session.query(FreshdeskUnifiedTicketView).filter(
+        bad_tickets = session.query(FreshdeskUnifiedTicketView).options(
+            FreshdeskUnifiedTicketView.load_profile(*BAD_CSAT_PROFILE)
+        ).filter(
             FreshdeskUnifiedTicketView.merchant_id == merchant_id,
             FreshdeskUnifiedTicketView.has_rating == True,
             FreshdeskUnifiedTicketView.rating_score < 102,
@@ -425,7 +604,9 @@ class FreshdeskAnalytics:
         Returns:
             List of tickets with all fields including conversation
         """
-        tickets = session.query(FreshdeskUnifiedTicketView).filter(
+        tickets = session.query(FreshdeskUnifiedTicketView).options(
+            FreshdeskUnifiedTicketView.load_profile(*TICKET_REVIEW_PROFILE)
+        ).filter(
             FreshdeskUnifiedTicketView.merchant_id == merchant_id
         ).order_by(
             FreshdeskUnifiedTicketView.created_at.desc()
@@ -462,76 +643,89 @@ class FreshdeskAnalytics:
         merchant_id: int, 
         limit: int = 20,
         cursor: Optional[str] = None,
-        status_filter: Optional[List[int]] = None
+        status_filter: Optional[List[int]] = None,
+        conversation_messages: int = REVIEW_CONVERSATION_MESSAGES,
+        message_chars: int = REVIEW_MESSAGE_CHARS
     ) -> Dict[str, Any]:
-        """Get recent support tickets with cursor-based pagination for manual review.
+        """Get recent support tickets with keyset pagination for manual review.
+        
+        Each page is one query: the cursor carries the (created_at, ticket_id) of the last
+        ticket, so no lookup is needed to resume. Conversations are an excerpt built in SQL;
+        use get_ticket_by_id for a ticket's full conversation.
         
         Args:
             session: Database session
             merchant_id: Merchant ID
             limit: Number of tickets per page (default 20, max 100)
-            cursor: Pagination cursor (ticket_id from previous page)
+            cursor: Opaque pagination cursor (next_cursor from the previous page)
             status_filter: Optional list of status codes to filter by
+            conversation_messages: Messages included per ticket conversation
+            message_chars: Characters kept from each message body
             
         Returns:
             Dict containing:
-            - tickets: List of ticket data with conversations
+            - tickets: List of ticket data with conversation excerpts
             - has_more: Boolean indicating if more results exist
-            - next_cursor: Ticket ID to use for next page (if has_more)
+            - next_cursor: Cursor for the next page (if has_more)
             - date_range: Dict with oldest and newest ticket dates
+            
+        Raises:
+            ValueError: If the cursor is malformed
         """
         # Enforce limit
         limit = min(limit, 100)
+        view = FreshdeskUnifiedTicketView
         
         # Build base query
-        query = session.query(FreshdeskUnifiedTicketView).filter(
-            FreshdeskUnifiedTicketView.merchant_id == merchant_id
+        query = session.query(
+            view, _conversation_excerpt(conversation_messages, message_chars)
+        ).options(
+            view.load_profile(*TICKET_REVIEW_PAGE_PROFILE)
+        ).filter(
+            view.merchant_id == merchant_id
         )
         
         # Apply status filter if provided
         if status_filter:
-            query = query.filter(FreshdeskUnifiedTicketView.status.in_(status_filter))
+            query = query.filter(view.status.in_(status_filter))
         
-        # Apply cursor filter if provided
+        # Resume after the cursor position. Row comparison matches the
+        # (merchant_id, created_at DESC, freshdesk_ticket_id DESC) index order.
         if cursor:
-            # Get the cursor ticket to find its created_at
-            cursor_ticket = session.query(
-                FreshdeskUnifiedTicketView.created_at,
-                FreshdeskUnifiedTicketView.freshdesk_ticket_id
-            ).filter(
-                FreshdeskUnifiedTicketView.freshdesk_ticket_id == cursor,
-                FreshdeskUnifiedTicketView.merchant_id == merchant_id
-            ).first()
-            
-            if cursor_ticket:
-                # Use tuple comparison for stable pagination
+            created_at, ticket_id = decode_review_cursor(cursor)
+            if created_at is not None:
                 query = query.filter(
-                    or_(
-                        FreshdeskUnifiedTicketView.created_at < cursor_ticket.created_at,
-                        and_(
-                            FreshdeskUnifiedTicketView.created_at == cursor_ticket.created_at,
-                            FreshdeskUnifiedTicketView.freshdesk_ticket_id < cursor_ticket.freshdesk_ticket_id
-                        )
-                    )
+                    tuple_(view.created_at, view.freshdesk_ticket_id) < tuple_(created_at, ticket_id)
                 )
+            else:
+                # NULL created_at sorts first in DESC order, so every dated ticket comes after it
+                query = query.filter(or_(
+                    view.created_at.isnot(None),
+                    and_(view.created_at.is_(None), view.freshdesk_ticket_id < ticket_id)
+                ))
         
         # Order by created_at DESC, ticket_id DESC for stable ordering
         query = query.order_by(
-            FreshdeskUnifiedTicketView.created_at.desc(),
-            FreshdeskUnifiedTicketView.freshdesk_ticket_id.desc()
+            view.created_at.desc(),
+            view.freshdesk_ticket_id.desc()
         )
         
         # Fetch limit + 1 to check if more exist
-        tickets = query.limit(limit + 1).all()
+        rows = query.limit(limit + 1).all()
         
         # Check if we have more results
-        has_more = len(tickets) > limit
+        has_more = len(rows) > limit
         if has_more:
-            tickets = tickets[:limit]  # Remove the extra ticket
+            rows = rows[:limit]  # Remove the extra ticket
         
         # Format results
         results = []
-        for ticket in tickets:
+        for ticket, excerpt in rows:
+            excerpt = excerpt or []
+            truncated = (ticket.conversation_count or 0) > len(excerpt) or any(m.get("truncated") for m in excerpt)
+            for message in excerpt:
+                if message.get("truncated"):
+                    message["body_text"] += " [...]"
             results.append({
                 "ticket_id": ticket.freshdesk_ticket_id,
                 "subject": ticket.subject,
@@ -543,7 +737,8 @@ class FreshdeskAnalytics:
                 "requester_name": ticket.requester_name,
                 "requester_email": ticket.requester_email,
                 "tags": ticket.tags or [],
-                "conversation": ticket.conversation,
+                "conversation": ticket.format_conversation(excerpt),
+                "conversation_truncated": truncated,
                 "has_rating": ticket.has_rating,
                 "rating_score": ticket.rating_score,
                 "rating_feedback": ticket.rating_feedback,
@@ -569,8 +764,9 @@ class FreshdeskAnalytics:
         }
         
         # Add next cursor if there are more results
-        if has_more and results:
-            response["next_cursor"] = results[-1]["ticket_id"]
+        if has_more and rows:
+            last = rows[-1][0]
+            response["next_cursor"] = encode_review_cursor(last.created_at, last.freshdesk_ticket_id)
         
         return response
     
@@ -629,8 +825,11 @@ class FreshdeskAnalytics:
         start_dt = datetime.combine(target_date, datetime.min.time()).replace(tzinfo=timezone.utc)
         end_dt = datetime.combine(target_date, datetime.max.time()).replace(tzinfo=timezone.utc)
         
-        # Get all ratings for the target date
-        rated_tickets = session.query(FreshdeskUnifiedTicketView).filter(
+        # Get all ratings for the target date (conversations only when requested)
+        profile = CSAT_DETAIL_PROFILE + (CONVERSATION_COLUMNS if include_conversations else [])
+        rated_tickets = session.query(FreshdeskUnifiedTicketView).options(
+            FreshdeskUnifiedTicketView.load_profile(*profile)
+        ).filter(
             FreshdeskUnifiedTicketView.merchant_id == merchant_id,
             FreshdeskUnifiedTicketView.rating_created_at.between(start_dt, end_dt),
             FreshdeskUnifiedTicketView.has_rating == True
@@ -708,9 +907,20 @@ class FreshdeskAnalytics:
         }
     
     @staticmethod
-    def get_sla_exceptions(session: Session, merchant_id: int, sla_config: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    def get_sla_exceptions(
+        session: Session,
+        merchant_id: int,
+        sla_config: Optional[Dict[str, Any]] = None,
+        limit: int = DEFAULT_SLA_BREACH_LIMIT,
+        since: Optional[datetime] = None
+    ) -> Dict[str, Any]:
         """Get tickets breaching response/resolution SLAs with pattern detection.
         
+        Threshold checks run in SQL and the breaching rows are streamed with a
+        server-side cursor, so memory stays flat however long the merchant's history is.
+        Only the worst `limit` breaches of each kind are returned; summary and pattern
+        figures cover every breach.
+        
         Args:
             session: SQLAlchemy session for database queries
             merchant_id: The merchant ID to filter by
@@ -719,13 +929,16 @@ class FreshdeskAnalytics:
                 - resolution_min: Resolution SLA in minutes (default: 1440/24hrs)
                 - business_hours_only: Whether to calculate only business hours (default: False)
                 - include_pending: Whether to include pending tickets in resolution breaches (default: True)
+            limit: Maximum breaches returned per breach type, worst first (default: 50)
+            since: Only consider tickets created at or after this datetime (optional)
                 
         Returns:
             Dict containing:
                 - sla_config: Applied SLA configuration
-                - breaches: First response and resolution SLA breaches
-                - summary: Statistical summary of breaches
+                - breaches: Worst first response and resolution SLA breaches
+                - summary: Statistical summary of all breaches
                 - patterns: Common patterns in breaches
+                - page: Applied limit/since and whether each breach list was truncated
         """
         # Default SLA configuration
         default_config = {
@@ -741,142 +954,136 @@ class FreshdeskAnalytics:
         else:
             config = default_config
         
-        # Get all tickets for merchant
-        all_tickets = session.query(FreshdeskUnifiedTicketView).filter(
-            FreshdeskUnifiedTicketView.merchant_id == merchant_id
-        ).all()
+        now = datetime.utcnow().replace(tzinfo=timezone.utc)
         
-        # Track breaches
-        response_breaches = []
-        resolution_breaches = []
-        
-        # Analyze each ticket
-        for ticket in all_tickets:
-            # Check first response SLA
-            if ticket.created_at and ticket.first_responded_at:
-                response_time_min = (ticket.first_responded_at - ticket.created_at).total_seconds() / 60
-                if response_time_min > config["first_response_min"]:
-                    breach_by_min = response_time_min - config["first_response_min"]
-                    response_breaches.append({
-                        "ticket_id": ticket.freshdesk_ticket_id,
-                        "subject": ticket.subject,
-                        "created_at": ticket.created_at.isoformat() if ticket.created_at else None,
-                        "first_responded_at": ticket.first_responded_at.isoformat() if ticket.first_responded_at else None,
-                        "response_time_min": round(response_time_min, 1),
-                        "breach_by_min": round(breach_by_min, 1),
-                        "status": ticket.status,
-                        "priority": ticket.priority,
-                        "tags": ticket.tags or [],
-                        "fr_escalated": ticket.fr_escalated  # Check if marked as escalated
-                    })
-            elif ticket.created_at and not ticket.first_responded_at and ticket.status in [2, 3, 6]:  # Open, Pending, Waiting
-                # No response yet - check if overdue
-                time_since_created = (datetime.utcnow().replace(tzinfo=timezone.utc) - ticket.created_at).total_seconds() / 60
-                if time_since_created > config["first_response_min"]:
-                    response_breaches.append({
-                        "ticket_id": ticket.freshdesk_ticket_id,
-                        "subject": ticket.subject,
-                        "created_at": ticket.created_at.isoformat() if ticket.created_at else None,
-                        "first_responded_at": None,
-                        "response_time_min": None,
-                        "breach_by_min": round(time_since_created - config["first_response_min"], 1),
-                        "status": ticket.status,
-                        "priority": ticket.priority,
-                        "tags": ticket.tags or [],
-                        "fr_escalated": ticket.fr_escalated,
-                        "no_response": True
-                    })
-            
-            # Check resolution SLA
-            check_resolution = False
-            if ticket.status in [4, 5]:  # Resolved or Closed
-                check_resolution = True
-            elif config["include_pending"] and ticket.status in [2, 3, 6]:  # Open, Pending, Waiting
-                check_resolution = True
-            
-            if check_resolution and ticket.created_at:
-                if ticket.resolved_at:
-                    resolution_time_min = (ticket.resolved_at - ticket.created_at).total_seconds() / 60
-                else:
-                    # Still open - calculate time since creation
-                    resolution_time_min = (datetime.utcnow().replace(tzinfo=timezone.utc) - ticket.created_at).total_seconds() / 60
-                
-                if resolution_time_min > config["resolution_min"]:
-                    breach_by_min = resolution_time_min - config["resolution_min"]
-                    resolution_breaches.append({
-                        "ticket_id": ticket.freshdesk_ticket_id,
-                        "subject": ticket.subject,
-                        "created_at": ticket.created_at.isoformat() if ticket.created_at else None,
-                        "resolved_at": ticket.resolved_at.isoformat() if ticket.resolved_at else None,
-                        "resolution_time_min": round(resolution_time_min, 1),
-                        "breach_by_min": round(breach_by_min, 1),
-                        "status": ticket.status,
-                        "priority": ticket.priority,
-                        "assigned_agent": ticket.responder_id,
-                        "tags": ticket.tags or [],
-                        "is_escalated": ticket.is_escalated,
-                        "still_open": ticket.status not in [4, 5]
-                    })
+        response = _BreachAggregate(limit)
+        for row in FreshdeskAnalytics._stream(
+            session, FreshdeskAnalytics._response_breach_query(merchant_id, config, now, since)
+        ):
+            response.add(row)
         
-        # Analyze patterns in breaches
-        patterns = {
-            "response": {},
-            "resolution": {}
-        }
+        resolution = _BreachAggregate(limit)
+        for row in FreshdeskAnalytics._stream(
+            session, FreshdeskAnalytics._resolution_breach_query(merchant_id, config, now, since)
+        ):
+            resolution.add(row)
         
-        # Pattern: By priority
-        for breach in response_breaches:
-            priority = breach.get("priority", "unknown")
-            if priority not in patterns["response"]:
-                patterns["response"][priority] = {"count": 0, "avg_breach_min": 0}
-            patterns["response"][priority]["count"] += 1
-            patterns["response"][priority]["avg_breach_min"] += breach["breach_by_min"]
-        
-        for breach in resolution_breaches:
-            priority = breach.get("priority", "unknown")
-            if priority not in patterns["resolution"]:
-                patterns["resolution"][priority] = {"count": 0, "avg_breach_min": 0}
-            patterns["resolution"][priority]["count"] += 1
-            patterns["resolution"][priority]["avg_breach_min"] += breach["breach_by_min"]
-        
-        # Calculate averages
-        for pattern_type in patterns:
-            for priority in patterns[pattern_type]:
-                count = patterns[pattern_type][priority]["count"]
-                if count > 0:
-                    patterns[pattern_type][priority]["avg_breach_min"] = round(
-                        patterns[pattern_type][priority]["avg_breach_min"] / count, 1
-                    )
+        response_breaches = [_response_breach(row) for row in response.worst()]
+        resolution_breaches = [_resolution_breach(row) for row in resolution.worst()]
         
         # Tag analysis for top breach reasons
-        tag_counts = {}
-        for breach in response_breaches + resolution_breaches:
-            for tag in breach.get("tags", []):
-                tag_counts[tag] = tag_counts.get(tag, 0) + 1
-        
-        top_tags = sorted(tag_counts.items(), key=lambda x: x[1], reverse=True)[:5]
+        top_tags = (response.tag_counts + resolution.tag_counts).most_common(5)
         
         return {
             "sla_config": config,
             "breaches": {
-                "first_response": sorted(response_breaches, key=lambda x: x["breach_by_min"], reverse=True),
-                "resolution": sorted(resolution_breaches, key=lambda x: x["breach_by_min"], reverse=True)
+                "first_response": response_breaches,
+                "resolution": resolution_breaches
             },
             "summary": {
-                "total_breaches": len(response_breaches) + len(resolution_breaches),
-                "response_breaches": len(response_breaches),
-                "resolution_breaches": len(resolution_breaches),
-                "avg_response_breach_min": round(sum(b["breach_by_min"] for b in response_breaches) / len(response_breaches), 1) if response_breaches else 0,
-                "avg_resolution_breach_min": round(sum(b["breach_by_min"] for b in resolution_breaches) / len(resolution_breaches), 1) if resolution_breaches else 0,
-                "no_response_count": sum(1 for b in response_breaches if b.get("no_response", False))
+                "total_breaches": response.count + resolution.count,
+                "response_breaches": response.count,
+                "resolution_breaches": resolution.count,
+                "avg_response_breach_min": response.average(),
+                "avg_resolution_breach_min": resolution.average(),
+                "no_response_count": response.flag_count,
+                "still_open_count": resolution.flag_count
             },
             "patterns": {
-                "by_priority": patterns,
+                "by_priority": {
+                    "response": response.priority_patterns(),
+                    "resolution": resolution.priority_patterns()
+                },
                 "top_breach_tags": [{"tag": tag, "count": count} for tag, count in top_tags],
                 "insights": []
+            },
+            "page": {
+                "limit": limit,
+                "since": since.isoformat() if since else None,
+                "first_response_truncated": response.count > len(response_breaches),
+                "resolution_truncated": resolution.count > len(resolution_breaches)
             }
         }
     
+    @staticmethod
+    def _stream(session: Session, statement):
+        """Iterate a statement's rows in SLA_STREAM_BATCH_SIZE chunks from a server-side cursor."""
+        return session.execute(statement.execution_options(yield_per=SLA_STREAM_BATCH_SIZE))
+    
+    @staticmethod
+    def _response_breach_query(merchant_id: int, config: Dict[str, Any], now: datetime, since: Optional[datetime] = None):
+        """Build the SELECT of first response SLA breaches.
+        
+        A ticket breaches when it was answered later than the threshold, or is still
+        open, unanswered and older than the threshold. Each row carries flag = True
+        for the unanswered case.
+        """
+        view = FreshdeskUnifiedTicketView
+        threshold = config["first_response_min"]
+        response_min = func.extract("epoch", view.first_responded_at - view.created_at) / 60
+        waiting_min = func.extract("epoch", now - view.created_at) / 60
+        unanswered = view.first_responded_at.is_(None)
+        
+        criteria = [
+            view.merchant_id == merchant_id,
+            view.created_at.isnot(None),
+            or_(
+                and_(view.first_responded_at.isnot(None), response_min > threshold),
+                and_(
+                    unanswered,
+                    view.status.in_([2, 3, 6]),  # Open, Pending, Waiting
+                    view.created_at < now - timedelta(minutes=threshold)
+                )
+            )
+        ]
+        if since:
+            criteria.append(view.created_at >= since)
+        
+        return select(
+            *_sla_base_columns(),
+            func.extract("epoch", view.first_responded_at).label("first_responded_at"),
+            view.fr_escalated.label("escalated"),
+            response_min.label("elapsed_min"),
+            (func.coalesce(response_min, waiting_min) - threshold).label("breach_by_min"),
+            unanswered.label("flag")
+        ).where(*criteria)
+    
+    @staticmethod
+    def _resolution_breach_query(merchant_id: int, config: Dict[str, Any], now: datetime, since: Optional[datetime] = None):
+        """Build the SELECT of resolution SLA breaches.
+        
+        Resolved/closed tickets (plus open ones when include_pending) breach when the
+        time from creation to resolution - or to now if unresolved - exceeds the
+        threshold. Each row carries flag = True when the ticket is still open.
+        """
+        view = FreshdeskUnifiedTicketView
+        threshold = config["resolution_min"]
+        statuses = [4, 5]  # Resolved or Closed
+        if config["include_pending"]:
+            statuses += [2, 3, 6]  # Open, Pending, Waiting
+        resolution_min = func.extract(
+            "epoch", func.coalesce(view.resolved_at, now) - view.created_at
+        ) / 60
+        
+        criteria = [
+            view.merchant_id == merchant_id,
+            view.created_at.isnot(None),
+            view.status.in_(statuses),
+            resolution_min > threshold
+        ]
+        if since:
+            criteria.append(view.created_at >= since)
+        
+        return select(
+            *_sla_base_columns(),
+            func.extract("epoch", view.resolved_at).label("resolved_at"),
+            view.responder_id,
+            view.is_escalated.label("escalated"),
+            resolution_min.label("elapsed_min"),
+            (resolution_min - threshold).label("breach_by_min"),
+            view.status.notin_([4, 5]).label("flag")
+        ).where(*criteria)
+    
     @staticmethod
     def get_open_ticket_distribution(session: Session, merchant_id: int) -> Dict[str, Any]:
         """Get distribution of open tickets by age and identify oldest tickets.
@@ -895,7 +1102,9 @@ class FreshdeskAnalytics:
         now = datetime.utcnow().replace(tzinfo=timezone.utc)
         
         # Query all open tickets (statuses: Open, Pending, Waiting on Customer, Waiting on Third Party)
-        open_tickets = session.query(FreshdeskUnifiedTicketView).filter(
+        open_tickets = session.query(FreshdeskUnifiedTicketView).options(
+            FreshdeskUnifiedTicketView.load_profile(*OPEN_TICKET_PROFILE)
+        ).filter(
             FreshdeskUnifiedTicketView.merchant_id == merchant_id,
             FreshdeskUnifiedTicketView.status.in_([2, 3, 6, 7])  # Open statuses
         ).all()
@@ -1032,190 +1241,90 @@ class FreshdeskAnalytics:
                 - total_resolved: Total number of resolved tickets
                 - csat_by_speed: CSAT correlation with response/resolution speed
         """
-        import numpy as np
-        
         # Convert dates to datetime for filtering
         start_dt = datetime.combine(date_range['start_date'], datetime.min.time()).replace(tzinfo=timezone.utc)
         end_dt = datetime.combine(date_range['end_date'], datetime.max.time()).replace(tzinfo=timezone.utc)
         
-        # Get all tickets created in the date range
-        tickets = session.query(FreshdeskUnifiedTicketView).filter(
-        FreshdeskUnifiedTicketView.merchant_id == merchant_id,
-        FreshdeskUnifiedTicketView.created_at.between(start_dt, end_dt)
-        ).all()
+        # Get timing and rating columns for tickets created in the date range
+        frame = TicketFrame.load(
+            session, merchant_id, RESPONSE_TIME_COLUMNS,
+            FreshdeskUnifiedTicketView.created_at.between(start_dt, end_dt)
+        )
         
-        # Collect response and resolution times
-        first_response_times = []
-        resolution_times = []
-        tickets_with_times = []
+        return FreshdeskAnalytics._response_time_metrics_from_frame(frame)
+    
+    @staticmethod
+    def _response_time_metrics_from_frame(frame: TicketFrame) -> Dict[str, Any]:
+        """Compute get_response_time_metrics output from a ticket frame with vectorized operations."""
+        ticket_ids = frame["freshdesk_ticket_id"]
+        first_response = frame.minutes_between("created_at", "first_responded_at")
+        resolution = frame.minutes_between("created_at", "resolved_at")
+        
+        # Sanity check: missing timestamps (NaN) and negative durations are excluded
+        fr_valid = first_response >= 0
+        res_valid = resolution >= 0
+        
+        def duration_stats(values: np.ndarray, ids: np.ndarray, key: str) -> Dict[str, Any]:
+            if values.size == 0:
+                return {}
+            median, p25, p75, p95 = np.percentile(values, [50, 25, 75, 95])
+            mean = np.mean(values)
+            # Find outliers (>2 standard deviations from mean)
+            outlier_mask = values > mean + (2 * np.std(values))
+            return {
+                'median_min': float(median),
+                'mean_min': float(mean),
+                'p25_min': float(p25),
+                'p75_min': float(p75),
+                'p95_min': float(p95),
+                'outliers': [
+                    {'ticket_id': int(ticket_id), key: round(float(value), 1)}
+                    for ticket_id, value in zip(ids[outlier_mask], values[outlier_mask])
+                ]
+            }
         
-        for ticket in tickets:
-                ticket_data = {
-                    'ticket_id': int(ticket.freshdesk_ticket_id),
-                    'has_rating': ticket.has_rating,
-                    'rating_score': ticket.rating_score if ticket.has_rating else None
-                }
-                
-                # First response time
-                if ticket.first_responded_at and ticket.created_at:
-                    response_min = (ticket.first_responded_at - ticket.created_at).total_seconds() / 60
-                    if response_min >= 0:  # Sanity check
-                        first_response_times.append(response_min)
-                        ticket_data['first_response_min'] = response_min
-                
-                # Resolution time
-                if ticket.resolved_at and ticket.created_at:
-                    resolution_min = (ticket.resolved_at - ticket.created_at).total_seconds() / 60
-                    if resolution_min >= 0:  # Sanity check
-                        resolution_times.append(resolution_min)
-                        ticket_data['resolution_min'] = resolution_min
-                
-                if 'first_response_min' in ticket_data or 'resolution_min' in ticket_data:
-                    tickets_with_times.append(ticket_data)
-        
-        # Calculate statistics for first response
-        first_response_stats = {}
-        if first_response_times:
-                fr_array = np.array(first_response_times)
-                first_response_stats = {
-                    'median_min': float(np.median(fr_array)),
-                    'mean_min': float(np.mean(fr_array)),
-                    'p25_min': float(np.percentile(fr_array, 25)),
-                    'p75_min': float(np.percentile(fr_array, 75)),
-                    'p95_min': float(np.percentile(fr_array, 95)),
-                    'outliers': []
-                }
-                
-                # Find outliers (>2 standard deviations from mean)
-                mean = np.mean(fr_array)
-                std = np.std(fr_array)
-                outlier_threshold = mean + (2 * std)
-                
-                for i, time_val in enumerate(first_response_times):
-                    if time_val > outlier_threshold:
-                        # Find the corresponding ticket
-                        for ticket_data in tickets_with_times:
-                            if ticket_data.get('first_response_min') == time_val:
-                                first_response_stats['outliers'].append({
-                                    'ticket_id': ticket_data['ticket_id'],
-                                    'response_min': round(time_val, 1)
-                                })
-                                break
-        
-        # Calculate statistics for resolution
-        resolution_stats = {}
-        if resolution_times:
-                res_array = np.array(resolution_times)
-                resolution_stats = {
-                    'median_min': float(np.median(res_array)),
-                    'mean_min': float(np.mean(res_array)),
-                    'p25_min': float(np.percentile(res_array, 25)),
-                    'p75_min': float(np.percentile(res_array, 75)),
-                    'p95_min': float(np.percentile(res_array, 95)),
-                    'outliers': []
-                }
-                
-                # Find outliers
-                mean = np.mean(res_array)
-                std = np.std(res_array)
-                outlier_threshold = mean + (2 * std)
-                
-                for i, time_val in enumerate(resolution_times):
-                    if time_val > outlier_threshold:
-                        # Find the corresponding ticket
-                        for ticket_data in tickets_with_times:
-                            if ticket_data.get('resolution_min') == time_val:
-                                resolution_stats['outliers'].append({
-                                    'ticket_id': ticket_data['ticket_id'],
-                                    'resolution_min': round(time_val, 1)
-                                })
-                                break
-        
-        # Quick resolution analysis
-        quick_resolutions = {
-                '<5min': {'count': 0, 'with_rating': 0, 'total_rating': 0},
-                '<10min': {'count': 0, 'with_rating': 0, 'total_rating': 0},
-                '<30min': {'count': 0, 'with_rating': 0, 'total_rating': 0},
-                '<60min': {'count': 0, 'with_rating': 0, 'total_rating': 0}
-        }
+        first_response_stats = duration_stats(first_response[fr_valid], ticket_ids[fr_valid], 'response_min')
+        resolution_stats = duration_stats(resolution[res_valid], ticket_ids[res_valid], 'resolution_min')
         
-        total_resolved = len(resolution_times)
+        # Ratings that count towards CSAT by speed (rated with a non-zero score)
+        res_times = resolution[res_valid]
+        scores = np.nan_to_num(frame["rating_score"][res_valid])
+        rated = frame["has_rating"][res_valid] & (scores != 0)
         
-        for ticket_data in tickets_with_times:
-                if 'resolution_min' in ticket_data:
-                    res_time = ticket_data['resolution_min']
-                    
-                    # Count in appropriate buckets
-                    if res_time < 5:
-                        quick_resolutions['<5min']['count'] += 1
-                        if ticket_data['has_rating'] and ticket_data['rating_score']:
-                            quick_resolutions['<5min']['with_rating'] += 1
-                            quick_resolutions['<5min']['total_rating'] += ticket_data['rating_score']
-                    if res_time < 10:
-                        quick_resolutions['<10min']['count'] += 1
-                        if ticket_data['has_rating'] and ticket_data['rating_score']:
-                            quick_resolutions['<10min']['with_rating'] += 1
-                            quick_resolutions['<10min']['total_rating'] += ticket_data['rating_score']
-                    if res_time < 30:
-                        quick_resolutions['<30min']['count'] += 1
-                        if ticket_data['has_rating'] and ticket_data['rating_score']:
-                            quick_resolutions['<30min']['with_rating'] += 1
-                            quick_resolutions['<30min']['total_rating'] += ticket_data['rating_score']
-                    if res_time < 60:
-                        quick_resolutions['<60min']['count'] += 1
-                        if ticket_data['has_rating'] and ticket_data['rating_score']:
-                            quick_resolutions['<60min']['with_rating'] += 1
-                            quick_resolutions['<60min']['total_rating'] += ticket_data['rating_score']
-        
-        # Calculate percentages and average CSAT
-        for bucket in quick_resolutions:
-                data = quick_resolutions[bucket]
-                data['percentage'] = round((data['count'] / total_resolved * 100) if total_resolved > 0 else 0, 1)
-                # Convert Freshdesk rating to 1-5 scale approximation
-                if data['with_rating'] > 0:
-                    avg_freshdesk_rating = data['total_rating'] / data['with_rating']
-                    # Map -103 to 103 scale to 1-5 scale
-                    data['avg_csat'] = round(((avg_freshdesk_rating + 103) / 206) * 4 + 1, 1)
-                else:
-                    data['avg_csat'] = 0.0
-                # Clean up temporary fields
-                del data['with_rating']
-                del data['total_rating']
-        
-        # CSAT by speed categories
-        csat_by_speed = {
-                'ultra_fast_<5min': {'count': 0, 'total_rating': 0},
-                'fast_5-30min': {'count': 0, 'total_rating': 0},
-                'normal_30-180min': {'count': 0, 'total_rating': 0},
-                'slow_>180min': {'count': 0, 'total_rating': 0}
-        }
+        total_resolved = int(res_valid.sum())
         
-        for ticket_data in tickets_with_times:
-                if 'resolution_min' in ticket_data and ticket_data['has_rating'] and ticket_data['rating_score']:
-                    res_time = ticket_data['resolution_min']
-                    rating = ticket_data['rating_score']
-                    
-                    if res_time < 5:
-                        csat_by_speed['ultra_fast_<5min']['count'] += 1
-                        csat_by_speed['ultra_fast_<5min']['total_rating'] += rating
-                    elif res_time < 30:
-                        csat_by_speed['fast_5-30min']['count'] += 1
-                        csat_by_speed['fast_5-30min']['total_rating'] += rating
-                    elif res_time < 180:
-                        csat_by_speed['normal_30-180min']['count'] += 1
-                        csat_by_speed['normal_30-180min']['total_rating'] += rating
-                    else:
-                        csat_by_speed['slow_>180min']['count'] += 1
-                        csat_by_speed['slow_>180min']['total_rating'] += rating
-        
-        # Calculate average ratings for each speed category
-        for category in csat_by_speed:
-                data = csat_by_speed[category]
-                if data['count'] > 0:
-                    data['avg_rating'] = round(data['total_rating'] / data['count'], 1)
-                else:
-                    data['avg_rating'] = 0.0
-                del data['total_rating']
+        # Quick resolution analysis - buckets are cumulative
+        quick_resolutions = {}
+        for bucket, limit in (('<5min', 5), ('<10min', 10), ('<30min', 30), ('<60min', 60)):
+            in_bucket = res_times < limit
+            count = int(in_bucket.sum())
+            rated_in_bucket = in_bucket & rated
+            with_rating = int(rated_in_bucket.sum())
+            
+            data = {'count': count}
+            data['percentage'] = round((count / total_resolved * 100) if total_resolved > 0 else 0, 1)
+            # Convert Freshdesk rating to 1-5 scale approximation
+            if with_rating > 0:
+                avg_freshdesk_rating = float(scores[rated_in_bucket].sum()) / with_rating
+                # Map -103 to 103 scale to 1-5 scale
+                data['avg_csat'] = round(((avg_freshdesk_rating + 103) / 206) * 4 + 1, 1)
+            else:
+                data['avg_csat'] = 0.0
+            quick_resolutions[bucket] = data
+        
+        # CSAT by speed categories - buckets are exclusive
+        speed_categories = ['ultra_fast_<5min', 'fast_5-30min', 'normal_30-180min', 'slow_>180min']
+        category_index = np.digitize(res_times[rated], [5, 30, 180])
+        category_counts = np.bincount(category_index, minlength=len(speed_categories))
+        category_totals = np.bincount(category_index, weights=scores[rated], minlength=len(speed_categories))
+        
+        csat_by_speed = {}
+        for i, category in enumerate(speed_categories):
+            count = int(category_counts[i])
+            csat_by_speed[category] = {
+                'count': count,
+                'avg_rating': round(float(category_totals[i]) / count, 1) if count > 0 else 0.0
+            }
         
         return {
                 'first_response': first_response_stats,
@@ -1244,69 +1353,52 @@ class FreshdeskAnalytics:
         end_date = date.today()
         start_date = end_date - timedelta(days=days)
         
-        # Get daily ticket counts
-        daily_counts = {}
-        tickets = session.query(FreshdeskUnifiedTicketView).filter(
-        FreshdeskUnifiedTicketView.merchant_id == merchant_id,
-        FreshdeskUnifiedTicketView.created_at >= datetime.combine(start_date, datetime.min.time()).replace(tzinfo=timezone.utc),
-        FreshdeskUnifiedTicketView.created_at <= datetime.combine(end_date, datetime.max.time()).replace(tzinfo=timezone.utc)
-        ).all()
+        # Daily counts come from the ETL-maintained rollups (one row per day, missing days are 0)
+        rollups = FreshdeskRollups.get_rollups(session, merchant_id, start_date, end_date)
+        volumes = FreshdeskRollups.daily_series(rollups, start_date, days + 1)
         
-        # Count tickets by day
-        for ticket in tickets:
-                if ticket.created_at:
-                    ticket_date = ticket.created_at.date()
-                    daily_counts[ticket_date] = daily_counts.get(ticket_date, 0) + 1
-        
-        # Fill in missing days with 0
-        current = start_date
-        while current <= end_date:
-                if current not in daily_counts:
-                    daily_counts[current] = 0
-                current += timedelta(days=1)
-        
-        # Sort by date
-        sorted_dates = sorted(daily_counts.keys())
-        daily_volumes = []
-        
-        # Calculate statistics for spike detection
-        volumes = [daily_counts[d] for d in sorted_dates]
-        if volumes:
-                mean_volume = sum(volumes) / len(volumes)
-                # Calculate standard deviation
-                variance = sum((x - mean_volume) ** 2 for x in volumes) / len(volumes)
-                std_dev = variance ** 0.5
+        return FreshdeskAnalytics._volume_trends_from_counts(start_date, volumes)
+    
+    @staticmethod
+    def _volume_trends_from_counts(start_date: date, volumes: np.ndarray) -> Dict[str, Any]:
+        """Compute get_volume_trends output from consecutive daily counts starting at start_date."""
+        sorted_dates = [start_date + timedelta(days=i) for i in range(len(volumes))]
+        
+        # Calculate statistics for spike detection (population std dev)
+        if volumes.size:
+                mean_volume = float(np.mean(volumes))
+                std_dev = float(np.std(volumes))
                 spike_threshold = mean_volume + (2 * std_dev)  # 2σ threshold
         else:
                 mean_volume = 0
                 std_dev = 0
                 spike_threshold = 0
         
+        is_spike = volumes > spike_threshold if spike_threshold > 0 else np.zeros(volumes.shape, dtype=bool)
+        deviations = (volumes - mean_volume) / std_dev if std_dev > 0 else np.zeros(volumes.shape)
+        
         # Build daily volume list with spike detection
-        for date_val in sorted_dates:
-                count = daily_counts[date_val]
-                is_spike = count > spike_threshold if spike_threshold > 0 else False
-                deviation = (count - mean_volume) / std_dev if std_dev > 0 else 0
-                
-                daily_volumes.append({
+        daily_volumes = [
+                {
                     "date": date_val.isoformat(),
-                    "new_tickets": count,
-                    "is_spike": is_spike,
-                    "deviation": round(deviation, 1)
-                })
+                    "new_tickets": int(count),
+                    "is_spike": bool(spike),
+                    "deviation": round(float(deviation), 1)
+                }
+                for date_val, count, spike, deviation in zip(sorted_dates, volumes, is_spike, deviations)
+        ]
         
-        # Calculate 7-day rolling average
-        rolling_7d_avg = []
-        for i, date_val in enumerate(sorted_dates):
-                # Get last 7 days including current
-                start_idx = max(0, i - 6)
-                window_values = volumes[start_idx:i+1]
-                avg = sum(window_values) / len(window_values) if window_values else 0
-                
-                rolling_7d_avg.append({
-                    "date": date_val.isoformat(),
-                    "avg": round(avg, 1)
-                })
+        # Calculate 7-day rolling average (window shrinks at the start of the range)
+        cumulative = np.cumsum(volumes)
+        window_sums = cumulative.astype(np.float64)
+        window_sums[7:] -= cumulative[:-7]
+        window_sizes = np.minimum(np.arange(1, volumes.size + 1), 7)
+        rolling_avgs = window_sums / window_sizes if volumes.size else window_sums
+        rolling_7d_avg = [
+                {"date": date_val.isoformat(), "avg": round(float(avg), 1)}
+                for date_val, avg in zip(sorted_dates, rolling_avgs)
+        ]
+        volumes = volumes.tolist()
         
         # Identify spike days
         spike_days = [
@@ -1395,46 +1487,29 @@ class FreshdeskAnalytics:
         # Parse the target date
         target_date = datetime.fromisoformat(date_str).date()
         
-        # Get tickets for the target date
+        # Target date boundaries
         start_dt = datetime.combine(target_date, datetime.min.time()).replace(tzinfo=timezone.utc)
         end_dt = datetime.combine(target_date, datetime.max.time()).replace(tzinfo=timezone.utc)
         
-        target_tickets = session.query(FreshdeskUnifiedTicketView).filter(
-        FreshdeskUnifiedTicketView.merchant_id == merchant_id,
-        FreshdeskUnifiedTicketView.created_at.between(start_dt, end_dt)
-        ).all()
-        
-        target_count = len(target_tickets)
-        
-        # Get historical data for comparison (30 days before target)
+        # Historical data for comparison (30 days before target)
         hist_start = target_date - timedelta(days=30)
-        hist_end = target_date - timedelta(days=1)
         
-        hist_tickets = session.query(FreshdeskUnifiedTicketView).filter(
-                FreshdeskUnifiedTicketView.merchant_id == merchant_id,
-                FreshdeskUnifiedTicketView.created_at >= datetime.combine(hist_start, datetime.min.time()).replace(tzinfo=timezone.utc),
-                FreshdeskUnifiedTicketView.created_at < datetime.combine(target_date, datetime.min.time()).replace(tzinfo=timezone.utc)
-        ).all()
+        # Only the target date needs ticket rows (for examples); history comes from daily rollups
+        target_tickets = TicketFrame.load(
+            session, merchant_id, ROOT_CAUSE_COLUMNS,
+            FreshdeskUnifiedTicketView.created_at >= start_dt,
+            FreshdeskUnifiedTicketView.created_at <= end_dt
+        )
+        hist_rollups = FreshdeskRollups.get_rollups(session, merchant_id, hist_start, target_date - timedelta(days=1))
         
-        # Calculate daily average and std dev from historical data
-        daily_counts = {}
-        for ticket in hist_tickets:
-                if ticket.created_at:
-                    day = ticket.created_at.date()
-                    daily_counts[day] = daily_counts.get(day, 0) + 1
-        
-        # Fill missing days with 0
-        current = hist_start
-        while current < target_date:
-                if current not in daily_counts:
-                    daily_counts[current] = 0
-                current += timedelta(days=1)
-        
-        volumes = list(daily_counts.values())
-        if volumes:
-                mean_volume = sum(volumes) / len(volumes)
-                variance = sum((x - mean_volume) ** 2 for x in volumes) / len(volumes)
-                std_dev = variance ** 0.5
+        target_count = len(target_tickets)
+        
+        # Calculate daily average and std dev from historical data (missing days are 0)
+        days_in_history = (target_date - hist_start).days
+        volumes = FreshdeskRollups.daily_series(hist_rollups, hist_start, days_in_history)
+        if volumes.size:
+                mean_volume = float(np.mean(volumes))
+                std_dev = float(np.std(volumes))
                 spike_level = mean_volume + (spike_threshold * std_dev)
         else:
                 mean_volume = 0
@@ -1446,27 +1521,28 @@ class FreshdeskAnalytics:
         deviation = (target_count - mean_volume) / std_dev if std_dev > 0 else 0
         
         # Analyze tags
-        tag_counts_target = {}
-        tag_counts_hist = {}
-        
-        # Count tags for target date
-        for ticket in target_tickets:
-                if ticket.tags:
-                    for tag in ticket.tags:
-                        tag_counts_target[tag] = tag_counts_target.get(tag, 0) + 1
-        
-        # Count tags historically (daily average)
-        for ticket in hist_tickets:
-                if ticket.tags:
-                    for tag in ticket.tags:
-                        tag_counts_hist[tag] = tag_counts_hist.get(tag, 0) + 1
+        tag_counts_target = tag_counts(target_tickets["tags"])
+        tag_counts_hist = FreshdeskRollups.merge_counts(hist_rollups, "tag_counts")
         
         # Calculate daily averages for historical tags
-        days_in_history = len(daily_counts)
         if days_in_history > 0:
                 for tag in tag_counts_hist:
                     tag_counts_hist[tag] = tag_counts_hist[tag] / days_in_history
         
+        # Collect up to 3 example tickets per tag in a single pass
+        tag_examples = {}
+        for ticket_id, subject, created_at, ticket_tags in zip(
+                target_tickets["freshdesk_ticket_id"], target_tickets["subject"],
+                target_tickets["created_at"], target_tickets["tags"]):
+                for tag in ticket_tags or []:
+                    examples = tag_examples.setdefault(tag, [])
+                    if len(examples) < 3:
+                        examples.append({
+                            "ticket_id": int(ticket_id),
+                            "subject": subject or "No subject",
+                            "created_at": _epoch_isoformat(created_at)
+                        })
+        
         # Analyze tag differences
         tag_analysis = []
         all_tags = set(tag_counts_target.keys()) | set(tag_counts_hist.keys())
@@ -1479,39 +1555,21 @@ class FreshdeskAnalytics:
                 if target_val > 0:  # Only include tags that appeared on target date
                     percentage_increase = ((target_val - hist_avg) / hist_avg * 100) if hist_avg > 0 else float('inf')
                     
-                    # Get example tickets for this tag
-                    examples = []
-                    for ticket in target_tickets:
-                        if ticket.tags and tag in ticket.tags and len(examples) < 3:
-                            examples.append({
-                                "ticket_id": int(ticket.freshdesk_ticket_id),
-                                "subject": ticket.subject or "No subject",
-                                "created_at": ticket.created_at.isoformat() if ticket.created_at else None
-                            })
-                    
                     tag_analysis.append({
                         "tag": tag,
                         "today_count": target_val,
                         "avg_count": round(hist_avg, 1),
                         "delta": round(delta, 1),
                         "percentage_increase": round(percentage_increase, 1) if percentage_increase != float('inf') else 999.9,
-                        "example_tickets": examples
+                        "example_tickets": tag_examples.get(tag, [])
                     })
         
         # Sort by delta (biggest increases first)
         tag_analysis.sort(key=lambda x: x["delta"], reverse=True)
         
         # Analyze ticket types
-        type_counts_target = {}
-        type_counts_hist = {}
-        
-        for ticket in target_tickets:
-                ticket_type = ticket.type or "unspecified"
-                type_counts_target[ticket_type] = type_counts_target.get(ticket_type, 0) + 1
-        
-        for ticket in hist_tickets:
-                ticket_type = ticket.type or "unspecified"
-                type_counts_hist[ticket_type] = type_counts_hist.get(ticket_type, 0) + 1
+        type_counts_target = dict(Counter(ticket_type or "unspecified" for ticket_type in target_tickets["type"]))
+        type_counts_hist = FreshdeskRollups.merge_counts(hist_rollups, "type_counts")
         
         # Calculate daily averages for types
         if days_in_history > 0:
@@ -1537,7 +1595,7 @@ class FreshdeskAnalytics:
         type_analysis.sort(key=lambda x: x["delta"], reverse=True)
         
         # Count untagged tickets
-        untagged_count = sum(1 for t in target_tickets if not t.tags or len(t.tags) == 0)
+        untagged_count = sum(1 for ticket_tags in target_tickets["tags"] if not ticket_tags)
         
         # Generate insights
         insights = []
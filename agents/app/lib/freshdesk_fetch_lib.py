@@ -0,0 +1,114 @@
+"""Concurrent Freshdesk conversation fetcher.
+
+Keeps up to max_in_flight tickets' conversations downloading at once from worker
+threads that share the API client's RateLimitBudget. Finished tickets are handed to
+the caller (the DB writer) through a bounded queue, so a slow writer holds the
+fetchers back instead of buffering every ticket in memory.
+"""
+
+import queue
+import threading
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from app.utils.freshdesk_util import FreshdeskAPI
+
+
+# Marks a worker that has run out of tickets
+_DONE = object()
+
+# How often a worker blocked on a full queue checks whether the caller stopped reading
+_PUT_POLL_SECONDS = 0.1
+
+
+class ConversationFetcher:
+    """Fetch conversations for many tickets with N requests in flight."""
+
+    def __init__(self, api: FreshdeskAPI, max_in_flight: int = 4, queue_size: int = 100):
+        if max_in_flight < 1 or queue_size < 1:
+            raise ValueError("max_in_flight and queue_size must be at least 1")
+        self.api = api
+        self.max_in_flight = max_in_flight
+        self.queue_size = queue_size
+        self.stats = {"tickets": 0, "errors": 0}
+        self._stats_lock = threading.Lock()
+        # Workers share the account's pooled client, whose per-host cap also bounds them
+
+    def fetch_ticket(self, ticket_id: str) -> List[Dict[str, Any]]:
+        """All conversation pages for one ticket."""
+        all_conversations = []
+        conv_page = 1
+
+        while True:
+            conversations, conv_next_url = self.api.get_conversations(
+                ticket_id=int(ticket_id),
+                page=conv_page
+            )
+
+            if not conversations:
+                break
+
+            all_conversations.extend(conversations)
+
+            if not conv_next_url:
+                break
+            conv_page += 1
+
+        return all_conversations
+
+    def fetch(self, ticket_ids: Iterable[str]) -> Iterator[Tuple[str, Optional[List[Dict[str, Any]]], Optional[Exception]]]:
+        """Yield (ticket_id, conversations, error) as tickets finish, in completion order.
+
+        Exactly one of conversations and error is set. Closing the generator early
+        stops the workers after their current ticket.
+        """
+        pending: "queue.Queue[str]" = queue.Queue()
+        for ticket_id in ticket_ids:
+            pending.put(str(ticket_id))
+        results: "queue.Queue[Any]" = queue.Queue(maxsize=self.queue_size)
+        stop = threading.Event()
+
+        def put(item) -> None:
+            while not stop.is_set():
+                try:
+                    results.put(item, timeout=_PUT_POLL_SECONDS)
+                    return
+                except queue.Full:
+                    continue
+
+        def worker() -> None:
+            try:
+                while not stop.is_set():
+                    try:
+                        ticket_id = pending.get_nowait()
+                    except queue.Empty:
+                        return
+                    try:
+                        result = (ticket_id, self.fetch_ticket(ticket_id), None)
+                    except Exception as e:
+                        result = (ticket_id, None, e)
+                    with self._stats_lock:
+                        self.stats["tickets"] += 1
+                        self.stats["errors"] += result[2] is not None
+                    put(result)
+            finally:
+                put(_DONE)
+
+        workers = [
+            threading.Thread(target=worker, name=f"freshdesk-fetch-{i}", daemon=True)
+            for i in range(min(self.max_in_flight, pending.qsize()))
+        ]
+        for thread in workers:
+            thread.start()
+
+        try:
+            finished = 0
+            while finished < len(workers):
+                item = results.get()
+                if item is _DONE:
+                    finished += 1
+                    continue
+                yield item
+        finally:
+            stop.set()
+            for thread in workers:
+                thread.join()
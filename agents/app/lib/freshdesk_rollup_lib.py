@@ -0,0 +1,165 @@
+"""Freshdesk daily rollup library.
+
+Maintains and reads freshdesk_daily_rollups, the per-merchant, per-day aggregates
+that let trend and spike analytics cost O(days) instead of O(tickets). The ETL
+calls refresh_days() after each committed batch with the days that batch touched;
+analytics read a date range with get_rollups() and combine rows with the helpers below.
+"""
+
+from datetime import date, datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.dbmodels.etl_tables import FreshdeskDailyRollup, FreshdeskTicket
+
+
+# Upper bounds (minutes) of the response-time sketch buckets. Bucket i counts values in
+# [SKETCH_BOUNDS_MIN[i-1], SKETCH_BOUNDS_MIN[i]); bucket 0 is < 1 minute and the last
+# bucket is >= 1 week. Must match the array in refresh_freshdesk_daily_rollups().
+SKETCH_BOUNDS_MIN = [1, 5, 10, 15, 30, 60, 120, 240, 480, 1440, 2880, 4320, 10080]
+
+
+class FreshdeskRollups:
+    """Read and refresh per-day Freshdesk aggregates."""
+
+    @staticmethod
+    def refresh_days(session: Session, merchant_id: int, days: Iterable[date]) -> int:
+        """Recompute the rollup rows for the given UTC days.
+
+        Args:
+            session: SQLAlchemy session for database queries
+            merchant_id: The merchant ID to refresh
+            days: Days whose tickets, closes or ratings changed
+
+        Returns:
+            Number of rollup rows written
+        """
+        days = sorted(set(days))
+        if not days:
+            return 0
+        return session.execute(
+            select(func.refresh_freshdesk_daily_rollups(merchant_id, days))
+        ).scalar() or 0
+
+    @staticmethod
+    def stored_ticket_days(session: Session, merchant_id: int, ticket_ids: List[str]) -> Dict[str, Set[date]]:
+        """Days each already-stored ticket currently counts towards, keyed by ticket ID.
+
+        Read before a batch is upserted so a ticket whose closed_at moves (e.g. reopened
+        and closed again) also refreshes the day it used to count towards.
+        """
+        if not ticket_ids:
+            return {}
+        rows = session.execute(
+            select(
+                FreshdeskTicket.freshdesk_ticket_id,
+                FreshdeskTicket.created_at,
+                FreshdeskTicket.closed_at,
+            ).where(
+                FreshdeskTicket.merchant_id == merchant_id,
+                FreshdeskTicket.freshdesk_ticket_id.in_(ticket_ids)
+            )
+        ).all()
+        return {
+            ticket_id: {moment.astimezone(timezone.utc).date() for moment in (created_at, closed_at) if moment}
+            for ticket_id, created_at, closed_at in rows
+        }
+
+    @staticmethod
+    def ticket_days(ticket: Dict[str, Any]) -> Set[date]:
+        """Days a Freshdesk API ticket payload contributes to (created and closed)."""
+        stats = ticket.get('stats') or {}
+        return {day for day in (_utc_day(ticket.get('created_at')), _utc_day(stats.get('closed_at'))) if day}
+
+    @staticmethod
+    def rating_days(rating: Dict[str, Any]) -> Set[date]:
+        """Days a Freshdesk API satisfaction rating payload contributes to."""
+        day = _utc_day(rating.get('created_at'))
+        return {day} if day else set()
+
+    @staticmethod
+    def get_rollups(session: Session, merchant_id: int, start_date: date, end_date: date) -> List[FreshdeskDailyRollup]:
+        """Get rollup rows for start_date..end_date inclusive, ordered by day."""
+        return session.query(FreshdeskDailyRollup).filter(
+            FreshdeskDailyRollup.merchant_id == merchant_id,
+            FreshdeskDailyRollup.day >= start_date,
+            FreshdeskDailyRollup.day <= end_date
+        ).order_by(FreshdeskDailyRollup.day).all()
+
+    @staticmethod
+    def daily_series(rollups: List[FreshdeskDailyRollup], start_date: date, num_days: int, field: str = "new_tickets") -> np.ndarray:
+        """Dense per-day values of a count field, with 0 for days without a rollup row."""
+        series = np.zeros(num_days, dtype=np.int64)
+        for rollup in rollups:
+            index = (rollup.day - start_date).days
+            if 0 <= index < num_days:
+                series[index] = getattr(rollup, field) or 0
+        return series
+
+    @staticmethod
+    def merge_counts(rollups: List[FreshdeskDailyRollup], field: str) -> Dict[str, int]:
+        """Sum a JSONB count map (tag_counts, type_counts, rating_histogram) across days."""
+        merged: Dict[str, int] = {}
+        for rollup in rollups:
+            for key, count in (getattr(rollup, field) or {}).items():
+                merged[key] = merged.get(key, 0) + count
+        return merged
+
+    @staticmethod
+    def merge_sketches(sketches: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+        """Combine response-time sketches from several days."""
+        buckets = np.zeros(len(SKETCH_BOUNDS_MIN) + 1, dtype=np.int64)
+        total = 0.0
+        for sketch in sketches:
+            for bucket, count in (sketch or {}).get('buckets', {}).items():
+                buckets[int(bucket)] += count
+            total += float((sketch or {}).get('sum_min', 0) or 0)
+        return {
+            'buckets': {str(i): int(n) for i, n in enumerate(buckets) if n},
+            'count': int(buckets.sum()),
+            'sum_min': round(total, 2)
+        }
+
+    @staticmethod
+    def sketch_percentile(sketch: Dict[str, Any], percentile: float) -> Optional[float]:
+        """Approximate a percentile (0-100) from a sketch.
+
+        Interpolates linearly inside the bucket that holds the target rank. The open-ended
+        first and last buckets report their finite bound.
+        """
+        buckets = np.zeros(len(SKETCH_BOUNDS_MIN) + 1, dtype=np.float64)
+        for bucket, count in (sketch or {}).get('buckets', {}).items():
+            buckets[int(bucket)] += count
+        total = buckets.sum()
+        if total == 0:
+            return None
+
+        target = percentile / 100 * total
+        cumulative = np.cumsum(buckets)
+        index = int(np.searchsorted(cumulative, target, side="left"))
+        index = min(index, len(buckets) - 1)
+        if index == 0:
+            return float(SKETCH_BOUNDS_MIN[0])
+        if index == len(SKETCH_BOUNDS_MIN):
+            return float(SKETCH_BOUNDS_MIN[-1])
+
+        lower, upper = SKETCH_BOUNDS_MIN[index - 1], SKETCH_BOUNDS_MIN[index]
+        previous = cumulative[index - 1]
+        fraction = (target - previous) / buckets[index] if buckets[index] else 0.0
+        return float(lower + (upper - lower) * fraction)
+
+
+def _utc_day(timestamp_str: Optional[str]) -> Optional[date]:
+    """UTC calendar day of a Freshdesk ISO timestamp string."""
+    if not timestamp_str:
+        return None
+    try:
+        parsed = datetime.fromisoformat(timestamp_str.replace('Z', '+00:00'))
+    except (ValueError, AttributeError):
+        return None
+    if parsed.utcoffset():
+        parsed = parsed - parsed.utcoffset()
+    return parsed.date()
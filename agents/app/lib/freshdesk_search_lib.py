@@ -0,0 +1,123 @@
+"""Freshdesk ticket search library.
+
+Maintains and queries freshdesk_ticket_search, the per-ticket search index with a
+weighted tsvector over ticket fields and conversation text plus trigram indexes on
+subject, requester email and name. The ETL calls refresh_tickets() after each
+committed batch with the tickets that batch changed; search() returns ranked matches
+from the index in a single query.
+"""
+
+from typing import Any, Dict, Iterable, List
+
+from sqlalchemy import case, func, literal, or_, select
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import Select
+
+from app.dbmodels.etl_tables import FreshdeskTicketSearch
+
+
+# pg_trgm cannot use its index for patterns shorter than one trigram, so shorter
+# queries rely on full-text and tag matches only
+MIN_TRIGRAM_QUERY_LENGTH = 3
+
+# Rank bonus for an exact tag match, on top of text rank and trigram similarity
+TAG_MATCH_RANK = 1.0
+
+
+class FreshdeskSearch:
+    """Refresh and query the Freshdesk ticket search index."""
+
+    @staticmethod
+    def refresh_tickets(session: Session, merchant_id: int, ticket_ids: Iterable[str]) -> int:
+        """Rebuild the search rows for the given tickets.
+
+        Args:
+            session: SQLAlchemy session for database queries
+            merchant_id: The merchant ID the tickets belong to
+            ticket_ids: Tickets whose ticket data or conversations changed
+
+        Returns:
+            Number of search rows written
+        """
+        ticket_ids = sorted(set(ticket_ids))
+        if not ticket_ids:
+            return 0
+        return session.execute(
+            select(func.refresh_freshdesk_ticket_search(merchant_id, ticket_ids))
+        ).scalar() or 0
+
+    @staticmethod
+    def search_query(merchant_id: int, query: str, limit: int = 10) -> Select:
+        """Ranked search statement for a free-text query.
+
+        Matches full-text (stemmed and unstemmed, so names and emails match as typed),
+        exact tags, and - for queries of MIN_TRIGRAM_QUERY_LENGTH or more - substrings of
+        subject, email and name via the trigram indexes.
+        """
+        index = FreshdeskTicketSearch
+        query = query.strip()
+        stemmed = func.websearch_to_tsquery("english", query)
+        unstemmed = func.websearch_to_tsquery("simple", query)
+        tag_match = index.tags.contains([query])
+
+        conditions = [
+            index.search_vector.op("@@")(stemmed),
+            index.search_vector.op("@@")(unstemmed),
+            tag_match,
+        ]
+        rank = (
+            func.ts_rank_cd(index.search_vector, stemmed)
+            + func.ts_rank_cd(index.search_vector, unstemmed)
+            + case((tag_match, TAG_MATCH_RANK), else_=0.0)
+        )
+
+        if len(query) >= MIN_TRIGRAM_QUERY_LENGTH:
+            pattern = "%" + query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+            conditions += [
+                index.subject.ilike(pattern, escape="\\"),
+                index.requester_email.ilike(pattern, escape="\\"),
+                index.requester_name.ilike(pattern, escape="\\"),
+            ]
+            rank = rank + func.coalesce(
+                func.greatest(
+                    func.similarity(index.subject, query),
+                    func.similarity(index.requester_email, query),
+                    func.similarity(index.requester_name, query),
+                ),
+                literal(0.0),
+            )
+
+        rank = rank.label("rank")
+        return (
+            select(
+                index.freshdesk_ticket_id,
+                index.subject,
+                index.status,
+                index.created_at,
+                index.requester_email,
+                index.requester_name,
+                rank,
+            )
+            .where(index.merchant_id == merchant_id, or_(*conditions))
+            .order_by(rank.desc(), index.created_at.desc().nulls_last())
+            .limit(limit)
+        )
+
+    @staticmethod
+    def search(session: Session, merchant_id: int, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """Ranked tickets matching a free-text query, best match first."""
+        if not query or not query.strip():
+            return []
+        rows = session.execute(FreshdeskSearch.search_query(merchant_id, query, limit)).all()
+        return [
+            {
+                "ticket_id": row.freshdesk_ticket_id,
+                "subject": row.subject,
+                "status": row.status,
+                "created_at": row.created_at.isoformat() if row.created_at else None,
+                "requester_email": row.requester_email,
+                "customer_name": row.requester_name,
+                "rank": round(float(row.rank or 0), 4),
+            }
+            for row in rows
+        ]
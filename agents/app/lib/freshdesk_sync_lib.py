@@ -1,23 +1,34 @@
 """Freshdesk ETL library for syncing data to database."""
 
-import json
 from datetime import datetime, timezone
-from typing import Optional, List, Dict, Any
-from sqlalchemy import select, update
+from typing import Optional, List, Dict, Any, Tuple
+from sqlalchemy import func, null, select
 from sqlalchemy.dialects.postgresql import insert
 
-from app.utils.freshdesk_util import FreshdeskAPI
+from app.config import settings
+from app.utils.freshdesk_util import FreshdeskAPI, RateLimitBudget
 from app.utils.supabase_util import get_db_session
 from app.dbmodels.base import Merchant, SyncMetadata
 from app.dbmodels.etl_tables import FreshdeskTicket, FreshdeskConversation, FreshdeskRating
+from app.lib.freshdesk_rollup_lib import FreshdeskRollups
+from app.lib.freshdesk_search_lib import FreshdeskSearch
+from app.lib.freshdesk_fetch_lib import ConversationFetcher
+from app.lib.etl_upsert_lib import upsert_rows_isolating_failures
 
 
 class FreshdeskETL:
     """Orchestrates Freshdesk data sync to database."""
     
-    def __init__(self, merchant_id: int):
+    def __init__(self, merchant_id: int, api_key: Optional[str] = None, domain: Optional[str] = None):
+        """
+        Args:
+            merchant_id: Merchant the synced rows belong to
+            api_key: The merchant's Freshdesk API key (defaults to FRESHDESK_API_KEY)
+            domain: The merchant's Freshdesk domain (defaults to FRESHDESK_DOMAIN)
+        """
         self.merchant_id = merchant_id
-        self.api = FreshdeskAPI()
+        # One budget for every thread calling this account, synced from response headers
+        self.api = FreshdeskAPI(rate_limit=RateLimitBudget(), api_key=api_key, domain=domain)
     
     def _parse_timestamp(self, timestamp_str: Optional[str]) -> Optional[datetime]:
         """Parse timestamp string to datetime object."""
@@ -31,22 +42,80 @@ class FreshdeskETL:
         except (ValueError, AttributeError):
             return None
     
+    def _ticket_columns(self, ticket: Dict[str, Any]) -> Dict[str, Any]:
+        """Typed column values for a Freshdesk API ticket (copies of fields kept in data)."""
+        stats = ticket.get('stats') or {}
+        requester = ticket.get('requester') or {}
+        return {
+            'created_at': self._parse_timestamp(ticket.get('created_at')),
+            'updated_at': self._parse_timestamp(ticket.get('updated_at')),
+            'status': ticket.get('status'),
+            'priority': ticket.get('priority'),
+            'first_responded_at': self._parse_timestamp(stats.get('first_responded_at')),
+            'resolved_at': self._parse_timestamp(stats.get('resolved_at')),
+            'closed_at': self._parse_timestamp(stats.get('closed_at')),
+            'requester_email': requester.get('email'),
+        }
+    
+    def _rating_columns(self, rating: Dict[str, Any]) -> Dict[str, Any]:
+        """Typed column values for a Freshdesk API satisfaction rating."""
+        created_at = self._parse_timestamp(rating.get('created_at'))
+        if created_at and created_at.tzinfo:
+            # Stored as UTC wall-clock time, like the view's rating_created_at
+            created_at = created_at.astimezone(timezone.utc).replace(tzinfo=None)
+        return {
+            'rating_score': (rating.get('ratings') or {}).get('default_question'),
+            'created_at': created_at,
+        }
+    
+    def _conversation_columns(self, conversations: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Summary columns for a ticket's conversation array, stored next to it."""
+        timestamps = [
+            moment for moment in (self._parse_timestamp(entry.get('created_at')) for entry in conversations)
+            if moment
+        ]
+        return {
+            'conversation_count': len(conversations),
+            'last_conversation_at': max(timestamps, default=None),
+            'has_agent_response': any(entry.get('incoming') is False for entry in conversations),
+        }
+    
     def get_last_sync_timestamp(self, resource_type: str) -> Optional[datetime]:
-        """Get the last successful sync timestamp for a resource."""
+        """Get the point the next incremental sync of a resource starts from.
+        
+        This is the source watermark of the last completed run, or for resources synced
+        before watermarks existed, the time of the last successful sync.
+        """
         with get_db_session() as session:
             sync_meta = session.query(SyncMetadata).filter_by(
                 merchant_id=self.merchant_id,
                 resource_type=resource_type
             ).first()
             
-            if sync_meta and sync_meta.last_sync_at:
-                return sync_meta.last_sync_at
+            if sync_meta and (sync_meta.watermark_at or sync_meta.last_sync_at):
+                return sync_meta.watermark_at or sync_meta.last_sync_at
             return None
     
+    def get_checkpoint(self, resource_type: str) -> Optional[Dict[str, Any]]:
+        """Get the checkpoint an unfinished run of a resource left behind, if any."""
+        with get_db_session() as session:
+            return session.execute(
+                select(SyncMetadata.checkpoint).where(
+                    SyncMetadata.merchant_id == self.merchant_id,
+                    SyncMetadata.resource_type == resource_type
+                )
+            ).scalar()
+    
     def update_sync_metadata(self, resource_type: str, status: str, 
                            last_successful_id: Optional[str] = None,
-                           error_message: Optional[str] = None):
-        """Update sync metadata for tracking."""
+                           error_message: Optional[str] = None,
+                           watermark_at: Optional[datetime] = None):
+        """Update sync metadata for tracking.
+        
+        A "success" status marks the run complete: its checkpoint is cleared and
+        watermark_at, when given, becomes the start of the next incremental run.
+        Other statuses keep the checkpoint so the run can be resumed.
+        """
         with get_db_session() as session:
             stmt = insert(SyncMetadata).values(
                 merchant_id=self.merchant_id,
@@ -54,22 +123,82 @@ class FreshdeskETL:
                 sync_status=status,
                 last_sync_at=datetime.now(timezone.utc) if status == "success" else None,
                 last_successful_id=last_successful_id,
-                error_message=error_message
+                error_message=error_message,
+                watermark_at=watermark_at
             )
             
             stmt = stmt.on_conflict_do_update(
                 index_elements=['merchant_id', 'resource_type'],
                 set_={
                     'sync_status': stmt.excluded.sync_status,
-                    'last_sync_at': stmt.excluded.last_sync_at,
-                    'last_successful_id': stmt.excluded.last_successful_id,
-                    'error_message': stmt.excluded.error_message
+                    # Keep the last successful sync while a run is in progress or after it fails
+                    'last_sync_at': func.coalesce(stmt.excluded.last_sync_at, SyncMetadata.last_sync_at),
+                    'last_successful_id': func.coalesce(stmt.excluded.last_successful_id, SyncMetadata.last_successful_id),
+                    'error_message': stmt.excluded.error_message,
+                    'watermark_at': func.coalesce(stmt.excluded.watermark_at, SyncMetadata.watermark_at),
+                    'checkpoint': null() if status == "success" else SyncMetadata.checkpoint
                 }
             )
             
             session.execute(stmt)
     
-    def sync_ticket_data(self, since: Optional[datetime] = None, max_pages: Optional[int] = None, force_reparse: bool = False) -> Dict[str, Any]:
+    def _start_run(self, resource_type: str, since: Optional[datetime], resume: bool) -> Dict[str, Any]:
+        """State for a paged sync run, continued from the resource's checkpoint when resuming.
+        
+        Returns:
+            Dict with since, page (next page to fetch), watermark (newest source timestamp
+            committed so far), started_at and resumed
+        """
+        checkpoint = self.get_checkpoint(resource_type) if resume else None
+        if checkpoint:
+            return {
+                'since': self._parse_timestamp(checkpoint.get('since')),
+                'page': checkpoint['page'] + 1,
+                'watermark': self._parse_timestamp(checkpoint.get('watermark')),
+                'started_at': self._parse_timestamp(checkpoint['started_at']),
+                'resumed': True
+            }
+        return {
+            'since': since,
+            'page': 1,
+            'watermark': None,
+            'started_at': datetime.now(timezone.utc),
+            'resumed': False
+        }
+    
+    def _advance_run(self, run: Dict[str, Any], page: int, timestamps: List[Optional[str]]) -> None:
+        """Record a fetched page and the newest source timestamp on it."""
+        run['page'] = page + 1
+        for value in timestamps:
+            parsed = self._parse_timestamp(value)
+            if parsed and (run['watermark'] is None or parsed > run['watermark']):
+                run['watermark'] = parsed
+    
+    def _save_checkpoint(self, session, resource_type: str, run: Dict[str, Any]) -> None:
+        """Write a run's checkpoint in the caller's transaction, so it commits with the page."""
+        def iso(value: Optional[datetime]) -> Optional[str]:
+            return value.isoformat() if value else None
+        
+        checkpoint = {
+            'since': iso(run['since']),
+            'page': run['page'] - 1,  # Last committed page
+            'watermark': iso(run['watermark']),
+            'started_at': iso(run['started_at']),
+            'saved_at': datetime.now(timezone.utc).isoformat()
+        }
+        stmt = insert(SyncMetadata).values(
+            merchant_id=self.merchant_id,
+            resource_type=resource_type,
+            sync_status="in_progress",
+            checkpoint=checkpoint
+        )
+        session.execute(stmt.on_conflict_do_update(
+            index_elements=['merchant_id', 'resource_type'],
+            set_={'checkpoint': stmt.excluded.checkpoint}
+        ))
+    
+    def sync_ticket_data(self, since: Optional[datetime] = None, max_pages: Optional[int] = None, force_reparse: bool = False,
+                         resume: bool = False) -> Dict[str, Any]:
         """Sync ONLY Freshdesk ticket data (without conversations).
         
         This method fetches and stores core ticket data only. Conversations
@@ -79,6 +208,12 @@ class FreshdeskETL:
             since: Sync tickets updated since this datetime
             max_pages: Maximum number of pages to fetch (for testing)
             force_reparse: Force re-parsing of all fields
+            resume: Continue an unfinished run from its checkpoint (ignores since)
+            
+        Each committed page checkpoints the run. Runs that stop at max_pages keep
+        their checkpoint (sync status "partial") and can be resumed. A page with
+        rows Postgres rejected is not checkpointed: the run stops there as "failed"
+        and a resumed run retries that page.
             
         Returns:
             Dict containing:
@@ -87,6 +222,9 @@ class FreshdeskETL:
                 - total_errors: Number of errors
                 - last_ticket_id: Last ticket ID processed
                 - updated_ticket_ids: List of ticket IDs that were updated
+                - complete: Whether the run reached the last page
+                - resumed: Whether the run continued from a checkpoint
+                - run_started_at: When the (first part of the) run started
         """
         print(f"🎫 Starting Freshdesk ticket data sync for merchant {self.merchant_id}")
         print("   📝 Syncing ticket data only (no conversations)")
@@ -94,9 +232,13 @@ class FreshdeskETL:
         # Mark sync as in progress
         self.update_sync_metadata("freshdesk_tickets", "in_progress")
         
+        run = self._start_run("freshdesk_tickets", since, resume)
+        if run['resumed']:
+            since = run['since']
+            print(f"   Resuming from page {run['page']} (since: {since})")
         # Use last sync timestamp if not provided
-        if not since:
-            since = self.get_last_sync_timestamp("freshdesk_tickets")
+        elif not since:
+            since = run['since'] = self.get_last_sync_timestamp("freshdesk_tickets")
             if since:
                 print(f"   Using last sync timestamp: {since}")
         else:
@@ -109,10 +251,12 @@ class FreshdeskETL:
         total_errors = 0
         last_ticket_id = None
         updated_ticket_ids = []  # Track which tickets were updated
+        complete = True
+        run_error = None  # Set when a page had rows Postgres rejected
         
         try:
             with get_db_session() as session:
-                page = 1
+                page = first_page = run['page']
                 has_more = True
                 
                 while has_more:
@@ -129,8 +273,16 @@ class FreshdeskETL:
                     if not tickets:
                             break
                     
-                    # Process each ticket
-                    for idx, ticket in enumerate(tickets, 1):
+                    # Days the stored versions count towards, so moved close dates refresh too
+                    stored_days = FreshdeskRollups.stored_ticket_days(
+                        session, self.merchant_id, [str(ticket.get('id')) for ticket in tickets]
+                    )
+                    touched_days = set()
+                    
+                    # Prepare one row per ticket; a ticket repeated on a page keeps its last version
+                    rows = {}
+                    page_tickets = {}
+                    for ticket in tickets:
                         try:
                             ticket_id = str(ticket.get('id'))
                             requester_id = ticket.get('requester_id')
@@ -159,48 +311,59 @@ class FreshdeskETL:
                                 '_raw_data': ticket
                             }
                             
-                            # Show progress for large batches
-                            if len(tickets) > 20 and idx % 10 == 0:
-                                print(f"    Processing ticket {idx}/{len(tickets)}...")
-                            
-                            # Upsert the ticket (without conversations)
-                            stmt = insert(FreshdeskTicket).values(
-                                freshdesk_ticket_id=ticket_id,
-                                merchant_id=self.merchant_id,
-                                data=ticket_data
-                            )
-                            
-                            if not force_reparse:
-                                stmt = stmt.on_conflict_do_update(
-                                    index_elements=['merchant_id', 'freshdesk_ticket_id'],
-                                    set_={
-                                        'data': stmt.excluded.data
-                                    },
-                                    where=(FreshdeskTicket.data != stmt.excluded.data)  # Only update if data differs
-                                )
-                            else:
-                                stmt = stmt.on_conflict_do_update(
-                                    index_elements=['merchant_id', 'freshdesk_ticket_id'],
-                                    set_={
-                                        'data': stmt.excluded.data
-                                    }
-                                )
-                            
-                            result = session.execute(stmt)
-                            # Track if this ticket was actually updated
-                            if result.rowcount > 0:
-                                updated_ticket_ids.append(ticket_id)
-                            
-                            total_synced += 1
-                            last_ticket_id = ticket_id
+                            rows[ticket_id] = {
+                                'merchant_id': self.merchant_id,
+                                'freshdesk_ticket_id': ticket_id,
+                                'data': ticket_data,
+                                **self._ticket_columns(ticket)
+                            }
+                            page_tickets[ticket_id] = ticket
                             
                         except Exception as e:
-                            print(f"  ❌ Error syncing ticket {ticket.get('id')}: {e}")
+                            print(f"  ❌ Error preparing ticket {ticket.get('id')}: {e}")
                             total_errors += 1
                     
-                    # Commit batch
+                    # Upsert the whole page (without conversations) in one statement;
+                    # if Postgres rejects it, only the offending rows are left out
+                    page_updated_ids, failed = upsert_rows_isolating_failures(
+                        session, FreshdeskTicket, list(rows.values()),
+                        ['merchant_id', 'freshdesk_ticket_id'], force_reparse
+                    )
+                    for ticket_id, error in failed:
+                        print(f"  ❌ Error upserting ticket {ticket_id} on page {page}: {error}")
+                    failed_ids = {ticket_id for ticket_id, _ in failed}
+                    written_ids = [ticket_id for ticket_id in rows if ticket_id not in failed_ids]
+                    total_errors += len(failed_ids)
+                    total_synced += len(written_ids)
+                    if written_ids:
+                        last_ticket_id = written_ids[-1]
+                    
+                    # Track which tickets were actually inserted or changed
+                    for ticket_id in page_updated_ids:
+                        updated_ticket_ids.append(ticket_id)
+                        touched_days |= FreshdeskRollups.ticket_days(page_tickets[ticket_id])
+                        touched_days |= stored_days.get(ticket_id, set())
+                    
+                    # Commit batch together with its checkpoint; a page with rejected rows
+                    # keeps the previous checkpoint so the page is retried on resume
+                    if failed:
+                        run_error = f"{len(failed)} tickets on page {page} could not be written"
+                    else:
+                        self._advance_run(run, page, [ticket.get('updated_at') for ticket in tickets])
+                        self._save_checkpoint(session, "freshdesk_tickets", run)
                     session.commit()
                     
+                    # Refresh daily rollups for the days this batch changed
+                    if touched_days:
+                        FreshdeskRollups.refresh_days(session, self.merchant_id, touched_days)
+                        session.commit()
+                        print(f"     Refreshed {len(touched_days)} daily rollups")
+                    
+                    # Rebuild search rows for the tickets this batch changed
+                    if page_updated_ids:
+                        FreshdeskSearch.refresh_tickets(session, self.merchant_id, page_updated_ids)
+                        session.commit()
+                    
                     # Get timestamp range for this batch
                     if tickets:
                         # Since tickets are ordered by updated_at desc, first is newest, last is oldest
@@ -209,37 +372,54 @@ class FreshdeskETL:
                         print(f"  ✅ Synced {len(tickets)} tickets from page {page} (Total so far: {total_synced})")
                         print(f"     Updated range: {newest_updated} → {oldest_updated}")
                     
+                    if run_error:
+                        print(f"  → {run_error}, stopping.")
+                        complete = False
+                        break
+                    
                     # Check for more pages
                     has_more = next_url is not None
                     
                     if has_more:
-                        if max_pages and page >= max_pages:
+                        if max_pages and page - first_page + 1 >= max_pages:
                             print(f"  → Reached max pages limit ({max_pages}), stopping.")
+                            complete = False
                             break
                         print(f"  → More pages available, continuing to page {page + 1}...")
                     else:
                         print(f"  → No more pages, stopping.")
                     page += 1
             
-            # Update sync metadata on success
+            # Update sync metadata on success; an unfinished or failed run keeps its checkpoint
             self.update_sync_metadata(
                 "freshdesk_tickets", 
-                "success",
-                last_successful_id=last_ticket_id
+                "failed" if run_error else "success" if complete else "partial",
+                last_successful_id=last_ticket_id,
+                error_message=run_error,
+                watermark_at=run['watermark'] if complete else None
             )
             
-            print(f"\n✅ Ticket data sync completed:")
+            if run_error:
+                print(f"\n❌ Ticket data sync stopped: {run_error}")
+            else:
+                print(f"\n✅ Ticket data sync completed:")
             print(f"   Total synced: {total_synced}")
             print(f"   Tickets updated: {len(updated_ticket_ids)}")
             print(f"   Errors: {total_errors}")
             
-            return {
-                "status": "success",
+            result = {
+                "status": "failed" if run_error else "success",
                 "total_synced": total_synced,
                 "total_errors": total_errors,
                 "last_ticket_id": last_ticket_id,
-                "updated_ticket_ids": updated_ticket_ids
+                "updated_ticket_ids": updated_ticket_ids,
+                "complete": complete,
+                "resumed": run['resumed'],
+                "run_started_at": run['started_at']
             }
+            if run_error:
+                result["error"] = run_error
+            return result
             
         except Exception as e:
             # Update sync metadata on failure
@@ -290,68 +470,39 @@ class FreshdeskETL:
         total_errors = 0
         
         try:
+            fetcher = ConversationFetcher(
+                self.api,
+                max_in_flight=settings.freshdesk_fetch_concurrency,
+                queue_size=settings.freshdesk_fetch_queue_size
+            )
             with get_db_session() as session:
-                # Process tickets in batches to avoid too many commits
+                # Write fetched tickets in batches to avoid too many commits
                 batch_size = 50
-                for i in range(0, len(ticket_ids), batch_size):
-                    batch = ticket_ids[i:i + batch_size]
-                    print(f"  Processing batch {i//batch_size + 1} ({len(batch)} tickets)...")
+                rows = {}
+                processed = 0
+                
+                for ticket_id, all_conversations, error in fetcher.fetch(ticket_ids):
+                    processed += 1
+                    if error:
+                        print(f"    ❌ Error syncing conversations for ticket {ticket_id}: {error}")
+                        total_errors += 1
+                    elif all_conversations:
+                        rows[ticket_id] = {
+                            'freshdesk_ticket_id': ticket_id,
+                            'data': all_conversations,  # Store as array
+                            **self._conversation_columns(all_conversations)
+                        }
+                    else:
+                        print(f"    ⚠️  No conversations found for ticket {ticket_id}")
                     
-                    for ticket_id in batch:
-                        try:
-                            # Fetch all conversations for this ticket
-                            all_conversations = []
-                            conv_page = 1
-                            
-                            while True:
-                                conversations, conv_next_url = self.api.get_conversations(
-                                    ticket_id=int(ticket_id),
-                                    page=conv_page
-                                )
-                                
-                                if not conversations:
-                                    break
-                                    
-                                all_conversations.extend(conversations)
-                                
-                                if not conv_next_url:
-                                    break
-                                conv_page += 1
-                            
-                            # Store conversations if we got any
-                            if all_conversations:
-                                conv_stmt = insert(FreshdeskConversation).values(
-                                    freshdesk_ticket_id=ticket_id,
-                                    data=all_conversations  # Store as array
-                                )
-                                
-                                if not force_reparse:
-                                    conv_stmt = conv_stmt.on_conflict_do_update(
-                                        index_elements=['freshdesk_ticket_id'],
-                                        set_={
-                                            'data': conv_stmt.excluded.data
-                                        },
-                                        where=(FreshdeskConversation.data != conv_stmt.excluded.data)  # Only update if data differs
-                                    )
-                                else:
-                                    conv_stmt = conv_stmt.on_conflict_do_update(
-                                        index_elements=['freshdesk_ticket_id'],
-                                        set_={
-                                            'data': conv_stmt.excluded.data
-                                        }
-                                    )
-                                
-                                session.execute(conv_stmt)
-                                total_synced += 1
-                            else:
-                                print(f"    ⚠️  No conversations found for ticket {ticket_id}")
-                                
-                        except Exception as e:
-                            print(f"    ❌ Error syncing conversations for ticket {ticket_id}: {e}")
-                            total_errors += 1
+                    if processed % batch_size and processed < len(ticket_ids):
+                        continue
                     
-                    # Commit batch
-                    session.commit()
+                    print(f"  Writing batch {(processed - 1)//batch_size + 1} ({len(rows)} tickets with conversations)...")
+                    synced, errors = self._write_conversation_batch(session, list(rows.values()), force_reparse)
+                    total_synced += synced
+                    total_errors += errors
+                    rows = {}
                     
             # Update sync metadata on success
             self.update_sync_metadata("freshdesk_conversations", "success")
@@ -382,7 +533,40 @@ class FreshdeskETL:
                 "total_errors": total_errors
             }
     
-    def sync_tickets(self, since: Optional[datetime] = None, max_pages: Optional[int] = None, force_reparse: bool = False) -> Dict[str, Any]:
+    def _write_conversation_batch(self, session, rows: List[Dict[str, Any]], force_reparse: bool) -> Tuple[int, int]:
+        """Upsert one batch of conversation rows, commit, and refresh their search rows.
+        
+        Returns:
+            Tuple of (rows synced, rows failed)
+        """
+        # Upsert the whole batch in one statement; a rejected row is left out on its own
+        changed_ticket_ids, failed = upsert_rows_isolating_failures(
+            session, FreshdeskConversation, rows, ['freshdesk_ticket_id'], force_reparse
+        )
+        for ticket_id, error in failed:
+            print(f"    ❌ Error upserting conversations for ticket {ticket_id}: {error}")
+        
+        # Commit batch
+        session.commit()
+        
+        # Conversation text is part of the search index
+        if changed_ticket_ids:
+            FreshdeskSearch.refresh_tickets(session, self.merchant_id, changed_ticket_ids)
+            session.commit()
+        return len(rows) - len(failed), len(failed)
+    
+    def _tickets_written_since(self, started_at: datetime) -> List[str]:
+        """Tickets this merchant's ETL inserted or changed since a run started."""
+        with get_db_session() as session:
+            return list(session.execute(
+                select(FreshdeskTicket.freshdesk_ticket_id).where(
+                    FreshdeskTicket.merchant_id == self.merchant_id,
+                    func.coalesce(FreshdeskTicket.etl_updated_at, FreshdeskTicket.etl_created_at) >= started_at
+                )
+            ).scalars())
+    
+    def sync_tickets(self, since: Optional[datetime] = None, max_pages: Optional[int] = None, force_reparse: bool = False,
+                     resume: bool = False) -> Dict[str, Any]:
         """Sync Freshdesk tickets with conversations using two-phase approach.
         
         Phase 1: Sync all ticket data that has been updated since last sync
@@ -395,6 +579,8 @@ class FreshdeskETL:
             since: Sync tickets updated since this datetime
             max_pages: Maximum number of pages to fetch (for testing)
             force_reparse: Force re-parsing of all fields
+            resume: Continue an unfinished run. Phase 1 resumes from the ticket checkpoint;
+                phase 2 also covers tickets the interrupted run wrote before it stopped.
             
         Returns:
             Combined results from both phases
@@ -405,12 +591,24 @@ class FreshdeskETL:
         print("=" * 60)
         
         # Phase 1: Sync ticket data
-        ticket_result = self.sync_ticket_data(since=since, max_pages=max_pages, force_reparse=force_reparse)
+        ticket_result = self.sync_ticket_data(since=since, max_pages=max_pages, force_reparse=force_reparse, resume=resume)
         
         if ticket_result['status'] != 'success':
             return ticket_result
         
         updated_ticket_ids = ticket_result.get('updated_ticket_ids', [])
+        run_started_at = ticket_result['run_started_at']
+        
+        if resume:
+            # Conversations were never fetched for tickets written before the interruption
+            pending = self.get_checkpoint("freshdesk_conversations")
+            starts = [run_started_at] if ticket_result['resumed'] else []
+            if pending:
+                starts.append(self._parse_timestamp(pending['started_at']))
+            if starts:
+                run_started_at = min(starts)
+                updated_ticket_ids = sorted(set(updated_ticket_ids) | set(self._tickets_written_since(run_started_at)))
+                print(f"   Resuming conversations for {len(updated_ticket_ids)} tickets written since {run_started_at}")
         
         if not updated_ticket_ids:
             print("\n✅ No tickets were updated, skipping conversation sync")
@@ -420,7 +618,12 @@ class FreshdeskETL:
         print("PHASE 2: SYNCING CONVERSATIONS FOR UPDATED TICKETS")
         print("=" * 60)
         
-        # Phase 2: Sync conversations for updated tickets
+        # Phase 2: Sync conversations for updated tickets. The checkpoint is cleared when
+        # the phase succeeds, so a resume knows whether these conversations are still owed.
+        with get_db_session() as session:
+            self._save_checkpoint(session, "freshdesk_conversations", {
+                'since': None, 'page': 1, 'watermark': None, 'started_at': run_started_at
+            })
         conv_result = self.sync_conversations_for_tickets(
             ticket_ids=updated_ticket_ids,
             force_reparse=force_reparse
@@ -436,33 +639,47 @@ class FreshdeskETL:
             "last_ticket_id": ticket_result.get('last_ticket_id')
         }
     
-    def sync_satisfaction_ratings(self, since: Optional[datetime] = None, max_pages: Optional[int] = None, force_reparse: bool = False) -> Dict[str, Any]:
-        """Sync ALL satisfaction ratings to separate ratings table.
+    def sync_satisfaction_ratings(self, since: Optional[datetime] = None, max_pages: Optional[int] = None, force_reparse: bool = False,
+                                  incremental: bool = False, resume: bool = False) -> Dict[str, Any]:
+        """Sync satisfaction ratings to separate ratings table.
         
         Ratings are stored in etl_freshdesk_ratings table with foreign key to tickets.
-        Only syncs ratings for tickets that exist in the database.
+        Only syncs ratings for tickets that exist in the database. By default ALL
+        ratings are fetched; each committed page checkpoints the run.
         
         Args:
-            since: DEPRECATED - kept for compatibility but should always be None
+            since: Only fetch ratings created since this datetime
             max_pages: Maximum number of pages to fetch (for testing)
+            force_reparse: Force re-parsing of all fields
+            incremental: Without since, fetch only ratings created since the last completed run's watermark
+            resume: Continue an unfinished run from its checkpoint (ignores since and incremental)
         """
         print(f"⭐ Starting satisfaction ratings sync for merchant {self.merchant_id}")
-        print("   📊 Fetching ALL satisfaction ratings from Freshdesk")
-        print("   💾 Storing ratings in etl_freshdesk_ratings table")
         
         # Mark sync as in progress
         self.update_sync_metadata("freshdesk_satisfaction_ratings", "in_progress")
         
-        # Always fetch ALL ratings
-        created_since = None  # Don't limit by date
+        if not since and incremental:
+            since = self.get_last_sync_timestamp("freshdesk_satisfaction_ratings")
+        run = self._start_run("freshdesk_satisfaction_ratings", since, resume)
+        created_since = run['since'].isoformat() if run['since'] else None
+        if run['resumed']:
+            print(f"   Resuming from page {run['page']} (created since: {created_since})")
+        elif created_since:
+            print(f"   📊 Fetching satisfaction ratings created since {created_since}")
+        else:
+            print("   📊 Fetching ALL satisfaction ratings from Freshdesk")
+        print("   💾 Storing ratings in etl_freshdesk_ratings table")
         
         total_synced = 0
         total_errors = 0
         tickets_updated = 0
+        complete = True
+        run_error = None  # Set when a page had rows Postgres rejected
         
         try:
             with get_db_session() as session:
-                page = 1
+                page = first_page = run['page']
                 has_more = True
                 
                 while has_more:
@@ -477,58 +694,69 @@ class FreshdeskETL:
                     if not ratings:
                         break
                     
-                    # Process each rating
+                    touched_days = set()
+                    
+                    # Check which of the page's tickets exist in one query
+                    page_ticket_ids = {str(rating.get('ticket_id')) for rating in ratings}
+                    existing_ticket_ids = set(session.execute(
+                        select(FreshdeskTicket.freshdesk_ticket_id).where(
+                            FreshdeskTicket.merchant_id == self.merchant_id,
+                            FreshdeskTicket.freshdesk_ticket_id.in_(page_ticket_ids)
+                        )
+                    ).scalars())
+                    
+                    # Prepare one row per ticket; a ticket rated twice on a page keeps its last rating
+                    rows = {}
+                    page_ratings = {}
+                    page_synced = 0
                     for rating in ratings:
                         try:
                             ticket_id = str(rating.get('ticket_id'))
                             
-                            # Check if ticket exists
-                            result = session.execute(
-                                select(FreshdeskTicket).where(
-                                    FreshdeskTicket.merchant_id == self.merchant_id,
-                                    FreshdeskTicket.freshdesk_ticket_id == ticket_id
-                                )
-                            )
-                            
-                            ticket_record = result.scalar_one_or_none()
-                            
-                            if ticket_record:
-                                # Store rating in separate table
-                                rating_stmt = insert(FreshdeskRating).values(
-                                    freshdesk_ticket_id=ticket_id,
-                                    data=rating  # Store the rating data
-                                )
-                                
-                                if not force_reparse:
-                                    rating_stmt = rating_stmt.on_conflict_do_update(
-                                        index_elements=['freshdesk_ticket_id'],
-                                        set_={
-                                            'data': rating_stmt.excluded.data
-                                        },
-                                        where=(FreshdeskRating.data != rating_stmt.excluded.data)  # Only update if data differs
-                                    )
-                                else:
-                                    rating_stmt = rating_stmt.on_conflict_do_update(
-                                        index_elements=['freshdesk_ticket_id'],
-                                        set_={
-                                            'data': rating_stmt.excluded.data
-                                        }
-                                    )
-                                
-                                session.execute(rating_stmt)
-                                tickets_updated += 1
+                            if ticket_id in existing_ticket_ids:
+                                # Store rating in separate table with its typed columns
+                                rows[ticket_id] = {
+                                    'freshdesk_ticket_id': ticket_id,
+                                    'data': rating,  # Store the rating data
+                                    **self._rating_columns(rating)
+                                }
+                                page_ratings[ticket_id] = rating
                             else:
                                 print(f"    ⚠️  Ticket {ticket_id} not found in database")
                             
-                            total_synced += 1
+                            page_synced += 1
                             
                         except Exception as e:
                             print(f"  ❌ Error syncing rating for ticket {rating.get('ticket_id')}: {e}")
                             total_errors += 1
                     
-                    # Commit batch
+                    # Upsert the whole page in one statement; a rejected row is left out on its own
+                    changed_ticket_ids, failed = upsert_rows_isolating_failures(
+                        session, FreshdeskRating, list(rows.values()),
+                        ['freshdesk_ticket_id'], force_reparse
+                    )
+                    for ticket_id, error in failed:
+                        print(f"  ❌ Error upserting rating for ticket {ticket_id} on page {page}: {error}")
+                    total_errors += len(failed)
+                    total_synced += page_synced - len(failed)
+                    tickets_updated += len(changed_ticket_ids)
+                    for ticket_id in changed_ticket_ids:
+                        touched_days |= FreshdeskRollups.rating_days(page_ratings[ticket_id])
+                    
+                    # Commit batch together with its checkpoint; a page with rejected rows
+                    # keeps the previous checkpoint so the page is retried on resume
+                    if failed:
+                        run_error = f"{len(failed)} ratings on page {page} could not be written"
+                    else:
+                        self._advance_run(run, page, [rating.get('created_at') for rating in ratings])
+                        self._save_checkpoint(session, "freshdesk_satisfaction_ratings", run)
                     session.commit()
                     
+                    # Refresh daily rollups for the days this batch changed
+                    if touched_days:
+                        FreshdeskRollups.refresh_days(session, self.merchant_id, touched_days)
+                        session.commit()
+                    
                     # Get timestamp range for this batch
                     if ratings:
                         # Since ratings are ordered by created_at desc, first is newest, last is oldest
@@ -537,35 +765,51 @@ class FreshdeskETL:
                         print(f"  ✅ Synced {len(ratings)} ratings from page {page} (Tickets updated: {tickets_updated})")
                         print(f"     Created range: {newest_created} → {oldest_created}")
                     
+                    if run_error:
+                        print(f"  → {run_error}, stopping.")
+                        complete = False
+                        break
+                    
                     # Check for more pages
                     has_more = next_url is not None
                     
                     if has_more:
-                        if max_pages and page >= max_pages:
+                        if max_pages and page - first_page + 1 >= max_pages:
                             print(f"  → Reached max pages limit ({max_pages}), stopping.")
+                            complete = False
                             break
                         print(f"  → More pages available, continuing to page {page + 1}...")
                     else:
                         print(f"  → No more pages, stopping.")
                     page += 1
             
-            # Update sync metadata on success
+            # Update sync metadata on success; an unfinished or failed run keeps its checkpoint
             self.update_sync_metadata(
                 "freshdesk_satisfaction_ratings", 
-                "success"
+                "failed" if run_error else "success" if complete else "partial",
+                error_message=run_error,
+                watermark_at=run['watermark'] if complete else None
             )
             
-            print(f"\n✅ Satisfaction ratings sync completed:")
+            if run_error:
+                print(f"\n❌ Satisfaction ratings sync stopped: {run_error}")
+            else:
+                print(f"\n✅ Satisfaction ratings sync completed:")
             print(f"   Total ratings synced: {total_synced}")
             print(f"   Tickets updated: {tickets_updated}")
             print(f"   Errors: {total_errors}")
             
-            return {
-                "status": "success",
+            result = {
+                "status": "failed" if run_error else "success",
                 "total_synced": total_synced,
                 "tickets_updated": tickets_updated,
-                "total_errors": total_errors
+                "total_errors": total_errors,
+                "complete": complete,
+                "resumed": run['resumed']
             }
+            if run_error:
+                result["error"] = run_error
+            return result
             
         except Exception as e:
             # Update sync metadata on failure
@@ -599,7 +843,9 @@ class FreshdeskETL:
                     'status': status.sync_status,
                     'last_sync': status.last_sync_at.isoformat() if status.last_sync_at else None,
                     'last_id': status.last_successful_id,
-                    'error': status.error_message
+                    'error': status.error_message,
+                    'watermark': status.watermark_at.isoformat() if status.watermark_at else None,
+                    'checkpoint': status.checkpoint
                 }
             
             return result
\ No newline at end of file
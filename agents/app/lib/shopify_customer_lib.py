@@ -7,6 +7,7 @@ This module provides customer search functionality using GraphQL with intelligen
 """
 
 import logging
+from functools import lru_cache
 from typing import Dict, Any, Optional, List
 from datetime import datetime
 
@@ -16,6 +17,16 @@ from shared.env_loader import get_env
 logger = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=16)
+def _client_for(shop_domain: str, access_token: str) -> ShopifyGraphQL:
+    return ShopifyGraphQL(shop_domain, access_token)
+
+
+def _get_client() -> ShopifyGraphQL:
+    """GraphQL client for the shop in the environment, reused across tool calls."""
+    return _client_for(get_env("SHOPIFY_SHOP_DOMAIN"), get_env("SHOPIFY_API_TOKEN"))
+
+
 def find_shopify_customer_by_email(email: str) -> Dict[str, Any]:
     """
     Find a Shopify customer by email address with fuzzy fallback.
@@ -40,10 +51,7 @@ def find_shopify_customer_by_email(email: str) -> Dict[str, Any]:
     logger.info(f"Searching for customer by email: {email}")
     
     try:
-        # ShopifyGraphQL will get credentials from environment
-        shop_domain = get_env("SHOPIFY_SHOP_DOMAIN")
-        access_token = get_env("SHOPIFY_API_TOKEN")
-        client = ShopifyGraphQL(shop_domain, access_token)
+        client = _get_client()
         
         # First try exact email match
         exact_query = """
@@ -162,9 +170,7 @@ def search_customers_fuzzy(search_term: str, search_fields: List[str] = None) ->
         search_fields = ["email", "first_name", "last_name", "phone"]
     
     try:
-        shop_domain = get_env("SHOPIFY_SHOP_DOMAIN")
-        access_token = get_env("SHOPIFY_API_TOKEN")
-        client = ShopifyGraphQL(shop_domain, access_token)
+        client = _get_client()
         
         query = """
         query FuzzyCustomerSearch($query: String!) {
@@ -274,9 +280,7 @@ def get_customer_order_history(customer_id: str, limit: int = 10) -> Dict[str, A
     limit = min(limit, 50)
     
     try:
-        shop_domain = get_env("SHOPIFY_SHOP_DOMAIN")
-        access_token = get_env("SHOPIFY_API_TOKEN")
-        client = ShopifyGraphQL(shop_domain, access_token)
+        client = _get_client()
         
         # Convert numeric ID to GID if needed
         if not customer_id.startswith("gid://"):
@@ -1,23 +1,102 @@
 """Shopify ETL library for syncing data to database."""
 
 import json
+from collections import OrderedDict
 from datetime import datetime, timezone
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
 from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
 
-from app.utils.shopify_util import ShopifyAPI
+from app.config import settings
+from app.utils.shopify_util import ShopifyAPI, ShopifyGraphQL
 from app.utils.supabase_util import get_db_session
 from app.dbmodels.base import Merchant, SyncMetadata
 from app.dbmodels.etl_tables import ShopifyCustomer
+from app.lib.etl_upsert_lib import upsert_changed_rows, upsert_rows_isolating_failures
+
+
+# Bulk operation query for the customer fields _bulk_customer_row stores
+CUSTOMERS_BULK_QUERY = """
+{
+  customers%s {
+    edges {
+      node {
+        id
+        email
+        firstName
+        lastName
+        phone
+        numberOfOrders
+        amountSpent { amount currencyCode }
+        emailMarketingConsent { marketingState }
+        tags
+        createdAt
+        updatedAt
+        state
+        verifiedEmail
+        defaultAddress {
+          firstName lastName company address1 address2 city province provinceCode country countryCodeV2
+          zip phone name
+        }
+      }
+    }
+  }
+}
+"""
+
+# Stored default_address keys and the GraphQL MailingAddress field each comes from.
+# REST addresses already use these keys; fields only one API has are left out.
+ADDRESS_FIELDS = {
+    'first_name': 'firstName',
+    'last_name': 'lastName',
+    'company': 'company',
+    'address1': 'address1',
+    'address2': 'address2',
+    'city': 'city',
+    'province': 'province',
+    'province_code': 'provinceCode',
+    'country': 'country',
+    'country_code': 'countryCodeV2',
+    'zip': 'zip',
+    'phone': 'phone',
+    'name': 'name',
+}
+
+# The source API's payload is kept in data but left out of content_hash, so a customer
+# synced over REST and then over a bulk operation is not rewritten when nothing changed
+CUSTOMER_UNHASHED_KEYS = ('_raw_data',)
+
+
+def _utc_timestamp(value: Optional[str]) -> Optional[str]:
+    """ISO timestamp in UTC; REST returns the shop's offset and GraphQL returns Z."""
+    if not value:
+        return value
+    return datetime.fromisoformat(value.replace('Z', '+00:00')).astimezone(timezone.utc).isoformat()
+
+
+def _default_address(address: Optional[Dict[str, Any]], graphql: bool = False) -> Optional[Dict[str, Any]]:
+    """A REST or GraphQL (graphql=True) address as a dict with the ADDRESS_FIELDS keys."""
+    if not address:
+        return None
+    return {key: address.get(field if graphql else key) for key, field in ADDRESS_FIELDS.items()}
 
 
 class ShopifyETL:
     """Orchestrates Shopify data sync to database."""
     
-    def __init__(self, merchant_id: int):
+    def __init__(self, merchant_id: int, shop_domain: Optional[str] = None, access_token: Optional[str] = None):
+        """
+        Args:
+            merchant_id: Merchant the synced rows belong to
+            shop_domain: The merchant's shop (defaults to SHOPIFY_SHOP_DOMAIN)
+            access_token: The merchant's access token (defaults to SHOPIFY_API_TOKEN)
+        """
         self.merchant_id = merchant_id
-        self.api = ShopifyAPI()
-        self._customer_cache = {}  # Cache customer IDs
+        self.api = ShopifyAPI(shop_domain=shop_domain, access_token=access_token)
+        self.graphql = ShopifyGraphQL(self.api.shop_domain, self.api.api_token)
+        # LRU of customer ids already upserted by this ETL, bounded so long runs don't grow it forever
+        self._customer_cache: "OrderedDict[str, str]" = OrderedDict()
+        self._customer_cache_size = settings.shopify_customer_cache_size
     
     def get_last_sync_timestamp(self, resource_type: str) -> Optional[datetime]:
         """Get the last successful sync timestamp for a resource."""
@@ -57,17 +136,10 @@ class ShopifyETL:
             
             session.execute(stmt)
     
-    def _ensure_customer_exists(self, session, customer_data: Dict[str, Any]) -> Optional[str]:
-        """Ensure a customer exists in the database and return its UUID."""
-        if not customer_data:
-            return None
-        
+    def _customer_row(self, customer_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Row for etl_shopify_customers from a Shopify API customer."""
         customer_id = str(customer_data.get('id'))
         
-        # Check cache first
-        if customer_id in self._customer_cache:
-            return self._customer_cache[customer_id]
-        
         # Prepare customer data with all Shopify fields
         db_customer_data = {
             'shopify_customer_id': customer_id,
@@ -79,33 +151,105 @@ class ShopifyETL:
             'total_spent': float(customer_data.get('total_spent', 0)),
             'currency': customer_data.get('currency'),
             'accepts_marketing': customer_data.get('accepts_marketing'),
-            'tags': customer_data.get('tags', '').split(',') if customer_data.get('tags') else [],
-            'created_at': customer_data.get('created_at'),
-            'updated_at': customer_data.get('updated_at'),
+            'tags': [tag.strip() for tag in customer_data['tags'].split(',')] if customer_data.get('tags') else [],
+            'created_at': _utc_timestamp(customer_data.get('created_at')),
+            'updated_at': _utc_timestamp(customer_data.get('updated_at')),
             'state': customer_data.get('state'),
             'verified_email': customer_data.get('verified_email'),
-            'default_address': customer_data.get('default_address'),
+            'default_address': _default_address(customer_data.get('default_address')),
             # Store complete customer data
             '_raw_data': customer_data
         }
         
-        # Upsert the customer
-        stmt = insert(ShopifyCustomer).values(
-            shopify_customer_id=customer_id,
-            merchant_id=self.merchant_id,
-            data=db_customer_data
-        )
+        return {
+            'merchant_id': self.merchant_id,
+            'shopify_customer_id': customer_id,
+            'data': db_customer_data
+        }
+    
+    def _bulk_customer_row(self, node: Dict[str, Any]) -> Dict[str, Any]:
+        """Row for etl_shopify_customers from a bulk operation customer node.
         
-        stmt = stmt.on_conflict_do_update(
-            index_elements=['merchant_id', 'shopify_customer_id'],
-            set_={
-                'data': stmt.excluded.data
-            }
+        Maps the GraphQL fields onto the same data keys and value formats as _customer_row,
+        so the same customer hashes the same from either path. _raw_data holds the GraphQL
+        node and is left out of the hash (CUSTOMER_UNHASHED_KEYS).
+        """
+        # gid://shopify/Customer/123 -> 123, the id the REST API uses
+        customer_id = node['id'].rsplit('/', 1)[-1]
+        amount_spent = node.get('amountSpent') or {}
+        marketing_consent = node.get('emailMarketingConsent')
+        
+        db_customer_data = {
+            'shopify_customer_id': customer_id,
+            'email': node.get('email'),
+            'first_name': node.get('firstName'),
+            'last_name': node.get('lastName'),
+            'phone': node.get('phone'),
+            'orders_count': int(node.get('numberOfOrders') or 0),
+            'total_spent': float(amount_spent.get('amount') or 0),
+            'currency': amount_spent.get('currencyCode'),
+            'accepts_marketing': (
+                marketing_consent.get('marketingState') == 'SUBSCRIBED' if marketing_consent else None
+            ),
+            'tags': node.get('tags') or [],
+            'created_at': _utc_timestamp(node.get('createdAt')),
+            'updated_at': _utc_timestamp(node.get('updatedAt')),
+            'state': node['state'].lower() if node.get('state') else None,
+            'verified_email': node.get('verifiedEmail'),
+            'default_address': _default_address(node.get('defaultAddress'), graphql=True),
+            # Store complete customer node
+            '_raw_data': node
+        }
+        
+        return {
+            'merchant_id': self.merchant_id,
+            'shopify_customer_id': customer_id,
+            'data': db_customer_data
+        }
+    
+    def _write_customer_batch(self, session, rows: Dict[str, Dict[str, Any]], label: str) -> Tuple[List[str], int, int]:
+        """Upsert one batch of customer rows and commit it.
+        
+        A customer Postgres rejects is logged and left out; the rest of the batch is written.
+        
+        Returns:
+            (written customer ids in batch order, changed, errors)
+        """
+        # One hash lookup for the batch, then one upsert of the new and changed customers;
+        # if Postgres rejects it, only the offending rows are left out
+        changed_ids, failed = upsert_rows_isolating_failures(
+            session, ShopifyCustomer, list(rows.values()),
+            ['merchant_id', 'shopify_customer_id'], unhashed_keys=CUSTOMER_UNHASHED_KEYS
         )
+        for customer_id, error in failed:
+            print(f"  ❌ Error upserting customer {customer_id} in {label}: {error}")
+        failed_ids = {customer_id for customer_id, _ in failed}
+        
+        session.commit()
+        return [customer_id for customer_id in rows if customer_id not in failed_ids], len(changed_ids), len(failed)
+    
+    def _ensure_customer_exists(self, session, customer_data: Dict[str, Any]) -> Optional[str]:
+        """Ensure a customer exists in the database and return its UUID."""
+        if not customer_data:
+            return None
+        
+        customer_id = str(customer_data.get('id'))
         
-        session.execute(stmt)
+        # Check cache first
+        if customer_id in self._customer_cache:
+            self._customer_cache.move_to_end(customer_id)
+            return self._customer_cache[customer_id]
+        
+        # Upsert the customer (skipped when its stored hash matches)
+        upsert_changed_rows(
+            session, ShopifyCustomer, [self._customer_row(customer_data)],
+            ['merchant_id', 'shopify_customer_id'], unhashed_keys=CUSTOMER_UNHASHED_KEYS
+        )
         
         # Return the customer ID itself since we're using it as primary key
+        self._customer_cache[customer_id] = customer_id
+        if len(self._customer_cache) > self._customer_cache_size:
+            self._customer_cache.popitem(last=False)
         return customer_id
     
     def sync_customers(self, since: Optional[datetime] = None) -> Dict[str, Any]:
@@ -123,6 +267,7 @@ class ShopifyETL:
         updated_at_min = since.isoformat() if since else None
         
         total_synced = 0
+        total_changed = 0
         total_errors = 0
         last_customer_id = None
         
@@ -143,24 +288,23 @@ class ShopifyETL:
                     if not customers:
                         break
                     
-                    # Process each customer
+                    # Prepare one row per customer
+                    rows = {}
                     for customer in customers:
                         try:
-                            customer_id = str(customer.get('id'))
-                            
-                            # Ensure customer exists
-                            self._ensure_customer_exists(session, customer)
-                            
-                            total_synced += 1
-                            last_customer_id = customer_id
-                            
+                            rows[str(customer.get('id'))] = self._customer_row(customer)
                         except Exception as e:
                             print(f"  ❌ Error syncing customer {customer.get('id')}: {e}")
                             total_errors += 1
                     
-                    # Commit batch
-                    session.commit()
-                    print(f"  ✅ Synced {len(customers)} customers from page {page_num}")
+                    written_ids, changed, errors = self._write_customer_batch(session, rows, f"page {page_num}")
+                    total_synced += len(written_ids)
+                    total_changed += changed
+                    total_errors += errors
+                    if written_ids:
+                        last_customer_id = written_ids[-1]
+                    
+                    print(f"  ✅ Synced {len(customers)} customers from page {page_num} ({total_changed} changed so far)")
                     
                     # Check for more pages
                     if not next_page_info:
@@ -178,11 +322,13 @@ class ShopifyETL:
             
             print(f"\n✅ Customer sync completed:")
             print(f"   Total synced: {total_synced}")
+            print(f"   Changed: {total_changed}")
             print(f"   Errors: {total_errors}")
             
             return {
                 "status": "success",
                 "total_synced": total_synced,
+                "total_changed": total_changed,
                 "total_errors": total_errors,
                 "last_customer_id": last_customer_id
             }
@@ -203,6 +349,108 @@ class ShopifyETL:
                 "total_errors": total_errors
             }
     
+    def sync_customers_bulk(self, since: Optional[datetime] = None, batch_size: Optional[int] = None,
+                            poll_interval: Optional[float] = None) -> Dict[str, Any]:
+        """Sync Shopify customers through a GraphQL bulk operation.
+        
+        Shopify exports every matching customer to a JSONL file server-side, so there is
+        no REST pagination. The file is streamed line by line and written in batches of
+        batch_size, so memory stays flat however many customers the store has.
+        """
+        print(f"👥 Starting Shopify bulk customer sync for merchant {self.merchant_id}")
+        
+        # Mark sync as in progress
+        self.update_sync_metadata("shopify_customers", "in_progress")
+        
+        # Use last sync timestamp if not provided
+        if not since:
+            since = self.get_last_sync_timestamp("shopify_customers")
+        batch_size = batch_size or settings.shopify_bulk_batch_size
+        
+        search = f'(query: "updated_at:>=\'{since.isoformat()}\'")' if since else ""
+        
+        total_synced = 0
+        total_changed = 0
+        total_errors = 0
+        last_customer_id = None
+        
+        try:
+            operation = self.graphql.run_bulk_query(CUSTOMERS_BULK_QUERY % search)
+            print(f"  Started bulk operation {operation['id']}, waiting for Shopify to export...")
+            operation = self.graphql.wait_for_bulk_operation(
+                operation['id'], poll_interval=poll_interval or settings.shopify_bulk_poll_interval
+            )
+            print(f"  Bulk operation completed with {operation.get('objectCount')} objects")
+            
+            # No url means nothing matched the query
+            if operation.get('url'):
+                with get_db_session() as session:
+                    rows = {}
+                    batch_num = 1
+                    for node in self.graphql.stream_bulk_results(operation['url']):
+                        try:
+                            row = self._bulk_customer_row(node)
+                            rows[row['shopify_customer_id']] = row
+                        except Exception as e:
+                            print(f"  ❌ Error syncing customer {node.get('id')}: {e}")
+                            total_errors += 1
+                        
+                        if len(rows) < batch_size:
+                            continue
+                        written_ids, changed, errors = self._write_customer_batch(session, rows, f"batch {batch_num}")
+                        total_synced += len(written_ids)
+                        total_changed += changed
+                        total_errors += errors
+                        if written_ids:
+                            last_customer_id = written_ids[-1]
+                        print(f"  ✅ Synced batch {batch_num} ({total_synced} customers, {total_changed} changed so far)")
+                        rows = {}
+                        batch_num += 1
+                    
+                    if rows:
+                        written_ids, changed, errors = self._write_customer_batch(session, rows, f"batch {batch_num}")
+                        total_synced += len(written_ids)
+                        total_changed += changed
+                        total_errors += errors
+                        if written_ids:
+                            last_customer_id = written_ids[-1]
+            
+            # Update sync metadata on success
+            self.update_sync_metadata(
+                "shopify_customers",
+                "success",
+                last_successful_id=last_customer_id
+            )
+            
+            print(f"\n✅ Bulk customer sync completed:")
+            print(f"   Total synced: {total_synced}")
+            print(f"   Changed: {total_changed}")
+            print(f"   Errors: {total_errors}")
+            
+            return {
+                "status": "success",
+                "total_synced": total_synced,
+                "total_changed": total_changed,
+                "total_errors": total_errors,
+                "last_customer_id": last_customer_id
+            }
+            
+        except Exception as e:
+            # Update sync metadata on failure
+            self.update_sync_metadata(
+                "shopify_customers",
+                "failed",
+                error_message=str(e)
+            )
+            
+            print(f"\n❌ Bulk customer sync failed: {e}")
+            return {
+                "status": "failed",
+                "error": str(e),
+                "total_synced": total_synced,
+                "total_errors": total_errors
+            }
+    
     def sync_orders(self, since: Optional[datetime] = None) -> Dict[str, Any]:
         """DEPRECATED: Orders should not be synced to the database."""
         print(f"⚠️  Shopify order sync is disabled")
@@ -0,0 +1,153 @@
+"""Columnar ticket extracts for vectorized analytics.
+
+A TicketFrame holds a handful of scalar columns from v_freshdesk_unified_tickets
+as NumPy arrays (one array per column) instead of a list of ORM objects. Timestamps
+are converted to epoch seconds inside Postgres so no datetime objects are built
+in Python, and heavy JSONB such as conversation_history is never fetched.
+"""
+
+from collections import Counter
+from typing import Dict, Iterable, Sequence
+
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.dbmodels.view_models import FreshdeskUnifiedTicketView
+
+
+# How each supported column is represented in the frame:
+#   epoch  - float64 epoch seconds, NaN when NULL
+#   number - float64, NaN when NULL (status, priority, rating_score, ...)
+#   bool   - bool, NULL treated as False
+#   object - Python objects (strings, tag lists)
+COLUMN_KINDS: Dict[str, str] = {
+    "freshdesk_ticket_id": "object",
+    "subject": "object",
+    "type": "object",
+    "tags": "object",
+    "requester_email": "object",
+    "status": "number",
+    "priority": "number",
+    "responder_id": "number",
+    "rating_score": "number",
+    "has_rating": "bool",
+    "is_escalated": "bool",
+    "fr_escalated": "bool",
+    "created_at": "epoch",
+    "updated_at": "epoch",
+    "first_responded_at": "epoch",
+    "resolved_at": "epoch",
+    "closed_at": "epoch",
+    "rating_created_at": "epoch",
+}
+
+SECONDS_PER_DAY = 86400
+
+
+class TicketFrame:
+    """A set of equally sized NumPy column arrays describing tickets."""
+
+    def __init__(self, columns: Dict[str, np.ndarray]):
+        lengths = {len(values) for values in columns.values()}
+        if len(lengths) > 1:
+            raise ValueError(f"TicketFrame columns must have equal length, got {sorted(lengths)}")
+        self.columns = columns
+
+    def __len__(self) -> int:
+        if not self.columns:
+            return 0
+        return len(next(iter(self.columns.values())))
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.columns[name]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.columns
+
+    def filter(self, mask: np.ndarray) -> "TicketFrame":
+        """Return a new frame containing only the rows where mask is True."""
+        return TicketFrame({name: values[mask] for name, values in self.columns.items()})
+
+    def minutes_between(self, start: str, end: str) -> np.ndarray:
+        """Minutes from one epoch column to another (NaN when either is NULL)."""
+        return (self.columns[end] - self.columns[start]) / 60.0
+
+    @classmethod
+    def from_columns(cls, column_names: Sequence[str], values: Iterable[Sequence]) -> "TicketFrame":
+        """Build a frame from per-column value sequences, applying each column's kind."""
+        return cls({
+            name: _to_array(name, column_values)
+            for name, column_values in zip(column_names, values)
+        })
+
+    @classmethod
+    def from_rows(cls, column_names: Sequence[str], rows: Sequence[Sequence]) -> "TicketFrame":
+        """Build a frame from row tuples ordered like column_names."""
+        if not rows:
+            return cls.from_columns(column_names, [[] for _ in column_names])
+        return cls.from_columns(column_names, zip(*rows))
+
+    @classmethod
+    def load(
+        cls,
+        session: Session,
+        merchant_id: int,
+        columns: Sequence[str],
+        *criteria,
+    ) -> "TicketFrame":
+        """Load the requested columns for a merchant's tickets matching criteria.
+
+        Args:
+            session: SQLAlchemy session for database queries
+            merchant_id: The merchant ID to filter by (NEVER look up by name)
+            columns: Column names from COLUMN_KINDS to extract
+            *criteria: Extra SQLAlchemy filter expressions on FreshdeskUnifiedTicketView
+
+        Returns:
+            TicketFrame with one array per requested column
+        """
+        statement = select(*[_select_expression(name) for name in columns]).where(
+            FreshdeskUnifiedTicketView.merchant_id == merchant_id,
+            *criteria
+        )
+        rows = session.execute(statement).all()
+        return cls.from_rows(columns, rows)
+
+
+def _select_expression(name: str):
+    """SQL expression for a frame column, converting timestamps to epoch seconds."""
+    kind = COLUMN_KINDS.get(name)
+    if kind is None:
+        raise ValueError(f"Unsupported TicketFrame column: {name}")
+    column = getattr(FreshdeskUnifiedTicketView, name)
+    if kind == "epoch":
+        return func.extract("epoch", column).label(name)
+    return column.label(name)
+
+
+def _to_array(name: str, values: Iterable) -> np.ndarray:
+    """Convert raw column values to the array representation for the column kind."""
+    kind = COLUMN_KINDS[name]
+    values = list(values)
+    if kind in ("epoch", "number"):
+        # None becomes NaN; Decimal results from EXTRACT convert directly
+        return np.array(values, dtype=np.float64)
+    if kind == "bool":
+        return np.array(values, dtype=bool)
+    return np.fromiter(values, dtype=object, count=len(values))
+
+
+def tag_counts(tags: np.ndarray) -> Dict[str, int]:
+    """Count tag occurrences across an object array of tag lists."""
+    return dict(Counter(tag for ticket_tags in tags if ticket_tags for tag in ticket_tags))
+
+
+def daily_counts(epochs: np.ndarray, start_epoch: float, num_days: int) -> np.ndarray:
+    """Bucket epoch timestamps into num_days UTC days starting at start_epoch.
+
+    Returns an int array of length num_days; NULL and out-of-range values are dropped.
+    """
+    day_index = np.floor((epochs - start_epoch) / SECONDS_PER_DAY)
+    in_range = (day_index >= 0) & (day_index < num_days)  # NaN compares False
+    return np.bincount(day_index[in_range].astype(np.int64), minlength=num_days)
@@ -14,11 +14,20 @@ from app.config import settings
 from shared.logging_config import setup_logging
 from app.models import ConversationRequest, ConversationResponse, EvalChatRequest, EvalChatResponse, Message
 from app.services.session_manager import SessionManager
-from app.services.message_processor import MessageProcessor
+from app.services.message_processor import MessageProcessor, cancel_prefetch_tasks
 from app.services.conversation_storage import ConversationStorage
 from app.prompts import PromptLoader
 from app.scenarios import ScenarioLoader
 from app.cache_config import setup_litellm_cache, get_cache_info
+from app.utils.supabase_util import get_pool_metrics
+from shared.conversation_writer import close_conversation_writer
+from shared.user_identity import close_pool
+from app.services.persistence_executor import get_persistence_executor, shutdown_persistence_executor
+from app.services.agent_executor import get_agent_executor, shutdown_agent_executor
+from app.services.grounding_cache import get_grounding_cache
+from app.services.grounding_manager import shutdown_grounding_executor
+from app.utils.yaml_cache import get_yaml_cache
+from app.utils.http_pool import aclose_clients, close_clients
 from app.cache_warming import warm_cache_on_startup
 from app.platforms.manager import PlatformManager
 from app.platforms.web import WebPlatform
@@ -200,6 +209,13 @@ async def startup_event():
     """Initialize services on startup"""
     logger.info("🚀 Initializing HireCJ services...")
     
+    # Parse prompts, workflows, universes and the catalog once, before the first request
+    yaml_dirs = [settings.prompts_dir, settings.universes_dir, "config"]
+    if settings.yaml_cache_preload:
+        get_yaml_cache().preload(yaml_dirs)
+    if settings.yaml_cache_watch:
+        get_yaml_cache().start_watcher(yaml_dirs)
+
     # Validate critical resources first
     validate_critical_resources()
 
@@ -226,6 +242,18 @@ async def shutdown_event():
     global platform_manager
     if platform_manager:
         await platform_manager.stop_all()
+    await cancel_prefetch_tasks()
+    
+    # Finish in-flight agent turns, fact writes and buffered conversation messages,
+    # then close pooled provider HTTP clients and release identity DB connections
+    shutdown_agent_executor()
+    shutdown_grounding_executor()
+    shutdown_persistence_executor()
+    get_yaml_cache().stop_watcher()
+    close_clients()
+    await aclose_clients()
+    close_conversation_writer()
+    close_pool()
 
 
 async def initialize_websocket_services():
@@ -417,6 +445,11 @@ async def health_check():
                 if web_platform and web_platform.is_connected
                 else "not_connected"
             ),
+            "database_pool": get_pool_metrics(),
+            "persistence_executor": get_persistence_executor().get_stats(),
+            "agent_executor": get_agent_executor().get_stats(),
+            "yaml_cache": get_yaml_cache().get_stats(),
+            "grounding_cache": get_grounding_cache().get_stats(),
         },
     }
 
@@ -0,0 +1,192 @@
+-- Migration: Create Freshdesk daily rollups
+-- Purpose: Per-merchant, per-day ticket aggregates so trend and spike analytics
+--          cost O(days) instead of rescanning raw tickets on every call.
+--          Rows are refreshed incrementally by the ETL for the days each sync batch touches.
+-- Date: 2025-06-20
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS freshdesk_daily_rollups (
+    merchant_id INTEGER NOT NULL REFERENCES merchants(id) ON DELETE CASCADE,
+    day DATE NOT NULL,
+    new_tickets INTEGER NOT NULL DEFAULT 0,
+    closed_tickets INTEGER NOT NULL DEFAULT 0,
+    untagged_tickets INTEGER NOT NULL DEFAULT 0,
+    tag_counts JSONB NOT NULL DEFAULT '{}'::jsonb,
+    type_counts JSONB NOT NULL DEFAULT '{}'::jsonb,
+    rating_histogram JSONB NOT NULL DEFAULT '{}'::jsonb,
+    first_response_sketch JSONB NOT NULL DEFAULT '{}'::jsonb,
+    resolution_sketch JSONB NOT NULL DEFAULT '{}'::jsonb,
+    refreshed_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (merchant_id, day)
+);
+
+-- Recompute the rollup rows for one merchant and a set of UTC days.
+-- Sketch bucket bounds (minutes) must match SKETCH_BOUNDS_MIN in app/lib/freshdesk_rollup_lib.py
+CREATE OR REPLACE FUNCTION refresh_freshdesk_daily_rollups(p_merchant_id INTEGER, p_days DATE[])
+RETURNS INTEGER AS $$
+DECLARE
+    refreshed INTEGER;
+BEGIN
+    WITH target_days AS (
+        SELECT DISTINCT unnest(p_days) AS day
+    ),
+    created AS (
+        -- Tickets created on the target days
+        SELECT
+            (t.created_at AT TIME ZONE 'UTC')::date AS day,
+            CASE WHEN jsonb_typeof(t.tags) = 'array' THEN t.tags ELSE '[]'::jsonb END AS tags,
+            COALESCE(t.type, 'unspecified') AS type,
+            EXTRACT(EPOCH FROM t.first_responded_at - t.created_at) / 60 AS first_response_min,
+            EXTRACT(EPOCH FROM t.resolved_at - t.created_at) / 60 AS resolution_min
+        FROM v_freshdesk_unified_tickets t
+        WHERE t.merchant_id = p_merchant_id
+          AND (t.created_at AT TIME ZONE 'UTC')::date = ANY(p_days)
+    ),
+    ticket_counts AS (
+        SELECT day,
+               count(*) AS new_tickets,
+               count(*) FILTER (WHERE jsonb_array_length(tags) = 0) AS untagged_tickets
+        FROM created
+        GROUP BY day
+    ),
+    tag_counts AS (
+        SELECT day, jsonb_object_agg(tag, n) AS tag_counts
+        FROM (
+            SELECT c.day, tag, count(*) AS n
+            FROM created c, jsonb_array_elements_text(c.tags) AS tag
+            GROUP BY c.day, tag
+        ) per_tag
+        GROUP BY day
+    ),
+    type_counts AS (
+        SELECT day, jsonb_object_agg(type, n) AS type_counts
+        FROM (SELECT day, type, count(*) AS n FROM created GROUP BY day, type) per_type
+        GROUP BY day
+    ),
+    first_response AS (
+        SELECT day, jsonb_build_object(
+                   'buckets', jsonb_object_agg(bucket, n),
+                   'count', sum(n),
+                   'sum_min', round(sum(total)::numeric, 2)
+               ) AS sketch
+        FROM (
+            SELECT day,
+                   width_bucket(first_response_min::float8, ARRAY[1,5,10,15,30,60,120,240,480,1440,2880,4320,10080]::float8[]) AS bucket,
+                   count(*) AS n,
+                   sum(first_response_min) AS total
+            FROM created
+            WHERE first_response_min >= 0
+            GROUP BY 1, 2
+        ) per_bucket
+        GROUP BY day
+    ),
+    resolution AS (
+        SELECT day, jsonb_build_object(
+                   'buckets', jsonb_object_agg(bucket, n),
+                   'count', sum(n),
+                   'sum_min', round(sum(total)::numeric, 2)
+               ) AS sketch
+        FROM (
+            SELECT day,
+                   width_bucket(resolution_min::float8, ARRAY[1,5,10,15,30,60,120,240,480,1440,2880,4320,10080]::float8[]) AS bucket,
+                   count(*) AS n,
+                   sum(resolution_min) AS total
+            FROM created
+            WHERE resolution_min >= 0
+            GROUP BY 1, 2
+        ) per_bucket
+        GROUP BY day
+    ),
+    closed AS (
+        -- Tickets closed on the target days
+        SELECT (t.closed_at AT TIME ZONE 'UTC')::date AS day, count(*) AS closed_tickets
+        FROM v_freshdesk_unified_tickets t
+        WHERE t.merchant_id = p_merchant_id
+          AND (t.closed_at AT TIME ZONE 'UTC')::date = ANY(p_days)
+        GROUP BY 1
+    ),
+    ratings AS (
+        -- Ratings received on the target days (rating_created_at is stored as UTC)
+        SELECT day, jsonb_object_agg(rating_score, n) AS rating_histogram
+        FROM (
+            SELECT t.rating_created_at::date AS day, t.rating_score, count(*) AS n
+            FROM v_freshdesk_unified_tickets t
+            WHERE t.merchant_id = p_merchant_id
+              AND t.has_rating
+              AND t.rating_score IS NOT NULL
+              AND t.rating_created_at::date = ANY(p_days)
+            GROUP BY 1, 2
+        ) per_score
+        GROUP BY day
+    )
+    INSERT INTO freshdesk_daily_rollups (
+        merchant_id, day, new_tickets, closed_tickets, untagged_tickets,
+        tag_counts, type_counts, rating_histogram,
+        first_response_sketch, resolution_sketch, refreshed_at
+    )
+    SELECT
+        p_merchant_id,
+        d.day,
+        COALESCE(tc.new_tickets, 0),
+        COALESCE(cl.closed_tickets, 0),
+        COALESCE(tc.untagged_tickets, 0),
+        COALESCE(tg.tag_counts, '{}'::jsonb),
+        COALESCE(ty.type_counts, '{}'::jsonb),
+        COALESCE(ra.rating_histogram, '{}'::jsonb),
+        COALESCE(fr.sketch, '{}'::jsonb),
+        COALESCE(rs.sketch, '{}'::jsonb),
+        NOW()
+    FROM target_days d
+    LEFT JOIN ticket_counts tc ON tc.day = d.day
+    LEFT JOIN tag_counts tg ON tg.day = d.day
+    LEFT JOIN type_counts ty ON ty.day = d.day
+    LEFT JOIN first_response fr ON fr.day = d.day
+    LEFT JOIN resolution rs ON rs.day = d.day
+    LEFT JOIN closed cl ON cl.day = d.day
+    LEFT JOIN ratings ra ON ra.day = d.day
+    ON CONFLICT (merchant_id, day) DO UPDATE SET
+        new_tickets = EXCLUDED.new_tickets,
+        closed_tickets = EXCLUDED.closed_tickets,
+        untagged_tickets = EXCLUDED.untagged_tickets,
+        tag_counts = EXCLUDED.tag_counts,
+        type_counts = EXCLUDED.type_counts,
+        rating_histogram = EXCLUDED.rating_histogram,
+        first_response_sketch = EXCLUDED.first_response_sketch,
+        resolution_sketch = EXCLUDED.resolution_sketch,
+        refreshed_at = EXCLUDED.refreshed_at;
+
+    GET DIAGNOSTICS refreshed = ROW_COUNT;
+    RETURN refreshed;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Backfill every day that has ticket, close or rating activity
+SELECT refresh_freshdesk_daily_rollups(activity.merchant_id, array_agg(DISTINCT activity.day))
+FROM (
+    SELECT merchant_id, (created_at AT TIME ZONE 'UTC')::date AS day
+    FROM v_freshdesk_unified_tickets WHERE created_at IS NOT NULL
+    UNION
+    SELECT merchant_id, (closed_at AT TIME ZONE 'UTC')::date
+    FROM v_freshdesk_unified_tickets WHERE closed_at IS NOT NULL
+    UNION
+    SELECT merchant_id, rating_created_at::date
+    FROM v_freshdesk_unified_tickets WHERE rating_created_at IS NOT NULL
+) activity
+GROUP BY activity.merchant_id;
+
+COMMENT ON TABLE freshdesk_daily_rollups IS 'Per-merchant daily Freshdesk aggregates, refreshed by the ETL for the days each sync batch touches';
+COMMENT ON COLUMN freshdesk_daily_rollups.day IS 'UTC calendar day';
+COMMENT ON COLUMN freshdesk_daily_rollups.new_tickets IS 'Tickets created on this day';
+COMMENT ON COLUMN freshdesk_daily_rollups.closed_tickets IS 'Tickets closed on this day';
+COMMENT ON COLUMN freshdesk_daily_rollups.tag_counts IS 'Tag -> count for tickets created on this day';
+COMMENT ON COLUMN freshdesk_daily_rollups.type_counts IS 'Ticket type -> count for tickets created on this day (null type as unspecified)';
+COMMENT ON COLUMN freshdesk_daily_rollups.rating_histogram IS 'Rating score -> count for ratings received on this day';
+COMMENT ON COLUMN freshdesk_daily_rollups.first_response_sketch IS 'Bucketed first response minutes for tickets created on this day: {buckets, count, sum_min}';
+COMMENT ON COLUMN freshdesk_daily_rollups.resolution_sketch IS 'Bucketed resolution minutes for tickets created on this day: {buckets, count, sum_min}';
+
+COMMIT;
+
+-- Rollback instructions:
+-- DROP FUNCTION IF EXISTS refresh_freshdesk_daily_rollups(INTEGER, DATE[]);
+-- DROP TABLE IF EXISTS freshdesk_daily_rollups;
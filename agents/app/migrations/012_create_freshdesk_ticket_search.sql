@@ -0,0 +1,109 @@
+-- Migration: Create Freshdesk ticket search index
+-- Purpose: Ranked full-text search over ticket fields and conversation text, plus
+--          trigram indexes for partial email/name/subject matches, so search_tickets
+--          no longer scans every ticket of a merchant with ILIKE '%query%'.
+--          Rows are refreshed by the ETL for the tickets each sync batch touches.
+-- Date: 2025-06-24
+
+BEGIN;
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE TABLE IF NOT EXISTS freshdesk_ticket_search (
+    merchant_id INTEGER NOT NULL REFERENCES merchants(id) ON DELETE CASCADE,
+    freshdesk_ticket_id VARCHAR(255) NOT NULL,
+    subject TEXT,
+    status INTEGER,
+    created_at TIMESTAMP WITH TIME ZONE,
+    requester_name TEXT,
+    requester_email TEXT,
+    tags JSONB NOT NULL DEFAULT '[]'::jsonb,
+    search_vector TSVECTOR NOT NULL DEFAULT ''::tsvector,
+    refreshed_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (merchant_id, freshdesk_ticket_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_freshdesk_ticket_search_vector
+    ON freshdesk_ticket_search USING gin (search_vector);
+CREATE INDEX IF NOT EXISTS idx_freshdesk_ticket_search_subject_trgm
+    ON freshdesk_ticket_search USING gin (subject gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_freshdesk_ticket_search_email_trgm
+    ON freshdesk_ticket_search USING gin (requester_email gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_freshdesk_ticket_search_name_trgm
+    ON freshdesk_ticket_search USING gin (requester_name gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_freshdesk_ticket_search_tags
+    ON freshdesk_ticket_search USING gin (tags jsonb_path_ops);
+
+-- Rebuild the search rows for one merchant and a set of tickets.
+-- Weights: A = subject, B = tags and requester, C = description, D = conversation text.
+-- Conversation text is capped so the tsvector stays well under its 1MB limit.
+CREATE OR REPLACE FUNCTION refresh_freshdesk_ticket_search(p_merchant_id INTEGER, p_ticket_ids TEXT[])
+RETURNS INTEGER AS $$
+DECLARE
+    refreshed INTEGER;
+BEGIN
+    WITH conversation_text AS (
+        SELECT c.freshdesk_ticket_id,
+               left(string_agg(COALESCE(conv->>'body_text', conv->>'body', ''), ' '), 200000) AS body
+        FROM etl_freshdesk_conversations c,
+        LATERAL jsonb_array_elements(CASE WHEN jsonb_typeof(c.data) = 'array' THEN c.data ELSE '[]'::jsonb END) AS conv
+        WHERE c.freshdesk_ticket_id = ANY(p_ticket_ids)
+        GROUP BY c.freshdesk_ticket_id
+    )
+    INSERT INTO freshdesk_ticket_search (
+        merchant_id, freshdesk_ticket_id, subject, status, created_at,
+        requester_name, requester_email, tags, search_vector, refreshed_at
+    )
+    SELECT
+        t.merchant_id,
+        t.freshdesk_ticket_id,
+        t.data->>'subject',
+        (t.data->>'status')::integer,
+        (t.data->>'created_at')::timestamp with time zone,
+        t.data->'requester'->>'name',
+        t.data->'requester'->>'email',
+        CASE WHEN jsonb_typeof(t.data->'tags') = 'array' THEN t.data->'tags' ELSE '[]'::jsonb END,
+        setweight(to_tsvector('english', COALESCE(t.data->>'subject', '')), 'A') ||
+        setweight(to_tsvector('simple', concat_ws(' ',
+            t.data->'requester'->>'name',
+            t.data->'requester'->>'email',
+            CASE WHEN jsonb_typeof(t.data->'tags') = 'array'
+                 THEN (SELECT string_agg(tag, ' ') FROM jsonb_array_elements_text(t.data->'tags') AS tag)
+            END
+        )), 'B') ||
+        setweight(to_tsvector('english', COALESCE(t.data->>'description', '')), 'C') ||
+        setweight(to_tsvector('english', COALESCE(ct.body, '')), 'D'),
+        NOW()
+    FROM etl_freshdesk_tickets t
+    LEFT JOIN conversation_text ct ON ct.freshdesk_ticket_id = t.freshdesk_ticket_id
+    WHERE t.merchant_id = p_merchant_id
+      AND t.freshdesk_ticket_id = ANY(p_ticket_ids)
+    ON CONFLICT (merchant_id, freshdesk_ticket_id) DO UPDATE SET
+        subject = EXCLUDED.subject,
+        status = EXCLUDED.status,
+        created_at = EXCLUDED.created_at,
+        requester_name = EXCLUDED.requester_name,
+        requester_email = EXCLUDED.requester_email,
+        tags = EXCLUDED.tags,
+        search_vector = EXCLUDED.search_vector,
+        refreshed_at = EXCLUDED.refreshed_at;
+
+    GET DIAGNOSTICS refreshed = ROW_COUNT;
+    RETURN refreshed;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Backfill every stored ticket
+SELECT refresh_freshdesk_ticket_search(merchant_id, array_agg(freshdesk_ticket_id))
+FROM etl_freshdesk_tickets
+GROUP BY merchant_id;
+
+COMMENT ON TABLE freshdesk_ticket_search IS 'Per-ticket search index (full-text and trigram), refreshed by the ETL for the tickets each sync batch touches';
+COMMENT ON COLUMN freshdesk_ticket_search.search_vector IS 'Weighted tsvector: A=subject, B=requester and tags, C=description, D=conversation text';
+COMMENT ON COLUMN freshdesk_ticket_search.tags IS 'Ticket tags array, for exact tag matches';
+
+COMMIT;
+
+-- Rollback instructions:
+-- DROP FUNCTION IF EXISTS refresh_freshdesk_ticket_search(INTEGER, TEXT[]);
+-- DROP TABLE IF EXISTS freshdesk_ticket_search;
@@ -0,0 +1,161 @@
+-- Migration: Typed Freshdesk ticket and rating columns
+-- Purpose: Store the fields analytics filter and sort on as real typed columns, written by
+--          the ETL at upsert time, instead of casting them out of the JSONB on every row.
+--          Date-range, status and close-date filters on v_freshdesk_unified_tickets become
+--          index range scans on (merchant_id, ...) B-tree indexes.
+-- Date: 2025-06-27
+
+BEGIN;
+
+ALTER TABLE etl_freshdesk_tickets
+    ADD COLUMN IF NOT EXISTS created_at TIMESTAMP WITH TIME ZONE,
+    ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP WITH TIME ZONE,
+    ADD COLUMN IF NOT EXISTS status INTEGER,
+    ADD COLUMN IF NOT EXISTS priority INTEGER,
+    ADD COLUMN IF NOT EXISTS first_responded_at TIMESTAMP WITH TIME ZONE,
+    ADD COLUMN IF NOT EXISTS resolved_at TIMESTAMP WITH TIME ZONE,
+    ADD COLUMN IF NOT EXISTS closed_at TIMESTAMP WITH TIME ZONE,
+    ADD COLUMN IF NOT EXISTS requester_email TEXT;
+
+-- rating created_at is UTC wall-clock time, matching the view's existing rating_created_at type
+ALTER TABLE etl_freshdesk_ratings
+    ADD COLUMN IF NOT EXISTS rating_score INTEGER,
+    ADD COLUMN IF NOT EXISTS created_at TIMESTAMP WITHOUT TIME ZONE;
+
+-- Backfill from the stored JSONB (same casts the view used)
+UPDATE etl_freshdesk_tickets SET
+    created_at = freshdesk_timestamp(data->>'created_at'),
+    updated_at = freshdesk_timestamp(data->>'updated_at'),
+    status = (data->>'status')::integer,
+    priority = (data->>'priority')::integer,
+    first_responded_at = freshdesk_timestamp(data->'stats'->>'first_responded_at'),
+    resolved_at = freshdesk_timestamp(data->'stats'->>'resolved_at'),
+    closed_at = freshdesk_timestamp(data->'stats'->>'closed_at'),
+    requester_email = data->'requester'->>'email';
+
+UPDATE etl_freshdesk_ratings SET
+    rating_score = (data->'ratings'->>'default_question')::integer,
+    created_at = (data->>'created_at')::timestamp;
+
+-- (merchant_id, created_at, freshdesk_ticket_id) serves date ranges and, scanned backwards,
+-- the (created_at DESC, freshdesk_ticket_id DESC) keyset order of ticket review pages
+CREATE INDEX IF NOT EXISTS idx_etl_freshdesk_tickets_merchant_created
+    ON etl_freshdesk_tickets (merchant_id, created_at, freshdesk_ticket_id);
+CREATE INDEX IF NOT EXISTS idx_etl_freshdesk_tickets_merchant_status
+    ON etl_freshdesk_tickets (merchant_id, status);
+CREATE INDEX IF NOT EXISTS idx_etl_freshdesk_tickets_merchant_closed
+    ON etl_freshdesk_tickets (merchant_id, closed_at);
+CREATE INDEX IF NOT EXISTS idx_etl_freshdesk_tickets_merchant_email
+    ON etl_freshdesk_tickets (merchant_id, requester_email);
+CREATE INDEX IF NOT EXISTS idx_etl_freshdesk_ratings_created_at
+    ON etl_freshdesk_ratings (created_at);
+
+-- Superseded by idx_etl_freshdesk_tickets_merchant_created
+DROP INDEX IF EXISTS idx_etl_freshdesk_tickets_review_keyset;
+
+-- Same view as migration 013, reading the typed columns instead of casting JSONB
+CREATE OR REPLACE VIEW v_freshdesk_unified_tickets AS
+WITH conversation_summary AS (
+    -- Pre-aggregate conversation data for better performance
+    SELECT 
+        c.freshdesk_ticket_id,
+        jsonb_array_length(c.data) as conversation_count,
+        MAX((conv->>'created_at')::timestamp) as last_conversation_at,
+        bool_or((conv->>'incoming')::boolean = false) as has_agent_response,
+        c.data as conversation_history  -- Include the full conversation data
+    FROM etl_freshdesk_conversations c,
+    LATERAL jsonb_array_elements(c.data) as conv
+    GROUP BY c.freshdesk_ticket_id, c.data
+),
+rating_info AS (
+    -- Pre-aggregate rating data
+    SELECT 
+        r.freshdesk_ticket_id,
+        true as has_rating,
+        r.rating_score,
+        r.data->>'feedback' as rating_feedback,
+        r.created_at as rating_created_at
+    FROM etl_freshdesk_ratings r
+)
+SELECT 
+    -- Core Ticket Identifiers
+    t.merchant_id,
+    t.freshdesk_ticket_id,
+    NULLIF(regexp_replace(t.freshdesk_ticket_id, '[^0-9]', '', 'g'), '')::bigint as ticket_id_numeric,
+    
+    -- Basic Ticket Info
+    t.data->>'subject' as subject,
+    t.data->>'description' as description,
+    t.data->>'type' as type,
+    (t.data->'_raw_data'->>'source')::integer as source,
+    (t.data->'_raw_data'->>'spam')::boolean as spam,
+    
+    -- Status & Priority
+    t.status,
+    t.priority,
+    (t.data->>'is_escalated')::boolean as is_escalated,
+    (COALESCE(t.data->>'fr_escalated', t.data->'_raw_data'->>'fr_escalated'))::boolean as fr_escalated,
+    (COALESCE(t.data->>'nr_escalated', t.data->'_raw_data'->>'nr_escalated'))::boolean as nr_escalated,
+    
+    -- People
+    (t.data->>'requester_id')::bigint as requester_id,
+    t.data->'requester'->>'name' as requester_name,
+    t.requester_email,
+    (t.data->'_raw_data'->>'responder_id')::bigint as responder_id,
+    (t.data->'_raw_data'->>'company_id')::bigint as company_id,
+    (t.data->'_raw_data'->>'group_id')::bigint as group_id,
+    
+    -- Timestamps
+    t.created_at,
+    t.updated_at,
+    (t.data->>'due_by')::timestamp with time zone as due_by,
+    (t.data->>'fr_due_by')::timestamp with time zone as fr_due_by,
+    (t.data->>'nr_due_by')::timestamp with time zone as nr_due_by,
+    
+    -- Stats (from data->'stats')
+    t.first_responded_at,
+    (t.data->'stats'->>'agent_responded_at')::timestamp with time zone as agent_responded_at,
+    (t.data->'stats'->>'requester_responded_at')::timestamp with time zone as requester_responded_at,
+    t.closed_at,
+    t.resolved_at,
+    (t.data->'stats'->>'reopened_at')::timestamp with time zone as reopened_at,
+    (t.data->'stats'->>'pending_since')::timestamp with time zone as pending_since,
+    (t.data->'stats'->>'status_updated_at')::timestamp with time zone as status_updated_at,
+    
+    -- Tags & Custom Fields
+    t.data->'tags' as tags,
+    t.data->'custom_fields' as custom_fields,
+    
+    -- Conversation Summary
+    COALESCE(cs.conversation_count, 0) as conversation_count,
+    cs.last_conversation_at,
+    COALESCE(cs.has_agent_response, false) as has_agent_response,
+    
+    -- Conversation History (NEW)
+    cs.conversation_history,
+    
+    -- Rating Info
+    COALESCE(ri.has_rating, false) as has_rating,
+    ri.rating_score,
+    ri.rating_feedback,
+    ri.rating_created_at
+    
+FROM etl_freshdesk_tickets t
+LEFT JOIN conversation_summary cs ON cs.freshdesk_ticket_id = t.freshdesk_ticket_id
+LEFT JOIN rating_info ri ON ri.freshdesk_ticket_id = t.freshdesk_ticket_id;
+
+COMMENT ON COLUMN etl_freshdesk_tickets.created_at IS 'Ticket created_at from Freshdesk, written by the ETL from data';
+COMMENT ON COLUMN etl_freshdesk_tickets.status IS 'Ticket status code from Freshdesk, written by the ETL from data';
+COMMENT ON COLUMN etl_freshdesk_tickets.closed_at IS 'stats.closed_at from Freshdesk, written by the ETL from data';
+COMMENT ON COLUMN etl_freshdesk_ratings.created_at IS 'Rating created_at from Freshdesk (UTC), written by the ETL from data';
+
+COMMIT;
+
+-- Rollback instructions:
+-- Re-run migration 013_add_ticket_review_keyset_index.sql, then:
+-- DROP INDEX IF EXISTS idx_etl_freshdesk_tickets_merchant_created, idx_etl_freshdesk_tickets_merchant_status,
+--     idx_etl_freshdesk_tickets_merchant_closed, idx_etl_freshdesk_tickets_merchant_email, idx_etl_freshdesk_ratings_created_at;
+-- ALTER TABLE etl_freshdesk_tickets DROP COLUMN created_at, DROP COLUMN updated_at, DROP COLUMN status,
+--     DROP COLUMN priority, DROP COLUMN first_responded_at, DROP COLUMN resolved_at, DROP COLUMN closed_at,
+--     DROP COLUMN requester_email;
+-- ALTER TABLE etl_freshdesk_ratings DROP COLUMN rating_score, DROP COLUMN created_at;
@@ -0,0 +1,127 @@
+-- Migration: Store conversation summary on the conversation row
+-- Purpose: The unified view exploded every conversation array with jsonb_array_elements and
+--          grouped the result on every query, even for a one-day ticket count. The summary
+--          (count, last message time, agent replied) is now computed by the ETL when it writes
+--          the conversations, and the views join conversations and ratings by primary key.
+--          v_freshdesk_unified_tickets_lean has every column except conversation_history;
+--          v_freshdesk_unified_tickets adds it on top. Queries that do not reference the
+--          conversation or rating columns let the planner remove those joins entirely.
+-- Date: 2025-06-28
+
+BEGIN;
+
+ALTER TABLE etl_freshdesk_conversations
+    ADD COLUMN IF NOT EXISTS conversation_count INTEGER NOT NULL DEFAULT 0,
+    ADD COLUMN IF NOT EXISTS last_conversation_at TIMESTAMP WITH TIME ZONE,
+    ADD COLUMN IF NOT EXISTS has_agent_response BOOLEAN NOT NULL DEFAULT false;
+
+-- Backfill from the stored conversation arrays
+UPDATE etl_freshdesk_conversations c SET
+    conversation_count = summary.conversation_count,
+    last_conversation_at = summary.last_conversation_at,
+    has_agent_response = summary.has_agent_response
+FROM (
+    SELECT
+        c2.freshdesk_ticket_id,
+        count(conv) AS conversation_count,
+        max(freshdesk_timestamp(conv->>'created_at')) AS last_conversation_at,
+        COALESCE(bool_or((conv->>'incoming')::boolean = false), false) AS has_agent_response
+    FROM etl_freshdesk_conversations c2
+    LEFT JOIN LATERAL jsonb_array_elements(
+        CASE WHEN jsonb_typeof(c2.data) = 'array' THEN c2.data ELSE '[]'::jsonb END
+    ) AS conv ON true
+    GROUP BY c2.freshdesk_ticket_id
+) summary
+WHERE summary.freshdesk_ticket_id = c.freshdesk_ticket_id;
+
+-- Column order and types change (conversation_history moves to the end, last_conversation_at
+-- gains its time zone), so the view is recreated rather than replaced
+DROP VIEW IF EXISTS v_freshdesk_unified_tickets CASCADE;
+
+CREATE VIEW v_freshdesk_unified_tickets_lean AS
+SELECT 
+    -- Core Ticket Identifiers
+    t.merchant_id,
+    t.freshdesk_ticket_id,
+    NULLIF(regexp_replace(t.freshdesk_ticket_id, '[^0-9]', '', 'g'), '')::bigint as ticket_id_numeric,
+    
+    -- Basic Ticket Info
+    t.data->>'subject' as subject,
+    t.data->>'description' as description,
+    t.data->>'type' as type,
+    (t.data->'_raw_data'->>'source')::integer as source,
+    (t.data->'_raw_data'->>'spam')::boolean as spam,
+    
+    -- Status & Priority
+    t.status,
+    t.priority,
+    (t.data->>'is_escalated')::boolean as is_escalated,
+    (COALESCE(t.data->>'fr_escalated', t.data->'_raw_data'->>'fr_escalated'))::boolean as fr_escalated,
+    (COALESCE(t.data->>'nr_escalated', t.data->'_raw_data'->>'nr_escalated'))::boolean as nr_escalated,
+    
+    -- People
+    (t.data->>'requester_id')::bigint as requester_id,
+    t.data->'requester'->>'name' as requester_name,
+    t.requester_email,
+    (t.data->'_raw_data'->>'responder_id')::bigint as responder_id,
+    (t.data->'_raw_data'->>'company_id')::bigint as company_id,
+    (t.data->'_raw_data'->>'group_id')::bigint as group_id,
+    
+    -- Timestamps
+    t.created_at,
+    t.updated_at,
+    (t.data->>'due_by')::timestamp with time zone as due_by,
+    (t.data->>'fr_due_by')::timestamp with time zone as fr_due_by,
+    (t.data->>'nr_due_by')::timestamp with time zone as nr_due_by,
+    
+    -- Stats (from data->'stats')
+    t.first_responded_at,
+    (t.data->'stats'->>'agent_responded_at')::timestamp with time zone as agent_responded_at,
+    (t.data->'stats'->>'requester_responded_at')::timestamp with time zone as requester_responded_at,
+    t.closed_at,
+    t.resolved_at,
+    (t.data->'stats'->>'reopened_at')::timestamp with time zone as reopened_at,
+    (t.data->'stats'->>'pending_since')::timestamp with time zone as pending_since,
+    (t.data->'stats'->>'status_updated_at')::timestamp with time zone as status_updated_at,
+    
+    -- Tags & Custom Fields
+    t.data->'tags' as tags,
+    t.data->'custom_fields' as custom_fields,
+    
+    -- Conversation Summary (stored by the ETL)
+    COALESCE(c.conversation_count, 0) as conversation_count,
+    c.last_conversation_at,
+    COALESCE(c.has_agent_response, false) as has_agent_response,
+    
+    -- Rating Info
+    (r.freshdesk_ticket_id IS NOT NULL) as has_rating,
+    r.rating_score,
+    r.data->>'feedback' as rating_feedback,
+    r.created_at as rating_created_at
+    
+FROM etl_freshdesk_tickets t
+LEFT JOIN etl_freshdesk_conversations c ON c.freshdesk_ticket_id = t.freshdesk_ticket_id
+LEFT JOIN etl_freshdesk_ratings r ON r.freshdesk_ticket_id = t.freshdesk_ticket_id;
+
+CREATE VIEW v_freshdesk_unified_tickets AS
+SELECT
+    l.*,
+    -- Only read when a query selects it
+    c.data as conversation_history
+FROM v_freshdesk_unified_tickets_lean l
+LEFT JOIN etl_freshdesk_conversations c ON c.freshdesk_ticket_id = l.freshdesk_ticket_id;
+
+COMMENT ON VIEW v_freshdesk_unified_tickets_lean IS 'Unified Freshdesk ticket view without conversation_history. Conversation summary columns are stored by the ETL.';
+COMMENT ON VIEW v_freshdesk_unified_tickets IS 'Unified view of Freshdesk tickets combining data from tickets, conversations, and ratings tables. Includes full conversation history as JSONB array. Maps directly to Freshdesk API v2 fields.';
+COMMENT ON COLUMN v_freshdesk_unified_tickets.conversation_history IS 'Full conversation history as JSONB array from etl_freshdesk_conversations.data';
+COMMENT ON COLUMN etl_freshdesk_conversations.conversation_count IS 'Number of entries in data, written by the ETL';
+COMMENT ON COLUMN etl_freshdesk_conversations.last_conversation_at IS 'Latest created_at in data, written by the ETL';
+COMMENT ON COLUMN etl_freshdesk_conversations.has_agent_response IS 'Whether data has any non-incoming entry, written by the ETL';
+
+COMMIT;
+
+-- Rollback instructions:
+-- DROP VIEW IF EXISTS v_freshdesk_unified_tickets, v_freshdesk_unified_tickets_lean;
+-- Re-run migration 014_add_typed_freshdesk_columns.sql (its CREATE OR REPLACE VIEW recreates the view), then:
+-- ALTER TABLE etl_freshdesk_conversations DROP COLUMN conversation_count,
+--     DROP COLUMN last_conversation_at, DROP COLUMN has_agent_response;
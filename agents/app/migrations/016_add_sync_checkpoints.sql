@@ -0,0 +1,22 @@
+-- Migration: Add page-level checkpoints and source watermarks to sync_metadata
+-- Purpose: Freshdesk syncs only recorded progress when a run finished, so a crash on
+--          page 400 of a backfill restarted from page 1, and incremental runs started from
+--          our wall-clock time rather than the source's timestamps. The ETL now writes a
+--          checkpoint (filter, last committed page, newest source timestamp so far) in the
+--          same transaction as each page, and promotes the newest source timestamp to
+--          watermark_at when a run completes. A resumed run continues from the checkpoint.
+-- Date: 2025-06-30
+
+BEGIN;
+
+ALTER TABLE sync_metadata
+    ADD COLUMN IF NOT EXISTS watermark_at TIMESTAMP WITH TIME ZONE,
+    ADD COLUMN IF NOT EXISTS checkpoint JSONB;
+
+COMMENT ON COLUMN sync_metadata.watermark_at IS 'Newest source timestamp (e.g. ticket updated_at, rating created_at) covered by the last completed run; the next incremental run starts here';
+COMMENT ON COLUMN sync_metadata.checkpoint IS 'Progress of an unfinished run: {"since", "page", "watermark", "started_at", "saved_at"}; NULL once a run completes';
+
+COMMIT;
+
+-- Rollback instructions:
+-- ALTER TABLE sync_metadata DROP COLUMN IF EXISTS checkpoint, DROP COLUMN IF EXISTS watermark_at;
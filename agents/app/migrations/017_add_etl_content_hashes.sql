@@ -0,0 +1,30 @@
+-- Migration: Add content hashes to ETL tables
+-- Purpose: Upserts sent every JSONB document to Postgres and compared it with
+--          data != excluded.data, paying a full write round trip and JSON comparison for
+--          every unchanged ticket, conversation array, rating and customer. The ETL now
+--          stores a SHA-256 of each document's canonical JSON (sorted keys, no whitespace),
+--          looks up the stored hashes for a page in one query and only sends rows whose
+--          hash changed. Conflicting rows are updated when the hashes differ.
+--          Existing rows start without a hash and are rewritten once by their next sync,
+--          since Postgres cannot reproduce the client's canonical JSON.
+-- Date: 2025-07-01
+
+BEGIN;
+
+ALTER TABLE etl_freshdesk_tickets ADD COLUMN IF NOT EXISTS content_hash VARCHAR(64);
+ALTER TABLE etl_freshdesk_conversations ADD COLUMN IF NOT EXISTS content_hash VARCHAR(64);
+ALTER TABLE etl_freshdesk_ratings ADD COLUMN IF NOT EXISTS content_hash VARCHAR(64);
+ALTER TABLE etl_shopify_customers ADD COLUMN IF NOT EXISTS content_hash VARCHAR(64);
+
+COMMENT ON COLUMN etl_freshdesk_tickets.content_hash IS 'SHA-256 of data as canonical JSON, written by the ETL to skip unchanged tickets';
+COMMENT ON COLUMN etl_freshdesk_conversations.content_hash IS 'SHA-256 of data as canonical JSON, written by the ETL to skip unchanged conversations';
+COMMENT ON COLUMN etl_freshdesk_ratings.content_hash IS 'SHA-256 of data as canonical JSON, written by the ETL to skip unchanged ratings';
+COMMENT ON COLUMN etl_shopify_customers.content_hash IS 'SHA-256 of data as canonical JSON, written by the ETL to skip unchanged customers';
+
+COMMIT;
+
+-- Rollback instructions:
+-- ALTER TABLE etl_freshdesk_tickets DROP COLUMN IF EXISTS content_hash;
+-- ALTER TABLE etl_freshdesk_conversations DROP COLUMN IF EXISTS content_hash;
+-- ALTER TABLE etl_freshdesk_ratings DROP COLUMN IF EXISTS content_hash;
+-- ALTER TABLE etl_shopify_customers DROP COLUMN IF EXISTS content_hash;
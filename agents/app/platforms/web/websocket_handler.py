@@ -10,6 +10,7 @@ from pydantic import ValidationError, TypeAdapter
 
 from shared.logging_config import get_logger
 from app.services.fact_extractor import FactExtractor
+from app.services.agent_executor import AgentSaturatedError, get_agent_executor
 from app.constants import WebSocketCloseCodes
 from shared.protocol.models import (
     IncomingMessage,
@@ -273,7 +274,9 @@ class WebSocketHandler:
             )
             # Send more informative error
             error_msg = "Message processing error"
-            if "Universe not found" in str(e):
+            if isinstance(e, AgentSaturatedError):
+                error_msg = "CJ is busy with other conversations. Please try again in a moment."
+            elif "Universe not found" in str(e):
                 error_msg = f"Universe not found. Please ensure universe exists for {data.get('merchant_id', 'merchant')} and {data.get('scenario', 'scenario')}"
             elif "No such file or directory" in str(e):
                 error_msg = "Configuration file missing. Please check server setup."
@@ -285,6 +288,8 @@ class WebSocketHandler:
         # Extract facts on disconnect if session exists
         session = self.platform.session_manager.get_session(conversation_id)
         if session:
+            # Nobody is listening for this conversation's replies any more
+            get_agent_executor().cancel_session(getattr(session, 'conversation_id', session.id))
             
             # Only extract facts if conversation has messages and user_id
             if session.user_id and session.conversation.messages:
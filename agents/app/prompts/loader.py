@@ -1,10 +1,14 @@
-"""Prompt loading utilities for version-controlled prompts."""
+"""Prompt loading utilities for version-controlled prompts.
+
+Prompt files are parsed once per process through the shared YAML cache; loaded
+prompts are read-only views (see app.utils.yaml_cache).
+"""
 
-import yaml
 from pathlib import Path
 from typing import Dict, Any, List
 
 from app.config import settings
+from app.utils.yaml_cache import list_yaml_files, load_yaml
 from shared.logging_config import get_logger
 
 logger = get_logger(__name__)
@@ -29,12 +33,11 @@ class PromptLoader:
 
         prompt_file = persona_dir / f"{version}.yaml"
 
-        if not prompt_file.exists():
+        try:
+            return load_yaml(prompt_file)
+        except FileNotFoundError:
             raise FileNotFoundError(f"Persona prompt not found: {prompt_file}")
 
-        with open(prompt_file, "r") as f:
-            return yaml.safe_load(f)
-
     def load_cj_prompt(self, version: str = "latest") -> Dict[str, Any]:
         """Load a CJ prompt by version."""
 
@@ -50,7 +53,7 @@ class PromptLoader:
             # Check if the version is a short version (e.g., "v2" instead of "v2.0.0")
             if version.count('.') < 2:
                 matching_versions = []
-                for file in cj_dir.glob(f"{version}.*.yaml"):
+                for file in list_yaml_files(cj_dir, f"{version}.*.yaml"):
                     matching_versions.append(file.stem)
                 
                 if matching_versions:
@@ -63,16 +66,17 @@ class PromptLoader:
 
         prompt_file = cj_dir / f"{version}.yaml"
 
-        if not prompt_file.exists():
+        try:
+            prompt_data = load_yaml(prompt_file)
+        except FileNotFoundError:
             logger.error(f"CJ prompt file not found: {prompt_file}")
             # List available versions for debugging
-            available = list(cj_dir.glob("*.yaml"))
+            available = list_yaml_files(cj_dir)
             logger.error(f"Available CJ prompt files: {[f.name for f in available]}")
             raise FileNotFoundError(f"CJ prompt not found: {prompt_file}")
 
-        logger.info(f"Loading CJ prompt from: {prompt_file}")
-        with open(prompt_file, "r") as f:
-            return yaml.safe_load(f)
+        logger.debug(f"Loaded CJ prompt from: {prompt_file}")
+        return prompt_data
 
     def list_merchant_personas(self) -> List[str]:
         """List available merchant personas."""
@@ -89,11 +93,8 @@ class PromptLoader:
 
         versions_dir = self.prompts_path / "cj" / "versions"
 
-        if not versions_dir.exists():
-            return []
-
         versions = []
-        for file in versions_dir.glob("*.yaml"):
+        for file in list_yaml_files(versions_dir):
             versions.append(file.stem)
 
         return sorted(versions)
@@ -103,11 +104,8 @@ class PromptLoader:
 
         persona_dir = self.prompts_path / "merchants" / "personas" / persona_name
 
-        if not persona_dir.exists():
-            return []
-
         versions = []
-        for file in persona_dir.glob("*.yaml"):
+        for file in list_yaml_files(persona_dir):
             if file.name != "metadata.yaml":
                 versions.append(file.stem)
 
@@ -116,14 +114,13 @@ class PromptLoader:
     def _get_latest_version(self, directory: Path) -> str:
         """Get the latest version from a directory of version files."""
 
-        if not directory.exists():
-            raise FileNotFoundError(f"Directory not found: {directory}")
-
         versions = []
-        for file in directory.glob("v*.yaml"):
+        for file in list_yaml_files(directory, "v*.yaml"):
             versions.append(file.stem)
 
         if not versions:
+            if not directory.exists():
+                raise FileNotFoundError(f"Directory not found: {directory}")
             raise FileNotFoundError(f"No version files found in: {directory}")
 
         # Sort versions semantically (v1.0.0, v1.1.0, v2.0.0, etc.)
@@ -185,11 +182,10 @@ class PromptLoader:
         # Try to load from YAML file
         prompt_file = self.prompts_path / f"{prompt_name}.yaml"
         
-        if not prompt_file.exists():
+        try:
+            data = load_yaml(prompt_file)
+        except FileNotFoundError:
             raise FileNotFoundError(f"Prompt file not found: {prompt_file}")
-        
-        with open(prompt_file, "r") as f:
-            data = yaml.safe_load(f)
             
         # Extract the prompt data - it should be under the prompt_name key
         if prompt_name in data:
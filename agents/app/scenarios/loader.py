@@ -1,9 +1,10 @@
 """Loads text-based scenarios from YAML."""
 
-import yaml
 from pathlib import Path
 from typing import Dict, Any, List
 
+from app.utils.yaml_cache import load_yaml
+
 
 class ScenarioLoader:
     """Loads text-based scenarios from YAML."""
@@ -27,11 +28,12 @@ class ScenarioLoader:
         if self._scenarios is None:
             self._scenarios = {}
             for scenarios_file in self.scenarios_files:
-                if scenarios_file.exists():
-                    with open(scenarios_file, "r") as f:
-                        data = yaml.safe_load(f)
-                        # Merge scenarios from this file
-                        self._scenarios.update(data.get("scenarios", {}))
+                try:
+                    data = load_yaml(scenarios_file)
+                except FileNotFoundError:
+                    continue
+                # Merge scenarios from this file
+                self._scenarios.update(data.get("scenarios", {}))
 
             if not self._scenarios:
                 raise ValueError("No scenarios found in any scenario files")
@@ -0,0 +1,224 @@
+"""
+Bounded executor for CJ agent turns.
+
+crew.kickoff() runs the whole agent turn synchronously (agent construction, LLM
+calls, tool calls, grounding), so calling it from a coroutine stalls every
+WebSocket session served by the event loop. AgentTurnExecutor runs turns on a
+dedicated thread pool instead:
+
+- at most max_workers turns run at once; later turns wait on the loop without
+  blocking it;
+- turns of one session run one at a time, in arrival order;
+- once max_pending turns are running or waiting overall, or a session already has
+  max_pending_per_session turns queued, new turns are rejected with
+  AgentSaturatedError so the caller can tell the merchant to retry;
+- cancel_session() cancels a session's turns when its WebSocket goes away. Queued
+  turns never start; a turn that already reached a worker cannot be interrupted,
+  so its caller is cancelled, the result is discarded and the worker is freed
+  when the thread finishes.
+
+crewai's Crew.kickoff_async() is asyncio.to_thread(kickoff) on the loop's default
+executor, so it gives the same concurrency without any of these limits.
+
+Usage:
+    from app.services.agent_executor import get_agent_executor
+
+    result = await get_agent_executor().run(conversation_id, crew.kickoff)
+"""
+
+import asyncio
+import functools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Set, TypeVar
+
+from shared.logging_config import get_logger
+from app.config import settings
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+
+class AgentSaturatedError(RuntimeError):
+    """Raised when the agent executor cannot accept another turn."""
+
+
+class _SessionQueue:
+    """Ordering lock and waiting or running callers of one session."""
+
+    def __init__(self):
+        self.lock = asyncio.Lock()
+        self.pending = 0
+        self.waiters: Set[asyncio.Task] = set()
+
+
+class AgentTurnExecutor:
+    """Runs blocking agent turns on a bounded thread pool with per-session ordering."""
+
+    def __init__(self, max_workers: int = 8, max_pending: int = 64, max_pending_per_session: int = 3):
+        """
+        Args:
+            max_workers: Agent turns running concurrently
+            max_pending: Turns allowed in flight (running plus waiting) before rejecting
+            max_pending_per_session: Turns one session may have in flight before rejecting
+        """
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.max_pending_per_session = max_pending_per_session
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="agent-turn")
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._slots_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._sessions: Dict[str, _SessionQueue] = {}
+        self._pending = 0
+        self.stats = {
+            "completed": 0,
+            "failed": 0,
+            "cancelled": 0,
+            "rejected": 0,
+            "max_pending": 0,
+            "max_wait_ms": 0.0,
+        }
+
+    def _get_slots(self) -> asyncio.Semaphore:
+        """Worker slots for the running loop (semaphores cannot be shared across loops)."""
+        loop = asyncio.get_running_loop()
+        if self._slots is None or self._slots_loop is not loop:
+            self._slots = asyncio.Semaphore(self.max_workers)
+            self._slots_loop = loop
+        return self._slots
+
+    def _admit(self, session_id: str) -> _SessionQueue:
+        if self._pending >= self.max_pending:
+            self.stats["rejected"] += 1
+            raise AgentSaturatedError(f"{self._pending} agent turns pending (limit {self.max_pending})")
+        queue = self._sessions.get(session_id)
+        if queue is None:
+            queue = self._sessions[session_id] = _SessionQueue()
+        elif queue.pending >= self.max_pending_per_session:
+            self.stats["rejected"] += 1
+            raise AgentSaturatedError(
+                f"Session {session_id} has {queue.pending} turns pending (limit {self.max_pending_per_session})"
+            )
+        queue.pending += 1
+        self._pending += 1
+        self.stats["max_pending"] = max(self.stats["max_pending"], self._pending)
+        return queue
+
+    def _release(self, session_id: str, queue: _SessionQueue) -> None:
+        queue.pending -= 1
+        self._pending -= 1
+        if queue.pending == 0 and self._sessions.get(session_id) is queue:
+            del self._sessions[session_id]
+
+    def _finish(self, session_id: str, queue: _SessionQueue, slots: asyncio.Semaphore, future: asyncio.Future) -> None:
+        """Free the worker and session slot once the turn's thread is done."""
+        if not future.cancelled() and future.exception() is not None:
+            self.stats["failed"] += 1
+        else:
+            self.stats["completed"] += 1
+        slots.release()
+        queue.lock.release()
+        self._release(session_id, queue)
+
+    async def run(self, session_id: str, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Run fn(*args, **kwargs) as the next turn of session_id and return its result.
+
+        Raises:
+            AgentSaturatedError: The executor or the session is at its pending limit
+            asyncio.CancelledError: The turn was cancelled, e.g. by cancel_session()
+        """
+        queue = self._admit(session_id)
+        waiter = asyncio.current_task()
+        queue.waiters.add(waiter)
+        queued_at = time.perf_counter()
+        started = False
+        try:
+            await queue.lock.acquire()
+            slots = self._get_slots()
+            try:
+                await slots.acquire()
+            except BaseException:
+                queue.lock.release()
+                raise
+            wait_ms = (time.perf_counter() - queued_at) * 1000
+            self.stats["max_wait_ms"] = max(self.stats["max_wait_ms"], round(wait_ms, 2))
+
+            loop = asyncio.get_running_loop()
+            try:
+                future = loop.run_in_executor(self._executor, functools.partial(fn, *args, **kwargs))
+            except BaseException:
+                # e.g. RuntimeError after shutdown(): _finish will never run
+                slots.release()
+                queue.lock.release()
+                raise
+            started = True
+            future.add_done_callback(functools.partial(self._finish, session_id, queue, slots))
+            # Shielded: cancelling the caller must not release the slots while the thread still runs
+            return await asyncio.shield(future)
+        except asyncio.CancelledError:
+            self.stats["cancelled"] += 1
+            logger.info(f"[AGENT_EXECUTOR] Cancelled {'running' if started else 'queued'} turn for session {session_id}")
+            raise
+        finally:
+            queue.waiters.discard(waiter)
+            if not started:
+                self._release(session_id, queue)
+
+    def cancel_session(self, session_id: str) -> int:
+        """Cancel the session's queued and running turns. Returns how many were cancelled."""
+        queue = self._sessions.get(session_id)
+        if queue is None:
+            return 0
+        waiters = [task for task in queue.waiters if not task.done()]
+        for task in waiters:
+            task.cancel()
+        if waiters:
+            logger.info(f"[AGENT_EXECUTOR] Cancelling {len(waiters)} turns for session {session_id}")
+        return len(waiters)
+
+    @property
+    def pending(self) -> int:
+        """Turns currently running or waiting for a worker."""
+        return self._pending
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Counters plus current backlog, for health reporting."""
+        return {
+            **self.stats,
+            "pending": self._pending,
+            "sessions": len(self._sessions),
+            "max_workers": self.max_workers,
+        }
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop accepting work; with wait=True, finish turns already submitted."""
+        self._executor.shutdown(wait=wait)
+
+
+_executor: Optional[AgentTurnExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_agent_executor() -> AgentTurnExecutor:
+    """Process-wide executor sized from settings."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = AgentTurnExecutor(
+                    max_workers=settings.agent_max_workers,
+                    max_pending=settings.agent_max_pending,
+                    max_pending_per_session=settings.agent_session_max_pending,
+                )
+    return _executor
+
+
+def shutdown_agent_executor() -> None:
+    """Finish submitted turns and drop the shared executor."""
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True)
+            _executor = None
@@ -5,6 +5,7 @@ from datetime import datetime
 from shared.logging_config import get_logger
 from dataclasses import dataclass, asdict
 import re
+import threading
 import traceback
 
 logger = get_logger(__name__)
@@ -35,6 +36,30 @@ class DebugCallback(CustomLogger):
         self.current_message_id = None
         self.crew_output_buffer = []
         self.pending_tool_calls = {}  # Track tool calls in progress
+        # LiteLLM callbacks are process-wide; when bound, only this turn's calls are captured
+        self.owner_thread: Optional[int] = None
+        self.call_ids = set()
+        
+    def bind_to_current_thread(self):
+        """Only capture LLM calls made from the calling thread (the agent turn's worker)."""
+        self.owner_thread = threading.get_ident()
+        
+    def _owns_call(self, kwargs: Dict[str, Any], pre_call: bool = False) -> bool:
+        """Whether an LLM call belongs to this callback's turn.
+
+        Requests are matched by thread; responses arrive on LiteLLM's logging threads, so
+        they are matched by the call ids seen in log_pre_api_call.
+        """
+        if self.owner_thread is None:
+            return True
+        call_id = kwargs.get("litellm_call_id")
+        if pre_call:
+            if threading.get_ident() != self.owner_thread:
+                return False
+            if call_id:
+                self.call_ids.add(call_id)
+            return True
+        return call_id is None or call_id in self.call_ids
         
     def set_message_id(self, message_id: str):
         """Set the current message ID for associating debug data."""
@@ -45,6 +70,8 @@ class DebugCallback(CustomLogger):
     
     def log_pre_api_call(self, model: str, messages: list, kwargs: Dict[str, Any]) -> None:
         """Capture the raw API request before it's sent."""
+        if not self._owns_call(kwargs, pre_call=True):
+            return
         logger.info(f"[DEBUG_CALLBACK] log_pre_api_call called for message {self.current_message_id}")
         
         # Validate we have a current message_id
@@ -122,6 +149,8 @@ class DebugCallback(CustomLogger):
     
     def log_success_event(self, kwargs: Dict[str, Any], response_obj: Any, start_time: Any, end_time: Any) -> None:
         """Capture the raw API response including tool calls."""
+        if not self._owns_call(kwargs):
+            return
         logger.info(f"[DEBUG_CALLBACK] log_success_event called for message {self.current_message_id}")
         logger.info(f"[DEBUG_CALLBACK] Response object type: {type(response_obj)}")
         
@@ -11,6 +11,7 @@ import litellm
 from app.models import Conversation, Message
 from shared.user_identity import get_user_facts, append_fact
 from app.prompts.loader import PromptLoader
+from app.services.persistence_executor import PersistenceBacklogError, run_blocking
 from shared.logging_config import get_logger
 from app.config import settings
 
@@ -47,8 +48,8 @@ class FactExtractor:
             List of newly extracted facts
         """
         try:
-            # Get existing facts to avoid duplicates
-            user_facts = get_user_facts(user_id)
+            # Get existing facts to avoid duplicates (psycopg2, so off the event loop)
+            user_facts = await run_blocking(get_user_facts, user_id)
             existing_facts = [f['fact'] for f in user_facts]
             
             # Debug logging
@@ -82,9 +83,9 @@ class FactExtractor:
             # Extract facts using LLM
             new_facts = await self._extract_facts_with_llm(prompts)
             
-            # Add new facts to user's facts
-            for fact in new_facts:
-                append_fact(user_id, fact, f"conversation_{conversation.id}")
+            # Add new facts to user's facts in one worker call
+            if new_facts:
+                await run_blocking(self._append_facts, user_id, new_facts, f"conversation_{conversation.id}")
                 
             if new_facts:
                 logger.info(f"[FACT_EXTRACTOR] === NEW FACTS EXTRACTED ===")
@@ -98,10 +99,19 @@ class FactExtractor:
                 
             return new_facts
             
+        except PersistenceBacklogError as e:
+            logger.warning(f"[FACT_EXTRACTOR] Skipping extraction, persistence backlog full: {e}")
+            return []
         except Exception as e:
             logger.error(f"[FACT_EXTRACTOR] Error extracting facts: {e}", exc_info=True)
             return []
     
+    @staticmethod
+    def _append_facts(user_id: str, facts: List[str], source: str) -> None:
+        """Append facts in order. Blocking; runs on the persistence executor."""
+        for fact in facts:
+            append_fact(user_id, fact, source)
+    
     def _format_conversation(self, messages: List[Message]) -> str:
         """Format conversation messages for extraction.
         
@@ -0,0 +1,219 @@
+"""
+Process-wide cache of knowledge service (grounding) query results.
+
+GroundingManager used to keep a per-instance cache, but CJAgent builds a new
+manager for every turn, so it never hit. GroundingCache is shared by the process:
+
+- entries are keyed by (namespace, mode, normalized query), where normalizing
+  lowercases the query and collapses whitespace;
+- entries expire after GROUNDING_CACHE_TTL seconds, and the least recently used
+  entry is evicted beyond GROUNDING_CACHE_MAX_ENTRIES;
+- concurrent lookups of the same key are single-flighted: the first caller runs
+  the query and the others wait for its result, whether they run on agent
+  threads (get_or_fetch) or on the event loop (aget_or_fetch);
+- empty results and errors are not cached, so the next turn retries.
+
+Usage:
+    from app.services.grounding_cache import get_grounding_cache
+
+    result, cache_hit = get_grounding_cache().get_or_fetch(
+        "npr", "hybrid", query, lambda: client.query("npr", query, "hybrid")
+    )
+"""
+
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from shared.logging_config import get_logger
+from app.config import settings
+
+logger = get_logger(__name__)
+
+CacheKey = Tuple[str, str, str]
+
+
+def normalize_query(query: str) -> str:
+    """Lowercase and collapse whitespace so trivially different queries share an entry."""
+    return " ".join(query.lower().split())
+
+
+class GroundingCache:
+    """TTL and LRU bounded grounding results with single-flight lookups."""
+
+    def __init__(self, max_entries: int = 512, ttl_seconds: float = 1800.0):
+        """
+        Args:
+            max_entries: Results kept before evicting the least recently used
+            ttl_seconds: Seconds a result is served before it is queried again
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[CacheKey, Tuple[str, float]]" = OrderedDict()
+        self._in_flight: Dict[CacheKey, Future] = {}
+        self._lock = threading.Lock()
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "coalesced": 0,
+            "evictions": 0,
+            "expired": 0,
+            "errors": 0,
+        }
+
+    @staticmethod
+    def make_key(namespace: str, mode: str, query: str) -> CacheKey:
+        return (namespace, mode, normalize_query(query))
+
+    def _lookup(self, key: CacheKey) -> Optional[str]:
+        """Fresh cached result, or None. Caller holds the lock."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        result, expires_at = entry
+        if time.monotonic() >= expires_at:
+            del self._entries[key]
+            self.stats["expired"] += 1
+            return None
+        self._entries.move_to_end(key)
+        return result
+
+    def get(self, namespace: str, mode: str, query: str) -> Optional[str]:
+        """Cached result for the query, or None if missing or expired."""
+        with self._lock:
+            result = self._lookup(self.make_key(namespace, mode, query))
+            if result is not None:
+                self.stats["hits"] += 1
+            return result
+
+    def put(self, namespace: str, mode: str, query: str, result: str) -> None:
+        with self._lock:
+            self._store(self.make_key(namespace, mode, query), result)
+
+    def _store(self, key: CacheKey, result: str) -> None:
+        """Caller holds the lock."""
+        self._entries[key] = (result, time.monotonic() + self.ttl_seconds)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    def _claim(self, key: CacheKey) -> Tuple[Optional[str], Optional[Future], bool]:
+        """(cached result, None, False), (None, in-flight future, False) or (None, new future, True)."""
+        with self._lock:
+            result = self._lookup(key)
+            if result is not None:
+                self.stats["hits"] += 1
+                return result, None, False
+            future = self._in_flight.get(key)
+            if future is not None:
+                self.stats["coalesced"] += 1
+                return None, future, False
+            future = self._in_flight[key] = Future()
+            self.stats["misses"] += 1
+            return None, future, True
+
+    def _complete(self, key: CacheKey, future: Future, result: Optional[str] = None,
+                  error: Optional[BaseException] = None) -> None:
+        """Store the leader's result and hand it (or its error) to waiting callers."""
+        with self._lock:
+            if error is not None:
+                self.stats["errors"] += 1
+            elif result:
+                self._store(key, result)
+            del self._in_flight[key]
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def get_or_fetch(
+        self, namespace: str, mode: str, query: str, fetch: Callable[[], Optional[str]]
+    ) -> Tuple[Optional[str], bool]:
+        """Cached result, the result of an identical query already running, or fetch().
+
+        Blocks while waiting for another caller's query.
+
+        Returns:
+            (result, cache_hit); cache_hit is True when this call did not query
+        """
+        key = self.make_key(namespace, mode, query)
+        cached, future, leader = self._claim(key)
+        if future is None:
+            return cached, True
+        if not leader:
+            logger.info(f"[GROUNDING_CACHE] Waiting for in-flight query on '{namespace}'")
+            return future.result(), True
+
+        try:
+            result = fetch()
+        except BaseException as e:
+            self._complete(key, future, error=e)
+            raise
+        self._complete(key, future, result)
+        return result, False
+
+    async def aget_or_fetch(
+        self, namespace: str, mode: str, query: str, fetch: Callable[[], Awaitable[Optional[str]]]
+    ) -> Tuple[Optional[str], bool]:
+        """get_or_fetch() for coroutines; waits for in-flight queries without blocking the loop."""
+        key = self.make_key(namespace, mode, query)
+        cached, future, leader = self._claim(key)
+        if future is None:
+            return cached, True
+        if not leader:
+            logger.info(f"[GROUNDING_CACHE] Waiting for in-flight query on '{namespace}'")
+            # Shielded: a caller timing out must not cancel the shared future
+            return await asyncio.shield(asyncio.wrap_future(future)), True
+
+        try:
+            result = await fetch()
+        except asyncio.CancelledError:
+            self._complete(key, future, error=TimeoutError(f"Query on '{namespace}' was cancelled"))
+            raise
+        except Exception as e:
+            self._complete(key, future, error=e)
+            raise
+        self._complete(key, future, result)
+        return result, False
+
+    def is_pending(self, namespace: str, mode: str, query: str) -> bool:
+        """Whether a result is cached or being queried for this query."""
+        key = self.make_key(namespace, mode, query)
+        with self._lock:
+            return key in self._in_flight or self._lookup(key) is not None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+        logger.info("[GROUNDING_CACHE] Cleared")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Counters plus current size, for health reporting."""
+        with self._lock:
+            return {
+                **self.stats,
+                "entries": len(self._entries),
+                "in_flight": len(self._in_flight),
+                "max_entries": self.max_entries,
+            }
+
+
+_cache: Optional[GroundingCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_grounding_cache() -> GroundingCache:
+    """Process-wide grounding cache sized from settings."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = GroundingCache(
+                    max_entries=settings.grounding_cache_max_entries,
+                    ttl_seconds=settings.grounding_cache_ttl,
+                )
+    return _cache
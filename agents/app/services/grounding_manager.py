@@ -1,15 +1,47 @@
 """Manager for processing grounding knowledge directives."""
 
+import asyncio
+import functools
 import re
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
 from typing import Dict, List, Tuple, Optional, Any
-from datetime import datetime, timedelta
 
+from app.config import settings
 from app.models import Message
-from app.services.knowledge_client import KnowledgeServiceClient
+from app.services.grounding_cache import get_grounding_cache
+from app.services.knowledge_client import AsyncKnowledgeServiceClient, KnowledgeServiceClient
 from shared.logging_config import get_logger
 
 logger = get_logger(__name__)
 
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_grounding_executor() -> ThreadPoolExecutor:
+    """Threads that run one turn's knowledge queries concurrently.
+
+    Sized like the knowledge service's connection pool, which caps requests in flight anyway.
+    """
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=settings.http_pool_max_connections, thread_name_prefix="grounding"
+                )
+    return _executor
+
+
+def shutdown_grounding_executor() -> None:
+    """Drop the grounding threads without waiting for queries still running."""
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False)
+            _executor = None
+
 
 class GroundingDirective:
     """Represents a grounding directive from a template."""
@@ -35,10 +67,13 @@ class GroundingManager:
     
     def __init__(self):
         self.knowledge_client = KnowledgeServiceClient()
-        self._cache: Dict[str, Tuple[str, datetime]] = {}
-        self._cache_ttl = timedelta(minutes=30)  # 30 minute cache
+        self.async_knowledge_client = AsyncKnowledgeServiceClient()
+        # Shared by every manager in the process; CJAgent creates one per turn
+        self.cache = get_grounding_cache()
+        self.query_timeout = settings.grounding_query_timeout
         
-    def extract_grounding_directives(self, content: str) -> List[GroundingDirective]:
+    @classmethod
+    def extract_grounding_directives(cls, content: str) -> List[GroundingDirective]:
         """Extract grounding directives from template content.
         
         Args:
@@ -49,7 +84,7 @@ class GroundingManager:
         """
         directives = []
         
-        for match in self.GROUNDING_PATTERN.finditer(content):
+        for match in cls.GROUNDING_PATTERN.finditer(content):
             namespace = match.group(1)
             params_str = match.group(2)
             
@@ -92,6 +127,10 @@ class GroundingManager:
     ) -> Dict[str, str]:
         """Process grounding directives with conversation context.
         
+        All namespaces are queried at once on the grounding thread pool, so this takes
+        as long as the slowest query, at most GROUNDING_QUERY_TIMEOUT. Namespaces that
+        fail or time out are left out of the results; their markers stay unresolved.
+        
         Args:
             directives: List of grounding directives to process
             conversation_context: Recent conversation messages
@@ -101,27 +140,92 @@ class GroundingManager:
             Dict mapping namespace to grounding content
         """
         results = {}
+        queries = self._build_queries(directives, conversation_context, debug_callback)
+        if not queries:
+            return results
         
-        for directive in directives:
-            # Check cache first
-            cache_key = f"{directive.namespace}:{directive.mode}"
-            cached_result = self._get_cached_result(cache_key)
-            if cached_result:
-                results[directive.namespace] = cached_result
-                logger.info(f"Using cached grounding for {directive.namespace}")
+        # Query knowledge graphs, unless the result is cached or already being
+        # fetched (e.g. by the prefetch started when the message arrived)
+        executor = get_grounding_executor()
+        futures = [
+            executor.submit(
+                self.cache.get_or_fetch,
+                directive.namespace,
+                directive.mode,
+                query,
+                functools.partial(self._query, directive, query),
+            )
+            for directive, query in queries
+        ]
+        done, _ = wait(futures, timeout=self.query_timeout)
+        
+        for (directive, query), future in zip(queries, futures):
+            if future not in done:
+                self._record(results, directive, query, None, False, debug_callback,
+                             error=f"Timed out after {self.query_timeout}s")
+            elif future.exception() is not None:
+                self._record(results, directive, query, None, False, debug_callback,
+                             error=str(future.exception()))
+            else:
+                result, cache_hit = future.result()
+                self._record(results, directive, query, result, cache_hit, debug_callback)
                 
-                # Capture cache hit
-                if debug_callback and hasattr(debug_callback, 'capture_grounding'):
-                    debug_callback.capture_grounding(
-                        namespace=directive.namespace,
-                        query="(from cache)",
-                        results=cached_result,
-                        results_count=len(cached_result.strip().split('\n')) if cached_result else 0,
-                        cache_hit=True
-                    )
-                continue
+        return results
+    
+    async def aprocess_grounding(
+        self,
+        directives: List[GroundingDirective],
+        conversation_context: List[Message],
+        debug_callback: Optional[Any] = None
+    ) -> Dict[str, str]:
+        """process_grounding() for the event loop, using the async knowledge client.
+        
+        Args:
+            directives: List of grounding directives to process
+            conversation_context: Recent conversation messages
+            debug_callback: Optional debug callback for capturing operations
             
-            # Build query from conversation context
+        Returns:
+            Dict mapping namespace to grounding content
+        """
+        results = {}
+        queries = self._build_queries(directives, conversation_context, debug_callback)
+        
+        outcomes = await asyncio.gather(*(
+            asyncio.wait_for(
+                self.cache.aget_or_fetch(
+                    directive.namespace,
+                    directive.mode,
+                    query,
+                    functools.partial(self._aquery, directive, query),
+                ),
+                timeout=self.query_timeout,
+            )
+            for directive, query in queries
+        ), return_exceptions=True)
+        
+        for (directive, query), outcome in zip(queries, outcomes):
+            if isinstance(outcome, asyncio.TimeoutError):
+                self._record(results, directive, query, None, False, debug_callback,
+                             error=f"Timed out after {self.query_timeout}s")
+            elif isinstance(outcome, BaseException):
+                self._record(results, directive, query, None, False, debug_callback,
+                             error=str(outcome))
+            else:
+                result, cache_hit = outcome
+                self._record(results, directive, query, result, cache_hit, debug_callback)
+                
+        return results
+    
+    def _build_queries(
+        self,
+        directives: List[GroundingDirective],
+        conversation_context: List[Message],
+        debug_callback: Optional[Any] = None
+    ) -> List[Tuple[GroundingDirective, str]]:
+        """Query text for each directive; directives without context are skipped."""
+        queries = []
+        for directive in directives:
             query = self._build_query_from_context(conversation_context, directive.limit)
             
             if not query:
@@ -139,46 +243,97 @@ class GroundingManager:
                     )
                 continue
             
-            # Query knowledge graph
-            logger.info(f"Querying knowledge graph '{directive.namespace}' with mode '{directive.mode}'")
-            result = self.knowledge_client.query(
-                namespace=directive.namespace,
-                query=query,
-                mode=directive.mode
-            )
+            queries.append((directive, query))
+        return queries
+    
+    def _record(
+        self,
+        results: Dict[str, str],
+        directive: GroundingDirective,
+        query: str,
+        result: Optional[str],
+        cache_hit: bool,
+        debug_callback: Optional[Any] = None,
+        error: Optional[str] = None
+    ):
+        """Add one namespace's outcome to results and the debug capture."""
+        if cache_hit:
+            logger.info(f"Using cached grounding for {directive.namespace}")
+        
+        if result:
+            # Format result for inclusion in prompt
+            formatted_result = self._format_grounding_result(directive.namespace, result)
+            results[directive.namespace] = formatted_result
             
-            if result:
-                # Format result for inclusion in prompt
-                formatted_result = self._format_grounding_result(directive.namespace, result)
-                results[directive.namespace] = formatted_result
-                
-                # Cache the result
-                self._cache_result(cache_key, formatted_result)
-                
-                # Capture successful grounding
-                if debug_callback and hasattr(debug_callback, 'capture_grounding'):
-                    debug_callback.capture_grounding(
-                        namespace=directive.namespace,
-                        query=query,
-                        results=formatted_result,
-                        results_count=len(result.strip().split('\n')) if result else 0,
-                        cache_hit=False
-                    )
-            else:
-                logger.warning(f"No grounding result for namespace '{directive.namespace}'")
-                
-                # Capture empty result
-                if debug_callback and hasattr(debug_callback, 'capture_grounding'):
-                    debug_callback.capture_grounding(
-                        namespace=directive.namespace,
-                        query=query,
-                        results="",
-                        results_count=0,
-                        cache_hit=False,
-                        error="No results found"
-                    )
-                
-        return results
+            # Capture successful grounding
+            if debug_callback and hasattr(debug_callback, 'capture_grounding'):
+                debug_callback.capture_grounding(
+                    namespace=directive.namespace,
+                    query=query,
+                    results=formatted_result,
+                    results_count=len(result.strip().split('\n')) if result else 0,
+                    cache_hit=cache_hit
+                )
+        else:
+            error = error or "No results found"
+            logger.warning(f"No grounding result for namespace '{directive.namespace}': {error}")
+            
+            # Capture empty result
+            if debug_callback and hasattr(debug_callback, 'capture_grounding'):
+                debug_callback.capture_grounding(
+                    namespace=directive.namespace,
+                    query=query,
+                    results="",
+                    results_count=0,
+                    cache_hit=cache_hit,
+                    error=error
+                )
+    
+    def _query(self, directive: GroundingDirective, query: str) -> Optional[str]:
+        """Query the knowledge service for one directive."""
+        logger.info(f"Querying knowledge graph '{directive.namespace}' with mode '{directive.mode}'")
+        return self.knowledge_client.query(
+            namespace=directive.namespace,
+            query=query,
+            mode=directive.mode
+        )
+    
+    async def _aquery(self, directive: GroundingDirective, query: str) -> Optional[str]:
+        """Query the knowledge service for one directive without blocking the loop."""
+        logger.info(f"Querying knowledge graph '{directive.namespace}' with mode '{directive.mode}'")
+        return await self.async_knowledge_client.query(
+            namespace=directive.namespace,
+            query=query,
+            mode=directive.mode
+        )
+    
+    async def prefetch(
+        self,
+        directives: List[GroundingDirective],
+        conversation_context: List[Message]
+    ) -> int:
+        """Run the knowledge queries a turn will need, ahead of agent construction.
+        
+        Results land in the shared cache; a turn that reaches process_grounding while a
+        prefetched query is still running waits for it instead of querying again.
+        
+        Args:
+            directives: Grounding directives of the prompt the turn will use
+            conversation_context: Conversation window the turn will use
+            
+        Returns:
+            Number of queries started
+        """
+        missing = []
+        for directive in directives:
+            query = self._build_query_from_context(conversation_context, directive.limit)
+            if query and not self.cache.is_pending(directive.namespace, directive.mode, query):
+                missing.append(directive)
+        
+        if missing:
+            logger.info(f"Prefetching {len(missing)} grounding queries")
+            await self.aprocess_grounding(missing, conversation_context)
+        return len(missing)
     
     def _build_query_from_context(self, messages: List[Message], limit: int) -> str:
         """Build a query from conversation context.
@@ -237,37 +392,9 @@ class GroundingManager:
         
         return formatted
     
-    def _get_cached_result(self, cache_key: str) -> Optional[str]:
-        """Get cached result if still valid.
-        
-        Args:
-            cache_key: Cache key
-            
-        Returns:
-            Cached result or None if expired/missing
-        """
-        if cache_key in self._cache:
-            result, timestamp = self._cache[cache_key]
-            if datetime.now() - timestamp < self._cache_ttl:
-                return result
-            else:
-                # Expired, remove from cache
-                del self._cache[cache_key]
-        return None
-    
-    def _cache_result(self, cache_key: str, result: str):
-        """Cache a grounding result.
-        
-        Args:
-            cache_key: Cache key
-            result: Result to cache
-        """
-        self._cache[cache_key] = (result, datetime.now())
-    
     def clear_cache(self):
-        """Clear the grounding cache."""
-        self._cache.clear()
-        logger.info("Grounding cache cleared")
+        """Clear the process-wide grounding cache."""
+        self.cache.clear()
     
     def close(self):
         """Clean up resources."""
@@ -1,20 +1,34 @@
-"""Client for interacting with the Knowledge Service (LightRAG)."""
+"""Clients for interacting with the Knowledge Service (LightRAG).
+
+Both clients use the process-wide pooled HTTP clients (app/utils/http_pool.py), so
+creating one per GroundingManager no longer opens new connections:
+KnowledgeServiceClient for agent threads, AsyncKnowledgeServiceClient for the
+event loop.
+"""
 
 import httpx
+import requests
 from typing import Optional, Dict, Any
 from shared.logging_config import get_logger
 from app.config import settings
+from app.utils.http_pool import RetryPolicy, get_async_client, get_client
 
 logger = get_logger(__name__)
 
+# http_pool registry key; one pool per knowledge service URL
+KNOWLEDGE_PROVIDER = "knowledge"
+# Grounding is optional and bounded by GROUNDING_QUERY_TIMEOUT; a failed query is
+# simply tried again next turn, so don't spend the deadline backing off
+KNOWLEDGE_RETRY = RetryPolicy(max_retries=0)
+
 
 class KnowledgeServiceClient:
     """Synchronous HTTP client for Knowledge Service API."""
     
-    def __init__(self, base_url: Optional[str] = None):
+    def __init__(self, base_url: Optional[str] = None, timeout: Optional[float] = None):
         self.base_url = base_url or settings.knowledge_service_url
-        self.client = httpx.Client(timeout=30.0)
-        logger.info(f"KnowledgeServiceClient initialized with base URL: {self.base_url}")
+        self.timeout = timeout or settings.grounding_query_timeout
+        self.client = get_client(KNOWLEDGE_PROVIDER, self.base_url, retry=KNOWLEDGE_RETRY)
         
     def query(
         self, 
@@ -35,13 +49,14 @@ class KnowledgeServiceClient:
         try:
             response = self.client.post(
                 f"{self.base_url}/api/{namespace}/query",
-                json={"query": query, "mode": mode}
+                json={"query": query, "mode": mode},
+                timeout=self.timeout
             )
             response.raise_for_status()
             data = response.json()
             return data.get("result", "")
             
-        except httpx.HTTPStatusError as e:
+        except requests.HTTPError as e:
             if e.response.status_code == 404:
                 logger.warning(f"Knowledge graph '{namespace}' not found")
             else:
@@ -92,8 +107,7 @@ class KnowledgeServiceClient:
             return None
     
     def close(self):
-        """Close the HTTP client."""
-        self.client.close()
+        """Nothing to release; the pooled HTTP client is shared by the process."""
     
     def __enter__(self):
         """Context manager entry."""
@@ -101,4 +115,50 @@ class KnowledgeServiceClient:
     
     def __exit__(self, exc_type, exc_val, exc_tb):
         """Context manager exit."""
-        self.close()
\ No newline at end of file
+        self.close()
+
+
+class AsyncKnowledgeServiceClient:
+    """Async HTTP client for Knowledge Service API, for code on the event loop."""
+    
+    def __init__(self, base_url: Optional[str] = None, timeout: Optional[float] = None):
+        self.base_url = base_url or settings.knowledge_service_url
+        self.timeout = timeout or settings.grounding_query_timeout
+        
+    async def query(
+        self, 
+        namespace: str, 
+        query: str, 
+        mode: str = "hybrid"
+    ) -> Optional[str]:
+        """Query a knowledge graph.
+        
+        Args:
+            namespace: Knowledge graph namespace (e.g., "npr")
+            query: Query text
+            mode: Query mode - "naive", "local", "global", or "hybrid"
+            
+        Returns:
+            Query result or None if error
+        """
+        try:
+            client = get_async_client(KNOWLEDGE_PROVIDER, self.base_url, retry=KNOWLEDGE_RETRY)
+            response = await client.post(
+                f"{self.base_url}/api/{namespace}/query",
+                json={"query": query, "mode": mode},
+                timeout=self.timeout
+            )
+            response.raise_for_status()
+            data = response.json()
+            return data.get("result", "")
+            
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code == 404:
+                logger.warning(f"Knowledge graph '{namespace}' not found")
+            else:
+                logger.error(f"HTTP error querying knowledge graph: {e}")
+            return None
+            
+        except Exception as e:
+            logger.error(f"Error querying knowledge graph '{namespace}': {e}")
+            return None
@@ -2,24 +2,40 @@
 
 import asyncio
 from datetime import datetime
-from typing import List, Callable, Dict, Any, Union
+from typing import List, Callable, Dict, Any, Set, Union
 import uuid
 
 from crewai import Crew, Task
 import litellm
 
 from app.models import Message
-from app.agents.cj_agent import create_cj_agent
+from app.agents.cj_agent import get_grounding_directives
 from app.services.session_manager import Session
+from app.services.agent_executor import get_agent_executor
+from app.services.grounding_manager import GroundingManager
 from shared.logging_config import get_logger
 from app.config import settings
-from shared.user_identity import save_conversation_message
+from shared.conversation_writer import get_conversation_writer
 from app.agents.tool_output_parser import ToolOutputParser
 from app.services.debug_callback import DebugCallback
 from app.services.tool_logger import ToolLogger
 
 logger = get_logger(__name__)
 
+# Grounding prefetches in flight, referenced so they are not garbage collected mid-run
+_prefetch_tasks: Set[asyncio.Task] = set()
+
+
+async def cancel_prefetch_tasks() -> int:
+    """Cancel grounding prefetches still running (on shutdown). Returns how many were cancelled."""
+    tasks = [task for task in _prefetch_tasks if not task.done()]
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    if tasks:
+        logger.info(f"[GROUNDING] Cancelled {len(tasks)} grounding prefetches")
+    return len(tasks)
+
 
 class MessageProcessor:
     """Processes messages between CJ and merchants."""
@@ -121,6 +137,10 @@ class MessageProcessor:
         # Update conversation state
         session.conversation.state.context_window = session.conversation.messages[-10:]
 
+        # Start this turn's knowledge queries now rather than while the agent is built
+        if settings.grounding_prefetch:
+            self._start_prefetch(session)
+
         # Generate unique message ID
         message_id = f"msg_{uuid.uuid4().hex[:8]}"
         
@@ -161,41 +181,7 @@ class MessageProcessor:
         logger.info(f"[DEBUG_REGISTRATION] success_callback count: {len(litellm.success_callback)}")
         logger.info(f"[DEBUG_REGISTRATION] success_callback types: {[type(cb).__name__ for cb in litellm.success_callback]}")
 
-        # Set debug callback for tool logger
-        ToolLogger.set_debug_callback(debug_callback)
-
         try:
-            # Create CJ agent
-            logger.info(f"[CJ_AGENT] ====== COMPOSING RESPONSE ======")
-            logger.info(f"[CJ_AGENT] Merchant: {session.conversation.merchant_name}")
-            if session.user_id:
-                logger.info(f"[CJ_AGENT] User ID: {session.user_id}")
-            else:
-                logger.info(f"[CJ_AGENT] No user ID available")
-                
-            # Pass OAuth metadata if available
-            oauth_metadata = getattr(session, 'oauth_metadata', None)
-            
-            # Create agent (no debug_callback parameter needed!)
-            cj_agent = create_cj_agent(
-                merchant_name=session.conversation.merchant_name,
-                scenario_name=session.conversation.scenario_name,
-                workflow_name=session.conversation.workflow,
-                conversation_state=session.conversation.state,
-                data_agent=session.data_agent,
-                user_id=session.user_id,
-                oauth_metadata=oauth_metadata,
-                verbose=settings.enable_verbose_logging,
-                # debug_callback parameter removed - we register directly with LiteLLM
-            )
-        
-            # Set up thinking token callback for this agent BEFORE creating the task
-            # Use the conversation_id from the session, not session.id
-            from app.services.conversation_thinking_callback import ConversationThinkingCallback
-            conversation_id = getattr(session, 'conversation_id', session.id)
-            thinking_callback = ConversationThinkingCallback(conversation_id)
-            cj_agent.set_thinking_callback(thinking_callback)
-
             # Create task
             if is_system:
                 # For system messages (OAuth context), provide clear instruction
@@ -210,19 +196,6 @@ class MessageProcessor:
                     )
                 else:
                     task_description = f"Respond to: {message}"
-                
-            task = Task(
-                description=task_description,
-                agent=cj_agent,
-                expected_output="A helpful response using the appropriate tools when requested",
-            )
-
-            # Create crew and execute
-            logger.info(f"[MESSAGE_PROCESSOR] Before creating Crew - success callbacks: {[type(cb).__name__ for cb in litellm.success_callback]}")
-            
-            crew = Crew(agents=[cj_agent], tasks=[task], verbose=settings.enable_verbose_logging)
-            
-            logger.info(f"[MESSAGE_PROCESSOR] After creating Crew - success callbacks: {[type(cb).__name__ for cb in litellm.success_callback]}")
 
             await self._report_progress(session.id, "thinking", {"status": "generating"})
 
@@ -237,12 +210,13 @@ class MessageProcessor:
                 f"  Chat history ({len(context_messages)} messages):\n"
                 + "\n".join(f"    {msg}" for msg in context_messages)
             )
-            
-            logger.info(f"[MESSAGE_PROCESSOR] Before crew.kickoff() - success callbacks: {[type(cb).__name__ for cb in litellm.success_callback]}")
-            
-            result = crew.kickoff()
-            
-            logger.info(f"[MESSAGE_PROCESSOR] After crew.kickoff() - success callbacks: {[type(cb).__name__ for cb in litellm.success_callback]}")
+
+            # Agent setup and crew.kickoff() block for the whole turn, so they run on the
+            # agent executor; turns of one conversation stay in order
+            conversation_id = getattr(session, 'conversation_id', session.id)
+            result = await get_agent_executor().run(
+                conversation_id, self._run_turn, session, task_description, debug_callback
+            )
 
             # Extract response
             response = str(result)
@@ -382,6 +356,62 @@ class MessageProcessor:
             logger.info(f"[DEBUG_CLEANUP] After cleanup - input: {len(litellm.input_callback)}, success: {len(litellm.success_callback)}")
             
             debug_callback.finalize()
+
+    def _run_turn(self, session: Session, task_description: str, debug_callback: DebugCallback) -> Any:
+        """Build CJ's agent and crew for one turn and run it. Blocks; called on an executor thread."""
+        # Capture this turn's tool and LLM calls only, not those of turns on other threads
+        ToolLogger.set_debug_callback(debug_callback)
+        debug_callback.bind_to_current_thread()
+
+        try:
+            # Create CJ agent
+            logger.info(f"[CJ_AGENT] ====== COMPOSING RESPONSE ======")
+            logger.info(f"[CJ_AGENT] Merchant: {session.conversation.merchant_name}")
+            if session.user_id:
+                logger.info(f"[CJ_AGENT] User ID: {session.user_id}")
+            else:
+                logger.info(f"[CJ_AGENT] No user ID available")
+
+            # Pass OAuth metadata if available
+            oauth_metadata = getattr(session, 'oauth_metadata', None)
+
+            # Reuse the session's agent; only the conversation window and new facts change between turns
+            cj_agent = session.agent_cache.get_agent(
+                merchant_name=session.conversation.merchant_name,
+                scenario_name=session.conversation.scenario_name,
+                workflow_name=session.conversation.workflow,
+                conversation_state=session.conversation.state,
+                data_agent=session.data_agent,
+                user_id=session.user_id,
+                oauth_metadata=oauth_metadata,
+                verbose=settings.enable_verbose_logging,
+            )
+
+            # Set up thinking token callback for this agent BEFORE creating the task
+            # Use the conversation_id from the session, not session.id
+            from app.services.conversation_thinking_callback import ConversationThinkingCallback
+            conversation_id = getattr(session, 'conversation_id', session.id)
+            thinking_callback = ConversationThinkingCallback(conversation_id)
+            cj_agent.set_thinking_callback(thinking_callback)
+
+            task = Task(
+                description=task_description,
+                agent=cj_agent,
+                expected_output="A helpful response using the appropriate tools when requested",
+            )
+
+            # Create crew and execute
+            logger.info(f"[MESSAGE_PROCESSOR] Before creating Crew - success callbacks: {[type(cb).__name__ for cb in litellm.success_callback]}")
+
+            crew = Crew(agents=[cj_agent], tasks=[task], verbose=settings.enable_verbose_logging)
+
+            logger.info(f"[MESSAGE_PROCESSOR] Before crew.kickoff() - success callbacks: {[type(cb).__name__ for cb in litellm.success_callback]}")
+
+            result = crew.kickoff()
+
+            logger.info(f"[MESSAGE_PROCESSOR] After crew.kickoff() - success callbacks: {[type(cb).__name__ for cb in litellm.success_callback]}")
+            return result
+        finally:
             ToolLogger.set_debug_callback(None)
 
     async def _report_progress(
@@ -407,6 +437,28 @@ class MessageProcessor:
             except Exception as e:
                 logger.error(f"Error in progress callback: {e}")
     
+    def _start_prefetch(self, session: Session) -> asyncio.Task:
+        """Run _prefetch_grounding in the background, tracked until it finishes."""
+        task = asyncio.create_task(self._prefetch_grounding(session))
+        _prefetch_tasks.add(task)
+        task.add_done_callback(_prefetch_tasks.discard)
+        return task
+
+    async def _prefetch_grounding(self, session: Session):
+        """Query the knowledge graphs the turn's prompt grounds on; results go to the shared cache."""
+        grounding_manager = None
+        try:
+            directives = get_grounding_directives(session.conversation.workflow)
+            if not directives:
+                return
+            grounding_manager = GroundingManager()
+            await grounding_manager.prefetch(directives, session.conversation.state.context_window)
+        except Exception as e:
+            logger.warning(f"[GROUNDING] Prefetch failed, the turn will query directly: {e}")
+        finally:
+            if grounding_manager:
+                grounding_manager.close()
+
     async def _extract_facts_background(self, session: Session):
         """Extract facts in background without blocking conversation."""
         try:
@@ -423,6 +475,7 @@ class MessageProcessor:
             
             if new_facts:
                 logger.info(f"[REAL_TIME_FACTS] Extracted {len(new_facts)} new facts")
+                session.agent_cache.add_facts(new_facts)
                     
         except Exception as e:
             logger.error(f"[REAL_TIME_FACTS] Error extracting facts: {e}", exc_info=True)
@@ -437,9 +490,9 @@ class MessageProcessor:
                 "timestamp": message.timestamp.isoformat()
             }
             
-            # Save to database (this is synchronous but runs in background task)
-            save_conversation_message(user_id, message_data)
-            logger.debug(f"[DB_SAVE] Saved message from {message.sender} for user {user_id}")
+            # Queue for the batched writer; it is inserted with other messages shortly after
+            get_conversation_writer().enqueue(user_id, message_data)
+            logger.debug(f"[DB_SAVE] Queued message from {message.sender} for user {user_id}")
             
         except Exception as e:
             # Log error but don't fail the conversation
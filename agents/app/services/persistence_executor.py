@@ -0,0 +1,134 @@
+"""
+Bounded executor for blocking persistence calls made from async code.
+
+The identity and fact helpers in shared.user_identity use psycopg2, which blocks
+the calling thread for the whole round trip. Calling them from a coroutine stalls
+every WebSocket session served by the same event loop. run_blocking() hands the
+call to a small thread pool instead and applies backpressure:
+
+- at most max_workers calls run at once (bounded by the DB pool anyway);
+- callers beyond that wait on the loop without blocking it;
+- once max_pending calls are running or waiting, new calls are rejected with
+  PersistenceBacklogError so background work is shed instead of piling up.
+
+Usage:
+    from app.services.persistence_executor import run_blocking
+
+    facts = await run_blocking(get_user_facts, user_id)
+"""
+
+import asyncio
+import functools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+from shared.logging_config import get_logger
+from app.config import settings
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+
+class PersistenceBacklogError(RuntimeError):
+    """Raised when too many persistence calls are already queued."""
+
+
+class PersistenceExecutor:
+    """Runs blocking DB calls on a bounded thread pool with admission control."""
+
+    def __init__(self, max_workers: int = 4, max_pending: int = 200):
+        """
+        Args:
+            max_workers: Threads running blocking calls concurrently
+            max_pending: Calls allowed in flight (running plus waiting) before rejecting
+        """
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="persistence")
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._slots_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._pending = 0
+        self._lock = threading.Lock()
+        self.stats = {"completed": 0, "failed": 0, "rejected": 0, "max_pending": 0, "max_wait_ms": 0.0}
+
+    def _get_slots(self) -> asyncio.Semaphore:
+        """Worker slots for the running loop (semaphores cannot be shared across loops)."""
+        loop = asyncio.get_running_loop()
+        if self._slots is None or self._slots_loop is not loop:
+            self._slots = asyncio.Semaphore(self.max_workers)
+            self._slots_loop = loop
+        return self._slots
+
+    async def run(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Run fn(*args, **kwargs) on a worker thread and return its result."""
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self.stats["rejected"] += 1
+                raise PersistenceBacklogError(
+                    f"{self._pending} persistence calls pending (limit {self.max_pending})"
+                )
+            self._pending += 1
+            self.stats["max_pending"] = max(self.stats["max_pending"], self._pending)
+
+        queued_at = time.perf_counter()
+        try:
+            async with self._get_slots():
+                wait_ms = (time.perf_counter() - queued_at) * 1000
+                self.stats["max_wait_ms"] = max(self.stats["max_wait_ms"], round(wait_ms, 2))
+                loop = asyncio.get_running_loop()
+                result = await loop.run_in_executor(self._executor, functools.partial(fn, *args, **kwargs))
+            self.stats["completed"] += 1
+            return result
+        except Exception:
+            self.stats["failed"] += 1
+            raise
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    @property
+    def pending(self) -> int:
+        """Calls currently running or waiting for a worker."""
+        return self._pending
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Counters plus current backlog, for health reporting."""
+        return {**self.stats, "pending": self._pending, "max_workers": self.max_workers}
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop accepting work; with wait=True, finish calls already submitted."""
+        self._executor.shutdown(wait=wait)
+
+
+_executor: Optional[PersistenceExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_persistence_executor() -> PersistenceExecutor:
+    """Process-wide executor sized from settings."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = PersistenceExecutor(
+                    max_workers=settings.persistence_max_workers,
+                    max_pending=settings.persistence_max_pending,
+                )
+    return _executor
+
+
+async def run_blocking(fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run a blocking persistence call on the shared executor."""
+    return await get_persistence_executor().run(fn, *args, **kwargs)
+
+
+def shutdown_persistence_executor() -> None:
+    """Finish submitted calls and drop the shared executor."""
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True)
+            _executor = None
@@ -6,6 +6,7 @@ import uuid
 
 from app.models import Conversation, ConversationState
 from app.agents.universe_data_agent import UniverseDataAgent
+from app.agents.cj_agent import CJAgentCache
 from shared.logging_config import get_logger
 from app.config import settings
 
@@ -49,6 +50,8 @@ class Session:
             "final_responses": [],  # Store final responses from crew.kickoff()
             "grounding": []         # Store knowledge base grounding operations
         }
+        # CJ agent reused across this session's turns
+        self.agent_cache = CJAgentCache()
 
 
 class SessionManager:
@@ -78,19 +78,27 @@ class ShopifyDataFetcher:
             raise Exception(f"Failed to fetch orders: {str(e)}")
     
     def get_store_overview(self) -> Dict[str, Any]:
-        """Get shop info, recent orders, and top products in one query."""
+        """Get shop info, recent orders, and top products in one query.
+        
+        Includes api_budget, the shop's remaining GraphQL cost budget, so callers
+        can pace further queries. The budget is read fresh on every call and never cached.
+        """
         cached = self._get_cached("store_overview")
         if cached:
-            return cached
+            return {**cached, "api_budget": self.get_api_budget()}
         
         try:
             data = self.graphql_api.get_store_pulse()
             self._set_cached("store_overview", data)
-            return data
+            return {**data, "api_budget": self.get_api_budget()}
         except Exception as e:
             logger.error(f"Failed to fetch store overview: {e}")
             raise Exception(f"Failed to fetch store overview: {str(e)}")
     
+    def get_api_budget(self) -> Dict[str, Any]:
+        """Remaining GraphQL query cost budget for this shop."""
+        return self.graphql_api.cost_budget.snapshot()
+    
     def get_orders_last_week(self) -> List[Dict]:
         """Get last week's orders for deeper analysis."""
         cached = self._get_cached("orders_last_week")
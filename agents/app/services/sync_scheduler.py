@@ -0,0 +1,282 @@
+"""
+Multi-merchant ETL sync scheduler.
+
+Discovers every merchant with an active MerchantIntegration and runs one sync job
+per (merchant, provider) on a process pool, so the nightly window grows with the
+slowest merchant rather than with the number of merchants:
+
+- stalest first: jobs are ordered by the provider's SyncMetadata.last_sync_at,
+  never-synced merchants ahead of everyone else;
+- per-provider limits: at most provider_limits[provider] jobs of a provider run at
+  once, since all merchants of a provider share its API rate limits;
+- per-merchant fairness: a merchant runs at most one job at a time, so a merchant
+  with several integrations cannot take several slots while others wait;
+- per-merchant credentials: each job syncs with the API key and domain stored on
+  the merchant's own integration row. Integrations missing either are not
+  scheduled, rather than falling back to the environment's single account.
+
+get_metrics() reports queue depth (overall and per provider), running jobs and each
+merchant's lag behind its last successful sync.
+
+Usage:
+    scheduler = SyncScheduler(max_workers=4, provider_limits={"freshdesk": 2, "shopify": 2})
+    with get_db_session() as session:
+        jobs = discover_sync_jobs(session)
+    results = scheduler.run(jobs)
+"""
+
+import multiprocessing
+import time
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from sqlalchemy import and_, case, select
+from sqlalchemy.orm import Session
+
+from shared.logging_config import get_logger
+from app.config import settings
+from app.dbmodels.base import Merchant, MerchantIntegration, SyncMetadata
+
+logger = get_logger(__name__)
+
+
+# SyncMetadata resource whose last_sync_at measures how stale a provider's data is
+PROVIDER_RESOURCES = {
+    "freshdesk": "freshdesk_tickets",
+    "shopify": "shopify_customers",
+}
+
+# MerchantIntegration.config key holding the account's domain
+PROVIDER_DOMAIN_KEYS = {
+    "freshdesk": "domain",
+    "shopify": "shop_domain",
+}
+
+
+@dataclass
+class SyncJob:
+    """One provider sync for one merchant."""
+
+    merchant_id: int
+    merchant_name: str
+    provider: str
+    last_sync_at: Optional[datetime] = None
+    # api_key and domain from the merchant's integration; kept out of repr so logs don't leak keys
+    credentials: Dict[str, str] = field(default_factory=dict, compare=False, repr=False)
+    result: Optional[Dict[str, Any]] = field(default=None, compare=False)
+    error: Optional[str] = field(default=None, compare=False)
+    started_at: Optional[float] = field(default=None, compare=False)
+    finished_at: Optional[float] = field(default=None, compare=False)
+
+    @property
+    def key(self) -> str:
+        return f"{self.merchant_name}:{self.provider}"
+
+    def staleness(self) -> float:
+        """Sort key: never-synced first, then oldest last_sync_at."""
+        return self.last_sync_at.timestamp() if self.last_sync_at else float("-inf")
+
+
+def discover_sync_jobs_query():
+    """Active integrations with the provider's last sync time, stalest first."""
+    resource = case(
+        *[(MerchantIntegration.platform == provider, resource) for provider, resource in PROVIDER_RESOURCES.items()]
+    )
+    return (
+        select(
+            Merchant.id,
+            Merchant.name,
+            MerchantIntegration.platform,
+            MerchantIntegration.api_key,
+            MerchantIntegration.config,
+            SyncMetadata.last_sync_at,
+        )
+        .join(MerchantIntegration, MerchantIntegration.merchant_id == Merchant.id)
+        .outerjoin(
+            SyncMetadata,
+            and_(SyncMetadata.merchant_id == Merchant.id, SyncMetadata.resource_type == resource),
+        )
+        .where(
+            MerchantIntegration.is_active.is_(True),
+            MerchantIntegration.platform.in_(list(PROVIDER_RESOURCES)),
+        )
+        .order_by(SyncMetadata.last_sync_at.asc().nulls_first(), Merchant.id)
+    )
+
+
+def integration_credentials(provider: str, api_key: Optional[str], config: Optional[Dict[str, Any]]) -> Optional[Dict[str, str]]:
+    """api_key and domain of an integration, or None if either is missing."""
+    domain = (config or {}).get(PROVIDER_DOMAIN_KEYS[provider])
+    if not api_key or not domain:
+        return None
+    return {"api_key": api_key, "domain": domain}
+
+
+def discover_sync_jobs(session: Session) -> List[SyncJob]:
+    """Sync jobs for every merchant with an active, supported integration that has its own credentials."""
+    jobs = []
+    for row in session.execute(discover_sync_jobs_query()).all():
+        credentials = integration_credentials(row.platform, row.api_key, row.config)
+        if credentials is None:
+            logger.warning(
+                f"[SYNC_SCHEDULER] Skipping {row.name}:{row.platform}: integration has no API key or "
+                f"'{PROVIDER_DOMAIN_KEYS[row.platform]}' in its config"
+            )
+            continue
+        jobs.append(SyncJob(
+            merchant_id=row.id, merchant_name=row.name, provider=row.platform,
+            last_sync_at=row.last_sync_at, credentials=credentials,
+        ))
+    return jobs
+
+
+def run_sync_job(provider: str, merchant_id: int, credentials: Dict[str, str]) -> Dict[str, Any]:
+    """Run one incremental sync in a worker process with the merchant's credentials and return its summary."""
+    if provider == "freshdesk":
+        from app.lib.freshdesk_sync_lib import FreshdeskETL
+
+        etl = FreshdeskETL(merchant_id, api_key=credentials["api_key"], domain=credentials["domain"])
+        tickets = etl.sync_tickets(resume=True)
+        ratings = etl.sync_satisfaction_ratings(incremental=True, resume=True)
+        return {
+            "status": "success" if tickets["status"] == ratings["status"] == "success" else "partial",
+            "tickets": tickets.get("total_synced", 0),
+            "ratings": ratings.get("total_synced", 0),
+            "errors": tickets.get("total_errors", 0) + ratings.get("total_errors", 0),
+        }
+    if provider == "shopify":
+        from app.lib.shopify_lib import ShopifyETL
+
+        etl = ShopifyETL(merchant_id, shop_domain=credentials["domain"], access_token=credentials["api_key"])
+        customers = etl.sync_customers()
+        return {
+            "status": customers["status"],
+            "customers": customers.get("total_synced", 0),
+            "errors": customers.get("total_errors", 0),
+        }
+    raise ValueError(f"No sync runner for provider '{provider}'")
+
+
+def _process_pool(max_workers: int) -> Executor:
+    # Spawned workers build their own DB engine instead of inheriting the parent's pool
+    return ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn"))
+
+
+class SyncScheduler:
+    """Runs sync jobs on a worker pool under provider limits and per-merchant fairness."""
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        provider_limits: Optional[Dict[str, int]] = None,
+        runner: Callable[[str, int, Dict[str, str]], Dict[str, Any]] = run_sync_job,
+        executor_factory: Callable[[int], Executor] = _process_pool,
+    ):
+        self.max_workers = max_workers or settings.sync_max_workers
+        self.provider_limits = provider_limits or {
+            "freshdesk": settings.sync_freshdesk_concurrency,
+            "shopify": settings.sync_shopify_concurrency,
+        }
+        self.runner = runner
+        self.executor_factory = executor_factory
+
+        self.pending: List[SyncJob] = []
+        self.running: Dict[Future, SyncJob] = {}
+        self.finished: List[SyncJob] = []
+        self._started_at: Optional[float] = None
+
+    def _next_job(self, busy_merchants: Set[int]) -> Optional[SyncJob]:
+        """Stalest pending job whose provider has a free slot and whose merchant is idle."""
+        running_by_provider: Dict[str, int] = {}
+        for job in self.running.values():
+            running_by_provider[job.provider] = running_by_provider.get(job.provider, 0) + 1
+
+        for job in self.pending:
+            if job.merchant_id in busy_merchants:
+                continue
+            if running_by_provider.get(job.provider, 0) >= self.provider_limits.get(job.provider, 1):
+                continue
+            return job
+        return None
+
+    def _dispatch(self, executor: Executor) -> None:
+        while len(self.running) < self.max_workers:
+            busy_merchants = {job.merchant_id for job in self.running.values()}
+            job = self._next_job(busy_merchants)
+            if not job:
+                return
+            self.pending.remove(job)
+            job.started_at = time.monotonic()
+            self.running[executor.submit(self.runner, job.provider, job.merchant_id, job.credentials)] = job
+            logger.info(
+                f"[SYNC_SCHEDULER] Started {job.key} (last sync: {job.last_sync_at}, "
+                f"queue depth: {len(self.pending)}, running: {len(self.running)})"
+            )
+
+    def _complete(self, future: Future) -> None:
+        job = self.running.pop(future)
+        job.finished_at = time.monotonic()
+        try:
+            job.result = future.result()
+            status = job.result.get("status")
+            if status == "success":
+                job.last_sync_at = datetime.now(timezone.utc)
+            else:
+                # A "failed" or "partial" run returns normally but did not sync everything
+                job.error = f"Sync finished with status '{status}'"
+                logger.error(f"[SYNC_SCHEDULER] {job.key} finished with status '{status}': {job.result}")
+        except Exception as e:
+            job.error = str(e)
+            logger.error(f"[SYNC_SCHEDULER] {job.key} failed: {e}")
+        self.finished.append(job)
+        logger.info(
+            f"[SYNC_SCHEDULER] Finished {job.key} in {job.finished_at - job.started_at:.1f}s "
+            f"(queue depth: {len(self.pending)}, running: {len(self.running)})"
+        )
+
+    def run(self, jobs: List[SyncJob]) -> List[SyncJob]:
+        """Run all jobs and return them with their results, in completion order."""
+        self.pending = sorted(jobs, key=SyncJob.staleness)
+        self.finished = []
+        self._started_at = time.monotonic()
+        if not self.pending:
+            return []
+
+        executor = self.executor_factory(self.max_workers)
+        try:
+            self._dispatch(executor)
+            while self.running:
+                done, _ = wait(list(self.running), return_when=FIRST_COMPLETED)
+                for future in done:
+                    self._complete(future)
+                self._dispatch(executor)
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+        return self.finished
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Queue depth, running jobs and per-merchant lag behind the last successful sync.
+
+        Jobs that raised or returned any status other than "success" count as failed.
+        """
+        now = datetime.now(timezone.utc)
+        depth_by_provider: Dict[str, int] = {}
+        for job in self.pending:
+            depth_by_provider[job.provider] = depth_by_provider.get(job.provider, 0) + 1
+
+        jobs = self.pending + list(self.running.values()) + self.finished
+        return {
+            "queue_depth": len(self.pending),
+            "queue_depth_by_provider": depth_by_provider,
+            "running": len(self.running),
+            "completed": sum(1 for job in self.finished if not job.error),
+            "failed": sum(1 for job in self.finished if job.error),
+            "elapsed_seconds": round(time.monotonic() - self._started_at, 1) if self._started_at else 0.0,
+            # None means the merchant has never synced this provider
+            "merchant_lag_seconds": {
+                job.key: round((now - job.last_sync_at).total_seconds(), 1) if job.last_sync_at else None
+                for job in jobs
+            },
+        }
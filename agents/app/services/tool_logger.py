@@ -1,5 +1,6 @@
 import logging
 import json
+import threading
 import time
 from typing import Any, Dict, Optional
 from functools import wraps
@@ -11,17 +12,18 @@ class ToolLogger:
     """Central tool execution logger that integrates with debug callback."""
     
     _instance = None
-    _debug_callback = None
+    # Per thread: concurrent agent turns each run on their own executor thread
+    _local = threading.local()
     
     @classmethod
     def set_debug_callback(cls, callback):
-        """Set the debug callback for capturing tool calls."""
-        cls._debug_callback = callback
+        """Set the debug callback for capturing tool calls on the current thread."""
+        cls._local.debug_callback = callback
     
     @classmethod
     def get_debug_callback(cls):
-        """Get the current debug callback."""
-        return cls._debug_callback
+        """Get the current thread's debug callback."""
+        return getattr(cls._local, "debug_callback", None)
     
     @classmethod
     def log_tool_call(cls, tool_name: str, tool_input: Dict[str, Any], tool_output: Any = None, 
@@ -38,8 +40,9 @@ class ToolLogger:
             logger.info(f"[TOOL CALL] {tool_name}({input_str[:100]}...) - Executing")
         
         # Capture in debug callback if available
-        if cls._debug_callback:
-            cls._debug_callback.capture_tool_call(
+        debug_callback = cls.get_debug_callback()
+        if debug_callback:
+            debug_callback.capture_tool_call(
                 tool_name=tool_name,
                 tool_input=tool_input,
                 tool_output=tool_output,
@@ -4,6 +4,8 @@ from pathlib import Path
 from typing import Dict, List, Tuple, Optional
 import yaml
 
+from app.utils.yaml_cache import list_yaml_files, load_yaml
+
 
 class UniverseDiscovery:
     """Discover and validate available universes."""
@@ -20,27 +22,15 @@ class UniverseDiscovery:
         """
         universes = {}
 
-        if not self.universe_dir.exists():
-            return universes
-
-        for file_path in self.universe_dir.glob("*.yaml"):
+        for file_path in list_yaml_files(self.universe_dir):
             try:
-                # Quick parse to get metadata
-                with open(file_path, "r") as f:
-                    # Only read first few lines for efficiency
-                    content = ""
-                    for _ in range(10):
-                        line = f.readline()
-                        if not line:
-                            break
-                        content += line
-
-                    data = yaml.safe_load(content)
-                    if data and "metadata" in data:
-                        merchant = data["metadata"].get("merchant")
-                        scenario = data["metadata"].get("scenario")
-                        if merchant and scenario:
-                            universes[(merchant, scenario)] = file_path
+                # Parsed once per process by the shared cache
+                data = load_yaml(file_path)
+                if data and "metadata" in data:
+                    merchant = data["metadata"].get("merchant")
+                    scenario = data["metadata"].get("scenario")
+                    if merchant and scenario:
+                        universes[(merchant, scenario)] = file_path
             except (yaml.YAMLError, KeyError, IOError):
                 # Skip invalid files
                 pass
@@ -74,17 +64,16 @@ class UniverseDiscovery:
             return None
 
         try:
-            with open(path, "r") as f:
-                data = yaml.safe_load(f)
-                metadata = data.get("metadata", {})
-                return {
-                    "path": str(path),
-                    "generated_at": metadata.get("generated_at"),
-                    "timeline_days": metadata.get("timeline_days"),
-                    "current_day": metadata.get("current_day"),
-                    "total_customers": len(data.get("customers", [])),
-                    "total_tickets": len(data.get("support_tickets", [])),
-                }
+            data = load_yaml(path)
+            metadata = data.get("metadata", {})
+            return {
+                "path": str(path),
+                "generated_at": metadata.get("generated_at"),
+                "timeline_days": metadata.get("timeline_days"),
+                "current_day": metadata.get("current_day"),
+                "total_customers": len(data.get("customers", [])),
+                "total_tickets": len(data.get("support_tickets", [])),
+            }
         except (yaml.YAMLError, IOError):
             return None
 
@@ -1,9 +1,10 @@
 """Universe loading and validation."""
 
-import yaml
 from pathlib import Path
 from typing import Dict, Any
 
+from app.utils.yaml_cache import list_yaml_files, load_yaml
+
 
 class UniverseLoader:
     """Loads and validates universe files."""
@@ -13,15 +14,14 @@ class UniverseLoader:
         self.universes_path = Path(universes_path)
 
     def load(self, universe_id: str) -> Dict[str, Any]:
-        """Load a universe by ID."""
+        """Load a universe by ID (read-only view from the shared YAML cache)."""
 
         universe_file = self.universes_path / f"{universe_id}.yaml"
-        if not universe_file.exists():
+        try:
+            universe = load_yaml(universe_file)
+        except FileNotFoundError:
             raise FileNotFoundError(f"Universe not found: {universe_file}")
 
-        with open(universe_file, "r") as f:
-            universe = yaml.safe_load(f)
-
         self.validate(universe)
         return universe
 
@@ -42,11 +42,8 @@ class UniverseLoader:
     def list_universes(self) -> list:
         """List all available universes."""
 
-        if not self.universes_path.exists():
-            return []
-
         universes = []
-        for file in self.universes_path.glob("*.yaml"):
+        for file in list_yaml_files(self.universes_path):
             universes.append(file.stem)
 
         return sorted(universes)
@@ -1,6 +1,7 @@
 """Freshdesk API utilities for raw API calls."""
 
 import os
+import threading
 import time
 from typing import Dict, Any, Optional, List, Tuple
 import requests
@@ -8,32 +9,120 @@ from urllib.parse import urlencode
 
 # Use centralized config - no direct load_dotenv!
 from shared.env_loader import get_env
+from app.utils.http_pool import SERVER_ERROR_STATUSES, RetryPolicy, get_client
+
+
+class RateLimitBudget:
+    """Token bucket shared by every thread calling one Freshdesk account.
+    
+    Refills continuously at limit / window_seconds. Each response's X-RateLimit-Total
+    resizes the bucket and X-RateLimit-Remaining caps the tokens left, so requests made
+    by other clients of the same account are accounted for; requests still in flight
+    are not yet reflected in that header, so they are subtracted from it. A 429
+    empties the bucket and pauses all callers for Retry-After.
+    """
+    
+    def __init__(self, limit: int = 200, window_seconds: float = 60.0):
+        self.limit = limit
+        self.window_seconds = window_seconds
+        self.tokens = float(limit)
+        self.paused_until = 0.0
+        self.in_flight = 0
+        self.stats = {"acquired": 0, "waited_seconds": 0.0, "throttled": 0}
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def _refill(self, now: float) -> None:
+        rate = self.limit / self.window_seconds
+        self.tokens = min(float(self.limit), self.tokens + (now - self._updated) * rate)
+        self._updated = now
+    
+    def acquire(self) -> None:
+        """Block until a request may be sent, then take one token."""
+        started = time.monotonic()
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now >= self.paused_until and self.tokens >= 1:
+                    self.tokens -= 1
+                    self.in_flight += 1
+                    self.stats["acquired"] += 1
+                    self.stats["waited_seconds"] += now - started
+                    return
+                wait = max(
+                    self.paused_until - now,
+                    (1 - self.tokens) * self.window_seconds / self.limit
+                )
+            time.sleep(wait)
+    
+    def observe(self, headers) -> None:
+        """Finish an acquired request, syncing the bucket with its rate limit headers."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self.in_flight = max(0, self.in_flight - 1)
+            total = headers.get("X-RateLimit-Total")
+            if total and int(total) > 0:
+                self.limit = int(total)
+            remaining = headers.get("X-RateLimit-Remaining")
+            if remaining is not None:
+                self.tokens = min(self.tokens, float(remaining) - self.in_flight)
+    
+    def pause(self, seconds: float) -> None:
+        """Stop all callers for seconds after a 429."""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.tokens = 0.0
+            self.paused_until = max(self.paused_until, now + seconds)
+            self.stats["throttled"] += 1
 
 
 class FreshdeskAPI:
-    """Low-level Freshdesk API client."""
+    """Low-level Freshdesk API client.
     
-    def __init__(self):
-        self.api_key = get_env("FRESHDESK_API_KEY")
-        self.domain = get_env("FRESHDESK_DOMAIN")
+    Pass a shared RateLimitBudget when several threads call the same account, and
+    base_url to point the client at another host (e.g. a local stand-in). api_key
+    and domain default to FRESHDESK_API_KEY and FRESHDESK_DOMAIN.
+    """
+    
+    def __init__(self, rate_limit: Optional[RateLimitBudget] = None, base_url: Optional[str] = None,
+                 api_key: Optional[str] = None, domain: Optional[str] = None):
+        self.api_key = api_key or get_env("FRESHDESK_API_KEY")
+        self.domain = domain or get_env("FRESHDESK_DOMAIN")
         
         if not self.api_key or not self.domain:
-            raise ValueError("FRESHDESK_API_KEY and FRESHDESK_DOMAIN must be set")
+            raise ValueError("api_key and domain must be provided or FRESHDESK_API_KEY and FRESHDESK_DOMAIN set")
+        
+        # Accept "acme", "acme.freshdesk.com" or "https://acme.freshdesk.com"
+        self.domain = self.domain.replace("https://", "").replace("http://", "").removesuffix(".freshdesk.com")
         
-        self.base_url = f"https://{self.domain}.freshdesk.com/api/v2"
-        self.session = requests.Session()
-        self.session.auth = (self.api_key, "X")  # Freshdesk uses API key as username
-        self.session.headers.update({
+        self.base_url = base_url or f"https://{self.domain}.freshdesk.com/api/v2"
+        self.rate_limit = rate_limit
+        self.headers = {
             "Content-Type": "application/json",
             "Accept": "application/json"
-        })
+        }
+        self.auth = (self.api_key, "X")  # Freshdesk uses API key as username
+        # Shared keep-alive client for this account. It carries no credentials, so
+        # self.headers and self.auth go with every request. 429s are left to
+        # _handle_rate_limit so they pause the shared RateLimitBudget; the client
+        # only retries server errors.
+        self.http = get_client(
+            "freshdesk", self.domain,
+            retry=RetryPolicy.from_settings(retry_statuses=SERVER_ERROR_STATUSES)
+        )
     
     def _handle_rate_limit(self, response: requests.Response) -> None:
         """Handle rate limiting with exponential backoff."""
         if response.status_code == 429:
-            retry_after = int(response.headers.get("Retry-After", 60))
+            retry_after = float(response.headers.get("Retry-After", 60))
             print(f"Rate limited. Waiting {retry_after} seconds...")
-            time.sleep(retry_after)
+            if self.rate_limit:
+                # Pauses every thread sharing the budget; the retry waits in acquire()
+                self.rate_limit.pause(retry_after)
+            else:
+                time.sleep(retry_after)
     
     def _parse_link_header(self, link_header: str) -> Dict[str, str]:
         """Parse Link header for pagination."""
@@ -56,27 +145,35 @@ class FreshdeskAPI:
         """Make an API request with error handling."""
         url = f"{self.base_url}/{endpoint}"
         
-        response = self.session.request(
-            method=method,
-            url=url,
-            params=params,
-            json=json_data
-        )
+        response = self._send(method, url, params, json_data)
         
         # Handle rate limiting
         if response.status_code == 429:
             self._handle_rate_limit(response)
             # Retry the request
-            response = self.session.request(
-                method=method,
-                url=url,
-                params=params,
-                json=json_data
-            )
+            response = self._send(method, url, params, json_data)
         
         response.raise_for_status()
         return response
     
+    def _send(self, method: str, url: str, params: Optional[Dict], json_data: Optional[Dict]) -> requests.Response:
+        """Send one request, spending from the shared rate limit budget if set."""
+        if not self.rate_limit:
+            return self.http.request(
+                method=method, url=url, params=params, json=json_data, headers=self.headers, auth=self.auth
+            )
+        
+        self.rate_limit.acquire()
+        headers = {}
+        try:
+            response = self.http.request(
+                method=method, url=url, params=params, json=json_data, headers=self.headers, auth=self.auth
+            )
+            headers = response.headers
+            return response
+        finally:
+            self.rate_limit.observe(headers)
+    
     def get_tickets(self, updated_since: Optional[str] = None, page: int = 1,
                    per_page: int = 100, include: Optional[str] = None) -> Tuple[List[Dict], Optional[str]]:
         """
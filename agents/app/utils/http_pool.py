@@ -0,0 +1,298 @@
+"""Process-wide pooled HTTP clients for provider APIs.
+
+One client per (provider, shop) is shared by every caller in the process, so agent
+tool calls and sync jobs reuse keep-alive connections instead of paying for a new TLS
+handshake each time. Each client:
+
+- keeps up to max_connections pooled connections to its host and never has more than
+  that many requests in flight; callers beyond the cap wait for a slot;
+- retries connection errors and retryable statuses (429, 5xx) with jittered
+  exponential backoff, sleeping for the server's Retry-After instead when it sends one.
+  Only idempotent requests are retried that way: a POST that reached the server may
+  have taken effect (e.g. a GraphQL mutation), so it is retried on 429 alone unless
+  the caller passes idempotent=True.
+
+Clients hold no credentials: callers pass their own headers and auth with every
+request, so callers using different credentials for the same shop never share them.
+
+get_client() returns the requests-based client used by the synchronous API wrappers.
+get_async_client() returns an httpx-based client for code running on the FastAPI event
+loop; it negotiates HTTP/2 when HTTP_POOL_HTTP2 is on and the optional h2 package is
+installed (requests only speaks HTTP/1.1).
+"""
+
+import asyncio
+import random
+import threading
+import time
+import weakref
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Optional, Tuple
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+from shared.logging_config import get_logger
+from app.config import settings
+
+logger = get_logger(__name__)
+
+
+# Statuses worth retrying: rate limits and transient server/gateway errors
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+SERVER_ERROR_STATUSES = (500, 502, 503, 504)
+
+# Methods safe to resend after a connection error or server error
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date)."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """When and how long to back off between attempts."""
+
+    max_retries: int = 3
+    backoff_base: float = 0.5
+    backoff_max: float = 30.0
+    retry_statuses: Tuple[int, ...] = RETRY_STATUSES
+
+    @classmethod
+    def from_settings(cls, retry_statuses: Tuple[int, ...] = RETRY_STATUSES) -> "RetryPolicy":
+        return cls(
+            max_retries=settings.http_max_retries,
+            backoff_base=settings.http_backoff_base,
+            backoff_max=settings.http_backoff_max,
+            retry_statuses=retry_statuses,
+        )
+
+    def delay(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        """Seconds before retry number attempt + 1.
+
+        Honors Retry-After when present; otherwise full jitter over an exponentially
+        growing window, so clients retrying together spread out.
+        """
+        server_delay = parse_retry_after(retry_after)
+        if server_delay is not None:
+            return server_delay
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def retries_status(self, status_code: int, idempotent: bool) -> bool:
+        """Whether a response status is retried; a 429 was rejected unprocessed, so it always is."""
+        return status_code in self.retry_statuses and (idempotent or status_code == 429)
+
+
+def is_idempotent(method: str, idempotent: Optional[bool] = None) -> bool:
+    """idempotent when given, otherwise whether method is safe to resend."""
+    return method.upper() in IDEMPOTENT_METHODS if idempotent is None else idempotent
+
+
+class PooledClient:
+    """Keep-alive requests session for one provider host with a concurrency cap and retries."""
+
+    def __init__(self, provider: str, shop: str, max_connections: Optional[int] = None,
+                 retry: Optional[RetryPolicy] = None):
+        self.provider = provider
+        self.shop = shop
+        self.max_connections = max_connections or settings.http_pool_max_connections
+        self.retry = retry or RetryPolicy.from_settings()
+        self.stats = {"requests": 0, "retries": 0}
+        self._stats_lock = threading.Lock()
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.max_connections)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self._slots = threading.BoundedSemaphore(self.max_connections)
+
+    def request(self, method: str, url: str, timeout: float = 30.0, idempotent: Optional[bool] = None,
+                **kwargs: Any) -> requests.Response:
+        """Send a request, retrying retryable failures. Returns the last response.
+
+        Args:
+            idempotent: Whether the request is safe to resend after a connection or
+                server error; defaults to True for GET, HEAD, OPTIONS, PUT and DELETE
+        """
+        idempotent = is_idempotent(method, idempotent)
+        attempt = 0
+        while True:
+            try:
+                with self._slots:
+                    with self._stats_lock:
+                        self.stats["requests"] += 1
+                    response = self.session.request(method, url, timeout=timeout, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                if not idempotent or attempt >= self.retry.max_retries:
+                    raise
+                delay = self.retry.delay(attempt)
+                logger.warning(f"[HTTP_POOL] {self.provider}:{self.shop} {method} failed ({e}), retrying in {delay:.2f}s")
+            else:
+                if not self.retry.retries_status(response.status_code, idempotent) or attempt >= self.retry.max_retries:
+                    return response
+                delay = self.retry.delay(attempt, response.headers.get("Retry-After"))
+                response.close()
+                logger.warning(
+                    f"[HTTP_POOL] {self.provider}:{self.shop} {method} got {response.status_code}, "
+                    f"retrying in {delay:.2f}s"
+                )
+            with self._stats_lock:
+                self.stats["retries"] += 1
+            attempt += 1
+            time.sleep(delay)
+
+    def get(self, url: str, **kwargs: Any) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs: Any) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+    def close(self) -> None:
+        self.session.close()
+
+
+class AsyncPooledClient:
+    """httpx.AsyncClient for one provider host with a concurrency cap and retries."""
+
+    def __init__(self, provider: str, shop: str, max_connections: Optional[int] = None,
+                 retry: Optional[RetryPolicy] = None, http2: Optional[bool] = None):
+        self.provider = provider
+        self.shop = shop
+        self.max_connections = max_connections or settings.http_pool_max_connections
+        self.retry = retry or RetryPolicy.from_settings()
+        self.stats = {"requests": 0, "retries": 0}
+
+        http2 = settings.http_pool_http2 if http2 is None else http2
+        if http2 and not _http2_available():
+            logger.warning("[HTTP_POOL] HTTP/2 requested but the h2 package is not installed, using HTTP/1.1")
+            http2 = False
+        self.http2 = http2
+        self.client = httpx.AsyncClient(
+            http2=http2,
+            limits=httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_connections,
+            ),
+            timeout=30.0,
+        )
+        self._slots = asyncio.Semaphore(self.max_connections)
+
+    async def request(self, method: str, url: str, idempotent: Optional[bool] = None,
+                      **kwargs: Any) -> httpx.Response:
+        """Send a request, retrying retryable failures. Returns the last response.
+
+        Args:
+            idempotent: As for PooledClient.request()
+        """
+        idempotent = is_idempotent(method, idempotent)
+        attempt = 0
+        while True:
+            try:
+                async with self._slots:
+                    self.stats["requests"] += 1
+                    response = await self.client.request(method, url, **kwargs)
+            except httpx.TransportError as e:
+                if not idempotent or attempt >= self.retry.max_retries:
+                    raise
+                delay = self.retry.delay(attempt)
+                logger.warning(f"[HTTP_POOL] {self.provider}:{self.shop} {method} failed ({e}), retrying in {delay:.2f}s")
+            else:
+                if not self.retry.retries_status(response.status_code, idempotent) or attempt >= self.retry.max_retries:
+                    return response
+                delay = self.retry.delay(attempt, response.headers.get("Retry-After"))
+                logger.warning(
+                    f"[HTTP_POOL] {self.provider}:{self.shop} {method} got {response.status_code}, "
+                    f"retrying in {delay:.2f}s"
+                )
+            self.stats["retries"] += 1
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    async def get(self, url: str, **kwargs: Any) -> httpx.Response:
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs: Any) -> httpx.Response:
+        return await self.request("POST", url, **kwargs)
+
+    async def aclose(self) -> None:
+        await self.client.aclose()
+
+
+_clients: Dict[Tuple[str, str], PooledClient] = {}
+# Async clients are bound to the loop they first ran on, so each loop gets its own
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Tuple[str, str], AsyncPooledClient]]" = (
+    weakref.WeakKeyDictionary()
+)
+_registry_lock = threading.Lock()
+
+
+def get_client(provider: str, shop: str, max_connections: Optional[int] = None,
+               retry: Optional[RetryPolicy] = None) -> PooledClient:
+    """Shared client for (provider, shop), created on first use.
+
+    The client is shared by callers holding different credentials, so it carries none:
+    pass headers and auth with each request. max_connections and retry only apply when
+    the client is created.
+    """
+    key = (provider, shop)
+    with _registry_lock:
+        client = _clients.get(key)
+        if client is None:
+            client = _clients[key] = PooledClient(provider, shop, max_connections, retry)
+            logger.info(f"[HTTP_POOL] Created {provider}:{shop} client ({client.max_connections} connections)")
+    return client
+
+
+def get_async_client(provider: str, shop: str, max_connections: Optional[int] = None,
+                     retry: Optional[RetryPolicy] = None, http2: Optional[bool] = None) -> AsyncPooledClient:
+    """Shared async client for (provider, shop) on the running event loop; like get_client(), it carries no credentials."""
+    loop = asyncio.get_running_loop()
+    key = (provider, shop)
+    with _registry_lock:
+        clients = _async_clients.setdefault(loop, {})
+        client = clients.get(key)
+        if client is None:
+            client = clients[key] = AsyncPooledClient(provider, shop, max_connections, retry, http2)
+            logger.info(
+                f"[HTTP_POOL] Created async {provider}:{shop} client "
+                f"({client.max_connections} connections, http2={client.http2})"
+            )
+    return client
+
+
+def close_clients() -> None:
+    """Close and forget every synchronous client (e.g. at shutdown or between tests)."""
+    with _registry_lock:
+        clients = list(_clients.values())
+        _clients.clear()
+    for client in clients:
+        client.close()
+
+
+async def aclose_clients() -> None:
+    """Close and forget the running loop's async clients."""
+    with _registry_lock:
+        clients = list(_async_clients.pop(asyncio.get_running_loop(), {}).values())
+    for client in clients:
+        await client.aclose()
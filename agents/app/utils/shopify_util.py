@@ -5,15 +5,20 @@ This module provides both REST and GraphQL clients for Shopify API v2025-01.
 - ShopifyGraphQL: GraphQL client optimized for quick insights
 """
 
+import asyncio
 import os
+import re
+import threading
 import time
 import json
-from typing import Dict, Any, Optional, List, Tuple
+from typing import Dict, Any, Optional, List, Tuple, Iterator
+import httpx
 import requests
 from urllib.parse import urlparse, parse_qs
 
 # Use centralized config - no direct load_dotenv!
 from shared.env_loader import get_env
+from app.utils.http_pool import get_async_client, get_client
 
 
 class ShopifyAPI:
@@ -31,21 +36,17 @@ class ShopifyAPI:
         self.shop_domain = self.shop_domain.replace("https://", "").replace("http://", "")
         
         self.base_url = f"https://{self.shop_domain}/admin/api/2025-01"
-        self.session = requests.Session()
-        self.session.headers.update({
+        self.headers = {
             "X-Shopify-Access-Token": self.api_token,
             "Content-Type": "application/json",
             "Accept": "application/json"
-        })
+        }
+        # Shared keep-alive client for this shop; retries 429s after Retry-After.
+        # It carries no credentials, so self.headers goes with every request.
+        self.http = get_client("shopify", self.shop_domain)
     
     def _handle_rate_limit(self, response: requests.Response) -> None:
-        """Handle Shopify rate limiting."""
-        if response.status_code == 429:
-            retry_after = float(response.headers.get("Retry-After", 2.0))
-            print(f"Rate limited. Waiting {retry_after} seconds...")
-            time.sleep(retry_after)
-        
-        # Also check the rate limit headers
+        """Slow down when the REST call limit is nearly used up (429s are retried by the pooled client)."""
         rate_limit = response.headers.get("X-Shopify-Shop-Api-Call-Limit")
         if rate_limit:
             current, limit = map(int, rate_limit.split("/"))
@@ -79,25 +80,17 @@ class ShopifyAPI:
         """Make an API request with error handling."""
         url = f"{self.base_url}/{endpoint}"
         
-        response = self.session.request(
+        response = self.http.request(
             method=method,
             url=url,
             params=params,
-            json=json_data
+            json=json_data,
+            headers=self.headers
         )
         
         # Handle rate limiting
         self._handle_rate_limit(response)
         
-        if response.status_code == 429:
-            # Retry the request
-            response = self.session.request(
-                method=method,
-                url=url,
-                params=params,
-                json=json_data
-            )
-        
         response.raise_for_status()
         return response
     
@@ -225,60 +218,224 @@ class ShopifyAPI:
             return False
 
 
+# Reserved for a query whose requestedQueryCost has not been seen yet
+DEFAULT_QUERY_COST = 50.0
+
+# Times a query answered with a THROTTLED error is retried once the budget refills
+THROTTLED_RETRIES = 3
+
+# How often queries queued behind the first one check whether its cost has arrived
+_PROBE_POLL_SECONDS = 0.01
+
+# Refill left unspent as headroom, since a query reaches Shopify a little after it is
+# admitted here and Shopify's bucket may have refilled less by then
+_ARRIVAL_SLACK_SECONDS = 0.02
+
+
+class QueryCostBudget:
+    """Leaky bucket mirroring one shop's GraphQL cost limit.
+    
+    Shopify drains a per-shop bucket by each query's cost and refills it at
+    restoreRate points per second, reporting the result as extensions.cost on every
+    response. Before a query is sent, its cost (the requestedQueryCost it had last
+    time, DEFAULT_QUERY_COST if it has not run yet) is reserved, waiting for the
+    bucket to refill if needed, so callers queue here instead of being throttled.
+    Each response's throttleStatus caps the bucket; queries still in flight are not
+    reflected in it yet, so their reservations are subtracted from it. Until the
+    first throttleStatus arrives the shop's real limit is unknown, so only one query
+    is sent at a time.
+    """
+    
+    def __init__(self, maximum_available: float = 1000.0, restore_rate: float = 50.0):
+        self.maximum_available = maximum_available
+        self.restore_rate = restore_rate
+        self.available = maximum_available
+        self.in_flight_cost = 0.0
+        self.costs: Dict[str, float] = {}  # requestedQueryCost last seen per query text
+        self.synced = False  # Whether a throttleStatus has been seen
+        self.stats = {"queries": 0, "delayed": 0, "waited_seconds": 0.0, "throttled": 0}
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def _refill(self, now: float) -> None:
+        self.available = min(self.maximum_available, self.available + (now - self._updated) * self.restore_rate)
+        self._updated = now
+    
+    def _reserve(self, query: str) -> Tuple[float, float]:
+        """(cost, wait): reserves cost when wait is 0, otherwise seconds until it fits."""
+        with self._lock:
+            self._refill(time.monotonic())
+            cost = min(self.costs.get(query, DEFAULT_QUERY_COST), self.maximum_available)
+            if not self.synced and self.in_flight_cost:
+                return cost, _PROBE_POLL_SECONDS
+            needed = min(cost + self.restore_rate * _ARRIVAL_SLACK_SECONDS, self.maximum_available)
+            if self.available >= needed:
+                self.available -= cost
+                self.in_flight_cost += cost
+                self.stats["queries"] += 1
+                return cost, 0.0
+            return cost, (needed - self.available) / self.restore_rate
+    
+    def _record_wait(self, waited: float) -> None:
+        with self._lock:
+            self.stats["delayed"] += 1
+            self.stats["waited_seconds"] += waited
+    
+    def acquire(self, query: str) -> float:
+        """Block until the query's estimated cost fits, reserve it and return it."""
+        started = time.monotonic()
+        delayed = False
+        while True:
+            cost, wait = self._reserve(query)
+            if not wait:
+                if delayed:
+                    self._record_wait(time.monotonic() - started)
+                return cost
+            delayed = True
+            time.sleep(wait)
+    
+    async def acquire_async(self, query: str) -> float:
+        """acquire() for async callers; waits without blocking the event loop."""
+        started = time.monotonic()
+        delayed = False
+        while True:
+            cost, wait = self._reserve(query)
+            if not wait:
+                if delayed:
+                    self._record_wait(time.monotonic() - started)
+                return cost
+            delayed = True
+            await asyncio.sleep(wait)
+    
+    def observe(self, query: str, reserved: float, extensions: Optional[Dict[str, Any]]) -> None:
+        """Release a reservation and resync the bucket with a response's extensions.cost."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self.in_flight_cost = max(0.0, self.in_flight_cost - reserved)
+            cost = (extensions or {}).get("cost")
+            if not cost:
+                # No cost reported (transport or HTTP error): hand the reservation back
+                self.available = min(self.maximum_available, self.available + reserved)
+                return
+            
+            if cost.get("requestedQueryCost") is not None:
+                self.costs[query] = float(cost["requestedQueryCost"])
+            if cost.get("actualQueryCost") is None:
+                self.stats["throttled"] += 1
+            status = cost.get("throttleStatus")
+            if status:
+                self.maximum_available = float(status.get("maximumAvailable", self.maximum_available))
+                self.restore_rate = float(status.get("restoreRate", self.restore_rate))
+                # Responses can arrive out of order, so a report only ever lowers the bucket
+                self.available = max(0.0, min(
+                    self.available,
+                    self.maximum_available,
+                    float(status["currentlyAvailable"]) - self.in_flight_cost
+                ))
+                self.synced = True
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """Remaining budget, for callers deciding whether to issue more queries now."""
+        with self._lock:
+            self._refill(time.monotonic())
+            return {
+                "currently_available": round(self.available, 1),
+                "maximum_available": self.maximum_available,
+                "restore_rate": self.restore_rate,
+                "in_flight_cost": round(self.in_flight_cost, 1),
+                "seconds_until_full": round((self.maximum_available - self.available) / self.restore_rate, 1),
+                **self.stats,
+            }
+
+
+_cost_budgets: Dict[str, QueryCostBudget] = {}
+_cost_budgets_lock = threading.Lock()
+
+
+def get_cost_budget(shop_domain: str) -> QueryCostBudget:
+    """The process-wide cost budget for a shop, shared by all its GraphQL clients."""
+    with _cost_budgets_lock:
+        if shop_domain not in _cost_budgets:
+            _cost_budgets[shop_domain] = QueryCostBudget()
+        return _cost_budgets[shop_domain]
+
+
+def _is_mutation(query: str) -> bool:
+    """Whether a GraphQL document is a mutation, which must not be resent after a failure."""
+    return re.match(r"\s*mutation\b", re.sub(r"#[^\n]*", "", query)) is not None
+
+
+def _is_throttled(result: Dict[str, Any]) -> bool:
+    return any(
+        error.get("extensions", {}).get("code") == "THROTTLED"
+        for error in result.get("errors", [])
+    )
+
+
+# Bulk operation states after which polling stops
+BULK_OPERATION_FINAL_STATES = {"COMPLETED", "FAILED", "CANCELED", "EXPIRED"}
+
+
+class BulkOperationError(Exception):
+    """Raised when a bulk operation cannot be started or does not complete."""
+
+
 class ShopifyGraphQL:
-    """Minimal GraphQL client for quick insights."""
+    """Minimal GraphQL client for quick insights and bulk operations."""
     
-    def __init__(self, shop_domain: str, access_token: str):
+    def __init__(self, shop_domain: str, access_token: str, endpoint: Optional[str] = None):
         self.shop_domain = shop_domain.replace("https://", "").replace("http://", "")
         self.access_token = access_token
         # Using the latest stable API version (2025-01)
-        self.endpoint = f"https://{self.shop_domain}/admin/api/2025-01/graphql.json"
-        
-        self.session = requests.Session()
-        self.session.headers.update({
+        self.endpoint = endpoint or f"https://{self.shop_domain}/admin/api/2025-01/graphql.json"
+        self.headers = {
             "X-Shopify-Access-Token": self.access_token,
             "Content-Type": "application/json"  # Required for 2025-01
-        })
+        }
+        
+        # Shared keep-alive client for this shop; retries 429s after Retry-After.
+        # It carries no credentials, so self.headers goes with every request.
+        self.http = get_client("shopify", self.shop_domain)
+        # Query cost budget shared by every client of this shop
+        self.cost_budget = get_cost_budget(self.shop_domain)
     
     def execute(self, query: str, variables: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
-        """Execute a GraphQL query with comprehensive error handling."""
+        """Execute a GraphQL query with comprehensive error handling.
+        
+        Waits for the shop's cost budget before sending, and retries THROTTLED
+        responses once the budget has refilled.
+        """
         payload = {"query": query}
         if variables:
             payload["variables"] = variables
         
         try:
-            response = self.session.post(self.endpoint, json=payload)
-            
-            # Handle rate limiting
-            if response.status_code == 429:
-                retry_after = float(response.headers.get("Retry-After", 2.0))
-                print(f"Rate limited. Waiting {retry_after} seconds...")
-                time.sleep(retry_after)
-                # Retry the request
-                response = self.session.post(self.endpoint, json=payload)
-            
-            # Handle authentication errors
-            if response.status_code == 401:
-                raise Exception("Authentication failed. Access token may be invalid or expired.")
-            
-            # Handle other HTTP errors
-            response.raise_for_status()
-            
-            result = response.json()
-            
-            # Handle GraphQL errors
-            if "errors" in result:
-                error_messages = []
-                for error in result['errors']:
-                    msg = error.get('message', 'Unknown error')
-                    if 'extensions' in error:
-                        code = error['extensions'].get('code', '')
-                        if code:
-                            msg = f"{msg} (code: {code})"
-                    error_messages.append(msg)
-                raise Exception(f"GraphQL errors: {'; '.join(error_messages)}")
+            for attempt in range(THROTTLED_RETRIES + 1):
+                reserved = self.cost_budget.acquire(query)
+                extensions = None
+                try:
+                    # Queries are reads and safe to resend; mutations (e.g. bulkOperationRunQuery) are not
+                    response = self.http.post(
+                        self.endpoint, json=payload, headers=self.headers, idempotent=not _is_mutation(query)
+                    )
+                    
+                    # Handle authentication errors
+                    if response.status_code == 401:
+                        raise Exception("Authentication failed. Access token may be invalid or expired.")
+                    
+                    # Handle other HTTP errors
+                    response.raise_for_status()
+                    
+                    result = response.json()
+                    extensions = result.get("extensions")
+                finally:
+                    self.cost_budget.observe(query, reserved, extensions)
                 
-            return result.get("data", {})
+                if not _is_throttled(result) or attempt == THROTTLED_RETRIES:
+                    break
+                print("Query throttled. Waiting for the cost budget to refill...")
+            
+            return self._parse_result(result)
             
         except requests.exceptions.ConnectionError:
             raise Exception(f"Failed to connect to Shopify API at {self.endpoint}")
@@ -287,6 +444,133 @@ class ShopifyGraphQL:
         except requests.exceptions.RequestException as e:
             raise Exception(f"Request failed: {str(e)}")
     
+    async def execute_async(self, query: str, variables: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Execute a GraphQL query from async code on the shop's pooled async client."""
+        payload = {"query": query}
+        if variables:
+            payload["variables"] = variables
+        
+        client = get_async_client("shopify", self.shop_domain)
+        try:
+            for attempt in range(THROTTLED_RETRIES + 1):
+                reserved = await self.cost_budget.acquire_async(query)
+                extensions = None
+                try:
+                    response = await client.post(
+                        self.endpoint, json=payload, headers=self.headers, idempotent=not _is_mutation(query)
+                    )
+                    
+                    # Handle authentication errors
+                    if response.status_code == 401:
+                        raise Exception("Authentication failed. Access token may be invalid or expired.")
+                    
+                    # Handle other HTTP errors
+                    response.raise_for_status()
+                    
+                    result = response.json()
+                    extensions = result.get("extensions")
+                finally:
+                    self.cost_budget.observe(query, reserved, extensions)
+                
+                if not _is_throttled(result) or attempt == THROTTLED_RETRIES:
+                    break
+            
+            return self._parse_result(result)
+            
+        except httpx.ConnectError:
+            raise Exception(f"Failed to connect to Shopify API at {self.endpoint}")
+        except httpx.TimeoutException:
+            raise Exception("Request to Shopify API timed out")
+        except httpx.HTTPError as e:
+            raise Exception(f"Request failed: {str(e)}")
+    
+    def _parse_result(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        """Data of a GraphQL response, raising on GraphQL errors."""
+        if "errors" in result:
+            error_messages = []
+            for error in result['errors']:
+                msg = error.get('message', 'Unknown error')
+                if 'extensions' in error:
+                    code = error['extensions'].get('code', '')
+                    if code:
+                        msg = f"{msg} (code: {code})"
+                error_messages.append(msg)
+            raise Exception(f"GraphQL errors: {'; '.join(error_messages)}")
+        
+        return result.get("data", {})
+    
+    def run_bulk_query(self, query: str) -> Dict[str, Any]:
+        """Start a bulkOperationRunQuery and return the bulk operation (id, status)."""
+        mutation = """
+        mutation RunBulkQuery($query: String!) {
+          bulkOperationRunQuery(query: $query) {
+            bulkOperation {
+              id
+              status
+            }
+            userErrors {
+              field
+              message
+            }
+          }
+        }
+        """
+        result = self.execute(mutation, {"query": query})["bulkOperationRunQuery"]
+        if result.get("userErrors"):
+            messages = "; ".join(error.get("message", "Unknown error") for error in result["userErrors"])
+            raise BulkOperationError(f"Bulk query rejected: {messages}")
+        return result["bulkOperation"]
+    
+    def get_bulk_operation(self, operation_id: str) -> Dict[str, Any]:
+        """Current state of a bulk operation."""
+        query = """
+        query BulkOperationStatus($id: ID!) {
+          node(id: $id) {
+            ... on BulkOperation {
+              id
+              status
+              errorCode
+              objectCount
+              url
+              partialDataUrl
+            }
+          }
+        }
+        """
+        return self.execute(query, {"id": operation_id})["node"]
+    
+    def wait_for_bulk_operation(self, operation_id: str, poll_interval: float = 2.0,
+                                timeout: float = 3600.0) -> Dict[str, Any]:
+        """Poll a bulk operation until it finishes and return it.
+        
+        Raises:
+            BulkOperationError: if it fails, is canceled or expires, or the timeout passes
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            operation = self.get_bulk_operation(operation_id)
+            status = operation.get("status")
+            if status == "COMPLETED":
+                return operation
+            if status in BULK_OPERATION_FINAL_STATES:
+                raise BulkOperationError(
+                    f"Bulk operation {operation_id} {status.lower()} (error: {operation.get('errorCode')})"
+                )
+            if time.monotonic() >= deadline:
+                raise BulkOperationError(f"Bulk operation {operation_id} still {status} after {timeout}s")
+            time.sleep(poll_interval)
+    
+    def stream_bulk_results(self, url: str) -> Iterator[Dict[str, Any]]:
+        """Yield the objects of a bulk operation's JSONL result one line at a time.
+        
+        The result URL is pre-signed, so it is fetched without the Shopify token.
+        """
+        with requests.get(url, stream=True, timeout=60) as response:
+            response.raise_for_status()
+            for line in response.iter_lines():
+                if line:
+                    yield json.loads(line)
+    
     def get_store_pulse(self) -> Dict[str, Any]:
         """Get quick store overview in one query."""
         query = """
@@ -5,8 +5,12 @@ This module now delegates all functionality to the centralized `shared.database`
 module to ensure a single source of truth for database connections.
 """
 
+from shared.config_base import DatabasePoolConfig
+
 # Re-export all functions from the shared database utility
 from shared.database import (
+    configure_database_pool,
+    get_pool_metrics,
     get_connection_string,
     get_db_connection,
     execute_query,
@@ -16,7 +20,12 @@ from shared.database import (
     get_db_session,
 )
 
+# Pool tuned for this service: DB_POOL_* with AGENTS_DB_POOL_* overrides
+configure_database_pool(DatabasePoolConfig.for_service("agents"))
+
 __all__ = [
+    "configure_database_pool",
+    "get_pool_metrics",
     "get_connection_string",
     "get_db_connection",
     "execute_query",
@@ -0,0 +1,268 @@
+"""Process-wide cache of parsed YAML assets (prompts, workflows, universes, catalog).
+
+Loaders used to open and yaml.safe_load their files on every call, and the catalog
+routes, agent construction and cache warming call them per request. load_yaml()
+parses each file once per process and hands every caller the same read-only view:
+
+- entries are keyed on the resolved path and revalidated against the file's mtime
+  and size at most once per YAML_CACHE_CHECK_INTERVAL seconds, so an edited prompt
+  is picked up without a restart;
+- with YAML_CACHE_WATCH on and the optional watchdog package installed, a file
+  watcher (as in scripts/dev_watcher.py) invalidates entries on change and the
+  mtime checks are skipped for watched directories;
+- directory listings (glob results) are cached the same way, keyed on the
+  directory's mtime;
+- preload() parses every YAML file under the given directories at startup, so the
+  first request does not touch the parser.
+
+The views are dict/list subclasses that raise TypeError on mutation. thaw() (or
+copy.deepcopy) returns a mutable copy; dict.copy() gives a mutable top level.
+"""
+
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+import yaml
+
+from shared.logging_config import get_logger
+from app.config import settings
+
+logger = get_logger(__name__)
+
+PathLike = Union[str, Path]
+
+
+def _read_only(self, *args, **kwargs):
+    raise TypeError("Cached YAML content is read-only; use thaw() for a mutable copy")
+
+
+class FrozenDict(dict):
+    """Read-only dict view of cached YAML content."""
+
+    __slots__ = ()
+    __setitem__ = __delitem__ = __ior__ = _read_only
+    clear = pop = popitem = setdefault = update = _read_only
+
+    def __copy__(self) -> dict:
+        return dict(self)
+
+    def __deepcopy__(self, memo) -> dict:
+        return thaw(self)
+
+    def __reduce__(self):
+        return (dict, (dict(self),))
+
+
+class FrozenList(list):
+    """Read-only list view of cached YAML content."""
+
+    __slots__ = ()
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _read_only
+    append = extend = insert = remove = pop = clear = sort = reverse = _read_only
+
+    def __copy__(self) -> list:
+        return list(self)
+
+    def __deepcopy__(self, memo) -> list:
+        return thaw(self)
+
+    def __reduce__(self):
+        return (list, (list(self),))
+
+
+def freeze(value: Any) -> Any:
+    """Read-only view of parsed YAML."""
+    if isinstance(value, dict):
+        return FrozenDict((key, freeze(item)) for key, item in value.items())
+    if isinstance(value, list):
+        return FrozenList(freeze(item) for item in value)
+    return value
+
+
+def thaw(value: Any) -> Any:
+    """Mutable deep copy of a read-only view."""
+    if isinstance(value, dict):
+        return {key: thaw(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [thaw(item) for item in value]
+    return value
+
+
+def _signature(path: str) -> Tuple[int, int]:
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+class YamlCache:
+    """Parsed YAML files and directory listings, revalidated by mtime or a watcher."""
+
+    def __init__(self, check_interval: float = 1.0):
+        """
+        Args:
+            check_interval: Seconds between mtime checks of one cached path
+        """
+        self.check_interval = check_interval
+        # path -> (signature, last checked, frozen content)
+        self._files: Dict[str, Tuple[Tuple[int, int], float, Any]] = {}
+        # (directory, pattern) -> (directory mtime, last checked, sorted paths)
+        self._listings: Dict[Tuple[str, str], Tuple[int, float, Tuple[Path, ...]]] = {}
+        self._lock = threading.Lock()
+        self._watched: Tuple[str, ...] = ()
+        self._observer = None
+        self.stats = {"hits": 0, "misses": 0, "reloads": 0, "invalidations": 0}
+
+    def _is_fresh(self, path: str, checked_at: float) -> bool:
+        """Whether a cached entry can be returned without a stat call."""
+        if self._watched and path.startswith(self._watched):
+            return True
+        return time.monotonic() - checked_at < self.check_interval
+
+    def load(self, path: PathLike) -> Any:
+        """Parsed content of a YAML file as a read-only view.
+
+        Raises:
+            FileNotFoundError: The file does not exist
+        """
+        key = os.path.abspath(path)
+        with self._lock:
+            entry = self._files.get(key)
+            if entry is not None and self._is_fresh(key, entry[1]):
+                self.stats["hits"] += 1
+                return entry[2]
+
+        signature = _signature(key)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._files.get(key)
+            if entry is not None and entry[0] == signature:
+                self._files[key] = (signature, now, entry[2])
+                self.stats["hits"] += 1
+                return entry[2]
+
+        with open(key, "r") as f:
+            content = freeze(yaml.safe_load(f))
+        with self._lock:
+            self.stats["reloads" if entry is not None else "misses"] += 1
+            self._files[key] = (signature, now, content)
+        if entry is not None:
+            logger.info(f"[YAML_CACHE] Reloaded changed file {key}")
+        return content
+
+    def list_files(self, directory: PathLike, pattern: str = "*.yaml") -> List[Path]:
+        """Sorted paths in directory matching pattern; empty if the directory is missing."""
+        directory = os.path.abspath(directory)
+        key = (directory, pattern)
+        with self._lock:
+            entry = self._listings.get(key)
+            if entry is not None and self._is_fresh(directory, entry[1]):
+                return list(entry[2])
+
+        try:
+            mtime = os.stat(directory).st_mtime_ns
+        except FileNotFoundError:
+            return []
+        now = time.monotonic()
+        if entry is not None and entry[0] == mtime:
+            paths = entry[2]
+        else:
+            paths = tuple(sorted(Path(directory).glob(pattern)))
+        with self._lock:
+            self._listings[key] = (mtime, now, paths)
+        return list(paths)
+
+    def invalidate(self, path: Optional[PathLike] = None) -> None:
+        """Forget one file (and listings of its directory), or everything."""
+        with self._lock:
+            self.stats["invalidations"] += 1
+            if path is None:
+                self._files.clear()
+                self._listings.clear()
+                return
+            key = os.path.abspath(path)
+            self._files.pop(key, None)
+            parent = os.path.dirname(key)
+            for listing in [k for k in self._listings if k[0] in (key, parent)]:
+                del self._listings[listing]
+
+    def preload(self, directories: Iterable[PathLike]) -> int:
+        """Parse every YAML file under directories. Returns the number of files loaded."""
+        loaded = 0
+        started = time.perf_counter()
+        for directory in directories:
+            for path in sorted(Path(directory).rglob("*.yaml")):
+                try:
+                    self.load(path)
+                    loaded += 1
+                except (OSError, yaml.YAMLError) as e:
+                    logger.warning(f"[YAML_CACHE] Could not preload {path}: {e}")
+        logger.info(f"[YAML_CACHE] Preloaded {loaded} files in {(time.perf_counter() - started) * 1000:.0f}ms")
+        return loaded
+
+    def start_watcher(self, directories: Iterable[PathLike]) -> bool:
+        """Invalidate entries on file events instead of polling mtimes.
+
+        Returns False (and keeps polling) when the watchdog package is not installed.
+        """
+        try:
+            from watchdog.events import FileSystemEventHandler
+            from watchdog.observers import Observer
+        except ImportError:
+            logger.warning("[YAML_CACHE] watchdog is not installed, falling back to mtime checks")
+            return False
+
+        cache = self
+
+        class _Invalidate(FileSystemEventHandler):
+            def on_any_event(self, event):
+                for path in (event.src_path, getattr(event, "dest_path", None)):
+                    if path:
+                        cache.invalidate(path)
+
+        directories = [os.path.abspath(d) for d in directories if os.path.isdir(d)]
+        observer = Observer()
+        for directory in directories:
+            observer.schedule(_Invalidate(), directory, recursive=True)
+        observer.daemon = True
+        observer.start()
+        self._observer = observer
+        self._watched = tuple(os.path.join(d, "") for d in directories)
+        logger.info(f"[YAML_CACHE] Watching {len(directories)} directories for changes")
+        return True
+
+    def stop_watcher(self) -> None:
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join(timeout=5)
+            self._observer = None
+        self._watched = ()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Counters plus cache size, for health reporting."""
+        return {**self.stats, "files": len(self._files), "watching": bool(self._watched)}
+
+
+_cache: Optional[YamlCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_yaml_cache() -> YamlCache:
+    """Process-wide cache configured from settings."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = YamlCache(check_interval=settings.yaml_cache_check_interval)
+    return _cache
+
+
+def load_yaml(path: PathLike) -> Any:
+    """Parsed YAML file from the shared cache (read-only)."""
+    return get_yaml_cache().load(path)
+
+
+def list_yaml_files(directory: PathLike, pattern: str = "*.yaml") -> List[Path]:
+    """Sorted, cached directory listing."""
+    return get_yaml_cache().list_files(directory, pattern)
@@ -1,9 +1,10 @@
 """Loads workflow definitions from YAML files."""
 
-import yaml
 from pathlib import Path
 from typing import Dict, Any, List
 
+from app.utils.yaml_cache import list_yaml_files, load_yaml
+
 
 class WorkflowLoader:
     """Loads workflow definitions from YAML files."""
@@ -14,15 +15,11 @@ class WorkflowLoader:
 
     @property
     def workflows(self) -> Dict[str, Any]:
-        """Lazy load workflows from YAML files."""
+        """Workflows by name, read-only views from the shared YAML cache."""
         if self._workflows is None:
             self._workflows = {}
-            if self.workflows_path.exists():
-                for yaml_file in self.workflows_path.glob("*.yaml"):
-                    with open(yaml_file, "r") as f:
-                        workflow_data = yaml.safe_load(f)
-                        workflow_name = yaml_file.stem
-                        self._workflows[workflow_name] = workflow_data
+            for yaml_file in list_yaml_files(self.workflows_path):
+                self._workflows[yaml_file.stem] = load_yaml(yaml_file)
         return self._workflows
 
     def get_workflow(self, name: str) -> Dict[str, Any]:
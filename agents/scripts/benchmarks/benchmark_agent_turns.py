@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Load test: wall time of N concurrent CJ turns on one event loop.
+
+Runs N sessions through MessageProcessor.process_message at the same time, each
+sending one merchant message. The turn is a real crewai Crew with one agent; only
+the LLM is stubbed: litellm.completion sleeps for --llm-ms and returns a final
+answer, as a blocking provider call would. No API keys or database are needed.
+
+Modes:
+  - inline:   crew.kickoff() called directly on the event loop (previous behaviour)
+  - executor: turns run on the bounded agent executor
+
+With the executor, N sessions should finish in about one turn's latency (up to
+--workers sessions), where inline mode takes about N times as long.
+
+Usage:
+    python scripts/benchmarks/benchmark_agent_turns.py
+    python scripts/benchmarks/benchmark_agent_turns.py --sessions 16 --llm-ms 500 --workers 16
+"""
+
+import os
+import sys
+import argparse
+import asyncio
+import time
+from datetime import datetime
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.append(str(Path(__file__).parent.parent.parent))
+sys.path.append(str(Path(__file__).parent.parent.parent.parent))  # Add root directory for shared module
+
+# Keep crewai's first-run trace prompt and telemetry out of the measurement
+os.environ.setdefault("CREWAI_TESTING", "true")
+os.environ.setdefault("CREWAI_DISABLE_TELEMETRY", "true")
+
+import litellm
+from litellm import ModelResponse
+
+from app.agents.extended_agent import ExtendedAgent
+from app.models import Conversation
+from app.services import message_processor as message_processor_module
+from app.services.agent_executor import AgentTurnExecutor
+from app.services.message_processor import MessageProcessor
+from app.services.session_manager import Session
+
+
+class InlineExecutor:
+    """Previous behaviour: the turn runs on the event loop thread."""
+
+    async def run(self, session_id, fn, *args, **kwargs):
+        return fn(*args, **kwargs)
+
+
+def make_agent(**kwargs) -> ExtendedAgent:
+    return ExtendedAgent(
+        role="Customer support lead",
+        goal="Answer the merchant",
+        backstory="Benchmark agent",
+        llm="gpt-4o-mini",
+        allow_delegation=False,
+        verbose=False,
+    )
+
+
+def make_session(index: int) -> Session:
+    conversation = Conversation(
+        id=f"bench-{index}",
+        merchant_name="bench_merchant",
+        scenario_name="bench",
+        workflow="ad_hoc_support",
+        created_at=datetime.utcnow(),
+    )
+    session = Session(conversation=conversation)
+    session.agent_cache.get_agent = make_agent
+    return session
+
+
+async def run_mode(mode: str, args) -> dict:
+    def completion(**kwargs):
+        time.sleep(args.llm_ms / 1000)
+        return ModelResponse(
+            model="gpt-4o-mini",
+            choices=[{"message": {"role": "assistant", "content": "Thought: done\nFinal Answer: All set."}}],
+        )
+
+    executor = AgentTurnExecutor(max_workers=args.workers, max_pending=args.sessions * 2)
+    runner = InlineExecutor() if mode == "inline" else executor
+    processor = MessageProcessor()
+
+    with patch.object(litellm, "completion", completion), \
+            patch.object(message_processor_module, "get_agent_executor", lambda: runner), \
+            patch.object(message_processor_module, "logger"):
+        sessions = [make_session(i) for i in range(args.sessions)]
+        # Warm up crewai once so import and telemetry setup are not measured
+        await processor.process_message(make_session(-1), "warm up")
+
+        started = time.perf_counter()
+        await processor.process_message(sessions[0], "Where is my order?")
+        single_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        await asyncio.gather(*(processor.process_message(s, "Where is my order?") for s in sessions))
+        parallel_seconds = time.perf_counter() - started
+    executor.shutdown()
+
+    return {
+        "mode": mode,
+        "single_s": single_seconds,
+        "parallel_s": parallel_seconds,
+        "ratio": parallel_seconds / single_seconds,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent CJ turns with a stubbed LLM")
+    parser.add_argument("--sessions", type=int, default=8, help="Concurrent sessions")
+    parser.add_argument("--llm-ms", type=float, default=300.0, help="Simulated LLM latency per call")
+    parser.add_argument("--workers", type=int, default=8, help="Agent executor threads")
+    args = parser.parse_args()
+
+    print(f"{args.sessions} concurrent sessions, LLM {args.llm_ms}ms/call, {args.workers} workers")
+    print(f"{'mode':<10} {'1 turn s':>9} {'N turns s':>10} {'ratio':>7}")
+    for mode in ("inline", "executor"):
+        r = asyncio.run(run_mode(mode, args))
+        print(f"{r['mode']:<10} {r['single_s']:>9.2f} {r['parallel_s']:>10.2f} {r['ratio']:>6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
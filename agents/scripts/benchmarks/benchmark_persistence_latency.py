@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Load test: chat response latency while fact persistence runs in the background.
+
+Simulates N concurrent WebSocket sessions on one event loop. Each session sends
+merchant messages; the reply is an awaited stand-in for the CJ call, and every
+message also schedules FactExtractor.extract_and_add_facts in the background
+exactly as MessageProcessor does. The identity DB helpers are replaced with
+time.sleep() of --db-ms so no database is needed, and the LLM is a stubbed
+awaitable.
+
+Modes:
+  - inline:   blocking DB helpers called directly on the event loop (previous behaviour)
+  - executor: DB helpers go through the bounded persistence executor
+
+Usage:
+    python scripts/benchmarks/benchmark_persistence_latency.py
+    python scripts/benchmarks/benchmark_persistence_latency.py --sessions 200 --messages 5 --db-ms 20
+"""
+
+import sys
+import argparse
+import asyncio
+import json
+import random
+import time
+from datetime import datetime
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import patch
+
+sys.path.append(str(Path(__file__).parent.parent.parent))
+sys.path.append(str(Path(__file__).parent.parent.parent.parent))  # Add root directory for shared module
+
+import numpy as np
+
+from app.models import Conversation, Message
+from app.services import fact_extractor as fact_extractor_module
+from app.services.fact_extractor import FactExtractor
+from app.services.persistence_executor import PersistenceExecutor
+
+
+async def run_inline(fn, *args, **kwargs):
+    """Previous behaviour: the blocking call runs on the event loop thread."""
+    return fn(*args, **kwargs)
+
+
+async def session(extractor: FactExtractor, index: int, args, latencies: list, background: set):
+    """One chat session: send, await the reply, schedule fact extraction."""
+    conversation = Conversation(
+        id=f"bench-{index}",
+        merchant_name="bench_merchant",
+        scenario_name="bench",
+        created_at=datetime.utcnow(),
+    )
+    await asyncio.sleep(random.uniform(0, args.think_ms / 1000))
+    for turn in range(args.messages):
+        conversation.messages.append(
+            Message(timestamp=datetime.utcnow(), sender="merchant", content=f"message {turn}")
+        )
+        sent = time.perf_counter()
+        task = asyncio.create_task(
+            extractor.extract_and_add_facts(conversation, f"user_{index}", last_n_messages=4)
+        )
+        background.add(task)
+        task.add_done_callback(background.discard)
+        await asyncio.sleep(args.reply_ms / 1000)  # Stand-in for the CJ response
+        latencies.append((time.perf_counter() - sent) * 1000)
+        await asyncio.sleep(random.uniform(0, args.think_ms / 1000))
+
+
+async def run_mode(mode: str, args) -> dict:
+    def get_user_facts(user_id):
+        time.sleep(args.db_ms / 1000)
+        return [{"fact": "Existing fact"}]
+
+    def append_fact(user_id, fact, source):
+        time.sleep(args.db_ms / 1000)
+
+    async def acompletion(**kwargs):
+        await asyncio.sleep(args.llm_ms / 1000)
+        return SimpleNamespace(choices=[SimpleNamespace(
+            message=SimpleNamespace(content=json.dumps({"facts": ["Fact A", "Fact B"]}))
+        )])
+
+    executor = PersistenceExecutor(max_workers=args.workers, max_pending=args.max_pending)
+    runner = run_inline if mode == "inline" else executor.run
+
+    latencies: list = []
+    background: set = set()
+    with patch.object(fact_extractor_module, "get_user_facts", get_user_facts), \
+            patch.object(fact_extractor_module, "append_fact", append_fact), \
+            patch.object(fact_extractor_module, "run_blocking", runner), \
+            patch.object(fact_extractor_module.litellm, "acompletion", acompletion), \
+            patch.object(fact_extractor_module, "logger"):
+        extractor = FactExtractor()
+        started = time.perf_counter()
+        await asyncio.gather(*(session(extractor, i, args, latencies, background) for i in range(args.sessions)))
+        chat_seconds = time.perf_counter() - started
+        await asyncio.gather(*background, return_exceptions=True)
+        drain_seconds = time.perf_counter() - started
+    executor.shutdown()
+
+    values = np.array(latencies)
+    return {
+        "mode": mode,
+        "replies": len(values),
+        "p50_ms": float(np.percentile(values, 50)),
+        "p99_ms": float(np.percentile(values, 99)),
+        "max_ms": float(values.max()),
+        "chat_s": chat_seconds,
+        "drain_s": drain_seconds,
+        "rejected": executor.stats["rejected"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Chat latency with background fact persistence")
+    parser.add_argument("--sessions", type=int, default=200, help="Concurrent sessions")
+    parser.add_argument("--messages", type=int, default=5, help="Messages per session")
+    parser.add_argument("--db-ms", type=float, default=20.0, help="Simulated DB round trip per call")
+    parser.add_argument("--llm-ms", type=float, default=300.0, help="Simulated fact extraction LLM latency")
+    parser.add_argument("--reply-ms", type=float, default=500.0, help="Simulated CJ reply latency")
+    parser.add_argument("--think-ms", type=float, default=200.0, help="Max pause between messages")
+    parser.add_argument("--workers", type=int, default=4, help="Persistence executor threads")
+    parser.add_argument("--max-pending", type=int, default=2000, help="Persistence executor backlog limit")
+    args = parser.parse_args()
+
+    print(f"{args.sessions} sessions x {args.messages} messages, DB {args.db_ms}ms/call, reply {args.reply_ms}ms")
+    print(f"{'mode':<10} {'replies':>8} {'p50 ms':>9} {'p99 ms':>9} {'max ms':>9} {'chat s':>8} {'drain s':>8} {'rejected':>9}")
+    for mode in ("inline", "executor"):
+        random.seed(42)
+        r = asyncio.run(run_mode(mode, args))
+        print(f"{r['mode']:<10} {r['replies']:>8} {r['p50_ms']:>9.1f} {r['p99_ms']:>9.1f} {r['max_ms']:>9.1f} "
+              f"{r['chat_s']:>8.2f} {r['drain_s']:>8.2f} {r['rejected']:>9}")
+
+
+if __name__ == "__main__":
+    main()
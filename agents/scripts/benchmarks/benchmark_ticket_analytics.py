@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Benchmark the columnar TicketFrame analytics against the previous per-object loops.
+
+Generates synthetic tickets (no database needed) and times:
+  - legacy: Python loops over ticket objects, including the O(n²) outlier lookup
+  - frame:  FreshdeskAnalytics frame helpers on NumPy column arrays
+
+Usage:
+    python scripts/benchmarks/benchmark_ticket_analytics.py
+    python scripts/benchmarks/benchmark_ticket_analytics.py --sizes 10000 100000 1000000 --legacy-max 100000
+"""
+
+import sys
+import argparse
+import time
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.append(str(Path(__file__).parent.parent.parent))
+sys.path.append(str(Path(__file__).parent.parent.parent.parent))  # Add root directory for shared module
+
+import numpy as np
+
+from app.lib.freshdesk_analytics_lib import FreshdeskAnalytics
+from app.lib.ticket_frame import TicketFrame, daily_counts
+
+DAYS = 60
+
+
+def make_frame(n: int, seed: int = 42) -> TicketFrame:
+    """Build a synthetic frame shaped like a RESPONSE_TIME_COLUMNS extract."""
+    rng = np.random.default_rng(seed)
+    start_epoch = datetime.combine(date.today() - timedelta(days=DAYS), datetime.min.time()).replace(tzinfo=timezone.utc).timestamp()
+    created = start_epoch + rng.uniform(0, DAYS * 86400, n)
+    first_responded = created + rng.exponential(60 * 60, n)
+    first_responded[rng.random(n) < 0.2] = np.nan
+    resolved = created + rng.exponential(12 * 3600, n)
+    resolved[rng.random(n) < 0.4] = np.nan
+    has_rating = rng.random(n) < 0.3
+    rating_score = np.where(has_rating, rng.choice([103, 102, 101, 100, -101, -102, -103], n), np.nan)
+    ticket_ids = np.fromiter((str(100000 + i) for i in range(n)), dtype=object, count=n)
+    return TicketFrame({
+        "freshdesk_ticket_id": ticket_ids,
+        "created_at": created,
+        "first_responded_at": first_responded,
+        "resolved_at": resolved,
+        "has_rating": has_rating,
+        "rating_score": rating_score,
+    })
+
+
+def frame_to_objects(frame: TicketFrame) -> list:
+    """Hydrate per-ticket objects with datetimes, as the ORM used to."""
+    def as_datetime(epoch):
+        return None if np.isnan(epoch) else datetime.fromtimestamp(epoch, tz=timezone.utc)
+
+    return [
+        SimpleNamespace(
+            freshdesk_ticket_id=ticket_id,
+            created_at=as_datetime(created),
+            first_responded_at=as_datetime(first_responded),
+            resolved_at=as_datetime(resolved),
+            has_rating=bool(has_rating),
+            rating_score=None if np.isnan(score) else int(score),
+        )
+        for ticket_id, created, first_responded, resolved, has_rating, score in zip(
+            frame["freshdesk_ticket_id"], frame["created_at"], frame["first_responded_at"],
+            frame["resolved_at"], frame["has_rating"], frame["rating_score"]
+        )
+    ]
+
+
+def legacy_response_times(tickets: list) -> dict:
+    """The previous get_response_time_metrics core: loops plus O(n²) outlier lookup."""
+    first_response_times = []
+    tickets_with_times = []
+    for ticket in tickets:
+        ticket_data = {"ticket_id": int(ticket.freshdesk_ticket_id)}
+        if ticket.first_responded_at and ticket.created_at:
+            response_min = (ticket.first_responded_at - ticket.created_at).total_seconds() / 60
+            if response_min >= 0:
+                first_response_times.append(response_min)
+                ticket_data["first_response_min"] = response_min
+        if "first_response_min" in ticket_data:
+            tickets_with_times.append(ticket_data)
+
+    fr_array = np.array(first_response_times)
+    threshold = np.mean(fr_array) + 2 * np.std(fr_array)
+    outliers = []
+    for time_val in first_response_times:
+        if time_val > threshold:
+            for ticket_data in tickets_with_times:
+                if ticket_data.get("first_response_min") == time_val:
+                    outliers.append(ticket_data["ticket_id"])
+                    break
+    return {"median": float(np.median(fr_array)), "outliers": len(outliers)}
+
+
+def legacy_volume_trends(tickets: list, start_date: date) -> list:
+    """The previous get_volume_trends core: dict counting and list-slice rolling average."""
+    counts = {}
+    for ticket in tickets:
+        day = ticket.created_at.date()
+        counts[day] = counts.get(day, 0) + 1
+    volumes = [counts.get(start_date + timedelta(days=i), 0) for i in range(DAYS + 1)]
+    return [sum(volumes[max(0, i - 6):i + 1]) / len(volumes[max(0, i - 6):i + 1]) for i in range(len(volumes))]
+
+
+def timed(fn, *args):
+    started = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark vectorized ticket analytics")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument(
+        "--legacy-max",
+        type=int,
+        default=100_000,
+        help="Largest size to run the legacy O(n²) path on (default: 100000)"
+    )
+    args = parser.parse_args()
+
+    start_date = date.today() - timedelta(days=DAYS)
+    start_epoch = datetime.combine(start_date, datetime.min.time()).replace(tzinfo=timezone.utc).timestamp()
+
+    print(f"{'tickets':>10} | {'legacy (s)':>10} | {'frame (s)':>10} | {'speedup':>8}")
+    print("-" * 48)
+    for n in args.sizes:
+        frame = make_frame(n)
+
+        frame_time = timed(FreshdeskAnalytics._response_time_metrics_from_frame, frame)
+        frame_time += timed(
+            lambda: FreshdeskAnalytics._volume_trends_from_counts(
+                start_date, daily_counts(frame["created_at"], start_epoch, DAYS + 1)
+            )
+        )
+
+        if n <= args.legacy_max:
+            tickets = frame_to_objects(frame)
+            legacy_time = timed(legacy_response_times, tickets)
+            legacy_time += timed(legacy_volume_trends, tickets, start_date)
+            print(f"{n:>10,} | {legacy_time:>10.3f} | {frame_time:>10.3f} | {legacy_time / frame_time:>7.1f}x")
+        else:
+            print(f"{n:>10,} | {'skipped':>10} | {frame_time:>10.3f} | {'-':>8}")
+
+
+if __name__ == "__main__":
+    main()
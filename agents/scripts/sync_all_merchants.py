@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Sync every merchant with an active integration, in parallel.
+
+Runs one incremental sync per (merchant, provider) on a process pool, stalest
+merchants first, with per-provider concurrency limits and at most one job per
+merchant at a time. Freshdesk syncs resume from their checkpoints.
+
+Usage:
+    python scripts/sync_all_merchants.py
+    python scripts/sync_all_merchants.py --workers 8 --freshdesk-limit 3 --shopify-limit 4
+    python scripts/sync_all_merchants.py --provider freshdesk --dry-run
+"""
+
+import sys
+import argparse
+import json
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+sys.path.append(str(Path(__file__).parent.parent.parent))  # Add root directory for shared module
+
+from app.config import settings
+from app.utils.supabase_util import get_db_session
+from app.services.sync_scheduler import PROVIDER_RESOURCES, SyncScheduler, discover_sync_jobs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parallel sync for all merchants with active integrations")
+    parser.add_argument("--workers", type=int, default=settings.sync_max_workers, help="Worker processes")
+    parser.add_argument("--freshdesk-limit", type=int, default=settings.sync_freshdesk_concurrency,
+                        help="Freshdesk merchant syncs at once")
+    parser.add_argument("--shopify-limit", type=int, default=settings.sync_shopify_concurrency,
+                        help="Shopify merchant syncs at once")
+    parser.add_argument("--provider", choices=sorted(PROVIDER_RESOURCES), help="Only sync this provider")
+    parser.add_argument("--dry-run", action="store_true", help="Print the schedule order without syncing")
+    args = parser.parse_args()
+
+    with get_db_session() as session:
+        jobs = discover_sync_jobs(session)
+    if args.provider:
+        jobs = [job for job in jobs if job.provider == args.provider]
+
+    print(f"🗓️  {len(jobs)} sync jobs, stalest first:")
+    for job in jobs:
+        print(f"   {job.key:<40} last sync: {job.last_sync_at.isoformat() if job.last_sync_at else 'never'}")
+    if args.dry_run or not jobs:
+        return
+
+    scheduler = SyncScheduler(
+        max_workers=args.workers,
+        provider_limits={"freshdesk": args.freshdesk_limit, "shopify": args.shopify_limit},
+    )
+    finished = scheduler.run(jobs)
+
+    print("\n" + "=" * 60)
+    print("SYNC SUMMARY")
+    print("=" * 60)
+    for job in finished:
+        duration = job.finished_at - job.started_at
+        if job.error:
+            details = f"  {json.dumps(job.result)}" if job.result else ""
+            print(f"❌ {job.key:<40} {duration:7.1f}s  {job.error}{details}")
+        else:
+            print(f"✅ {job.key:<40} {duration:7.1f}s  {json.dumps(job.result)}")
+
+    metrics = scheduler.get_metrics()
+    print(f"\n📊 Completed: {metrics['completed']}, failed: {metrics['failed']}, "
+          f"window: {metrics['elapsed_seconds']}s")
+    sys.exit(1 if metrics["failed"] else 0)
+
+
+if __name__ == "__main__":
+    main()
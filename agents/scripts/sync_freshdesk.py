@@ -2,6 +2,10 @@
 """
 Refactored Freshdesk sync script with separate tables for tickets, conversations, and ratings.
 Supports syncing each component independently.
+
+Each committed page is checkpointed. If a run stops part way (crash, Ctrl-C, --max-pages),
+continue exactly where it stopped with:
+    python scripts/sync_freshdesk.py --merchant <name> --resume
 """
 
 import sys
@@ -13,7 +17,6 @@ sys.path.append(str(Path(__file__).parent.parent.parent))  # Add root directory
 
 from app.utils.supabase_util import get_db_session
 from app.dbmodels.base import Merchant
-from app.dbmodels.etl_tables import FreshdeskTicket, FreshdeskConversation, FreshdeskRating
 from app.lib.freshdesk_sync_lib import FreshdeskETL
 
 
@@ -43,6 +46,17 @@ def main():
         action="store_true",
         help="Force re-parsing of all parsed fields"
     )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue the last unfinished run from its checkpoint (ignores --days; "
+             "resources without a checkpoint sync incrementally from their watermark)"
+    )
+    parser.add_argument(
+        "--ratings-incremental",
+        action="store_true",
+        help="Only fetch ratings created since the last completed ratings sync"
+    )
     parser.add_argument(
         "--conversations-for",
         nargs="+",
@@ -51,8 +65,8 @@ def main():
     
     args = parser.parse_args()
     
-    # Calculate since date
-    since = datetime.now() - timedelta(days=args.days)
+    # Calculate since date; a resumed run takes it from the checkpoint instead
+    since = None if args.resume else datetime.now() - timedelta(days=args.days)
     
     # Get merchant
     with get_db_session() as session:
@@ -70,6 +84,8 @@ def main():
         print(f"   Limiting to {args.max_pages} pages per API")
     if args.force_reparse:
         print(f"   🔄 Force re-parsing enabled - will update all parsed fields")
+    if args.resume:
+        print(f"   ⏯️  Resuming from the last checkpoints")
     print()
     
     # Initialize ETL
@@ -81,6 +97,9 @@ def main():
     for resource, info in status.items():
         if info:
             print(f"   {resource}: {info['status']} (last: {info['last_sync']})")
+            if info.get('checkpoint'):
+                print(f"      checkpoint: page {info['checkpoint']['page']} "
+                      f"(saved {info['checkpoint']['saved_at']})")
     print()
     
     total_results = {
@@ -124,7 +143,8 @@ def main():
     result = etl.sync_tickets(
         since=since,
         max_pages=args.max_pages,
-        force_reparse=args.force_reparse
+        force_reparse=args.force_reparse,
+        resume=args.resume
     )
     
     if result['status'] in ['success', 'partial']:
@@ -154,12 +174,16 @@ def main():
     print("STEP 2: SYNCING SATISFACTION RATINGS")
     print("=" * 60)
     
-    print(f"   Fetching ALL satisfaction ratings from Freshdesk")
+    incremental = args.ratings_incremental or args.resume
+    if not incremental:
+        print(f"   Fetching ALL satisfaction ratings from Freshdesk")
     
     result = etl.sync_satisfaction_ratings(
-        since=None,  # Always get all ratings
+        since=None,  # All ratings, or those since the last watermark when incremental
         max_pages=args.max_pages,
-        force_reparse=args.force_reparse
+        force_reparse=args.force_reparse,
+        incremental=incremental,
+        resume=args.resume
     )
     
     if result['status'] == 'success':
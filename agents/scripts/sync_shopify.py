@@ -35,6 +35,11 @@ def main():
         action="store_true", 
         help="Sync orders"
     )
+    parser.add_argument(
+        "--bulk",
+        action="store_true",
+        help="Sync customers through a GraphQL bulk operation instead of REST pages"
+    )
     parser.add_argument(
         "--all",
         action="store_true",
@@ -95,7 +100,10 @@ def main():
         print("=" * 60)
         print("SYNCING CUSTOMERS")
         print("=" * 60)
-        results['customers'] = etl.sync_customers(since=since)
+        if args.bulk:
+            results['customers'] = etl.sync_customers_bulk(since=since)
+        else:
+            results['customers'] = etl.sync_customers(since=since)
         print()
     
     # Sync orders
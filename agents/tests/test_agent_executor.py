@@ -0,0 +1,198 @@
+"""Tests for the bounded agent turn executor."""
+
+import asyncio
+import sys
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from app.models import Conversation  # noqa: E402
+from app.services import message_processor as message_processor_module  # noqa: E402
+from app.services.agent_executor import AgentSaturatedError, AgentTurnExecutor  # noqa: E402
+from app.services.message_processor import MessageProcessor  # noqa: E402
+from app.services.session_manager import Session  # noqa: E402
+
+
+class RecordingTurn:
+    """Stand-in for a blocking agent turn that records order and overlap per session."""
+
+    def __init__(self, duration: float = 0.05):
+        self.duration = duration
+        self.started = []
+        self.running = set()
+        self.overlap = False
+        self.lock = threading.Lock()
+
+    def __call__(self, session_id: str, turn: int):
+        with self.lock:
+            self.started.append((session_id, turn))
+            self.overlap |= session_id in self.running
+            self.running.add(session_id)
+        time.sleep(self.duration)
+        with self.lock:
+            self.running.discard(session_id)
+        return turn
+
+
+class TestAgentTurnExecutor:
+    """Turns run off the loop, in order per session, within the limits."""
+
+    @pytest.mark.asyncio
+    async def test_runs_off_event_loop_thread(self):
+        executor = AgentTurnExecutor(max_workers=2)
+        try:
+            thread_name = await executor.run("s1", lambda: threading.current_thread().name)
+            assert thread_name.startswith("agent-turn")
+            assert executor.get_stats()["completed"] == 1
+        finally:
+            executor.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_sessions_run_in_parallel(self):
+        executor = AgentTurnExecutor(max_workers=8)
+        turn = RecordingTurn(duration=0.2)
+        try:
+            started = time.perf_counter()
+            await asyncio.gather(*(executor.run(f"s{i}", turn, f"s{i}", 0) for i in range(8)))
+            # Eight sequential turns would take 1.6s
+            assert time.perf_counter() - started < 0.4
+        finally:
+            executor.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_turns_of_one_session_run_in_order(self):
+        executor = AgentTurnExecutor(max_workers=4, max_pending_per_session=5)
+        turn = RecordingTurn()
+        try:
+            results = await asyncio.gather(*(executor.run("s1", turn, "s1", i) for i in range(4)))
+            assert results == [0, 1, 2, 3]
+            assert [n for _, n in turn.started] == [0, 1, 2, 3]
+            assert turn.overlap is False
+            assert executor.get_stats()["sessions"] == 0
+        finally:
+            executor.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_rejects_beyond_max_pending(self):
+        executor = AgentTurnExecutor(max_workers=1, max_pending=2)
+        try:
+            turns = [asyncio.create_task(executor.run(f"s{i}", time.sleep, 0.1)) for i in range(2)]
+            await asyncio.sleep(0)
+            with pytest.raises(AgentSaturatedError):
+                await executor.run("s3", time.sleep, 0)
+            await asyncio.gather(*turns)
+            assert executor.get_stats()["rejected"] == 1
+            assert executor.pending == 0
+        finally:
+            executor.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_rejects_beyond_session_limit(self):
+        executor = AgentTurnExecutor(max_workers=4, max_pending_per_session=2)
+        try:
+            turns = [asyncio.create_task(executor.run("busy", time.sleep, 0.1)) for _ in range(2)]
+            await asyncio.sleep(0)
+            with pytest.raises(AgentSaturatedError, match="busy"):
+                await executor.run("busy", time.sleep, 0)
+            # Other sessions are still admitted
+            await executor.run("quiet", time.sleep, 0)
+            await asyncio.gather(*turns)
+        finally:
+            executor.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_cancel_session_drops_queued_and_running_turns(self):
+        executor = AgentTurnExecutor(max_workers=2, max_pending_per_session=3)
+        turn = RecordingTurn(duration=0.2)
+        try:
+            turns = [asyncio.create_task(executor.run("gone", turn, "gone", i)) for i in range(3)]
+            await asyncio.sleep(0.05)
+
+            assert executor.cancel_session("gone") == 3
+            results = await asyncio.gather(*turns, return_exceptions=True)
+
+            assert all(isinstance(result, asyncio.CancelledError) for result in results)
+            # Only the turn that had reached a worker ran; the queued ones never started
+            assert turn.started == [("gone", 0)]
+            assert executor.get_stats()["cancelled"] == 3
+            # The worker is freed once the running turn's thread finishes
+            await asyncio.sleep(0.25)
+            assert executor.pending == 0
+            assert await executor.run("next", lambda: "ok") == "ok"
+        finally:
+            executor.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_propagates_errors(self):
+        executor = AgentTurnExecutor(max_workers=1)
+
+        def fail():
+            raise ValueError("llm down")
+
+        try:
+            with pytest.raises(ValueError):
+                await executor.run("s1", fail)
+            assert executor.get_stats()["failed"] == 1
+            assert executor.pending == 0
+        finally:
+            executor.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_submit_after_shutdown_releases_slots(self):
+        executor = AgentTurnExecutor(max_workers=1)
+        executor.shutdown()
+
+        for _ in range(2):
+            # A leaked session lock or worker slot would make the second call hang
+            with pytest.raises(RuntimeError):
+                await asyncio.wait_for(executor.run("s1", time.sleep, 0), timeout=1)
+
+        assert executor.pending == 0
+        assert executor.get_stats()["sessions"] == 0
+
+
+class TestMessageProcessorTurns:
+    """CJ turns go through the executor and leave the loop free."""
+
+    @pytest.mark.asyncio
+    async def test_kickoff_runs_on_agent_thread(self):
+        executor = AgentTurnExecutor(max_workers=2)
+        kickoff_threads = []
+
+        def kickoff():
+            kickoff_threads.append(threading.current_thread().name)
+            time.sleep(0.2)
+            return Mock(output="Happy to help")
+
+        conversation = Conversation(
+            id="conv-1",
+            merchant_name="test_merchant",
+            scenario_name="test_scenario",
+            workflow="ad_hoc_support",
+            created_at=datetime.utcnow(),
+        )
+        session = Session(conversation)
+
+        try:
+            with patch.object(session.agent_cache, "get_agent"), \
+                    patch.object(message_processor_module, "Task"), \
+                    patch.object(message_processor_module, "Crew") as crew, \
+                    patch.object(message_processor_module, "get_agent_executor", lambda: executor):
+                crew.return_value.kickoff.side_effect = kickoff
+                reply = asyncio.create_task(MessageProcessor().process_message(session, "Hi CJ"))
+
+                started = time.perf_counter()
+                await asyncio.sleep(0.01)
+                assert time.perf_counter() - started < 0.1
+                response = await reply
+
+            assert response["content"] == "Happy to help"
+            assert kickoff_threads[0].startswith("agent-turn")
+        finally:
+            executor.shutdown()
@@ -0,0 +1,116 @@
+"""Tests for reusing a session's CJ agent across turns."""
+
+import sys
+from datetime import datetime
+from pathlib import Path
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from app.agents.cj_agent import CJAgent, CJAgentCache  # noqa: E402
+from app.models import Conversation, ConversationState, Message  # noqa: E402
+from app.services.message_processor import MessageProcessor  # noqa: E402
+from app.services.session_manager import Session  # noqa: E402
+
+
+class RecordingFacts:
+    """Stand-in for get_user_facts that counts database reads."""
+
+    def __init__(self, facts):
+        self.facts = [{"fact": fact} for fact in facts]
+        self.calls = 0
+
+    def __call__(self, user_id):
+        self.calls += 1
+        return list(self.facts)
+
+
+@pytest.fixture
+def facts():
+    facts = RecordingFacts(["Sells hand-poured candles"])
+    # Grounding queries the knowledge service; it is covered by its own tests
+    with patch("shared.user_identity.get_user_facts", facts), \
+            patch.object(CJAgent, "_process_grounding", lambda self, content: content):
+        yield facts
+
+
+def _turn(cache: CJAgentCache, state: ConversationState, workflow: str = "ad_hoc_support"):
+    return cache.get_agent(
+        merchant_name="marcus_thompson",
+        scenario_name="steady_operations",
+        cj_version="v6.0.1",
+        workflow_name=workflow,
+        conversation_state=state,
+        user_id="user_1",
+        verbose=False,
+    )
+
+
+def _say(state: ConversationState, content: str):
+    state.context_window = state.context_window + [
+        Message(timestamp=datetime.utcnow(), sender="merchant", content=content)
+    ]
+
+
+class TestCJAgentCache:
+    """Only the conversation window and new facts change between turns."""
+
+    def test_reuses_agent_and_refreshes_conversation_window(self, facts):
+        cache = CJAgentCache()
+        state = ConversationState()
+
+        first = _turn(cache, state)
+        _say(state, "Where is order 1234?")
+        with patch("app.prompts.loader.PromptLoader") as prompt_loader:
+            second = _turn(cache, state)
+
+        assert second is first
+        assert "Where is order 1234?" in second.backstory
+        assert "Sells hand-poured candles" in second.backstory
+        prompt_loader.assert_not_called()
+        assert facts.calls == 1
+        assert cache.stats == {"hits": 1, "misses": 1}
+
+    def test_new_facts_appear_without_a_database_read(self, facts):
+        cache = CJAgentCache()
+        state = ConversationState()
+        _turn(cache, state)
+
+        cache.add_facts(["Ships from Portland"])
+        agent = _turn(cache, state)
+
+        assert "Ships from Portland" in agent.backstory
+        assert facts.calls == 1
+
+    def test_workflow_change_builds_a_new_agent(self, facts):
+        cache = CJAgentCache()
+        state = ConversationState()
+
+        first = _turn(cache, state)
+        second = _turn(cache, state, workflow="shopify_onboarding")
+
+        assert second is not first
+        assert cache.stats["misses"] == 2
+
+
+class TestFactExtractionUpdatesAgent:
+    """Facts extracted in the background reach the session's agent."""
+
+    @pytest.mark.asyncio
+    async def test_extracted_facts_are_added_to_cache(self):
+        conversation = Conversation(
+            id="conv-1",
+            merchant_name="marcus_thompson",
+            scenario_name="steady_operations",
+            created_at=datetime.utcnow(),
+        )
+        session = Session(conversation, user_id="user_1")
+
+        with patch("app.services.fact_extractor.FactExtractor.extract_and_add_facts",
+                   AsyncMock(return_value=["Prefers email"])), \
+                patch.object(session.agent_cache, "add_facts") as add_facts:
+            await MessageProcessor()._extract_facts_background(session)
+
+        add_facts.assert_called_once_with(["Prefers email"])
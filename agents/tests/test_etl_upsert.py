@@ -0,0 +1,158 @@
+"""Tests for content-hash change detection in ETL upserts."""
+
+import sys
+from contextlib import contextmanager
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from app.dbmodels.etl_tables import FreshdeskRating, FreshdeskTicket  # noqa: E402
+from app.lib import shopify_lib  # noqa: E402
+from app.lib.etl_upsert_lib import content_hash, upsert_changed_rows, upsert_rows_isolating_failures  # noqa: E402
+from app.lib.shopify_lib import ShopifyETL  # noqa: E402
+
+
+def _compile(statement) -> str:
+    """Render a statement as Postgres SQL text."""
+    return str(statement.compile(dialect=postgresql.dialect()))
+
+
+def _session(stored=(), returned=()):
+    """Session whose hash lookup returns stored rows and whose upsert returns keys."""
+    session = Mock()
+
+    def execute(statement):
+        result = Mock()
+        result.all.return_value = list(stored)
+        result.scalars.return_value = list(returned)
+        return result
+
+    session.execute.side_effect = execute
+    return session
+
+
+def _ticket_row(ticket_id: str, subject: str) -> dict:
+    return {"merchant_id": 1, "freshdesk_ticket_id": ticket_id, "data": {"subject": subject, "status": 2}}
+
+
+class TestContentHash:
+    """Hashes of canonical JSON."""
+
+    def test_key_order_and_whitespace_do_not_matter(self):
+        assert content_hash({"a": 1, "b": [1, 2]}) == content_hash({"b": [1, 2], "a": 1})
+
+    def test_values_matter(self):
+        assert content_hash({"status": 2}) != content_hash({"status": 5})
+        assert content_hash([{"id": 1}]) != content_hash([{"id": 1}, {"id": 2}])
+
+    def test_is_sha256_hex(self):
+        assert len(content_hash({"é": "ü"})) == 64
+
+
+class TestUpsertChangedRows:
+    """One hash lookup per page; unchanged rows are never sent."""
+
+    def test_unchanged_rows_are_not_sent(self):
+        unchanged = _ticket_row("1", "same")
+        session = _session(stored=[(1, "1", content_hash(unchanged["data"])), (1, "2", "stale")], returned=["2", "3"])
+
+        changed = upsert_changed_rows(
+            session, FreshdeskTicket,
+            [unchanged, _ticket_row("2", "edited"), _ticket_row("3", "new")],
+            ["merchant_id", "freshdesk_ticket_id"]
+        )
+
+        lookup, upsert = (call.args[0] for call in session.execute.call_args_list)
+        assert "(etl_freshdesk_tickets.merchant_id, etl_freshdesk_tickets.freshdesk_ticket_id) IN" in _compile(lookup)
+        sql = _compile(upsert)
+        assert "freshdesk_ticket_id_m1" in sql and "freshdesk_ticket_id_m2" not in sql
+        assert "content_hash = excluded.content_hash" in sql
+        assert "WHERE etl_freshdesk_tickets.content_hash IS DISTINCT FROM excluded.content_hash" in sql
+        assert changed == ["2", "3"]
+
+    def test_page_without_changes_only_looks_up_hashes(self):
+        row = {"freshdesk_ticket_id": "1", "data": {"ratings": {"default_question": 103}}}
+        session = _session(stored=[("1", content_hash(row["data"]))])
+
+        assert upsert_changed_rows(session, FreshdeskRating, [row], ["freshdesk_ticket_id"]) == []
+        assert session.execute.call_count == 1
+
+    def test_force_sends_every_row(self):
+        session = _session(returned=["1"])
+
+        upsert_changed_rows(session, FreshdeskTicket, [_ticket_row("1", "same")],
+                            ["merchant_id", "freshdesk_ticket_id"], force=True)
+
+        (upsert,) = (call.args[0] for call in session.execute.call_args_list)
+        assert "IS DISTINCT FROM" not in _compile(upsert)
+
+
+class TestUpsertIsolatingFailures:
+    """A rejected page is split until only the bad rows are left out."""
+
+    def test_bad_row_is_isolated(self):
+        session = Mock()
+        sent = []
+
+        def execute(statement):
+            params = statement.compile(dialect=postgresql.dialect()).params
+            keys = [value for name, value in params.items() if name.startswith("freshdesk_ticket_id")]
+            if "3" in keys:
+                raise ValueError("invalid byte sequence")
+            sent.append(keys)
+            result = Mock()
+            result.scalars.return_value = keys
+            return result
+
+        session.execute.side_effect = execute
+        rows = [_ticket_row(str(i), "subject") for i in range(1, 6)]
+
+        changed, failed = upsert_rows_isolating_failures(
+            session, FreshdeskTicket, rows, ["merchant_id", "freshdesk_ticket_id"], force=True
+        )
+
+        assert changed == ["1", "2", "4", "5"]
+        assert [(key, type(error)) for key, error in failed] == [("3", ValueError)]
+        assert sent == [["1", "2"], ["4", "5"]]
+        # Every attempt ran in its own savepoint; the three rejected ones were rolled back
+        assert session.begin_nested.call_count == 5
+        assert session.begin_nested.return_value.rollback.call_count == 3
+        session.rollback.assert_not_called()
+
+
+class TestShopifyCustomerSync:
+    """Customer pages go through the same hash filter."""
+
+    @pytest.fixture
+    def etl(self):
+        with patch.object(shopify_lib, "ShopifyAPI"):
+            etl = ShopifyETL(merchant_id=1)
+        etl.update_sync_metadata = Mock()
+        return etl
+
+    def test_page_is_one_lookup_and_one_upsert(self, etl):
+        customers = [
+            {"id": 10, "email": "a@example.com", "total_spent": "12.00"},
+            {"id": 11, "email": "b@example.com", "total_spent": "0"},
+        ]
+        etl.api.get_customers.return_value = (customers, None)
+        unchanged = etl._customer_row(customers[0])["data"]
+        session = _session(stored=[(1, "10", content_hash(unchanged, shopify_lib.CUSTOMER_UNHASHED_KEYS))], returned=["11"])
+
+        @contextmanager
+        def get_db_session():
+            yield session
+
+        with patch.object(shopify_lib, "get_db_session", get_db_session):
+            result = etl.sync_customers()
+
+        statements = [_compile(call.args[0]) for call in session.execute.call_args_list]
+        assert len(statements) == 2
+        assert statements[1].startswith("INSERT INTO etl_shopify_customers")
+        assert "shopify_customer_id_m1" not in statements[1]
+        assert result["total_synced"] == 2
+        assert result["total_changed"] == 1
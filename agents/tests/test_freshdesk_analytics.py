@@ -0,0 +1,489 @@
+"""Tests for FreshdeskAnalytics query construction and result shaping."""
+
+import sys
+from datetime import date, datetime, timezone
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import Mock
+
+import numpy as np
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import Session
+
+# Add repo root to path so the shared package resolves
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from app.dbmodels.view_models import FreshdeskUnifiedTicketView  # noqa: E402
+from app.lib import freshdesk_analytics_lib  # noqa: E402
+from app.lib.freshdesk_analytics_lib import FreshdeskAnalytics  # noqa: E402
+from app.lib.freshdesk_rollup_lib import FreshdeskRollups  # noqa: E402
+from app.lib.freshdesk_search_lib import FreshdeskSearch  # noqa: E402
+from app.lib.ticket_frame import TicketFrame, daily_counts  # noqa: E402
+
+
+@compiles(JSONB, "sqlite")
+def _jsonb_on_sqlite(type_, compiler, **kw):
+    return "JSON"
+
+
+@pytest.fixture
+def sqlite_session():
+    """Session on an in-memory SQLite copy of the unified ticket view."""
+    engine = create_engine("sqlite://")
+    FreshdeskUnifiedTicketView.__table__.create(engine)
+    with Session(engine) as session:
+        yield session
+    engine.dispose()
+
+
+def _compile(statement) -> str:
+    """Render a statement as Postgres SQL text."""
+    return str(statement.compile(dialect=postgresql.dialect()))
+
+
+class TestDailySnapshot:
+    """Test cases for the SQL-native daily snapshot."""
+
+    @pytest.fixture
+    def day_range(self):
+        start_dt = datetime(2025, 6, 1, tzinfo=timezone.utc)
+        end_dt = datetime.combine(date(2025, 6, 1), datetime.max.time()).replace(tzinfo=timezone.utc)
+        return start_dt, end_dt
+
+    def test_query_aggregates_in_sql(self, day_range):
+        """The snapshot is one aggregate SELECT using FILTER and percentile_cont."""
+        sql = _compile(FreshdeskAnalytics._daily_snapshot_query(1, *day_range))
+
+        assert sql.count("SELECT") == 1
+        assert "percentile_cont" in sql
+        assert "FILTER (WHERE" in sql
+        assert "GROUP BY" not in sql
+
+    def test_query_never_loads_conversation_bodies(self, day_range):
+        """Conversation JSONB is never selected by the snapshot."""
+        sql = _compile(FreshdeskAnalytics._daily_snapshot_query(1, *day_range))
+
+        assert "conversation_history" not in sql
+        assert "custom_fields" not in sql
+
+    def test_snapshot_uses_single_round_trip(self):
+        """get_daily_snapshot executes exactly one statement and shapes the row."""
+        row = SimpleNamespace(
+            new_tickets=12,
+            closed_tickets=9,
+            open_eod=4,
+            median_first_response_min=17.25,
+            median_resolution_min=None,
+            quick_close_count=3,
+            new_csat_count=4,
+            perfect_scores=3,
+            bad_csat_count=1,
+            sla_breaches=2,
+        )
+        session = Mock()
+        session.execute.return_value.one.return_value = row
+
+        snapshot = FreshdeskAnalytics.get_daily_snapshot(session, 1, date(2025, 6, 1))
+
+        session.execute.assert_called_once()
+        session.query.assert_not_called()
+        assert snapshot == {
+            "date": "2025-06-01",
+            "new_tickets": 12,
+            "closed_tickets": 9,
+            "open_eod": 4,
+            "median_first_response_min": 17.2,
+            "median_resolution_min": None,
+            "quick_close_count": 3,
+            "new_csat_count": 4,
+            "csat_percentage": 75.0,
+            "bad_csat_count": 1,
+            "sla_breaches": 2,
+        }
+
+    def test_snapshot_without_ratings(self):
+        """CSAT percentage is zero when no ratings arrived on the day."""
+        row = SimpleNamespace(
+            new_tickets=0,
+            closed_tickets=0,
+            open_eod=0,
+            median_first_response_min=None,
+            median_resolution_min=None,
+            quick_close_count=0,
+            new_csat_count=0,
+            perfect_scores=0,
+            bad_csat_count=0,
+            sla_breaches=0,
+        )
+        session = Mock()
+        session.execute.return_value.one.return_value = row
+
+        snapshot = FreshdeskAnalytics.get_daily_snapshot(session, 1, date(2025, 6, 1))
+
+        assert snapshot["csat_percentage"] == 0.0
+        assert snapshot["median_first_response_min"] is None
+
+
+class TestTicketFrameAnalytics:
+    """Test cases for the vectorized, frame-based analytics helpers."""
+
+    def test_from_rows_converts_nulls(self):
+        """NULL numbers become NaN, NULL booleans False, objects are preserved."""
+        frame = TicketFrame.from_rows(
+            ["freshdesk_ticket_id", "created_at", "has_rating", "tags"],
+            [("1", 100.0, True, ["a"]), ("2", None, None, None)],
+        )
+
+        assert len(frame) == 2
+        assert np.isnan(frame["created_at"][1])
+        assert frame["has_rating"].tolist() == [True, False]
+        assert frame["tags"][0] == ["a"]
+        assert frame["tags"][1] is None
+
+    def test_load_selects_only_requested_columns(self):
+        """The loader extracts epoch timestamps and never touches conversation JSONB."""
+        session = Mock()
+        session.execute.return_value.all.return_value = []
+
+        frame = TicketFrame.load(session, 1, ["freshdesk_ticket_id", "created_at"])
+
+        sql = _compile(session.execute.call_args[0][0])
+        assert "EXTRACT(epoch FROM v_freshdesk_unified_tickets.created_at)" in sql
+        assert "conversation_history" not in sql
+        assert len(frame) == 0
+
+    def test_daily_counts_drops_out_of_range(self):
+        """Timestamps are bucketed per day; NULL and out-of-range values are ignored."""
+        epochs = np.array([0.0, 10.0, 86400.0, 3 * 86400.0, np.nan, -5.0])
+
+        assert daily_counts(epochs, 0.0, 3).tolist() == [2, 1, 0]
+
+    def test_response_time_outliers(self):
+        """Outliers are matched to their own ticket ids without a nested scan."""
+        n = 20
+        created = np.zeros(n)
+        first_responded = np.full(n, 600.0)  # 10 minutes
+        first_responded[7] = 600.0 * 100  # one very slow response
+        frame = TicketFrame({
+            "freshdesk_ticket_id": np.array([str(100 + i) for i in range(n)], dtype=object),
+            "created_at": created,
+            "first_responded_at": first_responded,
+            "resolved_at": np.full(n, np.nan),
+            "has_rating": np.zeros(n, dtype=bool),
+            "rating_score": np.full(n, np.nan),
+        })
+
+        metrics = FreshdeskAnalytics._response_time_metrics_from_frame(frame)
+
+        assert metrics["first_response"]["median_min"] == 10.0
+        assert metrics["first_response"]["outliers"] == [{"ticket_id": 107, "response_min": 1000.0}]
+        assert metrics["resolution"] == {}
+        assert metrics["total_resolved"] == 0
+
+    def test_volume_trends_rolling_average_and_spikes(self):
+        """Rolling average uses a shrinking window at the start; spikes exceed mean + 2σ."""
+        volumes = np.array([1] * 13 + [20])
+
+        trends = FreshdeskAnalytics._volume_trends_from_counts(date(2025, 6, 1), volumes)
+
+        assert trends["rolling_7d_avg"][0] == {"date": "2025-06-01", "avg": 1.0}
+        assert trends["rolling_7d_avg"][-1]["avg"] == round(26 / 7, 1)
+        assert [day["date"] for day in trends["summary"]["spike_days"]] == ["2025-06-14"]
+        assert trends["summary"]["total_tickets"] == 33
+        assert trends["summary"]["trend"] == "increasing"
+
+
+class TestDailyRollups:
+    """Test cases for the per-day rollup helpers."""
+
+    @staticmethod
+    def _rollup(day, **fields):
+        values = {"new_tickets": 0, "tag_counts": {}, "type_counts": {}}
+        values.update(fields)
+        return SimpleNamespace(day=day, **values)
+
+    def test_ticket_days_covers_created_and_closed(self):
+        """A ticket touches its UTC creation day and its close day."""
+        ticket = {
+            "created_at": "2025-06-01T23:30:00Z",
+            "stats": {"closed_at": "2025-06-03T01:00:00+02:00"},
+        }
+
+        assert FreshdeskRollups.ticket_days(ticket) == {date(2025, 6, 1), date(2025, 6, 2)}
+        assert FreshdeskRollups.ticket_days({"created_at": None, "stats": None}) == set()
+
+    def test_daily_series_and_merge_counts(self):
+        """Missing days read as zero and JSONB count maps are summed."""
+        rollups = [
+            self._rollup(date(2025, 6, 1), new_tickets=3, tag_counts={"shipping": 2}),
+            self._rollup(date(2025, 6, 3), new_tickets=5, tag_counts={"shipping": 1, "refund": 4}),
+        ]
+
+        series = FreshdeskRollups.daily_series(rollups, date(2025, 6, 1), 4)
+
+        assert series.tolist() == [3, 0, 5, 0]
+        assert FreshdeskRollups.merge_counts(rollups, "tag_counts") == {"shipping": 3, "refund": 4}
+
+    def test_sketch_merge_and_percentile(self):
+        """Merged sketches add bucket counts; percentiles interpolate inside a bucket."""
+        merged = FreshdeskRollups.merge_sketches([
+            {"buckets": {"3": 2}, "count": 2, "sum_min": 22.0},   # 10-15 minutes
+            {"buckets": {"3": 2}, "count": 2, "sum_min": 24.0},
+            {},
+        ])
+
+        assert merged == {"buckets": {"3": 4}, "count": 4, "sum_min": 46.0}
+        assert FreshdeskRollups.sketch_percentile(merged, 50) == 12.5
+        assert FreshdeskRollups.sketch_percentile({}, 50) is None
+
+    def test_volume_trends_reads_rollups_not_tickets(self):
+        """Volume trends are built from rollup rows only."""
+        today = date.today()
+        session = Mock()
+        session.query.return_value.filter.return_value.order_by.return_value.all.return_value = [
+            self._rollup(today, new_tickets=7)
+        ]
+
+        trends = FreshdeskAnalytics.get_volume_trends(session, 1, days=6)
+
+        session.execute.assert_not_called()
+        assert len(trends["daily_volumes"]) == 7
+        assert trends["summary"]["total_tickets"] == 7
+
+
+class TestTicketSearch:
+    """Test cases for the indexed, ranked ticket search."""
+
+    def test_query_uses_search_index_and_ranks(self):
+        """Full-text, tag and trigram matches run against the search table, best rank first."""
+        sql = _compile(FreshdeskSearch.search_query(1, "shipping delay"))
+
+        assert "FROM freshdesk_ticket_search" in sql
+        assert "v_freshdesk_unified_tickets" not in sql
+        assert "search_vector @@ websearch_to_tsquery" in sql
+        assert "tags @>" in sql
+        assert "requester_email ILIKE" in sql
+        assert "ORDER BY rank DESC" in sql
+
+    def test_short_query_skips_trigram_matches(self):
+        """Patterns shorter than a trigram cannot use the index, so they are not added."""
+        sql = _compile(FreshdeskSearch.search_query(1, "ab"))
+
+        assert "ILIKE" not in sql
+        assert "similarity" not in sql
+        assert "search_vector @@" in sql
+
+    def test_like_wildcards_in_query_are_escaped(self):
+        """A literal % or _ in the query matches itself, not any character."""
+        statement = FreshdeskSearch.search_query(1, "50%_off")
+        params = statement.compile(dialect=postgresql.dialect()).params
+
+        assert params["requester_email_1"] == "%50\\%\\_off%"
+
+    def test_search_maps_rows_and_skips_blank_queries(self):
+        """Rows come back in the tool's result shape; blank queries never hit the database."""
+        session = Mock()
+        session.execute.return_value.all.return_value = [SimpleNamespace(
+            freshdesk_ticket_id="385660", subject="Where is my order", status=2,
+            created_at=datetime(2025, 6, 1, tzinfo=timezone.utc),
+            requester_email="anna@example.com", requester_name="Anna Brown", rank=0.61234,
+        )]
+
+        results = FreshdeskAnalytics.search_tickets(session, "order", merchant_id=1)
+
+        assert results == [{
+            "ticket_id": "385660", "subject": "Where is my order", "status": 2,
+            "created_at": "2025-06-01T00:00:00+00:00", "requester_email": "anna@example.com",
+            "customer_name": "Anna Brown", "rank": 0.6123,
+        }]
+        assert FreshdeskSearch.search(Mock(), 1, "   ") == []
+
+    def test_refresh_tickets_dedupes_and_skips_empty(self):
+        """Refreshing calls the database function once per batch, and not at all when empty."""
+        session = Mock()
+        session.execute.return_value.scalar.return_value = 2
+
+        assert FreshdeskSearch.refresh_tickets(session, 1, ["2", "1", "2"]) == 2
+        sql = _compile(session.execute.call_args[0][0])
+        assert "refresh_freshdesk_ticket_search" in sql
+        assert FreshdeskSearch.refresh_tickets(session, 1, []) == 0
+        assert session.execute.call_count == 1
+
+
+class TestTicketReviewPagination:
+    """Test cases for keyset-paginated ticket review."""
+
+    @staticmethod
+    def _ticket(ticket_id, created_at, conversation_count=1):
+        ticket = Mock(
+            freshdesk_ticket_id=ticket_id, subject="Refund", status=2, priority=1, type=None,
+            created_at=created_at, updated_at=None, requester_name="Anna", requester_email="a@example.com",
+            tags=[], has_rating=False, rating_score=None, rating_feedback=None,
+            first_responded_at=None, resolved_at=None, is_escalated=False,
+            conversation_count=conversation_count,
+        )
+        ticket.format_conversation.side_effect = lambda messages: " | ".join(m["body_text"] for m in messages)
+        return ticket
+
+    def test_cursor_round_trip_and_rejects_garbage(self):
+        """Cursors carry created_at and ticket ID; malformed cursors raise ValueError."""
+        created_at = datetime(2025, 6, 5, 13, 47, 56, tzinfo=timezone.utc)
+        cursor = freshdesk_analytics_lib.encode_review_cursor(created_at, "385660")
+
+        assert freshdesk_analytics_lib.decode_review_cursor(cursor) == (created_at, "385660")
+        with pytest.raises(ValueError):
+            freshdesk_analytics_lib.decode_review_cursor("385660")
+
+    def test_page_is_one_keyset_query_with_conversation_excerpt(self):
+        """The cursor becomes a row comparison and conversations are truncated in SQL."""
+        session = Mock()
+        query = session.query.return_value.options.return_value.filter.return_value
+        query.filter.return_value.order_by.return_value.limit.return_value.all.return_value = []
+        cursor = freshdesk_analytics_lib.encode_review_cursor(datetime(2025, 6, 5, tzinfo=timezone.utc), "385660")
+
+        FreshdeskAnalytics.get_recent_tickets_for_review(session, 1, cursor=cursor)
+
+        session.query.assert_called_once()
+        keyset_sql = _compile(query.filter.call_args[0][0])
+        assert "(v_freshdesk_unified_tickets.created_at, v_freshdesk_unified_tickets.freshdesk_ticket_id) <" in keyset_sql
+        excerpt_sql = _compile(select(session.query.call_args[0][1]))
+        assert "jsonb_array_elements(v_freshdesk_unified_tickets.conversation_history) WITH ORDINALITY" in excerpt_sql
+        assert "left(" in excerpt_sql
+
+    def test_next_cursor_points_at_last_ticket_and_flags_truncation(self):
+        """next_cursor resumes after the last returned ticket; partial conversations are flagged."""
+        newer = datetime(2025, 6, 5, tzinfo=timezone.utc)
+        older = datetime(2025, 6, 4, tzinfo=timezone.utc)
+        rows = [
+            (self._ticket("3", newer), [{"body_text": "hi", "truncated": False}]),
+            (self._ticket("2", older, conversation_count=12), [{"body_text": "long", "truncated": True}]),
+            (self._ticket("1", older), None),
+        ]
+        session = Mock()
+        session.query.return_value.options.return_value.filter.return_value \
+            .order_by.return_value.limit.return_value.all.return_value = rows
+
+        page = FreshdeskAnalytics.get_recent_tickets_for_review(session, 1, limit=2)
+
+        assert page["has_more"] is True
+        assert freshdesk_analytics_lib.decode_review_cursor(page["next_cursor"]) == (older, "2")
+        assert [t["conversation_truncated"] for t in page["tickets"]] == [False, True]
+        assert page["tickets"][1]["conversation"] == "long [...]"
+
+
+class TestSlaExceptions:
+    """Test cases for the streaming SLA breach analysis."""
+
+    CONFIG = {"first_response_min": 60, "resolution_min": 1440, "include_pending": True}
+    NOW = datetime(2025, 6, 10, tzinfo=timezone.utc)
+
+    @staticmethod
+    def _row(ticket_id, breach_by_min, priority=2, tags=None, flag=False):
+        return SimpleNamespace(
+            freshdesk_ticket_id=str(ticket_id),
+            subject=f"Ticket {ticket_id}",
+            status=2,
+            priority=priority,
+            tags=tags or [],
+            created_at=0,
+            first_responded_at=None if flag else 60,
+            resolved_at=None,
+            responder_id=None,
+            escalated=False,
+            elapsed_min=breach_by_min + 60,
+            breach_by_min=breach_by_min,
+            flag=flag,
+        )
+
+    def test_thresholds_are_applied_in_sql(self):
+        """Both breach queries filter in SQL and never select conversation JSONB."""
+        since = datetime(2025, 6, 1, tzinfo=timezone.utc)
+        response_sql = _compile(FreshdeskAnalytics._response_breach_query(1, self.CONFIG, self.NOW, since))
+        resolution_sql = _compile(FreshdeskAnalytics._resolution_breach_query(1, self.CONFIG, self.NOW))
+
+        for sql in (response_sql, resolution_sql):
+            assert "EXTRACT(epoch FROM" in sql
+            assert "conversation_history" not in sql
+        assert "v_freshdesk_unified_tickets.created_at >= %(created_at_" in response_sql
+        assert "coalesce(v_freshdesk_unified_tickets.resolved_at" in resolution_sql
+
+    def test_streams_with_yield_per_and_keeps_top_k(self):
+        """Rows are streamed; only the worst `limit` breaches are kept, totals cover all."""
+        response_rows = [self._row(i, float(i), tags=["late"]) for i in range(1, 101)]
+        response_rows.append(self._row(999, 5.0, priority=4, flag=True))
+        resolution_rows = [self._row(500, 30.0, flag=True)]
+        session = Mock()
+        session.execute.side_effect = [iter(response_rows), iter(resolution_rows)]
+
+        result = FreshdeskAnalytics.get_sla_exceptions(session, 1, limit=3)
+
+        statement = session.execute.call_args_list[0][0][0]
+        assert statement.get_execution_options()["yield_per"] > 0
+        assert [b["ticket_id"] for b in result["breaches"]["first_response"]] == ["100", "99", "98"]
+        assert result["summary"]["response_breaches"] == 101
+        assert result["summary"]["no_response_count"] == 1
+        assert result["summary"]["still_open_count"] == 1
+        assert result["summary"]["avg_response_breach_min"] == round((5050 + 5) / 101, 1)
+        assert result["patterns"]["by_priority"]["response"][4] == {"count": 1, "avg_breach_min": 5.0}
+        assert result["patterns"]["top_breach_tags"] == [{"tag": "late", "count": 100}]
+        assert result["page"]["first_response_truncated"] is True
+        assert result["page"]["resolution_truncated"] is False
+        assert result["breaches"]["resolution"][0]["still_open"] is True
+
+
+class TestColumnProfiles:
+    """Test cases for deferred heavy JSONB and per-method column profiles."""
+
+    def test_heavy_jsonb_is_deferred_by_default(self):
+        """A plain entity query skips conversation_history and custom_fields."""
+        sql = _compile(select(FreshdeskUnifiedTicketView))
+
+        assert "v_freshdesk_unified_tickets.subject" in sql
+        assert "conversation_history" not in sql
+        assert "custom_fields" not in sql
+
+    def test_load_profile_selects_only_named_columns(self):
+        """A profile loads its columns plus the primary key and nothing else."""
+        statement = select(FreshdeskUnifiedTicketView).options(
+            FreshdeskUnifiedTicketView.load_profile("subject", "conversation_history")
+        )
+        sql = _compile(statement)
+
+        assert "conversation_history" in sql
+        assert "freshdesk_ticket_id" in sql
+        assert "requester_email" not in sql
+
+    def test_only_conversation_profiles_fetch_conversation_history(self):
+        """Every profile names real view columns; list-only profiles stay free of heavy JSONB."""
+        profiles = {
+            name: value for name, value in vars(freshdesk_analytics_lib).items()
+            if name.endswith("_PROFILE")
+        }
+
+        for columns in profiles.values():
+            for column in columns:
+                assert hasattr(FreshdeskUnifiedTicketView, column)
+        with_conversations = {name for name, columns in profiles.items() if "conversation_history" in columns}
+        assert with_conversations == {
+            "RECENT_TICKET_PROFILE", "TICKET_DETAIL_PROFILE", "BAD_CSAT_PROFILE", "TICKET_REVIEW_PROFILE",
+        }
+
+    def test_recent_tickets_with_conversations_loads_under_its_profile(self, sqlite_session):
+        """Every attribute the method reads is in its profile, so raiseload never fires."""
+        sqlite_session.add(FreshdeskUnifiedTicketView(
+            merchant_id=1, freshdesk_ticket_id="385660", subject="Refund", status=2, priority=1,
+            created_at=datetime(2025, 6, 5, tzinfo=timezone.utc), tags=["refund"], conversation_count=1,
+            has_rating=False, is_escalated=False,
+            conversation_history=[{"incoming": True, "from_email": "a@example.com", "body_text": "Where is my refund?"}],
+        ))
+        sqlite_session.commit()
+        sqlite_session.expunge_all()
+
+        tickets = FreshdeskAnalytics.get_recent_tickets_with_conversations(sqlite_session, 1)
+
+        assert [t["ticket_id"] for t in tickets] == ["385660"]
+        assert "Where is my refund?" in tickets[0]["conversation"]
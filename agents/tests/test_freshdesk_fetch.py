@@ -0,0 +1,244 @@
+"""Tests for the concurrent Freshdesk conversation fetcher and its shared rate limit budget.
+
+The fetcher runs against a local HTTP stand-in for Freshdesk that serves canned
+conversations behind a token-bucket rate limit, so throughput and throttling are
+measured offline.
+"""
+
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from unittest.mock import patch
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from app.lib.freshdesk_fetch_lib import ConversationFetcher  # noqa: E402
+from app.utils import freshdesk_util  # noqa: E402
+from app.utils.freshdesk_util import FreshdeskAPI, RateLimitBudget  # noqa: E402
+
+
+class RateLimitedFreshdesk(ThreadingHTTPServer):
+    """Local Freshdesk stand-in: canned conversations behind a token-bucket rate limit."""
+
+    daemon_threads = True
+
+    def __init__(self, conversations, limit=1000, window_seconds=1.0, latency=0.0):
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.conversations = conversations
+        self.limit = limit
+        self.window_seconds = window_seconds
+        self.latency = latency
+        self.tokens = float(limit)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+        self.served = 0
+        self.throttled = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/api/v2"
+
+    def take_token(self):
+        """(allowed, remaining, retry_after) for one incoming request."""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.limit, self.tokens + (now - self.updated) * self.limit / self.window_seconds)
+            self.updated = now
+            if self.tokens < 1:
+                self.throttled += 1
+                return False, 0, (1 - self.tokens) * self.window_seconds / self.limit
+            self.tokens -= 1
+            return True, int(self.tokens), 0.0
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server
+        allowed, remaining, retry_after = server.take_token()
+        if not allowed:
+            self.send_response(429)
+            self.send_header("Retry-After", f"{retry_after:.3f}")
+            self.send_header("X-RateLimit-Total", str(server.limit))
+            self.send_header("X-RateLimit-Remaining", "0")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        with server.lock:
+            server.in_flight += 1
+            server.peak_in_flight = max(server.peak_in_flight, server.in_flight)
+        time.sleep(server.latency)
+
+        url = urlparse(self.path)
+        ticket_id = url.path.split("/")[-2]
+        query = parse_qs(url.query)
+        page, per_page = int(query["page"][0]), int(query["per_page"][0])
+        conversations = server.conversations.get(ticket_id, [])
+        body = json.dumps(conversations[(page - 1) * per_page:page * per_page]).encode()
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("X-RateLimit-Total", str(server.limit))
+        self.send_header("X-RateLimit-Remaining", str(remaining))
+        if page * per_page < len(conversations):
+            self.send_header("Link", f'<{server.base_url}{url.path[len("/api/v2"):]}?page={page + 1}>; rel="next"')
+        self.end_headers()
+
+        with server.lock:
+            server.in_flight -= 1
+            server.served += 1
+        self.wfile.write(body)
+
+
+def _canned(count: int, long_ticket_messages: int = 0) -> dict:
+    """Conversations for tickets 1..count; ticket 1 optionally spans several pages."""
+    conversations = {
+        str(i): [{"id": i * 10, "body_text": f"reply to {i}", "incoming": False}]
+        for i in range(1, count + 1)
+    }
+    if long_ticket_messages:
+        conversations["1"] = [{"id": n, "body_text": f"message {n}"} for n in range(long_ticket_messages)]
+    return conversations
+
+
+@pytest.fixture
+def standin():
+    servers = []
+
+    def start(conversations, **kwargs):
+        server = RateLimitedFreshdesk(conversations, **kwargs)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def _api(server, budget=None) -> FreshdeskAPI:
+    with patch.object(freshdesk_util, "get_env", lambda key, default=None: "test"):
+        return FreshdeskAPI(rate_limit=budget, base_url=server.base_url)
+
+
+class TestRateLimitBudget:
+    """Token bucket shared by the fetcher threads."""
+
+    def test_waits_when_bucket_is_empty(self):
+        budget = RateLimitBudget(limit=2, window_seconds=0.2)
+        started = time.monotonic()
+        for _ in range(3):
+            budget.acquire()
+        # Third token refills after window / limit
+        assert time.monotonic() - started >= 0.09
+        assert budget.stats["acquired"] == 3
+
+    def test_headers_resize_and_cap_the_bucket(self):
+        budget = RateLimitBudget(limit=200)
+        budget.observe({"X-RateLimit-Total": "50", "X-RateLimit-Remaining": "3"})
+
+        assert budget.limit == 50
+        assert budget.tokens <= 3.1
+
+    def test_pause_empties_the_bucket(self):
+        budget = RateLimitBudget(limit=100, window_seconds=1.0)
+        budget.pause(0.1)
+        started = time.monotonic()
+        budget.acquire()
+
+        assert time.monotonic() - started >= 0.09
+        assert budget.stats["throttled"] == 1
+
+
+class TestConversationFetcher:
+    """Concurrent fetches against the rate-limited stand-in."""
+
+    def test_fetches_every_page_of_every_ticket(self, standin):
+        server = standin(_canned(10, long_ticket_messages=250))
+        fetcher = ConversationFetcher(_api(server), max_in_flight=4)
+
+        results = {ticket_id: (conversations, error) for ticket_id, conversations, error in fetcher.fetch(range(1, 11))}
+
+        assert set(results) == {str(i) for i in range(1, 11)}
+        assert all(error is None for _, error in results.values())
+        assert len(results["1"][0]) == 250
+        assert results["7"][0][0]["body_text"] == "reply to 7"
+        assert server.served == 12  # Ticket 1 needs three pages
+
+    def test_keeps_n_tickets_in_flight(self, standin):
+        server = standin(_canned(24), latency=0.03)
+        api = _api(server)
+
+        started = time.monotonic()
+        assert len(list(ConversationFetcher(api, max_in_flight=1).fetch(range(1, 25)))) == 24
+        sequential = time.monotonic() - started
+        assert server.peak_in_flight == 1
+
+        started = time.monotonic()
+        assert len(list(ConversationFetcher(api, max_in_flight=6).fetch(range(1, 25)))) == 24
+        concurrent = time.monotonic() - started
+
+        assert 1 < server.peak_in_flight <= 6
+        assert concurrent < sequential / 2
+
+    def test_shared_budget_stays_under_the_rate_limit(self, standin):
+        server = standin(_canned(30), limit=10, window_seconds=0.5)
+        budget = RateLimitBudget(limit=10, window_seconds=0.5)
+        fetcher = ConversationFetcher(_api(server, budget), max_in_flight=8)
+
+        results = list(fetcher.fetch(range(1, 31)))
+
+        assert len(results) == 30
+        assert all(error is None for _, _, error in results)
+        assert server.throttled == 0
+        assert budget.stats["acquired"] == 30
+
+    def test_recovers_after_429(self, standin):
+        # Latency keeps all eight requests in flight before the first headers arrive
+        server = standin(_canned(8), limit=4, window_seconds=1.0, latency=0.05)
+        # The budget starts out believing the limit is higher than it is
+        budget = RateLimitBudget(limit=100, window_seconds=1.0)
+        fetcher = ConversationFetcher(_api(server, budget), max_in_flight=8)
+
+        results = list(fetcher.fetch(range(1, 9)))
+
+        assert server.throttled >= 1
+        assert budget.stats["throttled"] >= 1
+        assert budget.limit == 4
+        assert all(error is None for _, _, error in results)
+
+    def test_bounded_queue_holds_back_workers(self, standin):
+        server = standin(_canned(40))
+        fetcher = ConversationFetcher(_api(server), max_in_flight=4, queue_size=2)
+
+        results = fetcher.fetch(range(1, 41))
+        next(results)
+        time.sleep(0.2)
+        # Workers block on the full queue instead of fetching everything ahead of the writer
+        assert fetcher.stats["tickets"] <= 1 + 2 + 4
+        results.close()
+
+        assert fetcher.stats["tickets"] < 40
+
+    def test_reports_errors_per_ticket(self, standin):
+        server = standin(_canned(3))
+        fetcher = ConversationFetcher(_api(server), max_in_flight=2)
+
+        results = {ticket_id: error for ticket_id, _, error in fetcher.fetch(["1", "not-a-ticket", "3"])}
+
+        assert isinstance(results["not-a-ticket"], ValueError)
+        assert results["1"] is None and results["3"] is None
+        assert fetcher.stats["errors"] == 1
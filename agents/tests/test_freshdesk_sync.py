@@ -0,0 +1,305 @@
+"""Tests for FreshdeskETL row shaping and upsert statements."""
+
+import sys
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+# Add repo root to path so the shared package resolves
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from app.lib import freshdesk_sync_lib  # noqa: E402
+from app.lib.freshdesk_sync_lib import FreshdeskETL  # noqa: E402
+
+
+TICKET = {
+    "id": 385660,
+    "subject": "subscription question",
+    "status": 5,
+    "priority": 2,
+    "created_at": "2025-06-05T13:47:56Z",
+    "updated_at": "2025-06-08T14:20:23Z",
+    "requester": {"name": "Anna Brown", "email": "anna@example.com"},
+    "stats": {"closed_at": "2025-06-08T14:20:23Z", "first_responded_at": "2025-06-05T13:48:07Z"},
+}
+
+
+@pytest.fixture
+def etl():
+    with patch.object(freshdesk_sync_lib, "FreshdeskAPI"):
+        yield FreshdeskETL(merchant_id=1)
+
+
+@pytest.fixture
+def session():
+    session = Mock()
+    session.execute.return_value.rowcount = 1
+    session.execute.return_value.all.return_value = []
+    session.execute.return_value.scalar.return_value = 0
+    session.execute.return_value.scalars.return_value = []
+
+    @contextmanager
+    def get_db_session():
+        yield session
+
+    with patch.object(freshdesk_sync_lib, "get_db_session", get_db_session):
+        yield session
+
+
+def _compile(statement) -> str:
+    """Render a statement as Postgres SQL text."""
+    return str(statement.compile(dialect=postgresql.dialect()))
+
+
+def _statements(session, prefix: str) -> list:
+    """Compiled statements the session executed that start with prefix."""
+    compiled = [_compile(call.args[0]) for call in session.execute.call_args_list]
+    return [sql for sql in compiled if sql.startswith(prefix)]
+
+
+class TestTypedColumns:
+    """Typed copies of JSONB fields written at upsert time."""
+
+    def test_ticket_columns_parse_hot_fields(self, etl):
+        columns = etl._ticket_columns(TICKET)
+
+        assert columns["created_at"] == datetime(2025, 6, 5, 13, 47, 56, tzinfo=timezone.utc)
+        assert columns["closed_at"] == datetime(2025, 6, 8, 14, 20, 23, tzinfo=timezone.utc)
+        assert columns["resolved_at"] is None
+        assert columns["status"] == 5
+        assert columns["requester_email"] == "anna@example.com"
+        assert etl._ticket_columns({"id": 1})["created_at"] is None
+
+    def test_rating_columns_store_utc_wall_clock(self, etl):
+        columns = etl._rating_columns({
+            "ratings": {"default_question": 103},
+            "created_at": "2025-06-04T18:20:30+02:00",
+        })
+
+        assert columns == {"rating_score": 103, "created_at": datetime(2025, 6, 4, 16, 20, 30)}
+
+    def test_ticket_upsert_writes_typed_columns(self, etl, session):
+        etl.api.get_tickets.return_value = ([TICKET], None)
+
+        etl.sync_ticket_data(since=datetime(2025, 6, 1, tzinfo=timezone.utc))
+
+        upserts = [
+            _compile(call.args[0]) for call in session.execute.call_args_list
+            if "INSERT INTO etl_freshdesk_tickets" in _compile(call.args[0])
+        ]
+        assert len(upserts) == 1
+        assert "closed_at = excluded.closed_at" in upserts[0]
+        assert "status = excluded.status" in upserts[0]
+
+
+class TestConversationSummary:
+    """Conversation summary columns computed at ETL write time."""
+
+    def test_summary_columns(self, etl):
+        columns = etl._conversation_columns([
+            {"incoming": True, "created_at": "2025-06-04T14:22:45Z"},
+            {"incoming": False, "created_at": "2025-06-04T14:35:12Z"},
+            {"incoming": True, "created_at": None},
+        ])
+
+        assert columns == {
+            "conversation_count": 3,
+            "last_conversation_at": datetime(2025, 6, 4, 14, 35, 12, tzinfo=timezone.utc),
+            "has_agent_response": True,
+        }
+        assert etl._conversation_columns([{"incoming": True}])["has_agent_response"] is False
+
+    def test_conversation_upsert_writes_summary(self, etl, session):
+        etl.api.get_conversations.return_value = ([{"incoming": False, "created_at": "2025-06-04T14:35:12Z"}], None)
+
+        etl.sync_conversations_for_tickets(["385660"])
+
+        upserts = [
+            _compile(call.args[0]) for call in session.execute.call_args_list
+            if "INSERT INTO etl_freshdesk_conversations" in _compile(call.args[0])
+        ]
+        assert len(upserts) == 1
+        assert "conversation_count = excluded.conversation_count" in upserts[0]
+        assert "has_agent_response = excluded.has_agent_response" in upserts[0]
+
+
+class TestBulkUpserts:
+    """One multi-row upsert per page, with changed rows reported via RETURNING."""
+
+    def test_ticket_page_is_one_statement(self, etl, session):
+        second = {**TICKET, "id": 385661}
+        etl.api.get_tickets.return_value = ([TICKET, second, {**TICKET, "subject": "edited"}], None)
+        session.execute.return_value.scalars.return_value = ["385661"]
+
+        result = etl.sync_ticket_data(since=datetime(2025, 6, 1, tzinfo=timezone.utc))
+
+        upserts = _statements(session, "INSERT INTO etl_freshdesk_tickets")
+        assert len(upserts) == 1
+        assert "RETURNING etl_freshdesk_tickets.freshdesk_ticket_id" in upserts[0]
+        assert "WHERE etl_freshdesk_tickets.content_hash IS DISTINCT FROM excluded.content_hash" in upserts[0]
+        # The repeated ticket collapses into one row, as ON CONFLICT cannot touch a row twice
+        assert "freshdesk_ticket_id_m1" in upserts[0]
+        assert "freshdesk_ticket_id_m2" not in upserts[0]
+        assert result["total_synced"] == 2
+        assert result["updated_ticket_ids"] == ["385661"]
+
+    def test_force_reparse_updates_unconditionally(self, etl, session):
+        etl.api.get_tickets.return_value = ([TICKET], None)
+
+        etl.sync_ticket_data(since=datetime(2025, 6, 1, tzinfo=timezone.utc), force_reparse=True)
+
+        upsert = _statements(session, "INSERT INTO etl_freshdesk_tickets")[0]
+        assert "IS DISTINCT FROM" not in upsert
+
+    def test_ratings_page_checks_tickets_in_one_query(self, etl, session):
+        ratings = [
+            {"ticket_id": 385660, "ratings": {"default_question": 103}, "created_at": "2025-06-04T18:20:30Z"},
+            {"ticket_id": 385661, "ratings": {"default_question": 102}, "created_at": "2025-06-04T18:10:00Z"},
+            {"ticket_id": 999999, "ratings": {"default_question": 101}, "created_at": "2025-06-04T18:00:00Z"},
+        ]
+        etl.api.get_satisfaction_ratings.return_value = (ratings, None)
+        returned = {
+            "SELECT etl_freshdesk_tickets": ["385660", "385661"],
+            "INSERT INTO etl_freshdesk_ratings": ["385661"],
+        }
+
+        def execute(statement):
+            sql = _compile(statement)
+            result = Mock(rowcount=1)
+            result.all.return_value = []
+            result.scalars.return_value = next(
+                (ids for prefix, ids in returned.items() if sql.startswith(prefix)), []
+            )
+            return result
+
+        session.execute.side_effect = execute
+
+        result = etl.sync_satisfaction_ratings()
+
+        assert len(_statements(session, "SELECT etl_freshdesk_tickets.freshdesk_ticket_id")) == 1
+        upserts = _statements(session, "INSERT INTO etl_freshdesk_ratings")
+        assert len(upserts) == 1
+        assert "rating_score = excluded.rating_score" in upserts[0]
+        assert result["total_synced"] == 3
+        assert result["tickets_updated"] == 1
+
+
+class TestCheckpoints:
+    """Page-level checkpoints, resume and source watermarks."""
+
+    CHECKPOINT = {
+        "since": "2025-06-01T00:00:00+00:00",
+        "page": 4,
+        "watermark": "2025-06-08T14:20:23+00:00",
+        "started_at": "2025-06-20T00:00:00+00:00",
+        "saved_at": "2025-06-20T00:10:00+00:00",
+    }
+
+    def _checkpoints(self, session) -> list:
+        """Checkpoints written to sync_metadata, in order."""
+        params = [call.args[0].compile(dialect=postgresql.dialect()).params for call in session.execute.call_args_list]
+        return [p["checkpoint"] for p in params if isinstance(p.get("checkpoint"), dict)]
+
+    def test_each_committed_page_writes_a_checkpoint(self, etl, session):
+        newer = {**TICKET, "id": 385661, "updated_at": "2025-06-09T08:00:00Z"}
+        etl.api.get_tickets.side_effect = [([TICKET], "next"), ([newer], None)]
+
+        result = etl.sync_ticket_data(since=datetime(2025, 6, 1, tzinfo=timezone.utc))
+
+        checkpoints = self._checkpoints(session)
+        assert [c["page"] for c in checkpoints] == [1, 2]
+        assert checkpoints[0]["watermark"] == "2025-06-08T14:20:23+00:00"
+        assert checkpoints[1]["watermark"] == "2025-06-09T08:00:00+00:00"
+        assert checkpoints[1]["since"] == "2025-06-01T00:00:00+00:00"
+        assert result["complete"] is True
+
+    def test_resume_continues_after_the_checkpoint_page(self, etl, session):
+        etl.api.get_tickets.return_value = ([], None)
+
+        with patch.object(etl, "get_checkpoint", return_value=self.CHECKPOINT):
+            result = etl.sync_ticket_data(since=datetime(2025, 1, 1, tzinfo=timezone.utc), resume=True)
+
+        kwargs = etl.api.get_tickets.call_args.kwargs
+        assert kwargs["page"] == 5
+        assert kwargs["updated_since"] == "2025-06-01T00:00:00+00:00"
+        assert result["resumed"] is True
+        assert result["run_started_at"] == datetime(2025, 6, 20, tzinfo=timezone.utc)
+
+    def test_completed_run_promotes_watermark(self, etl, session):
+        etl.api.get_tickets.return_value = ([TICKET], None)
+
+        with patch.object(etl, "update_sync_metadata") as update:
+            etl.sync_ticket_data(since=datetime(2025, 6, 1, tzinfo=timezone.utc))
+
+        assert update.call_args.args == ("freshdesk_tickets", "success")
+        assert update.call_args.kwargs["watermark_at"] == datetime(2025, 6, 8, 14, 20, 23, tzinfo=timezone.utc)
+
+    def test_max_pages_leaves_run_resumable(self, etl, session):
+        etl.api.get_tickets.return_value = ([TICKET], "next")
+
+        with patch.object(etl, "update_sync_metadata") as update:
+            result = etl.sync_ticket_data(since=datetime(2025, 6, 1, tzinfo=timezone.utc), max_pages=1)
+
+        assert update.call_args.args == ("freshdesk_tickets", "partial")
+        assert update.call_args.kwargs["watermark_at"] is None
+        assert result["complete"] is False
+
+    def test_page_with_rejected_rows_is_not_checkpointed(self, etl, session):
+        bad = {**TICKET, "id": 385661, "subject": "bad\u0000byte"}
+        newer = {**TICKET, "id": 385662, "updated_at": "2025-06-09T08:00:00Z"}
+        etl.api.get_tickets.side_effect = [([TICKET], "next"), ([newer, bad], "next")]
+        real_execute = session.execute
+
+        def execute(statement):
+            if "385661" in statement.compile(dialect=postgresql.dialect()).params.values():
+                raise ValueError("unsupported Unicode escape sequence")
+            return real_execute(statement)
+
+        session.execute = Mock(side_effect=execute)
+
+        with patch.object(etl, "update_sync_metadata") as update:
+            result = etl.sync_ticket_data(since=datetime(2025, 6, 1, tzinfo=timezone.utc))
+
+        # Only page 1 is checkpointed; the good ticket on page 2 is still written
+        assert [c["page"] for c in self._checkpoints(session)] == [1]
+        assert etl.api.get_tickets.call_count == 2
+        assert update.call_args.args == ("freshdesk_tickets", "failed")
+        assert update.call_args.kwargs["watermark_at"] is None
+        assert result["status"] == "failed"
+        assert result["total_synced"] == 2
+        assert result["total_errors"] == 1
+        assert result["last_ticket_id"] == "385662"
+
+    def test_success_clears_checkpoint_and_keeps_last_sync(self, etl, session):
+        etl.update_sync_metadata("freshdesk_tickets", "in_progress")
+        etl.update_sync_metadata("freshdesk_tickets", "success")
+
+        in_progress, success = (_compile(call.args[0]) for call in session.execute.call_args_list)
+        assert "checkpoint = sync_metadata.checkpoint" in in_progress
+        assert "last_sync_at = coalesce(excluded.last_sync_at, sync_metadata.last_sync_at)" in in_progress
+        assert "checkpoint = NULL" in success
+
+    def test_incremental_ratings_start_from_watermark(self, etl, session):
+        etl.api.get_satisfaction_ratings.return_value = ([], None)
+        watermark = datetime(2025, 6, 4, 18, 20, 30, tzinfo=timezone.utc)
+
+        with patch.object(etl, "get_last_sync_timestamp", return_value=watermark):
+            etl.sync_satisfaction_ratings(incremental=True)
+
+        assert etl.api.get_satisfaction_ratings.call_args.kwargs["created_since"] == watermark.isoformat()
+
+    def test_resumed_ticket_sync_owes_conversations_for_earlier_pages(self, etl, session):
+        etl.api.get_tickets.return_value = ([], None)
+        etl.api.get_conversations.return_value = ([], None)
+
+        with patch.object(etl, "get_checkpoint", side_effect=lambda resource: self.CHECKPOINT if resource == "freshdesk_tickets" else None), \
+                patch.object(etl, "_tickets_written_since", return_value=["385660"]) as written, \
+                patch.object(etl, "sync_conversations_for_tickets", return_value={"status": "success"}) as conversations:
+            etl.sync_tickets(resume=True)
+
+        written.assert_called_once_with(datetime(2025, 6, 20, tzinfo=timezone.utc))
+        assert conversations.call_args.kwargs["ticket_ids"] == ["385660"]
@@ -0,0 +1,242 @@
+"""Tests for the process-wide grounding cache and grounding prefetch."""
+
+import asyncio
+import json
+import sys
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+import httpx
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from app.models import Message  # noqa: E402
+from app.services import message_processor  # noqa: E402
+from app.services.message_processor import MessageProcessor, cancel_prefetch_tasks  # noqa: E402
+from app.services.grounding_cache import GroundingCache, get_grounding_cache  # noqa: E402
+from app.services.grounding_manager import GroundingDirective, GroundingManager  # noqa: E402
+from app.services.knowledge_client import KNOWLEDGE_PROVIDER, AsyncKnowledgeServiceClient  # noqa: E402
+from app.utils.http_pool import aclose_clients, get_async_client  # noqa: E402
+
+
+class SlowQuery:
+    """Stand-in for a knowledge service query that counts calls."""
+
+    def __init__(self, result="NPR knowledge", duration=0.1):
+        self.result = result
+        self.duration = duration
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, *args, **kwargs):
+        with self.lock:
+            self.calls += 1
+        time.sleep(self.duration)
+        return self.result
+
+
+class TestGroundingCache:
+    """TTL, LRU and single-flight behaviour."""
+
+    def test_entries_expire(self):
+        cache = GroundingCache(ttl_seconds=0.05)
+        cache.put("npr", "hybrid", "q", "result")
+        assert cache.get("npr", "hybrid", "q") == "result"
+
+        time.sleep(0.06)
+
+        assert cache.get("npr", "hybrid", "q") is None
+        assert cache.stats["expired"] == 1
+
+    def test_evicts_least_recently_used(self):
+        cache = GroundingCache(max_entries=2)
+        cache.put("npr", "hybrid", "a", "A")
+        cache.put("npr", "hybrid", "b", "B")
+        cache.get("npr", "hybrid", "a")
+        cache.put("npr", "hybrid", "c", "C")
+
+        assert cache.get("npr", "hybrid", "b") is None
+        assert cache.get("npr", "hybrid", "a") == "A"
+        assert cache.get_stats()["evictions"] == 1
+
+    def test_concurrent_identical_queries_run_once(self):
+        cache = GroundingCache()
+        query = SlowQuery()
+        results = []
+
+        def lookup(text):
+            results.append(cache.get_or_fetch("npr", "hybrid", text, query))
+
+        threads = [threading.Thread(target=lookup, args=(text,))
+                   for text in ["Who is Terry Gross?", "who is terry  gross?", "WHO IS TERRY GROSS?"]]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert query.calls == 1
+        assert sorted(results) == [("NPR knowledge", False), ("NPR knowledge", True), ("NPR knowledge", True)]
+        assert cache.get_stats()["coalesced"] == 2
+
+    def test_empty_results_and_errors_are_not_cached(self):
+        cache = GroundingCache()
+        assert cache.get_or_fetch("npr", "hybrid", "q", lambda: None) == (None, False)
+
+        def fail():
+            raise ConnectionError("knowledge service down")
+
+        with pytest.raises(ConnectionError):
+            cache.get_or_fetch("npr", "hybrid", "q", fail)
+
+        assert cache.get_or_fetch("npr", "hybrid", "q", lambda: "result") == ("result", False)
+        stats = cache.get_stats()
+        assert stats["errors"] == 1 and stats["in_flight"] == 0
+
+
+class AsyncSlowQuery(SlowQuery):
+    """Async stand-in for a knowledge service query; durations override per namespace."""
+
+    durations = {}
+
+    async def __call__(self, namespace, query, mode="hybrid"):
+        with self.lock:
+            self.calls += 1
+        await asyncio.sleep(self.durations.get(namespace, self.duration))
+        return self.result
+
+
+def _messages():
+    return [Message(sender="merchant", content="Tell me about NPR shows", timestamp=datetime.now())]
+
+
+class TestGroundingPrefetch:
+    """Prefetched queries are reused by the turn instead of queried again."""
+
+    def setup_method(self):
+        get_grounding_cache().clear()
+
+    @pytest.mark.asyncio
+    async def test_turn_joins_in_flight_prefetch(self):
+        directives = [GroundingDirective("npr", limit=5), GroundingDirective("docs", limit=5)]
+        prefetch_query = AsyncSlowQuery(duration=0.2)
+        turn_query = SlowQuery()
+
+        with patch("app.services.knowledge_client.AsyncKnowledgeServiceClient.query", prefetch_query), \
+                patch("app.services.knowledge_client.KnowledgeServiceClient.query", turn_query):
+            prefetch = asyncio.create_task(GroundingManager().prefetch(directives, _messages()))
+
+            # The turn starts while the prefetch is still running
+            await asyncio.sleep(0.05)
+            results = await asyncio.to_thread(GroundingManager().process_grounding, directives, _messages())
+            assert await prefetch == 2
+
+        assert prefetch_query.calls == 2  # one per namespace
+        assert turn_query.calls == 0
+        assert set(results) == {"npr", "docs"}
+
+    @pytest.mark.asyncio
+    async def test_prefetch_tasks_are_tracked_and_cancelled_on_shutdown(self):
+        directives = [GroundingDirective("npr", limit=5)]
+        session = Mock()
+        session.conversation.state.context_window = _messages()
+        processor = MessageProcessor()
+
+        with patch.object(message_processor, "get_grounding_directives", return_value=directives), \
+                patch("app.services.knowledge_client.AsyncKnowledgeServiceClient.query", AsyncSlowQuery(duration=5)):
+            task = processor._start_prefetch(session)
+            await asyncio.sleep(0.05)
+            assert task in message_processor._prefetch_tasks
+
+            assert await cancel_prefetch_tasks() == 1
+
+        assert task.cancelled()
+        assert task not in message_processor._prefetch_tasks
+        assert get_grounding_cache().get_stats()["in_flight"] == 0
+
+
+class TestGroundingFanOut:
+    """Namespaces are queried concurrently and slow ones are dropped."""
+
+    def setup_method(self):
+        get_grounding_cache().clear()
+
+    def test_namespaces_are_queried_concurrently(self):
+        directives = [GroundingDirective(ns, limit=5) for ns in ("npr", "docs", "faq")]
+        query = SlowQuery(duration=0.2)
+        manager = GroundingManager()
+
+        with patch.object(manager.knowledge_client, "query", query):
+            started = time.perf_counter()
+            results = manager.process_grounding(directives, _messages())
+            elapsed = time.perf_counter() - started
+
+        assert set(results) == {"npr", "docs", "faq"}
+        # Three serial queries would take 0.6s
+        assert elapsed < 0.4
+
+    def test_slow_namespace_is_left_out(self):
+        directives = [GroundingDirective("npr", limit=5), GroundingDirective("slow", limit=5)]
+        manager = GroundingManager()
+        manager.query_timeout = 0.2
+        debug_callback = Mock()
+
+        def query(namespace, query, mode):
+            time.sleep(0.5 if namespace == "slow" else 0.01)
+            return f"{namespace} knowledge"
+
+        with patch.object(manager.knowledge_client, "query", query):
+            started = time.perf_counter()
+            results = manager.process_grounding(directives, _messages(), debug_callback)
+            elapsed = time.perf_counter() - started
+
+        assert list(results) == ["npr"]
+        assert elapsed < 0.4
+        errors = [c.kwargs.get("error") for c in debug_callback.capture_grounding.call_args_list]
+        assert errors == [None, "Timed out after 0.2s"]
+
+    @pytest.mark.asyncio
+    async def test_async_fan_out_keeps_partial_results(self):
+        directives = [GroundingDirective(ns, limit=5) for ns in ("npr", "docs", "late")]
+        manager = GroundingManager()
+        manager.query_timeout = 0.3
+        query = AsyncSlowQuery(duration=0.1)
+        query.durations = {"late": 1.0}
+
+        with patch.object(manager.async_knowledge_client, "query", query):
+            started = time.perf_counter()
+            results = await manager.aprocess_grounding(directives, _messages())
+            elapsed = time.perf_counter() - started
+
+        assert set(results) == {"npr", "docs"}
+        assert elapsed < 0.5
+        assert get_grounding_cache().get_stats()["in_flight"] == 0
+
+
+class TestAsyncKnowledgeServiceClient:
+    """The async client goes through the shared connection pool."""
+
+    @pytest.mark.asyncio
+    async def test_query_uses_pooled_client(self):
+        requests_seen = []
+
+        def handler(request):
+            requests_seen.append(request)
+            if request.url.path == "/api/missing/query":
+                return httpx.Response(404)
+            return httpx.Response(200, json={"result": "NPR knowledge"})
+
+        client = AsyncKnowledgeServiceClient(base_url="http://knowledge.test")
+        pooled = get_async_client(KNOWLEDGE_PROVIDER, "http://knowledge.test")
+        pooled.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        try:
+            assert await client.query("npr", "Who is Terry Gross?") == "NPR knowledge"
+            assert await client.query("missing", "anything") is None
+            assert get_async_client(KNOWLEDGE_PROVIDER, "http://knowledge.test") is pooled
+        finally:
+            await aclose_clients()
+
+        assert json.loads(requests_seen[0].content) == {"query": "Who is Terry Gross?", "mode": "hybrid"}
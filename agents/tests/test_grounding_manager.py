@@ -4,6 +4,7 @@ import pytest
 from unittest.mock import Mock, patch
 from datetime import datetime
 
+from app.services.grounding_cache import get_grounding_cache
 from app.services.grounding_manager import GroundingManager, GroundingDirective
 from app.models import Message
 
@@ -11,6 +12,10 @@ from app.models import Message
 class TestGroundingManager:
     """Test cases for GroundingManager."""
     
+    def setup_method(self):
+        # The grounding cache is shared by the process
+        get_grounding_cache().clear()
+    
     def test_extract_grounding_directives_simple(self):
         """Test extracting simple grounding directives."""
         manager = GroundingManager()
@@ -104,19 +109,38 @@ class TestGroundingManager:
         manager = GroundingManager()
         
         # Cache a result
-        manager._cache_result("npr:hybrid", "Cached content")
+        manager.cache.put("npr", "hybrid", "Who is Terry Gross?", "Cached content")
         
-        # Should get cached result
-        cached = manager._get_cached_result("npr:hybrid")
+        # Should get cached result, also for differently spaced or cased queries
+        cached = manager.cache.get("npr", "hybrid", "who is  terry gross?")
         assert cached == "Cached content"
+        assert manager.cache.get("npr", "global", "Who is Terry Gross?") is None
         
         # Clear cache
         manager.clear_cache()
         
         # Should not get cached result
-        cached = manager._get_cached_result("npr:hybrid")
+        cached = manager.cache.get("npr", "hybrid", "Who is Terry Gross?")
         assert cached is None
     
+    def test_cache_shared_across_managers(self):
+        """A new manager per turn still hits results cached by earlier turns."""
+        directives = [GroundingDirective("npr", limit=5, mode="hybrid")]
+        messages = [
+            Message(sender="merchant", content="Tell me about NPR shows", timestamp=datetime.now())
+        ]
+        
+        first = GroundingManager()
+        with patch.object(first.knowledge_client, 'query', return_value="NPR knowledge result"):
+            first.process_grounding(directives, messages)
+        
+        second = GroundingManager()
+        with patch.object(second.knowledge_client, 'query') as mock_query:
+            results = second.process_grounding(directives, messages)
+        
+        mock_query.assert_not_called()
+        assert "NPR knowledge result" in results["npr"]
+    
     def test_process_grounding_integration(self):
         """Test full grounding processing flow."""
         manager = GroundingManager()
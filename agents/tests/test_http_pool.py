@@ -0,0 +1,274 @@
+"""Tests for the pooled provider HTTP client registry.
+
+Clients run against a local keep-alive HTTP stand-in that counts connections and
+requests in flight and can be scripted to answer with 429s or 5xx first.
+"""
+
+import asyncio
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+import requests
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from app.lib import shopify_customer_lib  # noqa: E402
+from app.utils import http_pool  # noqa: E402
+from app.utils.shopify_util import ShopifyGraphQL  # noqa: E402
+from app.utils.http_pool import RetryPolicy, get_async_client, get_client, parse_retry_after  # noqa: E402
+
+
+FAST_RETRY = RetryPolicy(max_retries=3, backoff_base=0.01, backoff_max=0.05)
+
+
+class ProviderStandin(ThreadingHTTPServer):
+    """Local provider API: keep-alive, scripted failures, connection and concurrency counters."""
+
+    daemon_threads = True
+
+    def __init__(self, latency=0.0):
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.latency = latency
+        self.script = []  # (status, headers) answered before falling back to 200
+        self.lock = threading.Lock()
+        self.connections = 0
+        self.requests = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.tokens = []  # X-Shopify-Access-Token of each request
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/api"
+
+    def next_status(self):
+        with self.lock:
+            self.requests += 1
+            return self.script.pop(0) if self.script else (200, {})
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.in_flight += 1
+            server.peak_in_flight = max(server.peak_in_flight, server.in_flight)
+            server.tokens.append(self.headers.get("X-Shopify-Access-Token"))
+        time.sleep(server.latency)
+        status, headers = server.next_status()
+        body = b'{"ok": true}'
+
+        with server.lock:
+            server.in_flight -= 1
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.do_GET()
+
+
+@pytest.fixture
+def standin():
+    servers = []
+
+    def start(**kwargs):
+        server = ProviderStandin(**kwargs)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return server
+
+    yield start
+    http_pool.close_clients()
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+class TestRetryPolicy:
+    """Backoff timing."""
+
+    def test_retry_after_wins_over_backoff(self):
+        assert RetryPolicy().delay(0, "2.5") == 2.5
+
+    def test_retry_after_accepts_http_dates(self):
+        assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+        assert parse_retry_after("soon") is None
+
+    def test_backoff_is_jittered_and_capped(self):
+        policy = RetryPolicy(backoff_base=1.0, backoff_max=4.0)
+        delays = [policy.delay(attempt) for attempt in (0, 1, 5) for _ in range(50)]
+
+        assert all(0 <= delay <= 4.0 for delay in delays)
+        assert max(policy.delay(5) for _ in range(50)) > 1.0
+        assert len(set(delays)) > 1
+
+
+class TestPooledClient:
+    """Shared sync clients against the stand-in."""
+
+    def test_registry_returns_one_client_per_provider_and_shop(self):
+        client = get_client("shopify", "a.myshopify.com")
+
+        assert get_client("shopify", "a.myshopify.com") is client
+        assert get_client("shopify", "b.myshopify.com") is not client
+        assert get_client("freshdesk", "a.myshopify.com") is not client
+        http_pool.close_clients()
+
+    def test_connections_are_kept_alive(self, standin):
+        server = standin()
+        client = get_client("test", "keepalive")
+
+        for _ in range(5):
+            assert client.get(server.url).status_code == 200
+
+        assert server.connections == 1
+
+    def test_retries_honor_retry_after(self, standin):
+        server = standin()
+        server.script = [(429, {"Retry-After": "0.2"})]
+        client = get_client("test", "throttled", retry=FAST_RETRY)
+
+        started = time.monotonic()
+        response = client.get(server.url)
+
+        assert response.status_code == 200
+        assert time.monotonic() - started >= 0.2
+        assert server.requests == 2 and client.stats["retries"] == 1
+
+    def test_gives_up_after_max_retries(self, standin):
+        server = standin()
+        server.script = [(503, {})] * 10
+        client = get_client("test", "down", retry=FAST_RETRY)
+
+        assert client.get(server.url).status_code == 503
+        assert server.requests == 4
+
+    def test_posts_are_only_retried_on_429_unless_idempotent(self, standin):
+        server = standin()
+        client = get_client("test", "post", retry=FAST_RETRY)
+
+        server.script = [(503, {})]
+        assert client.post(server.url, json={"mutation": 1}).status_code == 503
+        server.script = [(429, {"Retry-After": "0"})]
+        assert client.post(server.url, json={"mutation": 2}).status_code == 200
+        server.script = [(503, {})]
+        assert client.post(server.url, json={"query": 3}, idempotent=True).status_code == 200
+
+        assert server.requests == 5
+
+    def test_posts_are_not_resent_after_connection_errors(self):
+        client = get_client("test", "unreachable", retry=FAST_RETRY)
+        with patch.object(client.session, "request", side_effect=requests.exceptions.ConnectionError("reset")) as send:
+            with pytest.raises(requests.exceptions.ConnectionError):
+                client.post("http://127.0.0.1:9/api")
+            assert send.call_count == 1
+
+            with pytest.raises(requests.exceptions.ConnectionError):
+                client.get("http://127.0.0.1:9/api")
+            assert send.call_count == 5
+        http_pool.close_clients()
+
+    def test_graphql_mutations_are_sent_once(self, standin):
+        server = standin()
+        server.script = [(503, {})]
+        graphql = ShopifyGraphQL("mutation.myshopify.com", "token", endpoint=server.url)
+
+        mutation = "mutation RunBulkQuery($query: String!) { bulkOperationRunQuery(query: $query) { userErrors { message } } }"
+
+        with pytest.raises(Exception):
+            graphql.execute(mutation, {"query": "{ customers { edges { node { id } } } }"})
+
+        assert server.requests == 1
+
+    def test_callers_with_different_credentials_keep_their_own(self, standin):
+        server = standin()
+        old = ShopifyGraphQL("rotated.myshopify.com", "old-token", endpoint=server.url)
+        new = ShopifyGraphQL("rotated.myshopify.com", "new-token", endpoint=server.url)
+
+        assert old.http is new.http
+        old.execute("{ shop { name } }")
+        new.execute("{ shop { name } }")
+        old.execute("{ shop { name } }")
+
+        assert server.tokens == ["old-token", "new-token", "old-token"]
+        assert "X-Shopify-Access-Token" not in old.http.session.headers
+
+    def test_per_host_cap_bounds_requests_in_flight(self, standin):
+        server = standin(latency=0.05)
+        client = get_client("test", "capped", max_connections=2)
+
+        threads = [threading.Thread(target=client.get, args=(server.url,)) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert server.requests == 8
+        assert server.peak_in_flight == 2
+
+
+class TestAsyncPooledClient:
+    """Shared async clients against the stand-in."""
+
+    def test_cap_retries_and_reuse(self, standin):
+        server = standin(latency=0.05)
+        server.script = [(502, {})]
+
+        async def run():
+            client = get_async_client("test", "async", max_connections=2, retry=FAST_RETRY)
+            assert get_async_client("test", "async") is client
+            responses = await asyncio.gather(*(client.get(server.url) for _ in range(6)))
+            await http_pool.aclose_clients()
+            return client, responses
+
+        client, responses = asyncio.run(run())
+
+        assert [response.status_code for response in responses] == [200] * 6
+        assert client.stats["retries"] == 1
+        assert server.peak_in_flight <= 2
+        assert server.connections <= 3
+
+    def test_http2_falls_back_without_h2(self):
+        async def run():
+            with patch.object(http_pool, "_http2_available", return_value=False):
+                client = get_async_client("test", "http2", http2=True)
+            await http_pool.aclose_clients()
+            return client
+
+        assert asyncio.run(run()).http2 is False
+
+
+class TestShopifyCustomerLib:
+    """Agent tools reuse one GraphQL client."""
+
+    def test_client_is_built_once_per_shop(self):
+        shopify_customer_lib._client_for.cache_clear()
+        with patch.object(shopify_customer_lib, "ShopifyGraphQL") as graphql, \
+                patch.object(shopify_customer_lib, "get_env", lambda key: f"{key.lower()}-value"):
+            graphql.return_value.execute.return_value = {"customers": {"edges": []}}
+            shopify_customer_lib.find_shopify_customer_by_email("a@example.com")
+            shopify_customer_lib.search_customers_fuzzy("pat")
+
+        graphql.assert_called_once_with("shopify_shop_domain-value", "shopify_api_token-value")
+        shopify_customer_lib._client_for.cache_clear()
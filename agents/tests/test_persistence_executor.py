@@ -0,0 +1,91 @@
+"""Tests for the bounded persistence executor."""
+
+import asyncio
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from app.services.persistence_executor import PersistenceBacklogError, PersistenceExecutor
+
+
+class TestPersistenceExecutor:
+    """Blocking calls run off the loop, bounded by workers and backlog."""
+
+    @pytest.mark.asyncio
+    async def test_runs_off_event_loop_thread(self):
+        executor = PersistenceExecutor(max_workers=2, max_pending=10)
+        try:
+            thread_name = await executor.run(lambda: threading.current_thread().name)
+            assert thread_name.startswith("persistence")
+            assert executor.get_stats()["completed"] == 1
+        finally:
+            executor.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_loop_stays_responsive_while_calls_block(self):
+        executor = PersistenceExecutor(max_workers=2, max_pending=10)
+        try:
+            calls = [asyncio.create_task(executor.run(time.sleep, 0.2)) for _ in range(4)]
+            started = time.perf_counter()
+            await asyncio.sleep(0.01)
+            # A sync call on the loop would have held it for at least 0.2s
+            assert time.perf_counter() - started < 0.1
+            await asyncio.gather(*calls)
+        finally:
+            executor.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_caps_concurrent_workers(self):
+        executor = PersistenceExecutor(max_workers=2, max_pending=10)
+        running = 0
+        peak = 0
+        lock = threading.Lock()
+
+        def work():
+            nonlocal running, peak
+            with lock:
+                running += 1
+                peak = max(peak, running)
+            time.sleep(0.05)
+            with lock:
+                running -= 1
+
+        try:
+            await asyncio.gather(*(executor.run(work) for _ in range(6)))
+            assert peak == 2
+        finally:
+            executor.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_rejects_beyond_max_pending(self):
+        executor = PersistenceExecutor(max_workers=1, max_pending=2)
+        try:
+            calls = [asyncio.create_task(executor.run(time.sleep, 0.1)) for _ in range(2)]
+            await asyncio.sleep(0)
+            with pytest.raises(PersistenceBacklogError):
+                await executor.run(time.sleep, 0)
+            await asyncio.gather(*calls)
+            assert executor.get_stats()["rejected"] == 1
+            assert executor.pending == 0
+        finally:
+            executor.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_propagates_errors(self):
+        executor = PersistenceExecutor(max_workers=1, max_pending=2)
+
+        def fail():
+            raise ValueError("db down")
+
+        try:
+            with pytest.raises(ValueError):
+                await executor.run(fail)
+            assert executor.get_stats()["failed"] == 1
+            assert executor.pending == 0
+        finally:
+            executor.shutdown()
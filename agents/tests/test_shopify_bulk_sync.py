@@ -0,0 +1,310 @@
+"""Tests for the Shopify bulk-operation customer sync.
+
+The sync runs against a local HTTP stand-in for Shopify that answers the bulk
+operation mutation and status polls over GraphQL and serves a canned JSONL result
+file, so the whole submit / poll / stream / upsert path runs offline.
+"""
+
+import json
+import sys
+import threading
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from app.lib import etl_upsert_lib, shopify_lib  # noqa: E402
+from app.lib.shopify_lib import ShopifyETL  # noqa: E402
+from app.utils.shopify_util import BulkOperationError, ShopifyGraphQL  # noqa: E402
+
+
+OPERATION_ID = "gid://shopify/BulkOperation/1"
+
+
+def _customer_line(customer_id: int) -> dict:
+    return {
+        "id": f"gid://shopify/Customer/{customer_id}",
+        "email": f"customer{customer_id}@example.com",
+        "firstName": "Pat",
+        "lastName": f"Customer {customer_id}",
+        "numberOfOrders": "3",
+        "amountSpent": {"amount": "42.50", "currencyCode": "USD"},
+        "emailMarketingConsent": {"marketingState": "SUBSCRIBED"},
+        "tags": ["vip"],
+        "state": "ENABLED",
+        "updatedAt": "2025-01-02T00:00:00Z",
+    }
+
+
+class BulkShopify(ThreadingHTTPServer):
+    """Local Shopify stand-in: bulk operation GraphQL endpoint plus the JSONL result file."""
+
+    daemon_threads = True
+
+    def __init__(self, customers, running_polls=2, final_status="COMPLETED", user_errors=()):
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.lines = [json.dumps(_customer_line(i)).encode() + b"\n" for i in range(1, customers + 1)]
+        self.running_polls = running_polls
+        self.final_status = final_status
+        self.user_errors = list(user_errors)
+        self.submitted_queries = []
+        self.polls = 0
+        self.lines_sent = 0
+        # When set, the file stops after pause_after lines until resume is set
+        self.pause_after = None
+        self.resume = threading.Event()
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    @property
+    def endpoint(self) -> str:
+        return f"{self.base_url}/admin/api/2025-01/graphql.json"
+
+    def graphql(self, payload: dict) -> dict:
+        if "bulkOperationRunQuery" in payload["query"]:
+            self.submitted_queries.append(payload["variables"]["query"])
+            return {"bulkOperationRunQuery": {
+                "bulkOperation": None if self.user_errors else {"id": OPERATION_ID, "status": "CREATED"},
+                "userErrors": [{"field": ["query"], "message": message} for message in self.user_errors],
+            }}
+
+        self.polls += 1
+        if self.polls <= self.running_polls:
+            return {"node": {"id": OPERATION_ID, "status": "RUNNING", "objectCount": "0", "url": None}}
+        completed = self.final_status == "COMPLETED"
+        return {"node": {
+            "id": OPERATION_ID,
+            "status": self.final_status,
+            "errorCode": None if completed else "INTERNAL_SERVER_ERROR",
+            "objectCount": str(len(self.lines)),
+            "url": f"{self.base_url}/bulk/customers.jsonl" if completed and self.lines else None,
+        }}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        body = json.dumps({"data": self.server.graphql(payload)}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        # No Content-Length: the file streams until the connection closes
+        server = self.server
+        self.send_response(200)
+        self.send_header("Content-Type", "application/jsonl")
+        self.end_headers()
+        for number, line in enumerate(server.lines, start=1):
+            self.wfile.write(line)
+            server.lines_sent = number
+            if number == server.pause_after:
+                self.wfile.flush()
+                server.resume.wait(timeout=5)
+
+
+@pytest.fixture
+def standin():
+    servers = []
+
+    def start(customers, **kwargs):
+        server = BulkShopify(customers, **kwargs)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.resume.set()
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture
+def etl():
+    with patch.object(shopify_lib, "ShopifyAPI"):
+        etl = ShopifyETL(merchant_id=1)
+    etl.update_sync_metadata = Mock()
+    etl.get_last_sync_timestamp = Mock(return_value=None)
+    return etl
+
+
+class RecordingUpsert:
+    """Stand-in for upsert_changed_rows that records batch sizes and treats every row as changed."""
+
+    def __init__(self, server=None, rejected=()):
+        self.server = server
+        self.rejected = set(rejected)  # customer ids Postgres refuses
+        self.batches = []
+        self.lines_sent_at_first_batch = None
+
+    def __call__(self, session, model, rows, index_elements, force=False, unhashed_keys=()):
+        if any(row["shopify_customer_id"] in self.rejected for row in rows):
+            raise ValueError("invalid byte sequence")
+        if not self.batches and self.server:
+            self.lines_sent_at_first_batch = self.server.lines_sent
+            self.server.resume.set()
+        self.batches.append(rows)
+        return [row["shopify_customer_id"] for row in rows]
+
+
+def _run(etl, server, upsert, **kwargs):
+    etl.graphql = ShopifyGraphQL("test.myshopify.com", "token", endpoint=server.endpoint)
+    session = Mock()
+
+    @contextmanager
+    def get_db_session():
+        yield session
+
+    with patch.object(shopify_lib, "get_db_session", get_db_session), \
+            patch.object(etl_upsert_lib, "upsert_changed_rows", upsert):
+        result = etl.sync_customers_bulk(poll_interval=0.01, **kwargs)
+    return result, session
+
+
+class TestBulkCustomerSync:
+    """Submit, poll, stream and upsert against the stand-in."""
+
+    def test_streams_result_file_into_batched_upserts(self, standin, etl):
+        server = standin(1234)
+        upsert = RecordingUpsert()
+
+        result, session = _run(etl, server, upsert, batch_size=500)
+
+        assert [len(batch) for batch in upsert.batches] == [500, 500, 234]
+        assert session.commit.call_count == 3
+        assert server.polls == 3
+        assert result["status"] == "success"
+        assert result["total_synced"] == result["total_changed"] == 1234
+        assert result["last_customer_id"] == "1234"
+        etl.update_sync_metadata.assert_called_with("shopify_customers", "success", last_successful_id="1234")
+
+    def test_first_batch_is_written_before_the_download_finishes(self, standin, etl):
+        server = standin(300)
+        server.pause_after = 150
+        upsert = RecordingUpsert(server)
+
+        result, _ = _run(etl, server, upsert, batch_size=100)
+
+        # The stand-in holds back the rest of the file until the first upsert arrives
+        assert 100 <= upsert.lines_sent_at_first_batch <= 150
+        assert [len(batch) for batch in upsert.batches] == [100, 100, 100]
+        assert result["total_synced"] == 300
+
+    def test_rejected_customer_costs_only_itself(self, standin, etl):
+        server = standin(10)
+        upsert = RecordingUpsert(rejected={"7"})
+
+        result, session = _run(etl, server, upsert, batch_size=500)
+
+        written = [row["shopify_customer_id"] for batch in upsert.batches for row in batch]
+        assert sorted(written, key=int) == [str(i) for i in range(1, 11) if i != 7]
+        assert result["total_synced"] == 9 and result["total_errors"] == 1
+        assert result["last_customer_id"] == "10"
+        session.commit.assert_called_once()
+
+    def test_nodes_map_onto_rest_customer_fields(self, standin, etl):
+        server = standin(1)
+        upsert = RecordingUpsert()
+
+        _run(etl, server, upsert)
+
+        (row,) = upsert.batches[0]
+        assert row["shopify_customer_id"] == "1"
+        assert row["data"]["orders_count"] == 3
+        assert row["data"]["total_spent"] == 42.5
+        assert row["data"]["currency"] == "USD"
+        assert row["data"]["accepts_marketing"] is True
+        assert row["data"]["state"] == "enabled"
+        assert row["data"]["tags"] == ["vip"]
+
+    def test_incremental_sync_filters_on_updated_at(self, standin, etl):
+        server = standin(0)
+        etl.get_last_sync_timestamp.return_value = Mock(isoformat=lambda: "2025-01-01T00:00:00+00:00")
+
+        result, _ = _run(etl, server, RecordingUpsert())
+
+        assert "customers(query: \"updated_at:>='2025-01-01T00:00:00+00:00'\")" in server.submitted_queries[0]
+        assert result["status"] == "success" and result["total_synced"] == 0
+
+    def test_failed_operation_marks_sync_failed(self, standin, etl):
+        server = standin(10, final_status="FAILED")
+
+        result, _ = _run(etl, server, RecordingUpsert())
+
+        assert result["status"] == "failed"
+        assert "INTERNAL_SERVER_ERROR" in result["error"]
+        etl.update_sync_metadata.assert_called_with("shopify_customers", "failed", error_message=result["error"])
+
+    def test_rejected_query_raises(self, standin):
+        server = standin(0, user_errors=["Bulk operation already in progress"])
+        client = ShopifyGraphQL("test.myshopify.com", "token", endpoint=server.endpoint)
+
+        with pytest.raises(BulkOperationError, match="already in progress"):
+            client.run_bulk_query("{ customers { edges { node { id } } } }")
+
+
+class TestCustomerRowShape:
+    """REST and bulk rows for the same customer store the same data."""
+
+    REST_CUSTOMER = {
+        "id": 207119551, "email": "bob@example.com", "first_name": "Bob", "last_name": "Norman",
+        "phone": "+16136120707", "orders_count": 3, "total_spent": "42.50", "currency": "USD",
+        "accepts_marketing": True, "tags": "vip, wholesale", "state": "enabled", "verified_email": True,
+        "created_at": "2024-03-01T10:00:00-05:00", "updated_at": "2025-01-02T00:00:00-05:00",
+        "default_address": {
+            "id": 207119551, "customer_id": 207119551, "first_name": "Bob", "last_name": "Norman",
+            "company": None, "address1": "Chestnut Street 92", "address2": "", "city": "Louisville",
+            "province": "Kentucky", "country": "United States", "zip": "40202", "phone": "555-625-1199",
+            "name": "Bob Norman", "province_code": "KY", "country_code": "US",
+            "country_name": "United States", "default": True,
+        },
+    }
+    BULK_NODE = {
+        "id": "gid://shopify/Customer/207119551", "email": "bob@example.com", "firstName": "Bob",
+        "lastName": "Norman", "phone": "+16136120707", "numberOfOrders": "3",
+        "amountSpent": {"amount": "42.5", "currencyCode": "USD"},
+        "emailMarketingConsent": {"marketingState": "SUBSCRIBED"}, "tags": ["vip", "wholesale"],
+        "state": "ENABLED", "verifiedEmail": True,
+        "createdAt": "2024-03-01T15:00:00Z", "updatedAt": "2025-01-02T05:00:00Z",
+        "defaultAddress": {
+            "firstName": "Bob", "lastName": "Norman", "company": None, "address1": "Chestnut Street 92",
+            "address2": "", "city": "Louisville", "province": "Kentucky", "provinceCode": "KY",
+            "country": "United States", "countryCodeV2": "US", "zip": "40202", "phone": "555-625-1199",
+            "name": "Bob Norman",
+        },
+    }
+
+    def test_rest_and_bulk_rows_hash_the_same(self, etl):
+        rest = etl._customer_row(self.REST_CUSTOMER)["data"]
+        bulk = etl._bulk_customer_row(self.BULK_NODE)["data"]
+
+        assert {**rest, "_raw_data": None} == {**bulk, "_raw_data": None}
+        assert rest["default_address"]["province_code"] == "KY"
+        assert rest["created_at"] == "2024-03-01T15:00:00+00:00"
+        assert (etl_upsert_lib.content_hash(rest, shopify_lib.CUSTOMER_UNHASHED_KEYS)
+                == etl_upsert_lib.content_hash(bulk, shopify_lib.CUSTOMER_UNHASHED_KEYS))
+
+
+class TestCustomerCache:
+    """_ensure_customer_exists remembers a bounded number of customers."""
+
+    def test_cache_evicts_least_recently_used(self, etl):
+        etl._customer_cache_size = 2
+        with patch.object(shopify_lib, "upsert_changed_rows") as upsert:
+            for customer_id in (1, 2, 1, 3):
+                etl._ensure_customer_exists(Mock(), {"id": customer_id})
+
+        assert list(etl._customer_cache) == ["1", "3"]
+        assert upsert.call_count == 3
@@ -0,0 +1,239 @@
+"""Tests for the cost-aware Shopify GraphQL budget.
+
+Queries run against a local stand-in that enforces Shopify's leaky-bucket cost
+limit: the requested cost is taken when a query arrives, the difference to the
+actual cost is refunded when it finishes, and a query that does not fit gets a
+THROTTLED error. Every response carries extensions.cost like the real API.
+"""
+
+import asyncio
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from app.services.shopify_data_fetcher import ShopifyDataFetcher  # noqa: E402
+from app.utils.shopify_util import QueryCostBudget, ShopifyGraphQL  # noqa: E402
+
+
+class CostLimitedShopify(ThreadingHTTPServer):
+    """Local Shopify GraphQL stand-in with a leaky-bucket query cost limit."""
+
+    daemon_threads = True
+
+    def __init__(self, requested_cost=30, actual_cost=20, maximum=100.0, restore_rate=1000.0, latency=0.05):
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.requested_cost = requested_cost
+        self.actual_cost = actual_cost
+        self.maximum = maximum
+        self.restore_rate = restore_rate
+        self.latency = latency
+        self.available = maximum
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+        self.served = 0
+        self.throttled = 0
+
+    @property
+    def endpoint(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/admin/api/2025-01/graphql.json"
+
+    def _refill(self):
+        now = time.monotonic()
+        self.available = min(self.maximum, self.available + (now - self.updated) * self.restore_rate)
+        self.updated = now
+
+    def cost(self, actual):
+        return {
+            "requestedQueryCost": self.requested_cost,
+            "actualQueryCost": actual,
+            "throttleStatus": {
+                "maximumAvailable": self.maximum,
+                "currentlyAvailable": int(self.available),
+                "restoreRate": self.restore_rate,
+            },
+        }
+
+    def handle_query(self) -> dict:
+        with self.lock:
+            self._refill()
+            if self.available < self.requested_cost:
+                self.throttled += 1
+                return {
+                    "errors": [{"message": "Throttled", "extensions": {"code": "THROTTLED"}}],
+                    "extensions": {"cost": self.cost(None)},
+                }
+            self.available -= self.requested_cost
+        time.sleep(self.latency)
+        with self.lock:
+            self._refill()
+            self.available = min(self.maximum, self.available + self.requested_cost - self.actual_cost)
+            self.served += 1
+            return {"data": {"shop": {"name": "Stand-in"}}, "extensions": {"cost": self.cost(self.actual_cost)}}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers["Content-Length"]))
+        body = json.dumps(self.server.handle_query()).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def standin():
+    servers = []
+
+    def start(**kwargs):
+        server = CostLimitedShopify(**kwargs)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def _client(server, shop: str) -> ShopifyGraphQL:
+    return ShopifyGraphQL(shop, "token", endpoint=server.endpoint)
+
+
+def _burst(client, count: int, threads: int = 6):
+    results = []
+    lock = threading.Lock()
+
+    def worker(n):
+        for _ in range(n):
+            data = client.execute("query Shop { shop { name } }")
+            with lock:
+                results.append(data)
+
+    workers = [threading.Thread(target=worker, args=(count // threads,)) for _ in range(threads)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    return results
+
+
+class TestQueryCostBudget:
+    """Bucket bookkeeping."""
+
+    def test_throttle_status_resyncs_bucket_minus_in_flight(self):
+        budget = QueryCostBudget()
+        budget.synced = True
+        first = budget.acquire("q")
+        budget.acquire("q")
+
+        budget.observe("q", first, {"cost": {
+            "requestedQueryCost": 12,
+            "actualQueryCost": 10,
+            "throttleStatus": {"maximumAvailable": 2000.0, "currentlyAvailable": 500, "restoreRate": 100.0},
+        }})
+
+        assert budget.maximum_available == 2000.0 and budget.restore_rate == 100.0
+        # The second query's reservation is still in flight
+        assert 449 <= budget.available <= 451
+        assert budget.costs["q"] == 12.0
+
+    def test_sends_one_query_until_the_limit_is_known(self):
+        budget = QueryCostBudget()
+        budget.acquire("q")
+
+        assert budget._reserve("q") == (50.0, 0.01)
+
+    def test_waits_for_refill_when_empty(self):
+        budget = QueryCostBudget(maximum_available=100.0, restore_rate=500.0)
+        budget.available = 0.0
+
+        started = time.monotonic()
+        assert budget.acquire("q") == 50.0
+        assert time.monotonic() - started >= 0.09
+        assert budget.stats["delayed"] == 1
+
+    def test_failed_request_hands_reservation_back(self):
+        budget = QueryCostBudget(restore_rate=0.001)
+        reserved = budget.acquire("q")
+        budget.observe("q", reserved, None)
+
+        assert budget.available == pytest.approx(1000.0, abs=0.1)
+        assert budget.in_flight_cost == 0.0
+
+
+class TestCostAwareExecute:
+    """Bursts against the cost-limited stand-in."""
+
+    def test_burst_is_paced_without_throttles(self, standin):
+        server = standin()
+        client = _client(server, "burst.myshopify.com")
+
+        results = _burst(client, 24)
+
+        assert len(results) == 24
+        assert server.throttled == 0
+        assert client.cost_budget.stats["delayed"] > 0
+
+    def test_learns_the_cost_of_expensive_queries(self, standin):
+        # Costlier than the default estimate; the first response teaches the budget its cost
+        server = standin(requested_cost=80, actual_cost=70, maximum=200.0, restore_rate=2000.0)
+        client = _client(server, "expensive.myshopify.com")
+
+        results = _burst(client, 12)
+
+        assert len(results) == 12
+        assert client.cost_budget.costs["query Shop { shop { name } }"] == 80.0
+        throttled_during_warmup = server.throttled
+        _burst(client, 12)
+        assert server.throttled == throttled_during_warmup
+
+    def test_async_burst_is_paced(self, standin):
+        server = standin()
+        client = _client(server, "async.myshopify.com")
+
+        async def run():
+            return await asyncio.gather(*(client.execute_async("query Shop { shop { name } }") for _ in range(16)))
+
+        results = asyncio.run(run())
+
+        assert len(results) == 16
+        assert server.throttled == 0
+
+
+class TestStoreOverviewBudget:
+    """Callers see the remaining budget."""
+
+    def test_overview_reports_remaining_budget(self):
+        fetcher = ShopifyDataFetcher("overview.myshopify.com", "token")
+        fetcher.graphql_api.cost_budget.available = 640.0
+
+        with patch.object(fetcher.graphql_api, "get_store_pulse", return_value={"shop": {"name": "Test"}}):
+            overview = fetcher.get_store_overview()
+
+        assert overview["shop"] == {"name": "Test"}
+        assert overview["api_budget"]["currently_available"] >= 640.0
+        assert overview["api_budget"]["maximum_available"] == 1000.0
+
+    def test_cached_overview_reports_current_budget(self):
+        fetcher = ShopifyDataFetcher("cached.myshopify.com", "token")
+        fetcher.graphql_api.cost_budget.available = 320.0
+
+        with patch.object(fetcher, "_get_cached", return_value={"shop": {"name": "Test"}}):
+            overview = fetcher.get_store_overview()
+
+        assert overview["shop"] == {"name": "Test"}
+        assert 320.0 <= overview["api_budget"]["currently_available"] < 1000.0
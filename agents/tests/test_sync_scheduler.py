@@ -0,0 +1,185 @@
+"""Tests for the multi-merchant sync scheduler."""
+
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import Mock
+
+from sqlalchemy.dialects import postgresql
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from app.services.sync_scheduler import SyncJob, SyncScheduler, discover_sync_jobs, discover_sync_jobs_query  # noqa: E402
+
+
+NOW = datetime.now(timezone.utc)
+
+
+def _job(merchant_id: int, provider: str, hours_ago=None) -> SyncJob:
+    return SyncJob(
+        merchant_id=merchant_id,
+        merchant_name=f"merchant_{merchant_id}",
+        provider=provider,
+        last_sync_at=NOW - timedelta(hours=hours_ago) if hours_ago is not None else None,
+    )
+
+
+class RecordingRunner:
+    """Stand-in for run_sync_job that records start order and concurrency."""
+
+    def __init__(self, duration: float = 0.05, fail=()):
+        self.duration = duration
+        self.fail = set(fail)
+        self.started = []
+        self.running = []
+        self.peak_by_provider = {}
+        self.merchant_overlap = False
+        self.credentials = {}
+        self.lock = threading.Lock()
+
+    def __call__(self, provider: str, merchant_id: int, credentials: dict):
+        with self.lock:
+            self.started.append((merchant_id, provider))
+            self.credentials[merchant_id] = credentials
+            self.merchant_overlap |= any(m == merchant_id for m, _ in self.running)
+            self.running.append((merchant_id, provider))
+            count = sum(1 for _, p in self.running if p == provider)
+            self.peak_by_provider[provider] = max(self.peak_by_provider.get(provider, 0), count)
+        time.sleep(self.duration)
+        with self.lock:
+            self.running.remove((merchant_id, provider))
+        if (merchant_id, provider) in self.fail:
+            raise RuntimeError("api down")
+        return {"status": "success"}
+
+
+def _scheduler(runner, max_workers=4, **limits) -> SyncScheduler:
+    return SyncScheduler(
+        max_workers=max_workers,
+        provider_limits=limits or {"freshdesk": 2, "shopify": 2},
+        runner=runner,
+        executor_factory=lambda workers: ThreadPoolExecutor(max_workers=workers),
+    )
+
+
+class TestSyncScheduler:
+    """Ordering, limits and fairness."""
+
+    def test_stalest_merchants_start_first(self):
+        runner = RecordingRunner()
+        jobs = [_job(1, "freshdesk", 1), _job(2, "freshdesk", 30), _job(3, "freshdesk"), _job(4, "freshdesk", 5)]
+
+        _scheduler(runner, max_workers=1, freshdesk=1).run(jobs)
+
+        assert [merchant for merchant, _ in runner.started] == [3, 2, 4, 1]
+
+    def test_respects_provider_limits(self):
+        runner = RecordingRunner()
+        jobs = [_job(i, "freshdesk", i) for i in range(1, 7)] + [_job(i, "shopify", i) for i in range(7, 10)]
+
+        _scheduler(runner, max_workers=8, freshdesk=2, shopify=3).run(jobs)
+
+        assert runner.peak_by_provider == {"freshdesk": 2, "shopify": 3}
+
+    def test_merchant_runs_one_job_at_a_time(self):
+        runner = RecordingRunner()
+        jobs = [_job(1, "freshdesk"), _job(1, "shopify"), _job(2, "freshdesk", 1), _job(2, "shopify", 1)]
+
+        _scheduler(runner, max_workers=4).run(jobs)
+
+        assert runner.merchant_overlap is False
+        # The second job of merchant 1 waits, so merchant 2 starts ahead of it
+        assert runner.started[:2] == [(1, "freshdesk"), (2, "freshdesk")]
+
+    def test_parallel_window_stays_flat(self):
+        runner = RecordingRunner(duration=0.1)
+        jobs = [_job(i, "freshdesk", i) for i in range(8)]
+
+        started = time.monotonic()
+        _scheduler(runner, max_workers=8, freshdesk=8).run(jobs)
+
+        assert time.monotonic() - started < 0.4
+
+    def test_failures_are_recorded_and_do_not_stop_others(self):
+        runner = RecordingRunner(fail=[(2, "shopify")])
+        scheduler = _scheduler(runner)
+
+        finished = scheduler.run([_job(1, "freshdesk", 2), _job(2, "shopify", 3)])
+
+        assert {job.merchant_id: job.error for job in finished} == {1: None, 2: "api down"}
+        metrics = scheduler.get_metrics()
+        assert metrics["completed"] == 1 and metrics["failed"] == 1
+
+    def test_unsuccessful_results_count_as_failed(self):
+        statuses = {1: "success", 2: "partial", 3: "failed"}
+        scheduler = _scheduler(lambda provider, merchant_id, credentials: {"status": statuses[merchant_id]})
+
+        finished = scheduler.run([_job(1, "freshdesk", 2), _job(2, "freshdesk", 2), _job(3, "shopify", 2)])
+
+        assert {job.merchant_id: job.error for job in finished} == {
+            1: None,
+            2: "Sync finished with status 'partial'",
+            3: "Sync finished with status 'failed'",
+        }
+        metrics = scheduler.get_metrics()
+        assert metrics["completed"] == 1 and metrics["failed"] == 2
+        # Only the successful sync moves the merchant's lag
+        assert metrics["merchant_lag_seconds"]["merchant_2:freshdesk"] > 3600
+
+    def test_metrics_report_queue_depth_and_lag(self):
+        scheduler = _scheduler(RecordingRunner())
+        scheduler.pending = [_job(1, "freshdesk", 2), _job(2, "shopify"), _job(3, "shopify", 1)]
+
+        metrics = scheduler.get_metrics()
+
+        assert metrics["queue_depth"] == 3
+        assert metrics["queue_depth_by_provider"] == {"freshdesk": 1, "shopify": 2}
+        assert abs(metrics["merchant_lag_seconds"]["merchant_1:freshdesk"] - 7200) < 60
+        assert metrics["merchant_lag_seconds"]["merchant_2:shopify"] is None
+
+    def test_successful_sync_resets_lag(self):
+        scheduler = _scheduler(RecordingRunner())
+        scheduler.run([_job(1, "freshdesk", 48)])
+
+        assert scheduler.get_metrics()["merchant_lag_seconds"]["merchant_1:freshdesk"] < 60
+
+    def test_discovery_query_orders_by_staleness(self):
+        sql = str(discover_sync_jobs_query().compile(dialect=postgresql.dialect()))
+
+        assert "merchant_integrations.is_active IS true" in sql
+        assert "ORDER BY sync_metadata.last_sync_at ASC NULLS FIRST" in sql
+
+    def test_discovery_skips_integrations_without_credentials(self):
+        rows = [
+            SimpleNamespace(id=1, name="merchant_1", platform="freshdesk", api_key="key_1", config={"domain": "acme"}, last_sync_at=None),
+            SimpleNamespace(id=2, name="merchant_2", platform="freshdesk", api_key="key_2", config={}, last_sync_at=None),
+            SimpleNamespace(id=3, name="merchant_3", platform="shopify", api_key="", config={"shop_domain": "c.myshopify.com"}, last_sync_at=None),
+            SimpleNamespace(id=4, name="merchant_4", platform="shopify", api_key="key_4", config={"shop_domain": "d.myshopify.com"}, last_sync_at=None),
+        ]
+        session = Mock()
+        session.execute.return_value.all.return_value = rows
+
+        jobs = discover_sync_jobs(session)
+
+        assert {job.merchant_id: job.credentials for job in jobs} == {
+            1: {"api_key": "key_1", "domain": "acme"},
+            4: {"api_key": "key_4", "domain": "d.myshopify.com"},
+        }
+        assert "key_1" not in repr(jobs[0])
+
+    def test_jobs_run_with_their_merchants_credentials(self):
+        runner = RecordingRunner()
+        jobs = [_job(1, "freshdesk"), _job(2, "freshdesk")]
+        for job in jobs:
+            job.credentials = {"api_key": f"key_{job.merchant_id}", "domain": f"merchant{job.merchant_id}"}
+
+        _scheduler(runner).run(jobs)
+
+        assert runner.credentials == {
+            1: {"api_key": "key_1", "domain": "merchant1"},
+            2: {"api_key": "key_2", "domain": "merchant2"},
+        }
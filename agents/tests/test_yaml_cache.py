@@ -0,0 +1,140 @@
+"""Tests for the shared YAML content cache."""
+
+import copy
+import os
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+import yaml
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from app.utils import yaml_cache  # noqa: E402
+from app.utils.yaml_cache import YamlCache, get_yaml_cache, thaw  # noqa: E402
+
+AGENTS_DIR = Path(__file__).parent.parent
+
+
+def _write(path: Path, content: str, bump_ns: int = 0):
+    path.write_text(content)
+    if bump_ns:
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + bump_ns))
+
+
+class CountingSafeLoad:
+    """Wraps yaml.safe_load to count parser calls."""
+
+    def __init__(self):
+        self.calls = 0
+        self._safe_load = yaml.safe_load
+
+    def __call__(self, stream):
+        self.calls += 1
+        return self._safe_load(stream)
+
+
+class TestYamlCache:
+    """Files are parsed once and revalidated by mtime."""
+
+    def test_parses_each_file_once(self, tmp_path):
+        _write(tmp_path / "a.yaml", "prompt: hello\n")
+        cache = YamlCache(check_interval=0)
+        parser = CountingSafeLoad()
+
+        with patch.object(yaml_cache.yaml, "safe_load", parser):
+            first = cache.load(tmp_path / "a.yaml")
+            second = cache.load(str(tmp_path / "a.yaml"))
+
+        assert first is second
+        assert first == {"prompt": "hello"}
+        assert parser.calls == 1
+        assert cache.stats["misses"] == 1 and cache.stats["hits"] == 1
+
+    def test_reloads_when_file_changes(self, tmp_path):
+        path = tmp_path / "a.yaml"
+        _write(path, "version: 1\n")
+        cache = YamlCache(check_interval=0)
+        assert cache.load(path)["version"] == 1
+
+        _write(path, "version: 2\n", bump_ns=1_000_000)
+
+        assert cache.load(path)["version"] == 2
+        assert cache.stats["reloads"] == 1
+
+    def test_skips_stat_within_check_interval(self, tmp_path):
+        path = tmp_path / "a.yaml"
+        _write(path, "version: 1\n")
+        cache = YamlCache(check_interval=60)
+        cache.load(path)
+
+        with patch.object(yaml_cache.os, "stat") as stat:
+            assert cache.load(path)["version"] == 1
+        stat.assert_not_called()
+
+    def test_missing_file_raises(self, tmp_path):
+        with pytest.raises(FileNotFoundError):
+            YamlCache().load(tmp_path / "missing.yaml")
+
+    def test_listing_follows_directory_changes(self, tmp_path):
+        _write(tmp_path / "v1.0.0.yaml", "a: 1\n")
+        cache = YamlCache(check_interval=0)
+        assert [p.name for p in cache.list_files(tmp_path)] == ["v1.0.0.yaml"]
+
+        _write(tmp_path / "v2.0.0.yaml", "a: 2\n")
+        cache.invalidate(tmp_path / "v2.0.0.yaml")
+
+        assert [p.name for p in cache.list_files(tmp_path)] == ["v1.0.0.yaml", "v2.0.0.yaml"]
+        assert cache.list_files(tmp_path / "missing") == []
+
+    def test_content_is_read_only(self, tmp_path):
+        _write(tmp_path / "a.yaml", "workflow: text\nsteps: [one, two]\nnested: {key: value}\n")
+        data = YamlCache().load(tmp_path / "a.yaml")
+
+        with pytest.raises(TypeError):
+            data["workflow"] = "changed"
+        with pytest.raises(TypeError):
+            data["steps"].append("three")
+        with pytest.raises(TypeError):
+            data["nested"].update(key="other")
+
+        mutable = thaw(data)
+        mutable["steps"].append("three")
+        assert copy.deepcopy(data)["nested"] == {"key": "value"}
+        assert data["steps"] == ["one", "two"]
+
+
+class TestLoadersUseCache:
+    """Loaders and catalog routes read through the shared cache."""
+
+    @pytest.fixture(autouse=True)
+    def agents_cwd(self, monkeypatch):
+        monkeypatch.chdir(AGENTS_DIR)
+
+    def test_workflow_copy_leaves_cache_untouched(self):
+        from app.workflows.loader import WorkflowLoader
+
+        workflow = WorkflowLoader().get_workflow("ad_hoc_support")
+        workflow["workflow"] += "\nExtra"
+
+        assert "Extra" not in WorkflowLoader().get_workflow("ad_hoc_support")["workflow"]
+
+    def test_cold_catalog_requests_do_not_parse_yaml(self):
+        from fastapi import FastAPI
+        from fastapi.testclient import TestClient
+        from app.api.routes import catalog
+
+        get_yaml_cache().preload(["prompts", "data/universes", "config"])
+        app = FastAPI()
+        app.include_router(catalog.router)
+        client = TestClient(app)
+        parser = CountingSafeLoad()
+
+        with patch.object(yaml_cache.yaml, "safe_load", parser):
+            for route in ("merchants", "scenarios", "workflows", "universes",
+                          "recommendations", "cj-versions"):
+                assert client.get(f"/api/v1/catalog/{route}").status_code == 200
+
+        assert parser.calls == 0
@@ -3,9 +3,56 @@ Base configuration class for all HireCJ services.
 
 Provides common configuration patterns using Pydantic.
 """
-from typing import Optional
+import os
+from typing import Literal, Optional
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+# Environment markers of platforms where a process may be frozen between requests,
+# so pooled connections would go stale (or exhaust the database) across instances.
+SERVERLESS_ENV_MARKERS = ("AWS_LAMBDA_FUNCTION_NAME", "VERCEL", "FUNCTIONS_WORKER_RUNTIME")
+
+
+class DatabasePoolConfig(BaseSettings):
+    """SQLAlchemy connection pool settings for shared.database.
+    
+    Read from DB_POOL_* environment variables (DB_POOL_SIZE=10, DB_POOL_MODE=null, ...).
+    A service can override any value for itself with <SERVICE>_DB_POOL_*, e.g.
+    AGENTS_DB_POOL_SIZE=20, by loading its config with for_service().
+    """
+    
+    # "queue" keeps a QueuePool, "null" opens a connection per checkout (serverless-safe),
+    # "auto" picks "null" on serverless platforms and "queue" everywhere else
+    mode: Literal["auto", "queue", "null"] = "auto"
+    size: int = 5                 # Connections kept open in the pool
+    max_overflow: int = 10        # Extra connections allowed under burst load
+    timeout: float = 30.0         # Seconds to wait for a free connection before erroring
+    recycle: int = 1800           # Replace connections older than this many seconds
+    pre_ping: bool = True         # Test connections on checkout (survives DB/pooler restarts)
+    
+    model_config = SettingsConfigDict(
+        env_prefix="DB_POOL_",
+        case_sensitive=False,
+        extra="ignore",
+    )
+    
+    @classmethod
+    def for_service(cls, service_name: str) -> "DatabasePoolConfig":
+        """Load DB_POOL_* settings with <SERVICE>_DB_POOL_* overrides applied."""
+        base = cls()
+        prefix = f"{service_name.upper().replace('-', '_')}_DB_POOL_"
+        overrides = cls(_env_prefix=prefix)
+        return base.model_copy(update={
+            name: getattr(overrides, name) for name in overrides.model_fields_set
+        })
+    
+    def resolved_mode(self) -> str:
+        """The effective pool mode ("queue" or "null") after resolving "auto"."""
+        if self.mode != "auto":
+            return self.mode
+        if any(os.environ.get(marker) for marker in SERVERLESS_ENV_MARKERS):
+            return "null"
+        return "queue"
+
 
 class ServiceConfig(BaseSettings):
     """Base configuration for all services."""
@@ -42,3 +89,7 @@ class ServiceConfig(BaseSettings):
     def get_bind_address(self) -> str:
         """Get the address to bind the service to."""
         return f"{self.host}:{self.port}"
+    
+    def get_database_pool_config(self) -> DatabasePoolConfig:
+        """Get this service's database pool settings (see DatabasePoolConfig)."""
+        return DatabasePoolConfig.for_service(self.service_name)
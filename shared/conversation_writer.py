@@ -0,0 +1,232 @@
+"""
+Buffered writer for the conversations table.
+
+Messages are queued in memory and written with one multi-row INSERT per batch
+(user_identity.save_conversation_messages) when either the batch is full or the
+oldest queued message has waited max_delay seconds. close() - also registered
+with atexit - flushes whatever is still queued.
+
+A batch that fails because the database is unreachable stays queued and is
+retried (max_buffer bounds the backlog). Any other failure usually means one
+bad row (an unknown user_id, a \u0000 in the JSON), so the batch is written row
+by row and only the rows that are rejected are dropped and logged. A batch that
+keeps failing that way is dropped after max_attempts flushes, so it cannot
+block the messages queued behind it.
+
+Usage:
+    from shared.conversation_writer import get_conversation_writer
+
+    get_conversation_writer().enqueue(user_id, {"sender": "CJ", "content": "Hi"})
+"""
+
+import atexit
+import logging
+import os
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import psycopg2
+from psycopg2.pool import PoolError
+
+from shared.user_identity import save_conversation_messages
+
+logger = logging.getLogger(__name__)
+
+Row = Tuple[str, Dict[str, Any], datetime]
+
+# Failures that say nothing about the rows themselves: keep the batch and retry it
+TRANSIENT_ERRORS = (psycopg2.OperationalError, psycopg2.InterfaceError, PoolError)
+
+
+class ConversationMessageWriter:
+    """Groups conversation message inserts into size/time-bounded batches."""
+
+    def __init__(self, max_batch: int = 50, max_delay: float = 1.0, max_buffer: int = 10000,
+                 max_attempts: int = 5):
+        """
+        Args:
+            max_batch: Flush as soon as this many messages are queued
+            max_delay: Flush messages that have waited this many seconds
+            max_buffer: Drop the oldest messages beyond this many (e.g. while the DB is down)
+            max_attempts: Drop a batch after this many failed flushes
+        """
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.max_buffer = max_buffer
+        self.max_attempts = max_attempts
+        self._buffer: List[Row] = []
+        # Failed flushes of the batch at the front of the buffer
+        self._attempts = 0
+        self._condition = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._closed = False
+        self.stats = {"enqueued": 0, "written": 0, "batches": 0, "dropped": 0, "rejected": 0, "failures": 0}
+        self._thread = threading.Thread(target=self._run, name="conversation-writer", daemon=True)
+        self._thread.start()
+
+    def enqueue(self, user_id: str, message: Dict[str, Any]) -> None:
+        """Queue a message; created_at is taken now, not when the batch is written."""
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("ConversationMessageWriter is closed")
+            self._buffer.append((user_id, message, datetime.utcnow()))
+            self.stats["enqueued"] += 1
+            if len(self._buffer) > self.max_buffer:
+                dropped = len(self._buffer) - self.max_buffer
+                del self._buffer[:dropped]
+                self.stats["dropped"] += dropped
+                logger.error(f"[CONVERSATION_WRITER] Buffer full, dropped {dropped} oldest messages")
+            # Wake the flusher to start the delay timer or to write a full batch
+            if len(self._buffer) == 1 or len(self._buffer) >= self.max_batch:
+                self._condition.notify()
+
+    def flush(self) -> int:
+        """Write everything queued so far. Returns the number of messages written."""
+        written = 0
+        with self._flush_lock:
+            while True:
+                with self._condition:
+                    batch = self._buffer[:self.max_batch]
+                    del self._buffer[:len(batch)]
+                if not batch:
+                    return written
+                try:
+                    save_conversation_messages(batch)
+                except TRANSIENT_ERRORS as e:
+                    # Database unreachable: keep the batch (bounded by max_buffer) and retry it
+                    self.stats["failures"] += 1
+                    logger.error(f"[CONVERSATION_WRITER] Failed to write {len(batch)} messages: {e}")
+                    self._requeue(batch)
+                    return written
+                except Exception as e:
+                    self.stats["failures"] += 1
+                    logger.error(f"[CONVERSATION_WRITER] Failed to write {len(batch)} messages: {e}")
+                    saved, batch = self._write_rows(batch)
+                    written += saved
+                    if batch and self._retry_later(batch):
+                        return written
+                    self._attempts = 0
+                    continue
+                self._attempts = 0
+                written += len(batch)
+                self.stats["written"] += len(batch)
+                self.stats["batches"] += 1
+
+    def _write_rows(self, batch: List[Row]) -> Tuple[int, List[Row]]:
+        """Write a failed batch one row at a time, dropping the rows that are rejected.
+
+        Rows are only blamed when others went through; if none did, or the database
+        goes away part way, the unwritten rows are returned for a retry.
+
+        Returns:
+            (rows written, rows to retry)
+        """
+        saved = 0
+        rejected: List[Tuple[Row, Exception]] = []
+        remaining: List[Row] = []
+        for index, row in enumerate(batch):
+            try:
+                save_conversation_messages([row])
+            except TRANSIENT_ERRORS:
+                remaining = batch[index:]
+                break
+            except Exception as e:
+                rejected.append((row, e))
+                continue
+            saved += 1
+            self.stats["written"] += 1
+
+        if not saved:
+            return 0, [row for row, _ in rejected] + remaining
+        for (user_id, _, created_at), error in rejected:
+            logger.error(f"[CONVERSATION_WRITER] Dropped message for {user_id} from {created_at}: {error}")
+        self.stats["rejected"] += len(rejected)
+        return saved, remaining
+
+    def _requeue(self, batch: List[Row]) -> None:
+        # Back in front so ordering survives a retry
+        with self._condition:
+            self._buffer[:0] = batch
+
+    def _retry_later(self, batch: List[Row]) -> bool:
+        """Requeue a failed batch, or drop it after max_attempts. Returns True if requeued."""
+        self._attempts += 1
+        if self._attempts < self.max_attempts:
+            self._requeue(batch)
+            return True
+        self.stats["dropped"] += len(batch)
+        logger.error(
+            f"[CONVERSATION_WRITER] Dropped {len(batch)} messages after {self._attempts} failed attempts"
+        )
+        return False
+
+    def pending(self) -> int:
+        """Number of messages waiting to be written."""
+        with self._condition:
+            return len(self._buffer)
+
+    def close(self, timeout: float = 10.0) -> None:
+        """Stop the background thread and flush what is left."""
+        with self._condition:
+            if self._closed:
+                return
+            self._closed = True
+            self._condition.notify()
+        self._thread.join(timeout)
+        self.flush()
+
+    def _run(self) -> None:
+        backoff = 0.0
+        while True:
+            with self._condition:
+                if not self._closed:
+                    if backoff:
+                        self._condition.wait(backoff)
+                    elif len(self._buffer) < self.max_batch:
+                        self._condition.wait(self._wait_time())
+                if self._closed:
+                    return
+                due = bool(self._buffer) and (
+                    len(self._buffer) >= self.max_batch
+                    or (datetime.utcnow() - self._buffer[0][2]).total_seconds() >= self.max_delay
+                )
+            if due:
+                failures = self.stats["failures"]
+                self.flush()
+                # Back off after a failed write instead of retrying in a tight loop
+                backoff = self.max_delay if self.stats["failures"] > failures else 0.0
+
+    def _wait_time(self) -> Optional[float]:
+        """Seconds until the oldest queued message is due (None = wait for a notify)."""
+        if not self._buffer:
+            return None
+        waited = (datetime.utcnow() - self._buffer[0][2]).total_seconds()
+        return max(self.max_delay - waited, 0.0)
+
+
+_writer: Optional[ConversationMessageWriter] = None
+_writer_lock = threading.Lock()
+
+
+def get_conversation_writer() -> ConversationMessageWriter:
+    """Process-wide writer (CONVERSATION_WRITER_BATCH_SIZE / _MAX_DELAY / _MAX_ATTEMPTS)."""
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = ConversationMessageWriter(
+                max_batch=int(os.getenv("CONVERSATION_WRITER_BATCH_SIZE", "50")),
+                max_delay=float(os.getenv("CONVERSATION_WRITER_MAX_DELAY", "1.0")),
+                max_attempts=int(os.getenv("CONVERSATION_WRITER_MAX_ATTEMPTS", "5")),
+            )
+            atexit.register(_writer.close)
+        return _writer
+
+
+def close_conversation_writer() -> None:
+    """Flush and stop the process-wide writer, if one was started."""
+    global _writer
+    with _writer_lock:
+        writer, _writer = _writer, None
+    if writer is not None:
+        writer.close()
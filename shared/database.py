@@ -5,14 +5,18 @@ This is the single source of truth for all database connections.
 """
 
 import os
+import threading
+import time
 import psycopg2
 from contextlib import contextmanager
-from sqlalchemy import create_engine
+from typing import Any, Dict, Optional
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker, Session
-from sqlalchemy.pool import NullPool
+from sqlalchemy.pool import NullPool, QueuePool
 
 # This import will load environment variables from the root .env file.
 from shared.env_loader import get_env
+from shared.config_base import DatabasePoolConfig
 
 
 def get_connection_string() -> str:
@@ -50,20 +54,156 @@ def execute_query(query: str, params=None):
 # Global engine and session factory to avoid re-creation
 _engine = None
 _SessionLocal = None
+_pool_config: Optional[DatabasePoolConfig] = None
+
+
+class PoolMetrics:
+    """Thread-safe counters describing how the engine's pool is being used."""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.connects = 0
+        self.invalidations = 0
+        self.total_wait_s = 0.0
+        self.max_wait_s = 0.0
+    
+    def record_wait(self, seconds: float) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.total_wait_s += seconds
+            self.max_wait_s = max(self.max_wait_s, seconds)
+    
+    def record_connect(self) -> None:
+        with self._lock:
+            self.connects += 1
+    
+    def record_invalidation(self) -> None:
+        with self._lock:
+            self.invalidations += 1
+    
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "connects": self.connects,
+                "invalidations": self.invalidations,
+                "avg_wait_ms": round(self.total_wait_s / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+                "max_wait_ms": round(self.max_wait_s * 1000, 3),
+            }
+
+
+class MeteredQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited for a connection."""
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+    
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            self.metrics.record_wait(time.perf_counter() - started)
+    
+    def recreate(self):
+        # Keep counters across pool recreation (e.g. after engine.dispose())
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+class MeteredNullPool(NullPool):
+    """NullPool with the same metrics surface; every checkout opens a new connection."""
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+    
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            self.metrics.record_wait(time.perf_counter() - started)
+    
+    def recreate(self):
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+def configure_database_pool(config: DatabasePoolConfig) -> None:
+    """Set the pool settings used for the global engine.
+    
+    Services call this once at startup, before anything touches the database, e.g.
+    configure_database_pool(DatabasePoolConfig.for_service("agents")). Without it the
+    engine uses the plain DB_POOL_* settings.
+    """
+    global _pool_config
+    if _engine is not None:
+        raise RuntimeError("Database engine already created; configure the pool before first use")
+    _pool_config = config
+
+
+def _engine_pool_kwargs(config: DatabasePoolConfig) -> Dict[str, Any]:
+    """create_engine() pool arguments for a pool configuration."""
+    if config.resolved_mode() == "null":
+        # Recommended for serverless environments
+        return {"poolclass": MeteredNullPool}
+    return {
+        "poolclass": MeteredQueuePool,
+        "pool_size": config.size,
+        "max_overflow": config.max_overflow,
+        "pool_timeout": config.timeout,
+        "pool_recycle": config.recycle,
+        "pool_pre_ping": config.pre_ping,
+    }
 
 
 def get_engine():
     """Get or create the global SQLAlchemy engine."""
-    global _engine
+    global _engine, _pool_config
     if _engine is None:
+        if _pool_config is None:
+            _pool_config = DatabasePoolConfig()
         _engine = create_engine(
             get_connection_string(),
-            poolclass=NullPool,  # Recommended for serverless environments
             echo=False,
+            **_engine_pool_kwargs(_pool_config),
         )
+        metrics = _engine.pool.metrics
+        event.listen(_engine, "connect", lambda dbapi_conn, record: metrics.record_connect())
+        event.listen(_engine, "invalidate", lambda dbapi_conn, record, exc: metrics.record_invalidation())
     return _engine
 
 
+def get_pool_metrics() -> Dict[str, Any]:
+    """Describe the global engine's pool: configuration, live usage and counters.
+    
+    Returns {"initialized": False} until the engine has been created.
+    """
+    if _engine is None:
+        return {"initialized": False}
+    
+    pool = _engine.pool
+    metrics = {
+        "initialized": True,
+        "mode": _pool_config.resolved_mode(),
+        **pool.metrics.snapshot(),
+    }
+    if isinstance(pool, QueuePool):
+        metrics.update({
+            "size": pool.size(),
+            "max_overflow": _pool_config.max_overflow,
+            "checked_out": pool.checkedout(),
+            "checked_in": pool.checkedin(),
+            "overflow": max(pool.overflow(), 0),
+        })
+    return metrics
+
+
 def get_session_factory():
     """Get or create the global session factory."""
     global _SessionLocal
@@ -2,7 +2,8 @@
 Simplified user identity for HireCJ - Phase 4.5
 
 Just 6 functions, ~140 lines. No over-engineering.
-Direct PostgreSQL connection for full control.
+Direct PostgreSQL access for full control, through a small process-wide
+psycopg2 connection pool. Batched message writes live in conversation_writer.py.
 Includes fact storage as JSONB documents.
 
 CRITICAL: This is the AUTHORITATIVE source for user identity generation.
@@ -17,37 +18,70 @@ import hashlib
 import json
 import os
 import logging
+import threading
 from datetime import datetime
 from typing import Tuple, List, Dict, Any, Optional
 import psycopg2
-from psycopg2.extras import RealDictCursor, Json
+from psycopg2.extras import RealDictCursor, Json, execute_values
+from psycopg2.pool import ThreadedConnectionPool
 from contextlib import contextmanager
 
 # Simple logger setup
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
+# Process-wide connection pool, created on first use
+_pool: Optional[ThreadedConnectionPool] = None
+_pool_slots: Optional[threading.BoundedSemaphore] = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool() -> Tuple[ThreadedConnectionPool, threading.BoundedSemaphore]:
+    """Create the connection pool on first use (IDENTITY_DB_POOL_MIN/MAX, default 1/10)."""
+    global _pool, _pool_slots
+    with _pool_lock:
+        if _pool is None:
+            # Use the single, authoritative env loader
+            db_url = os.getenv("SUPABASE_CONNECTION_STRING")
+            if not db_url:
+                logger.error("SUPABASE_CONNECTION_STRING not set")
+                raise ValueError("Database connection not configured")
+            maxconn = int(os.getenv("IDENTITY_DB_POOL_MAX", "10"))
+            _pool = ThreadedConnectionPool(int(os.getenv("IDENTITY_DB_POOL_MIN", "1")), maxconn, db_url)
+            # ThreadedConnectionPool raises when exhausted; the semaphore makes callers wait instead
+            _pool_slots = threading.BoundedSemaphore(maxconn)
+        return _pool, _pool_slots
+
 
 @contextmanager
 def get_db_connection():
-    """Get PostgreSQL connection using context manager."""
-    # Use the single, authoritative env loader
-    db_url = os.getenv("SUPABASE_CONNECTION_STRING")
-    
-    if not db_url:
-        logger.error("SUPABASE_CONNECTION_STRING not set")
-        raise ValueError("Database connection not configured")
-    
+    """Borrow a pooled PostgreSQL connection; it is rolled back and returned on exit."""
+    pool, slots = _get_pool()
+    slots.acquire()
     conn = None
     try:
-        conn = psycopg2.connect(db_url)
+        conn = pool.getconn()
         yield conn
     except Exception as e:
         logger.error(f"Database connection error: {e}")
         raise
     finally:
-        if conn:
-            conn.close()
+        if conn is not None:
+            try:
+                conn.rollback()  # Never hand back a connection mid-transaction
+            except psycopg2.Error:
+                pass  # Broken connection - discarded below
+            pool.putconn(conn, close=bool(conn.closed))
+        slots.release()
+
+
+def close_pool() -> None:
+    """Close every pooled connection (call on shutdown)."""
+    global _pool, _pool_slots
+    with _pool_lock:
+        if _pool is not None:
+            _pool.closeall()
+        _pool, _pool_slots = None, None
 
 
 def generate_user_id(shop_domain: str) -> str:
@@ -116,6 +150,22 @@ def save_conversation_message(user_id: str, message: Dict[str, Any]) -> None:
             logger.debug(f"Saved message for user {user_id}")
 
 
+def save_conversation_messages(rows: List[Tuple[str, Dict[str, Any], datetime]]) -> None:
+    """Save many (user_id, message, created_at) rows with one multi-row INSERT."""
+    if not rows:
+        return
+    with get_db_connection() as conn:
+        with conn.cursor() as cur:
+            execute_values(
+                cur,
+                "INSERT INTO conversations (user_id, message, created_at) VALUES %s",
+                [(user_id, Json(message), created_at) for user_id, message, created_at in rows],
+                page_size=len(rows)
+            )
+            conn.commit()
+            logger.debug(f"Saved {len(rows)} messages")
+
+
 def get_user_conversations(user_id: str, limit: int = 100) -> List[Dict[str, Any]]:
     """Get recent conversations for a user."""
     with get_db_connection() as conn:
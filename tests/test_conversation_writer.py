@@ -0,0 +1,133 @@
+"""
+Unit tests for the buffered conversation message writer.
+"""
+
+import time
+import psycopg2
+import pytest
+from unittest.mock import patch
+
+from shared.conversation_writer import ConversationMessageWriter
+
+
+@pytest.fixture
+def saved_batches():
+    """Capture batches instead of writing them to the database."""
+    batches = []
+    with patch("shared.conversation_writer.save_conversation_messages", side_effect=lambda rows: batches.append(list(rows))):
+        yield batches
+
+
+class TestConversationMessageWriter:
+    """Test batching, timed flushes and shutdown."""
+
+    def test_full_batch_is_written_immediately(self, saved_batches):
+        """Reaching max_batch triggers one multi-row write without waiting for the timer."""
+        writer = ConversationMessageWriter(max_batch=3, max_delay=60)
+        for i in range(3):
+            writer.enqueue("usr_1", {"content": f"m{i}"})
+
+        deadline = time.time() + 2
+        while not saved_batches and time.time() < deadline:
+            time.sleep(0.01)
+        writer.close()
+
+        assert len(saved_batches) == 1
+        assert [message["content"] for _, message, _ in saved_batches[0]] == ["m0", "m1", "m2"]
+
+    def test_partial_batch_is_written_after_max_delay(self, saved_batches):
+        """A lone message is flushed once it has waited max_delay."""
+        writer = ConversationMessageWriter(max_batch=100, max_delay=0.05)
+        writer.enqueue("usr_1", {"content": "hello"})
+
+        deadline = time.time() + 2
+        while not saved_batches and time.time() < deadline:
+            time.sleep(0.01)
+
+        assert len(saved_batches) == 1
+        assert writer.pending() == 0
+        writer.close()
+
+    def test_close_flushes_remaining_messages(self, saved_batches):
+        """Shutdown writes everything still queued, split into max_batch chunks."""
+        writer = ConversationMessageWriter(max_batch=4, max_delay=60)
+        for i in range(10):
+            writer.enqueue("usr_1", {"content": f"m{i}"})
+        writer.close()
+
+        assert sum(len(batch) for batch in saved_batches) == 10
+        assert all(len(batch) <= 4 for batch in saved_batches)
+        with pytest.raises(RuntimeError):
+            writer.enqueue("usr_1", {"content": "late"})
+
+    def test_failed_batch_is_kept_for_retry(self):
+        """A failed write leaves the batch queued, in order, for the next flush."""
+        writer = ConversationMessageWriter(max_batch=10, max_delay=60)
+        writer.enqueue("usr_1", {"content": "a"})
+        writer.enqueue("usr_1", {"content": "b"})
+
+        with patch("shared.conversation_writer.save_conversation_messages", side_effect=Exception("db down")):
+            assert writer.flush() == 0
+        assert writer.pending() == 2
+        assert writer.stats["failures"] == 1
+
+        with patch("shared.conversation_writer.save_conversation_messages") as save:
+            writer.close()
+        rows = save.call_args[0][0]
+        assert [message["content"] for _, message, _ in rows] == ["a", "b"]
+
+    def test_bad_row_is_dropped_and_the_rest_written(self):
+        """A batch rejected for one row is written row by row without that row."""
+        writer = ConversationMessageWriter(max_batch=10, max_delay=60)
+        for content in ["a", "bad", "c"]:
+            writer.enqueue("usr_1", {"content": content})
+        written = []
+
+        def save(rows):
+            if any(message["content"] == "bad" for _, message, _ in rows):
+                raise ValueError("unsupported Unicode escape sequence")
+            written.extend(message["content"] for _, message, _ in rows)
+
+        with patch("shared.conversation_writer.save_conversation_messages", side_effect=save):
+            assert writer.flush() == 2
+            writer.close()
+
+        assert written == ["a", "c"]
+        assert writer.pending() == 0
+        assert writer.stats["rejected"] == 1
+
+    def test_batch_is_dropped_after_max_attempts(self):
+        """A batch that keeps failing stops blocking the messages behind it."""
+        writer = ConversationMessageWriter(max_batch=1, max_delay=60, max_attempts=2)
+        writer.enqueue("usr_missing", {"content": "a"})
+        writer.enqueue("usr_1", {"content": "b"})
+
+        def save(rows):
+            if rows[0][0] == "usr_missing":
+                raise Exception("violates foreign key constraint")
+
+        with patch("shared.conversation_writer.save_conversation_messages", side_effect=save):
+            assert writer.flush() == 0
+            assert writer.pending() == 2
+            assert writer.flush() == 1
+            writer.close()
+
+        assert writer.pending() == 0
+        assert writer.stats["dropped"] == 1
+
+    def test_outage_keeps_batch_without_splitting(self):
+        """Connection errors requeue the batch as a whole and do not count toward max_attempts."""
+        writer = ConversationMessageWriter(max_batch=10, max_delay=60, max_attempts=1)
+        writer.enqueue("usr_1", {"content": "a"})
+        writer.enqueue("usr_1", {"content": "b"})
+
+        with patch("shared.conversation_writer.save_conversation_messages",
+                   side_effect=psycopg2.OperationalError("connection refused")) as save:
+            assert writer.flush() == 0
+            assert writer.flush() == 0
+        assert save.call_count == 2
+        assert writer.pending() == 2
+
+        with patch("shared.conversation_writer.save_conversation_messages"):
+            writer.close()
+        assert writer.stats["written"] == 2
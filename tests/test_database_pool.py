@@ -0,0 +1,121 @@
+"""
+Unit tests for the pooled shared database engine.
+"""
+
+import pytest
+from unittest.mock import patch
+
+import shared.database as database
+from pydantic_settings import SettingsConfigDict
+
+from shared.config_base import DatabasePoolConfig, ServiceConfig
+
+
+class EditorBackendConfig(ServiceConfig):
+    """Minimal service config, like editor-backend's Settings."""
+    service_name: str = "editor-backend"
+    port: int = 8001
+
+    model_config = SettingsConfigDict(env_file=None, extra="ignore")
+
+
+@pytest.fixture
+def fresh_engine(tmp_path):
+    """Reset the global engine and point it at a throwaway SQLite database."""
+    database._engine = None
+    database._SessionLocal = None
+    database._pool_config = None
+    with patch.object(database, "get_connection_string", return_value=f"sqlite:///{tmp_path / 'pool.db'}"):
+        yield
+    if database._engine is not None:
+        database._engine.dispose()
+    database._engine = None
+    database._SessionLocal = None
+    database._pool_config = None
+
+
+class TestDatabasePoolConfig:
+    """Test pool settings resolution."""
+
+    def test_service_overrides_global_settings(self, monkeypatch):
+        """<SERVICE>_DB_POOL_* wins over DB_POOL_* for that service only."""
+        monkeypatch.setenv("DB_POOL_SIZE", "7")
+        monkeypatch.setenv("DB_POOL_RECYCLE", "600")
+        monkeypatch.setenv("AGENTS_DB_POOL_SIZE", "20")
+
+        agents = DatabasePoolConfig.for_service("agents")
+        auth = DatabasePoolConfig.for_service("auth")
+
+        assert (agents.size, agents.recycle) == (20, 600)
+        assert (auth.size, auth.recycle) == (7, 600)
+
+    def test_service_config_exposes_pool_settings(self, monkeypatch):
+        """ServiceConfig subclasses resolve their pool with their own service name."""
+        monkeypatch.setenv("EDITOR_BACKEND_DB_POOL_MAX_OVERFLOW", "2")
+
+        config = EditorBackendConfig()
+
+        assert config.get_database_pool_config().max_overflow == 2
+
+    def test_auto_mode_falls_back_to_null_pool_on_serverless(self, monkeypatch):
+        """"auto" resolves to a per-checkout connection when a serverless marker is set."""
+        monkeypatch.delenv("AWS_LAMBDA_FUNCTION_NAME", raising=False)
+        assert DatabasePoolConfig().resolved_mode() == "queue"
+
+        monkeypatch.setenv("AWS_LAMBDA_FUNCTION_NAME", "agents")
+        assert DatabasePoolConfig().resolved_mode() == "null"
+        assert DatabasePoolConfig(mode="queue").resolved_mode() == "queue"
+
+
+class TestPooledEngine:
+    """Test the global engine's pool and metrics."""
+
+    def test_sessions_reuse_pooled_connections(self, fresh_engine):
+        """Repeated sessions check out the same physical connection."""
+        database.configure_database_pool(DatabasePoolConfig(mode="queue", size=2, max_overflow=1))
+
+        for _ in range(5):
+            with database.get_db_session() as session:
+                session.connection()
+
+        metrics = database.get_pool_metrics()
+        assert isinstance(database.get_engine().pool, database.MeteredQueuePool)
+        assert metrics["mode"] == "queue"
+        assert metrics["checkouts"] == 5
+        assert metrics["connects"] == 1
+        assert metrics["checked_out"] == 0
+        assert metrics["size"] == 2
+
+    def test_metrics_track_checked_out_connections(self, fresh_engine):
+        """Open sessions show up as checked out and overflow past the pool size."""
+        database.configure_database_pool(DatabasePoolConfig(mode="queue", size=1, max_overflow=2))
+        engine = database.get_engine()
+
+        first, second = engine.connect(), engine.connect()
+        metrics = database.get_pool_metrics()
+        first.close()
+        second.close()
+
+        assert metrics["checked_out"] == 2
+        assert metrics["overflow"] == 1
+        assert metrics["max_wait_ms"] >= 0
+
+    def test_null_mode_opens_connection_per_checkout(self, fresh_engine):
+        """The serverless-safe mode never keeps connections between checkouts."""
+        database.configure_database_pool(DatabasePoolConfig(mode="null"))
+
+        for _ in range(3):
+            with database.get_engine().connect():
+                pass
+
+        metrics = database.get_pool_metrics()
+        assert metrics["mode"] == "null"
+        assert metrics["connects"] == 3
+        assert "checked_out" not in metrics
+
+    def test_configure_after_engine_creation_is_rejected(self, fresh_engine):
+        """Pool settings cannot change once the engine exists."""
+        database.get_engine()
+
+        with pytest.raises(RuntimeError):
+            database.configure_database_pool(DatabasePoolConfig(size=1))